@@ -3,39 +3,66 @@ FastAPI application with RQ job queue integration
 
 PERFORMANCE: Rate limiting configured for 300 concurrent users
 - /api/submit: 5 req/min per IP (prevent spam submissions)
-- /api/result/{job_id}: 30 req/min per IP (polling)
+- /api/result/{job_id}: 30 req/min per IP (long-poll with ?wait=N)
+- /api/result/{job_id}/events: Server-Sent Events pushed from Redis pub/sub
 - /api/problems: 20 req/min per IP (reduce cache misses)
 - Admin endpoints: 60 req/min per IP (higher limit for teachers)
+- Bulk regrades run on their own low-priority "regrade" queue
+- Fully async request path: database through the async engine
+  (backend/async_database.py), Redis through redis.asyncio and enqueues
+  through AsyncQueue (backend/job_queue.py), so no handler blocks the
+  event loop on a round-trip; filesystem-bound problem listing runs in
+  the threadpool
+- Submissions go to RQ through a transactional outbox (backend/sagas/):
+  submit is one database transaction, with no Redis call
 """
-from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text
-from redis import Redis
-from rq import Queue
-from rq.job import Job
+from sqlalchemy import func, select, text
+from redis.asyncio import ConnectionPool, Redis
+import asyncio
 import pathlib
 import json
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
-from .database import get_db, init_db, SessionLocal, engine
-from .models import Submission, TestResult
+from .async_database import get_async_db, init_async_db, AsyncSessionLocal, async_engine
+from .cache import get_submission_progress
+from .models import OutboxMessage, Submission, TestResult
 from .config import settings
+from .job_queue import AsyncQueue
+from .sagas import add_job
 from .logging_config import setup_logging, get_logger
 from .validators import validate_submission_request
 from .services.problem_service import problem_service
 from .services.submission_service import submission_service
+from .services.regrade_service import regrade_service
+from .services.result_view_cache import result_view_cache
+from .services.submission_events import (
+    submission_event_hub,
+    sse_event,
+    FINAL_STATUSES,
+    MAX_RESULT_WAIT_SEC,
+    SSE_HEARTBEAT_SEC,
+    SSE_MAX_DURATION_SEC
+)
+from .exceptions import ConflictError, ProblemNotFoundError, ValidationError
 from .schemas import (
     SubmissionRequest,
     SubmissionResponse,
     ResultResponse,
     TestResultSchema,
     AdminSummary,
-    SubmissionsListResponse
+    SubmissionsListResponse,
+    RegradeRequest,
+    RegradeProgress
 )
 
 # Setup logging
@@ -57,14 +84,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Redis connection pool for RQ (DB 0)
+# Redis connection pool for RQ (DB 0), async (redis.asyncio)
 # PERFORMANCE: Connection pooling for 300 concurrent users
 # - max_connections=50: Matches backend pool (20 + 30 overflow)
 # - socket_keepalive=True: Prevent stale connections
 # - socket_timeout=5: Fail fast on network issues
 # - retry_on_timeout=True: Auto-retry on temporary failures
-from redis.connection import ConnectionPool
-
 redis_pool = ConnectionPool(
     host=settings.REDIS_HOST,
     port=settings.REDIS_PORT,
@@ -76,18 +101,28 @@ redis_pool = ConnectionPool(
     decode_responses=False
 )
 redis_conn = Redis(connection_pool=redis_pool)
-queue = Queue("submissions", connection=redis_conn)
+queue = AsyncQueue("submissions", connection=redis_conn)
+# Bulk regrades: workers take it only when "submissions" is empty (worker/regrade.py)
+regrade_queue = AsyncQueue("regrade", connection=redis_conn)
 
 
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
     """Initialize database and logging on startup"""
     setup_logging()
     logger.info("Starting Python Playground API", extra={"version": "2.0.0"})
-    init_db()
+    await init_async_db()
     logger.info("Database initialized successfully")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the submission event listener and close the pools"""
+    await submission_event_hub.stop()
+    await redis_conn.aclose()
+    await async_engine.dispose()
+
+
 @app.get("/api/problems")
 @limiter.limit("20/minute")
 async def list_problems(request: Request) -> Dict[str, Any]:
@@ -97,19 +132,22 @@ async def list_problems(request: Request) -> Dict[str, Any]:
     ASYNC: Non-blocking for better concurrency under load
     """
     logger.info("Fetching list of problems")
-    return problem_service.list_all()
+    # Disco + caché sync: en el threadpool, no en el event loop
+    return await run_in_threadpool(problem_service.list_all)
 
 
 @app.post("/api/submit", response_model=SubmissionResponse)
 @limiter.limit("5/minute")
-async def submit(request: Request, req: SubmissionRequest, db: Session = Depends(get_db)):
+async def submit(request: Request, req: SubmissionRequest, db: AsyncSession = Depends(get_async_db)):
     """Submit code for evaluation - enqueues job
 
     Rate limit: 5 requests per minute per IP (prevents spam submissions)
     ASYNC: Non-blocking for high throughput under concurrent load
 
-    IMPROVEMENT: Atomic transaction - create submission + enqueue + update job_id
-    in single transaction. Prevents race conditions and orphaned records.
+    IMPROVEMENT: Transactional outbox - the submission and its job are written
+    in one transaction that never waits on Redis; backend/sagas/outbox_relay.py
+    enqueues the job once committed, so a slow or unavailable Redis neither
+    holds a connection nor fails the request.
     """
     logger.info(f"Received submission for problem: {req.problem_id}")
 
@@ -117,55 +155,47 @@ async def submit(request: Request, req: SubmissionRequest, db: Session = Depends
     validate_submission_request(req)
 
     try:
-        # Create submission in pending state (no commit yet)
+        # Create submission (no commit yet)
         submission = Submission(
-            job_id="",  # Will be assigned after enqueueing
+            job_id="",  # Assigned with the outbox message below
             student_id=req.student_id,
             problem_id=req.problem_id,
             code=req.code,
-            status="pending"
+            status="queued"
         )
         db.add(submission)
-        db.flush()  # Get submission.id without committing
-
-        logger.info(
-            f"Created submission {submission.id} (pending commit)",
-            extra={"submission_id": submission.id, "problem_id": req.problem_id}
-        )
+        await db.flush()  # Get submission.id without committing
 
-        # Enqueue job in RQ
-        job = queue.enqueue(
+        # Job RQ en la misma transacción: el relay lo encola tras el commit
+        submission.job_id = add_job(
+            db,
+            queue.name,
             "worker.tasks.run_submission_in_sandbox",
+            job_timeout="5m",
             submission_id=submission.id,
             problem_id=req.problem_id,
             code=req.code,
             timeout_sec=req.timeout_sec,
-            memory_mb=req.memory_mb,
-            job_timeout="5m"
+            memory_mb=req.memory_mb
         )
 
-        # Update submission with job_id
-        submission.job_id = job.id
-        submission.status = "queued"
-
-        # Atomic commit: submission + job_id update
-        db.commit()
-        db.refresh(submission)
+        # Atomic commit: submission + outbox message
+        await db.commit()
 
         logger.info(
-            f"Submission {submission.id} atomically committed with job_id {job.id}",
-            extra={"submission_id": submission.id, "job_id": job.id}
+            f"Submission {submission.id} committed with job_id {submission.job_id}",
+            extra={"submission_id": submission.id, "job_id": submission.job_id}
         )
 
         return SubmissionResponse(
-            job_id=job.id,
+            job_id=submission.job_id,
             status="queued",
             message="Submission enqueued successfully"
         )
 
     except Exception as e:
         # Rollback on any error
-        db.rollback()
+        await db.rollback()
         logger.error(
             f"Failed to submit code: {e}",
             extra={"problem_id": req.problem_id, "error": str(e)},
@@ -177,55 +207,160 @@ async def submit(request: Request, req: SubmissionRequest, db: Session = Depends
         )
 
 
-@app.get("/api/result/{job_id}")
+@app.get("/api/result/{job_id}", response_model=None)
 @limiter.limit("30/minute")
-async def get_result(request: Request, job_id: str, db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def get_result(
+    request: Request,
+    job_id: str,
+    wait: float = Query(0, ge=0, le=MAX_RESULT_WAIT_SEC),
+    db: AsyncSession = Depends(get_async_db)
+) -> Union[Dict[str, Any], Response]:
     """Get result of a submission by job_id
 
-    Rate limit: 30 requests per minute per IP (supports exponential backoff polling)
+    Rate limit: 30 requests per minute per IP
     ASYNC: Non-blocking for concurrent polling from 300 users
+    Long-poll: with ?wait=N an unfinished submission is answered as soon as the
+    worker publishes its result (or after N seconds), without holding a DB connection
+    Finished results are served pre-encoded from result_view_cache (no DB query)
     """
-    # Find submission in DB
-    submission = submission_service.get_by_job_id(db=db, job_id=job_id)
-    if not submission:
+    lookup = await result_view_cache.fetch(job_id, _read_result)
+    if lookup is None:
         raise HTTPException(status_code=404, detail="Submission not found")
 
+    if wait and lookup.body is None:
+        if await _wait_until_finished(db, lookup.submission_id, wait):
+            lookup = await result_view_cache.fetch(job_id, _read_result) or lookup
+
     # If completed, return full result
-    if submission.status in ["completed", "failed", "timeout"]:
-        return submission_service.get_result_dict(submission)
+    if lookup.body is not None:
+        return Response(content=lookup.body, media_type="application/json")
+
+    # In progress: live state kept by the worker (one HGETALL, no RQ job deserialization)
+    progress = await get_submission_progress(lookup.submission_id)
+    state = progress.pop("state", None)
+    return {
+        "job_id": job_id,
+        # A final state is only trusted once it is in the database
+        "status": state if state and state not in FINAL_STATUSES else lookup.status,
+        "message": "Job is being processed",
+        "progress": progress or None
+    }
+
+
+async def _read_result(job_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+    """Loader of result_view_cache (its own short session)"""
+    async with AsyncSessionLocal() as db:
+        return await db.run_sync(_load_result, job_id)
+
+
+def _load_result(db: Session, job_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+    submission = submission_service.get_by_job_id(db=db, job_id=job_id)
+    if submission is None:
+        return None
+    return submission.id, submission_service.get_result_dict(submission)
+
+
+async def _wait_until_finished(db: AsyncSession, submission_id: int, timeout: float) -> bool:
+    """Wait for a final status on the pub/sub channel; True if the submission finished"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    await submission_event_hub.start()
+    # Suscribirse antes de releer el estado: un cambio intermedio no se pierde
+    with submission_event_hub.subscribe(submission_id) as events:
+        while True:
+            status = await db.run_sync(submission_service.get_status, submission_id)
+            # Liberar la conexión al pool mientras se espera
+            await db.rollback()
+            if status in FINAL_STATUSES:
+                return True
+            # Los eventos de progreso por test no cambian el estado en la base
+            while True:
+                remaining = deadline - loop.time()
+                event = await submission_event_hub.next_event(events, remaining) if remaining > 0 else None
+                if event is None:
+                    return False
+                if "progress" not in event:
+                    break
+
+
+@app.get("/api/result/{job_id}/events")
+@limiter.limit("30/minute")
+async def stream_result(request: Request, job_id: str) -> StreamingResponse:
+    """Server-Sent Events for a submission: `status` on every change, `progress` as
+    each test finishes, then one `result`
+
+    The worker publishes each committed status change on Redis pub/sub; this
+    stream forwards it without polling. Each database read uses its own short
+    session, so an open stream holds no DB connection.
+    """
+    lookup = await result_view_cache.fetch(job_id, _read_result)
+    if lookup is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+
+    if lookup.body is not None:
+        events = _single_event("result", lookup.body)
+    else:
+        events = _result_events(request, job_id, lookup.submission_id)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-    # If in progress, query RQ job
-    try:
-        job = Job.fetch(job_id, connection=redis_conn)
-        job_status = job.get_status()
-        return {
-            "job_id": job_id,
-            "status": job_status,
-            "message": "Job is being processed"
-        }
-    except Exception as e:
-        logger.warning(
-            f"Could not fetch RQ job {job_id}: {e}",
-            extra={"job_id": job_id, "submission_id": submission.id}
-        )
-        return {
-            "job_id": job_id,
-            "status": submission.status,
-            "message": "Job status unknown - check database record"
-        }
+
+async def _result_events(request: Request, job_id: str, submission_id: int) -> AsyncIterator[str]:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + SSE_MAX_DURATION_SEC
+    await submission_event_hub.start()
+    sent_status = None
+    with submission_event_hub.subscribe(submission_id) as events:
+        while True:
+            async with AsyncSessionLocal() as db:
+                status = await db.run_sync(submission_service.get_status, submission_id)
+            body = None
+            if status in FINAL_STATUSES:
+                lookup = await result_view_cache.fetch(job_id, _read_result)
+                body = lookup.body if lookup is not None else None
+            # El envío se borró mientras el stream estaba abierto: cerrar con un evento de error
+            if status is None or (status in FINAL_STATUSES and body is None):
+                yield sse_event("error", {"job_id": job_id, "detail": "Submission not found"})
+                return
+            if body is not None:
+                yield sse_event("result", body)
+                return
+            if status != sent_status:
+                sent_status = status
+                yield sse_event("status", {"job_id": job_id, "status": status})
+
+            # Esperar un cambio de estado; el progreso por test se reenvía sin releer la base
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0 or await request.is_disconnected():
+                    return
+                event = await submission_event_hub.next_event(events, min(SSE_HEARTBEAT_SEC, remaining))
+                if event is None:
+                    yield ": keepalive\n\n"
+                    break
+                if "progress" not in event:
+                    break
+                yield sse_event("progress", {"job_id": job_id, **event["progress"]})
+
+
+async def _single_event(event: str, data: bytes) -> AsyncIterator[str]:
+    yield sse_event(event, data)
 
 
 # ==================== ADMIN ENDPOINTS ====================
 
 @app.get("/api/admin/summary")
 @limiter.limit("60/minute")
-async def admin_summary(request: Request, db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def admin_summary(request: Request, db: AsyncSession = Depends(get_async_db)) -> Dict[str, Any]:
     """Get summary statistics for admin panel
 
     Rate limit: 60 requests per minute per IP (higher limit for teachers)
     ASYNC: Non-blocking for dashboard real-time updates
     """
-    return submission_service.get_statistics(db)
+    return await db.run_sync(submission_service.get_statistics)
 
 
 @app.get("/api/admin/submissions")
@@ -236,15 +371,15 @@ async def admin_submissions(
     offset: int = 0,
     problem_id: Optional[str] = None,
     student_id: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """Get recent submissions with filters
 
     Rate limit: 60 requests per minute per IP (higher limit for teachers)
     ASYNC: Non-blocking for admin dashboard
     """
-    return submission_service.list_submissions(
-        db=db,
+    return await db.run_sync(
+        submission_service.list_submissions,
         limit=limit,
         offset=offset,
         problem_id=problem_id,
@@ -252,6 +387,72 @@ async def admin_submissions(
     )
 
 
+@app.post("/api/admin/regrade", response_model=RegradeProgress)
+@limiter.limit("60/minute")
+async def admin_regrade(request: Request, req: RegradeRequest, db: AsyncSession = Depends(get_async_db)):
+    """Regrade all finished submissions of a problem (optionally of one student) in place
+
+    mode "rescore" only recomputes points with the current rubric (no sandbox runs).
+    Runs on the low-priority regrade queue; poll /api/admin/regrade/{run_id} for progress.
+    """
+    try:
+        problem_service.get_problem_dir(req.problem_id)
+    except ProblemNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    run = await db.run_sync(
+        regrade_service.create_run, problem_id=req.problem_id, student_id=req.student_id, mode=req.mode
+    )
+    return await _enqueue_regrade(db, run)
+
+
+@app.get("/api/admin/regrade/{run_id}", response_model=RegradeProgress)
+@limiter.limit("60/minute")
+async def admin_regrade_progress(request: Request, run_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Progress, throughput and ETA of a regrade run"""
+    try:
+        run = await db.run_sync(regrade_service.get_run, run_id)
+    except ValidationError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return regrade_service.get_progress(run)
+
+
+@app.post("/api/admin/regrade/{run_id}/resume", response_model=RegradeProgress)
+@limiter.limit("60/minute")
+async def admin_regrade_resume(request: Request, run_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Resume a regrade run after a crash: only submissions it has not regraded yet are run
+
+    Rejected (409) while the run may still have batches in flight.
+    """
+    try:
+        run = await db.run_sync(regrade_service.get_run, run_id)
+    except ValidationError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    try:
+        await db.run_sync(regrade_service.ensure_resumable, run)
+    except ConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return await _enqueue_regrade(db, run)
+
+
+async def _enqueue_regrade(db: AsyncSession, run) -> Dict[str, Any]:
+    """Enqueue the coordinator job of a regrade run"""
+    job = await regrade_queue.enqueue(
+        "worker.regrade.start_regrade",
+        run_id=run.id,
+        job_timeout="10m"
+    )
+    run.job_id = job.id
+    await db.commit()
+    await db.refresh(run)
+
+    logger.info(
+        f"Regrade run {run.id} enqueued with job_id {job.id}",
+        extra={"run_id": run.id, "job_id": job.id, "problem_id": run.problem_id}
+    )
+    return regrade_service.get_progress(run)
+
+
 @app.get("/api/subjects")
 def list_subjects() -> Dict[str, Any]:
     """Get list of all subjects (materias)"""
@@ -351,7 +552,10 @@ async def health_check() -> Dict[str, Any]:
     """
     from datetime import datetime
     from fastapi.responses import JSONResponse
-    from .cache import get_cache_stats
+    from .cache import (
+        get_cache_stats, get_result_cache_stats, get_sandbox_concurrency_stats, get_db_hold_stats,
+        RESULTS_STREAM
+    )
 
     checks = {
         "service": "api",
@@ -361,14 +565,16 @@ async def health_check() -> Dict[str, Any]:
     }
 
     # Check database with connection pool metrics
+    outbox_backlog = None
     try:
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-        db.close()
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
+            # Envíos guardados que el relay todavía no encoló
+            outbox_backlog = await db.scalar(select(func.count()).select_from(OutboxMessage))
         checks["database"] = "healthy"
 
         # Get connection pool metrics
-        pool = engine.pool
+        pool = async_engine.pool
         checks["metrics"]["db_pool"] = {
             "size": pool.size(),
             "checked_in": pool.checkedin(),
@@ -383,12 +589,15 @@ async def health_check() -> Dict[str, Any]:
 
     # Check Redis with cache statistics
     try:
-        redis_conn.ping()
+        await redis_conn.ping()
         checks["redis"] = "healthy"
 
         # Get cache statistics
-        cache_stats = get_cache_stats()
+        cache_stats = await get_cache_stats()
         checks["metrics"]["cache"] = cache_stats
+        checks["metrics"]["result_cache"] = await get_result_cache_stats()
+        checks["metrics"]["sandbox_concurrency"] = await get_sandbox_concurrency_stats()
+        checks["metrics"]["db_hold"] = await get_db_hold_stats()
     except Exception as e:
         checks["redis"] = f"unhealthy: {str(e)}"
         checks["status"] = "degraded"
@@ -396,14 +605,18 @@ async def health_check() -> Dict[str, Any]:
 
     # Check queue with metrics
     try:
-        queue_length = len(queue)
+        queue_length = await queue.count()
         checks["queue_length"] = str(queue_length)
         checks["queue"] = "healthy"
 
         # Get queue metrics
         checks["metrics"]["queue"] = {
             "submissions_queue_length": queue_length,
-            "worker_count": redis_conn.scard("rq:workers") if redis_conn else 0
+            "regrade_queue_length": await regrade_queue.count(),
+            # Resultados publicados que el writer todavía no guardó (RESULT_PERSISTENCE=stream)
+            "results_stream_backlog": await redis_conn.xlen(RESULTS_STREAM) if redis_conn else 0,
+            "outbox_backlog": outbox_backlog,
+            "worker_count": await redis_conn.scard("rq:workers") if redis_conn else 0
         }
     except Exception as e:
         checks["queue"] = f"unhealthy: {str(e)}"
@@ -412,7 +625,7 @@ async def health_check() -> Dict[str, Any]:
 
     # Check problems directory
     try:
-        problems = problem_service.list_all()
+        problems = await run_in_threadpool(problem_service.list_all)
         problem_count = len(problems)
         checks["problems_count"] = str(problem_count)
         checks["problems"] = "healthy" if problem_count > 0 else "warning: no problems loaded"
@@ -430,15 +643,12 @@ async def health_check() -> Dict[str, Any]:
     # Add system load metrics
     try:
         from sqlalchemy import text as sql_text
-        db = SessionLocal()
-
-        # Get total submissions processed
-        total_submissions = db.execute(sql_text("SELECT COUNT(*) FROM submissions")).scalar()
-        completed_today = db.execute(
-            sql_text("SELECT COUNT(*) FROM submissions WHERE DATE(created_at) = CURRENT_DATE")
-        ).scalar()
-
-        db.close()
+        async with AsyncSessionLocal() as db:
+            # Get total submissions processed
+            total_submissions = (await db.execute(sql_text("SELECT COUNT(*) FROM submissions"))).scalar()
+            completed_today = (await db.execute(
+                sql_text("SELECT COUNT(*) FROM submissions WHERE DATE(created_at) = CURRENT_DATE")
+            )).scalar()
 
         checks["metrics"]["usage"] = {
             "total_submissions": total_submissions,
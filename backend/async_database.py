@@ -0,0 +1,70 @@
+"""
+Async database engine and sessions for the API request path
+
+PERFORMANCE: The FastAPI handlers are `async def`; a synchronous Session
+blocks the event loop for every round-trip, so one slow query stalls all
+requests of the uvicorn worker. The API uses this engine instead:
+- Same database as backend.database, through an async driver (asyncpg;
+  aiosqlite for SQLite URLs)
+- Same pool sizing as the sync engine (20 + 30 overflow)
+- expire_on_commit=False: handlers read attributes after commit without
+  an implicit (blocking) refresh
+- The services are shared with the worker and written against the sync
+  Session API; handlers run them with `await db.run_sync(...)`, which keeps
+  the I/O on the async connection (no thread per query)
+The worker keeps the sync engine in backend.database (no asyncpg needed there).
+"""
+from typing import AsyncIterator
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from .config import settings
+from .database import Base
+
+# Driver async por dialecto (la URL de settings usa el driver sync)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Same database URL with the async driver of its dialect"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None or parsed.drivername in ASYNC_DRIVERS.values():
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def create_api_engine(url: str = None):
+    """Async engine with the production pool configuration"""
+    url = async_database_url(url or settings.DATABASE_URL)
+    if make_url(url).get_backend_name() == "sqlite":
+        return create_async_engine(url)
+    return create_async_engine(
+        url,
+        pool_size=20,              # Base number of connections to keep open
+        max_overflow=30,           # Max additional connections under load
+        pool_timeout=30,           # Seconds to wait for available connection
+        pool_pre_ping=True,        # Test connection health before using
+        pool_recycle=3600,         # Recycle connections after 1 hour
+    )
+
+
+async_engine = create_api_engine()
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency for FastAPI endpoints"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def init_async_db():
+    """Initialize database tables"""
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
@@ -6,11 +6,15 @@ PERFORMANCE: Reduces filesystem reads by 99% for problem data.
 - Admin stats: Cached for 1 minute (60s)
 - Shared cache across all workers
 - Connection pooling: max_connections=30 for cache DB
+- The API reads and writes through redis_cache_async_client (redis.asyncio),
+  so no cache round-trip blocks its event loop; the worker and the
+  thread-run helpers (redis_cache) keep the sync client
 """
 import json
 from functools import wraps
-from typing import Any, Callable
+from typing import Any, Callable, Dict, Iterable
 from redis import Redis
+from redis.asyncio import ConnectionPool as AsyncConnectionPool, Redis as AsyncRedis
 from redis.connection import ConnectionPool
 from .config import settings
 from .logging_config import get_logger
@@ -33,6 +37,41 @@ redis_cache_pool = ConnectionPool(
     decode_responses=True  # Auto-decode strings
 )
 redis_cache_client = Redis(connection_pool=redis_cache_pool)
+# Same DB and limits for the API's async handlers
+redis_cache_async_pool = AsyncConnectionPool(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=1,
+    max_connections=30,
+    socket_keepalive=True,
+    socket_timeout=5,
+    retry_on_timeout=True,
+    decode_responses=True
+)
+redis_cache_async_client = AsyncRedis(connection_pool=redis_cache_async_pool)
+
+# Sandbox result cache (worker/services/result_cache.py), also in DB 1
+RESULT_CACHE_PREFIX = "results"
+RESULT_CACHE_HITS_KEY = f"{RESULT_CACHE_PREFIX}:stats:hits"
+RESULT_CACHE_MISSES_KEY = f"{RESULT_CACHE_PREFIX}:stats:misses"
+# Per-worker sandbox concurrency decisions (worker/services/concurrency_controller.py)
+SANDBOX_CONCURRENCY_PREFIX = "sandbox:concurrency"
+# Pub/sub channels of submission status changes: submission_events:{submission_id}
+# (published by the workers, see backend/services/submission_events.py)
+SUBMISSION_EVENTS_PREFIX = "submission_events"
+# Live state of in-flight submissions, one hash each: submission_progress:{submission_id}
+# (state, queued_at, started_at, tests_done/tests_total, score/score_max)
+SUBMISSION_PROGRESS_PREFIX = "submission_progress"
+SUBMISSION_PROGRESS_TTL = 3600
+# Encoded results of finished submissions, one string each: result_view:{job_id}
+# (backend/services/result_view_cache.py); "" marks an unknown job id
+RESULT_VIEW_PREFIX = "result_view"
+# DB connection hold time of submission jobs (worker/services/db_hold_metrics.py)
+DB_HOLD_STATS_KEY = "db_hold:stats"
+# Finished results waiting for the batching DB writer (worker/result_writer.py).
+# Lives in DB 0 next to the RQ queues; its length is the unwritten backlog
+RESULTS_STREAM = "submissions:results"
+RESULTS_GROUP = "result-writer"
 
 
 def redis_cache(key_prefix: str, ttl: int = 3600):
@@ -110,7 +149,7 @@ def invalidate_cache(key_pattern: str):
         return 0
 
 
-def get_cache_stats() -> dict:
+async def get_cache_stats() -> dict:
     """
     Get cache statistics for monitoring.
 
@@ -118,11 +157,11 @@ def get_cache_stats() -> dict:
         dict: Cache stats (keys, memory, hit rate, etc.)
     """
     try:
-        info = redis_cache_client.info("stats")
-        memory = redis_cache_client.info("memory")
+        info = await redis_cache_async_client.info("stats")
+        memory = await redis_cache_async_client.info("memory")
 
         return {
-            "total_keys": redis_cache_client.dbsize(),
+            "total_keys": await redis_cache_async_client.dbsize(),
             "used_memory_human": memory.get("used_memory_human", "N/A"),
             "keyspace_hits": info.get("keyspace_hits", 0),
             "keyspace_misses": info.get("keyspace_misses", 0),
@@ -135,3 +174,129 @@ def get_cache_stats() -> dict:
     except Exception as e:
         logger.error(f"Error getting cache stats: {e}")
         return {"error": str(e)}
+
+
+async def get_result_cache_stats() -> dict:
+    """
+    Get hit/miss counters of the sandbox result cache.
+
+    Returns:
+        dict: hits, misses and hit rate (percent)
+    """
+    try:
+        hits, misses = await redis_cache_async_client.mget(RESULT_CACHE_HITS_KEY, RESULT_CACHE_MISSES_KEY)
+        hits, misses = int(hits or 0), int(misses or 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / max(hits + misses, 1) * 100
+        }
+
+    except Exception as e:
+        logger.error(f"Error getting result cache stats: {e}")
+        return {"error": str(e)}
+
+
+async def get_db_hold_stats() -> dict:
+    """
+    Get how long submission jobs keep a pooled DB connection checked out.
+
+    Returns:
+        dict: jobs, average hold per job and per phase (ms), jobs over the slow threshold
+    """
+    try:
+        raw = await redis_cache_async_client.hgetall(DB_HOLD_STATS_KEY)
+        jobs = int(raw.pop("jobs", 0) or 0)
+        slow = int(raw.pop("slow_jobs", 0) or 0)
+        phases = {
+            key[:-len("_ms")]: round(float(value) / max(jobs, 1), 2)
+            for key, value in raw.items() if key.endswith("_ms")
+        }
+        return {
+            "jobs": jobs,
+            "avg_hold_ms": round(sum(phases.values()), 2),
+            "avg_phase_ms": phases,
+            "slow_jobs": slow,
+        }
+
+    except Exception as e:
+        logger.error(f"Error getting DB hold stats: {e}")
+        return {"error": str(e)}
+
+
+def invalidate_result_views(job_ids: Iterable[str], chunk_size: int = 1000) -> int:
+    """
+    Drop the cached results of submissions whose stored result was rewritten (regrades).
+
+    Returns:
+        int: Number of cached results deleted
+    """
+    deleted = 0
+    keys = [f"{RESULT_VIEW_PREFIX}:{job_id}" for job_id in job_ids if job_id]
+    try:
+        for start in range(0, len(keys), chunk_size):
+            deleted += redis_cache_client.delete(*keys[start:start + chunk_size])
+    except Exception as e:
+        logger.error(f"Cache invalidation error: {e}")
+    return deleted
+
+
+def mark_submissions_queued(queued: Dict[int, str]) -> None:
+    """
+    Start the progress hash of just enqueued submissions, in one pipeline
+    (called by the outbox relay; never fails it).
+
+    Args:
+        queued: queued_at (ISO timestamp) by submission id
+    """
+    if not queued:
+        return
+    try:
+        pipe = redis_cache_client.pipeline(transaction=False)
+        for submission_id, queued_at in queued.items():
+            key = f"{SUBMISSION_PROGRESS_PREFIX}:{submission_id}"
+            pipe.hset(key, mapping={"state": "queued", "queued_at": queued_at})
+            pipe.expire(key, SUBMISSION_PROGRESS_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not store progress of {len(queued)} submissions: {e}")
+
+
+async def get_submission_progress(submission_id: int) -> dict:
+    """
+    Get the live state of an in-flight submission (one HGETALL).
+
+    Returns:
+        dict: state, timestamps, tests_done/tests_total and partial score; {} if unknown
+    """
+    try:
+        raw = await redis_cache_async_client.hgetall(f"{SUBMISSION_PROGRESS_PREFIX}:{submission_id}")
+    except Exception as e:
+        logger.warning(f"Could not read progress of submission {submission_id}: {e}")
+        return {}
+    progress = dict(raw)
+    for key in ("tests_done", "tests_total"):
+        if key in progress:
+            progress[key] = int(progress[key])
+    for key in ("score", "score_max"):
+        if key in progress:
+            progress[key] = float(progress[key])
+    return progress
+
+
+async def get_sandbox_concurrency_stats() -> dict:
+    """
+    Get the adaptive sandbox concurrency state of every live worker process.
+
+    Returns:
+        dict: worker id -> limit, in-flight runs, last decision and host signals
+    """
+    try:
+        stats = {}
+        async for key in redis_cache_async_client.scan_iter(match=f"{SANDBOX_CONCURRENCY_PREFIX}:*", count=100):
+            stats[key[len(SANDBOX_CONCURRENCY_PREFIX) + 1:]] = await redis_cache_async_client.hgetall(key)
+        return stats
+
+    except Exception as e:
+        logger.error(f"Error getting sandbox concurrency stats: {e}")
+        return {"error": str(e)}
@@ -26,3 +26,8 @@ class RubricError(Exception):
 class ValidationError(Exception):
     """Input validation error"""
     pass
+
+
+class ConflictError(Exception):
+    """Operation not allowed in the resource's current state"""
+    pass
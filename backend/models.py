@@ -23,16 +23,24 @@ class Submission(Base):
     code = Column(Text, nullable=False)
 
     # Resultados
-    status = Column(String(50), default="pending", index=True)  # pending, running, completed, failed, timeout
+    status = Column(String(50), default="pending", index=True)  # pending, running, completed, failed, timeout, output_limit
     ok = Column(Boolean, default=False)
     score_total = Column(Float, default=0.0)
     score_max = Column(Float, default=0.0)
+    # Hash de la rúbrica que calculó los puntos (worker/services/rubric_scorer.py)
+    rubric_version = Column(String(64), nullable=True)
 
     passed = Column(Integer, default=0)
     failed = Column(Integer, default=0)
     errors = Column(Integer, default=0)
 
     duration_sec = Column(Float, nullable=True)
+    # Uso de recursos del sandbox (NULL si el harness no pudo reportarlo)
+    cpu_user_sec = Column(Float, nullable=True)
+    cpu_system_sec = Column(Float, nullable=True)
+    peak_memory_kb = Column(Integer, nullable=True)
+    oom_killed = Column(Boolean, nullable=True)
+    exit_signal = Column(Integer, nullable=True)
     stdout = Column(Text, default="")
     stderr = Column(Text, default="")
     error_message = Column(Text, nullable=True)
@@ -40,6 +48,10 @@ class Submission(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
 
+    # Última recorrección masiva que la puntuó (NULL si nunca se recorrigió)
+    regrade_run_id = Column(Integer, ForeignKey("regrade_runs.id"), nullable=True, index=True)
+    regraded_at = Column(DateTime(timezone=True), nullable=True)
+
     # Relación con resultados de tests individuales
     test_results = relationship("TestResult", back_populates="submission", cascade="all, delete-orphan")
 
@@ -66,9 +78,11 @@ class TestResult(Base):
     submission_id = Column(Integer, ForeignKey("submissions.id"), nullable=False, index=True)
 
     test_name = Column(String(255), nullable=False)
-    outcome = Column(String(50), nullable=False)  # passed, failed, error, skipped
+    outcome = Column(String(50), nullable=False)  # passed, failed, error, skipped, timeout
     duration = Column(Float, default=0.0)
     message = Column(Text, nullable=True)
+    cpu_time_sec = Column(Float, nullable=True)
+    peak_memory_kb = Column(Integer, nullable=True)
 
     # Rúbrica
     points = Column(Float, default=0.0)
@@ -76,3 +90,51 @@ class TestResult(Base):
     visibility = Column(String(50), default="public")  # public, hidden
 
     submission = relationship("Submission", back_populates="test_results")
+
+
+class RegradeRun(Base):
+    """
+    Recorrección masiva de los envíos de un problema (worker/regrade.py).
+
+    Los envíos ya recorregidos quedan marcados con regrade_run_id, así que
+    reanudar una corrida caída solo procesa los que faltan.
+    """
+    __tablename__ = "regrade_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    problem_id = Column(String(255), index=True, nullable=False)
+    student_id = Column(String(255), nullable=True)  # filtro opcional
+
+    # rerun: vuelve a ejecutar el código; rescore: solo recalcula puntos con la rúbrica actual
+    mode = Column(String(20), default="rerun", nullable=False)
+    status = Column(String(50), default="pending", index=True)  # pending, running, completed, failed
+    job_id = Column(String(255), nullable=True)  # job coordinador en la cola regrade
+
+    # Progreso
+    total = Column(Integer, default=0)
+    regraded = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    score_changed = Column(Integer, default=0)  # envíos cuya puntuación cambió
+
+    error_message = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class OutboxMessage(Base):
+    """
+    Job RQ pendiente de encolar (backend/sagas/outbox_relay.py).
+
+    Se escribe en la misma transacción que el envío, así que existe si y
+    solo si el envío se guardó; el relay lo encola y borra la fila.
+    """
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    queue = Column(String(100), nullable=False)
+    func_name = Column(String(255), nullable=False)  # ruta del callable, p. ej. worker.tasks.run_submission_in_sandbox
+    job_id = Column(String(255), unique=True, nullable=False)  # id RQ ya devuelto al cliente
+    payload = Column(Text, nullable=False)  # kwargs en JSON
+    job_timeout = Column(Integer, nullable=True)  # segundos
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
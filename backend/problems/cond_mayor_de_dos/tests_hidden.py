@@ -1,99 +0,0 @@
-import importlib.util
-import os
-from io import StringIO
-import sys
-
-spec = importlib.util.spec_from_file_location('student_code', os.path.join(os.getcwd(), 'student_code.py'))
-student = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(student)
-
-def test_negativos_1():
-    """Verifica con números negativos caso 1"""
-    old_stdin = sys.stdin
-    old_stdout = sys.stdout
-    sys.stdin = StringIO("-5\n-10")
-    sys.stdout = StringIO()
-
-    student.main()
-
-    output = sys.stdout.getvalue().strip()
-    sys.stdin = old_stdin
-    sys.stdout = old_stdout
-
-    assert output == "-5" or output == "-5.0", f"Se esperaba '-5', se obtuvo '{output}'"
-
-def test_negativos_2():
-    """Verifica con números negativos caso 2"""
-    old_stdin = sys.stdin
-    old_stdout = sys.stdout
-    sys.stdin = StringIO("-3\n2")
-    sys.stdout = StringIO()
-
-    student.main()
-
-    output = sys.stdout.getvalue().strip()
-    sys.stdin = old_stdin
-    sys.stdout = old_stdout
-
-    assert output == "2" or output == "2.0", f"Se esperaba '2', se obtuvo '{output}'"
-
-def test_decimales_1():
-    """Verifica con números decimales caso 1"""
-    old_stdin = sys.stdin
-    old_stdout = sys.stdout
-    sys.stdin = StringIO("3.5\n2.1")
-    sys.stdout = StringIO()
-
-    student.main()
-
-    output = sys.stdout.getvalue().strip()
-    sys.stdin = old_stdin
-    sys.stdout = old_stdout
-
-    assert float(output) == 3.5, f"Se esperaba '3.5', se obtuvo '{output}'"
-
-def test_decimales_2():
-    """Verifica con números decimales caso 2"""
-    old_stdin = sys.stdin
-    old_stdout = sys.stdout
-    sys.stdin = StringIO("1.9\n4.7")
-    sys.stdout = StringIO()
-
-    student.main()
-
-    output = sys.stdout.getvalue().strip()
-    sys.stdin = old_stdin
-    sys.stdout = old_stdout
-
-    assert float(output) == 4.7, f"Se esperaba '4.7', se obtuvo '{output}'"
-
-def test_cero_1():
-    """Verifica con cero caso 1"""
-    old_stdin = sys.stdin
-    old_stdout = sys.stdout
-    sys.stdin = StringIO("0\n-5")
-    sys.stdout = StringIO()
-
-    student.main()
-
-    output = sys.stdout.getvalue().strip()
-    sys.stdin = old_stdin
-    sys.stdout = old_stdout
-
-    assert output == "0" or output == "0.0", f"Se esperaba '0', se obtuvo '{output}'"
-
-def test_cero_2():
-    """Verifica con cero caso 2"""
-    old_stdin = sys.stdin
-    old_stdout = sys.stdout
-    sys.stdin = StringIO("3\n0")
-    sys.stdout = StringIO()
-
-    student.main()
-
-    output = sys.stdout.getvalue().strip()
-    sys.stdin = old_stdin
-    sys.stdout = old_stdout
-
-    assert output == "3" or output == "3.0", f"Se esperaba '3', se obtuvo '{output}'"
-
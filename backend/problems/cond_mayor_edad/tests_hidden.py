@@ -1,53 +0,0 @@
-import importlib.util
-import os
-from io import StringIO
-import sys
-
-spec = importlib.util.spec_from_file_location('student_code', os.path.join(os.getcwd(), 'student_code.py'))
-student = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(student)
-
-def test_mayor_edad_avanzado():
-    """Verifica con edad muy alta"""
-    old_stdin = sys.stdin
-    old_stdout = sys.stdout
-    sys.stdin = StringIO("100")
-    sys.stdout = StringIO()
-
-    student.main()
-
-    output = sys.stdout.getvalue().strip()
-    sys.stdin = old_stdin
-    sys.stdout = old_stdout
-
-    assert output == "Es mayor de edad"
-
-def test_menor_edad_nino():
-    """Verifica con edad muy baja"""
-    old_stdin = sys.stdin
-    old_stdout = sys.stdout
-    sys.stdin = StringIO("5")
-    sys.stdout = StringIO()
-
-    student.main()
-
-    output = sys.stdout.getvalue().strip()
-    sys.stdin = old_stdin
-    sys.stdout = old_stdout
-
-    assert output == "Es menor de edad"
-
-def test_edad_limite_superior():
-    """Verifica el caso límite de 19 años"""
-    old_stdin = sys.stdin
-    old_stdout = sys.stdout
-    sys.stdin = StringIO("19")
-    sys.stdout = StringIO()
-
-    student.main()
-
-    output = sys.stdout.getvalue().strip()
-    sys.stdin = old_stdin
-    sys.stdout = old_stdout
-
-    assert output == "Es mayor de edad"
@@ -1,57 +0,0 @@
-import importlib.util
-import os
-from io import StringIO
-import sys
-
-spec = importlib.util.spec_from_file_location('student_code', os.path.join(os.getcwd(), 'student_code.py'))
-student = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(student)
-
-def test_existe_funcion():
-    """Verifica que existe la función main"""
-    assert hasattr(student, 'main'), 'Debe existir la función main'
-
-def test_numero_par_basico():
-    """Verifica con número par básico"""
-    old_stdin = sys.stdin
-    old_stdout = sys.stdout
-    sys.stdin = StringIO("4")
-    sys.stdout = StringIO()
-
-    student.main()
-
-    output = sys.stdout.getvalue().strip()
-    sys.stdin = old_stdin
-    sys.stdout = old_stdout
-
-    assert output == "Ha ingresado un número par", f"Se esperaba 'Ha ingresado un número par', se obtuvo '{output}'"
-
-def test_numero_impar_basico():
-    """Verifica con número impar básico"""
-    old_stdin = sys.stdin
-    old_stdout = sys.stdout
-    sys.stdin = StringIO("7")
-    sys.stdout = StringIO()
-
-    student.main()
-
-    output = sys.stdout.getvalue().strip()
-    sys.stdin = old_stdin
-    sys.stdout = old_stdout
-
-    assert output == "Por favor, ingrese un número par", f"Se esperaba 'Por favor, ingrese un número par', se obtuvo '{output}'"
-
-def test_cero_es_par():
-    """Verifica que cero es par"""
-    old_stdin = sys.stdin
-    old_stdout = sys.stdout
-    sys.stdin = StringIO("0")
-    sys.stdout = StringIO()
-
-    student.main()
-
-    output = sys.stdout.getvalue().strip()
-    sys.stdin = old_stdin
-    sys.stdout = old_stdout
-
-    assert output == "Ha ingresado un número par", f"Se esperaba 'Ha ingresado un número par', se obtuvo '{output}'"
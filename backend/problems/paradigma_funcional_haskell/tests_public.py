@@ -1,27 +0,0 @@
-import importlib.util
-import os
-from io import StringIO
-import sys
-
-spec = importlib.util.spec_from_file_location('student_code', os.path.join(os.getcwd(), 'student_code.py'))
-student = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(student)
-
-def test_existe_funcion():
-    """Verifica que existe la función main"""
-    assert hasattr(student, 'main'), 'Debe existir la función main'
-
-def test_duplicar_positivo():
-    """Verifica duplicar número positivo"""
-    old_stdin = sys.stdin
-    old_stdout = sys.stdout
-    sys.stdin = StringIO("5")
-    sys.stdout = StringIO()
-
-    student.main()
-
-    output = sys.stdout.getvalue().strip()
-    sys.stdin = old_stdin
-    sys.stdout = old_stdout
-
-    assert output == "10", f"Se esperaba '10', se obtuvo '{output}'"
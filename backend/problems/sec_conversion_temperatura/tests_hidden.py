@@ -1,40 +0,0 @@
-import importlib.util
-import os
-from io import StringIO
-import sys
-
-spec = importlib.util.spec_from_file_location('student_code', os.path.join(os.getcwd(), 'student_code.py'))
-student = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(student)
-
-def test_conversion_negativa():
-    """Test oculto con temperatura negativa"""
-    old_stdin = sys.stdin
-    old_stdout = sys.stdout
-    sys.stdin = StringIO("-40")
-    sys.stdout = StringIO()
-
-    student.main()
-
-    output = sys.stdout.getvalue().strip()
-    sys.stdin = old_stdin
-    sys.stdout = old_stdout
-
-    result = float(output)
-    assert abs(result - (-40.0)) < 0.1, f"Se esperaba '-40.0', se obtuvo '{output}'"
-
-def test_conversion_decimal():
-    """Test oculto con decimal"""
-    old_stdin = sys.stdin
-    old_stdout = sys.stdout
-    sys.stdin = StringIO("37.5")
-    sys.stdout = StringIO()
-
-    student.main()
-
-    output = sys.stdout.getvalue().strip()
-    sys.stdin = old_stdin
-    sys.stdout = old_stdout
-
-    result = float(output)
-    assert abs(result - 99.5) < 0.1, f"Se esperaba '99.5', se obtuvo '{output}'"
@@ -1,9 +1,10 @@
 """
 Sagas package
 
-Saga pattern implementation for distributed transactions.
+Transactional outbox: jobs written in the same transaction as the rows they
+act on, and the relay that enqueues them into RQ.
 """
 
-from .submission_saga import SubmissionSaga, SagaContext, SagaStep
+from .outbox import add_job
 
-__all__ = ['SubmissionSaga', 'SagaContext', 'SagaStep']
+__all__ = ['add_job']
@@ -0,0 +1,53 @@
+"""
+Transactional outbox: jobs recorded in the database with the rows they act on
+
+PERFORMANCE: Enqueueing inside the submit transaction held a pooled Postgres
+connection (and an open transaction) for a Redis round-trip, and a Redis blip
+failed the whole request. With the outbox:
+- The API adds an OutboxMessage to the same session as the Submission, so
+  both are written by one COMMIT (the job exists if and only if the
+  submission does)
+- The RQ job id is generated here, so the client gets it right away
+- backend/sagas/outbox_relay.py enqueues the messages into RQ in pipelined
+  batches and deletes them
+"""
+import json
+from typing import Any, Optional, Union
+from uuid import uuid4
+
+from rq.utils import parse_timeout
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models import OutboxMessage
+
+
+def add_job(
+    db: Union[Session, AsyncSession],
+    queue: str,
+    func: str,
+    job_timeout: Optional[Any] = None,
+    **kwargs
+) -> str:
+    """
+    Record a job to be enqueued once the caller's transaction commits.
+
+    Args:
+        db: Session holding the transaction (nothing is flushed here)
+        queue: RQ queue name
+        func: Dotted path of the job function
+        job_timeout: Like Queue.enqueue (seconds or "5m")
+        **kwargs: Job keyword arguments (JSON-serializable)
+
+    Returns:
+        The RQ job id the job will be enqueued with
+    """
+    job_id = str(uuid4())
+    db.add(OutboxMessage(
+        queue=queue,
+        func_name=func,
+        job_id=job_id,
+        payload=json.dumps(kwargs),
+        job_timeout=parse_timeout(job_timeout)
+    ))
+    return job_id
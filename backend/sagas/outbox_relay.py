@@ -0,0 +1,179 @@
+"""
+Relay from the outbox table to RQ.
+
+PERFORMANCE: The API only INSERTs outbox rows in the submit transaction
+(backend/sagas/outbox.py); this process moves them to Redis in bulk:
+- Selects up to OUTBOX_RELAY_BATCH_SIZE rows in id order with
+  FOR UPDATE SKIP LOCKED, so several relays can share the table
+- RQ builds the jobs (Queue.enqueue_many, with the job ids the clients
+  already have) into one MULTI/EXEC pipeline: one Redis round-trip per
+  batch, however large the burst
+- Deletes the rows only after the pipeline succeeded (at-least-once: a relay
+  dying between both steps enqueues the same job id again, which reruns the
+  submission; the worker replaces its TestResults on persist instead of
+  adding a second set)
+- Starts the progress hash of the enqueued submissions in one more pipeline
+- Polls every OUTBOX_RELAY_POLL_MS while the table is empty and loops
+  without waiting while batches come out full; if Redis or the database
+  fail, rows stay put and the batch is retried after OUTBOX_RELAY_RETRY_MS
+
+Usage:
+    python -m backend.sagas.outbox_relay [--url redis://...] [--batch-size N] [--burst]
+"""
+import argparse
+import json
+import os
+import signal
+import threading
+from datetime import datetime
+from typing import Dict, List
+
+from redis import Redis
+from rq import Queue
+from sqlalchemy.orm import Session
+
+from ..cache import mark_submissions_queued
+from ..config import settings
+from ..database import SessionLocal
+from ..logging_config import get_logger
+from ..models import OutboxMessage
+
+logger = get_logger(__name__)
+
+OUTBOX_RELAY_BATCH_SIZE = int(os.getenv("OUTBOX_RELAY_BATCH_SIZE", "500"))
+OUTBOX_RELAY_POLL_MS = int(os.getenv("OUTBOX_RELAY_POLL_MS", "100"))
+OUTBOX_RELAY_RETRY_MS = int(os.getenv("OUTBOX_RELAY_RETRY_MS", "1000"))
+SUBMISSIONS_QUEUE = "submissions"
+
+
+class OutboxRelay:
+    """Enqueues outbox rows into RQ in pipelined batches"""
+
+    def __init__(
+        self,
+        connection: Redis,
+        batch_size: int = OUTBOX_RELAY_BATCH_SIZE,
+        poll_ms: int = OUTBOX_RELAY_POLL_MS,
+        retry_ms: int = OUTBOX_RELAY_RETRY_MS,
+        session_factory=None,
+        mark_queued=None
+    ):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.poll_ms = poll_ms
+        self.retry_ms = retry_ms
+        self.session_factory = session_factory or SessionLocal
+        self.mark_queued = mark_queued or mark_submissions_queued
+        self._queues: Dict[str, Queue] = {}
+        self._stop = threading.Event()
+
+    def request_stop(self) -> None:
+        self._stop.set()
+
+    def run(self, burst: bool = False) -> int:
+        """Relay batches until stopped (or, with burst, until the outbox is empty or a batch fails)"""
+        relayed = 0
+        logger.info("Outbox relay started", extra={"batch_size": self.batch_size})
+        while not self._stop.is_set():
+            try:
+                count = self.relay_once()
+            except Exception as e:
+                if burst:
+                    raise
+                logger.warning(f"Outbox batch failed, retrying: {e}")
+                self._stop.wait(self.retry_ms / 1000)
+                continue
+            relayed += count
+            if count == 0:
+                if burst:
+                    break
+                self._stop.wait(self.poll_ms / 1000)
+        return relayed
+
+    def relay_once(self) -> int:
+        """
+        Enqueue and delete one batch of outbox rows.
+
+        Returns:
+            Number of jobs enqueued
+        """
+        db: Session = self.session_factory()
+        try:
+            rows = (
+                db.query(OutboxMessage)
+                .order_by(OutboxMessage.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not rows:
+                db.rollback()
+                return 0
+
+            self._enqueue(rows)
+            queued = self._queued_submissions(rows)
+            db.query(OutboxMessage).filter(
+                OutboxMessage.id.in_([row.id for row in rows])
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self.mark_queued(queued)
+        logger.debug("Outbox batch relayed", extra={"jobs": len(rows)})
+        return len(rows)
+
+    def _enqueue(self, rows: List[OutboxMessage]) -> None:
+        by_queue: Dict[str, list] = {}
+        for row in rows:
+            by_queue.setdefault(row.queue, []).append(Queue.prepare_data(
+                row.func_name, kwargs=json.loads(row.payload), timeout=row.job_timeout, job_id=row.job_id
+            ))
+        pipe = self.connection.pipeline()
+        try:
+            for name, job_datas in by_queue.items():
+                self._queue(name).enqueue_many(job_datas, pipeline=pipe)
+            pipe.execute()
+        finally:
+            pipe.reset()
+
+    def _queue(self, name: str) -> Queue:
+        if name not in self._queues:
+            self._queues[name] = Queue(name, connection=self.connection)
+        return self._queues[name]
+
+    @staticmethod
+    def _queued_submissions(rows: List[OutboxMessage]) -> Dict[int, str]:
+        queued = {}
+        for row in rows:
+            if row.queue != SUBMISSIONS_QUEUE:
+                continue
+            submission_id = json.loads(row.payload).get("submission_id")
+            if submission_id is not None:
+                queued[submission_id] = (row.created_at or datetime.utcnow()).isoformat()
+        return queued
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Enqueue outbox jobs into RQ in batches")
+    parser.add_argument("--url", default=None, help="Redis URL (default: settings REDIS_HOST/PORT/DB)")
+    parser.add_argument("--batch-size", type=int, default=OUTBOX_RELAY_BATCH_SIZE)
+    parser.add_argument("--burst", action="store_true", help="Exit when the outbox is empty")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        connection = Redis.from_url(args.url)
+    else:
+        connection = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB)
+
+    relay = OutboxRelay(connection, batch_size=args.batch_size)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: relay.request_stop())
+    relay.run(burst=args.burst)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 Pydantic schemas for request/response validation
 """
 from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime
 
 
@@ -36,6 +36,26 @@ class SubmissionRequest(BaseModel):
     )
 
 
+class RegradeRequest(BaseModel):
+    """Schema for a bulk regrade request (admin)
+
+    mode "rerun" runs the code again (tests changed); "rescore" only
+    recomputes points from stored test results (rubric.json changed).
+    """
+    problem_id: str = Field(..., min_length=1, max_length=100)
+    student_id: Optional[str] = Field(None, max_length=100)
+    mode: Literal["rerun", "rescore"] = "rerun"
+
+    @field_validator('problem_id')
+    @classmethod
+    def validate_problem_id(cls, v):
+        """Validate problem_id format"""
+        import re
+        if not re.match(r'^[a-zA-Z0-9_-]+$', v):
+            raise ValueError('problem_id must contain only alphanumeric characters, underscores, and hyphens')
+        return v
+
+
 # ==================== Response Schemas ====================
 
 class SubmissionResponse(BaseModel):
@@ -64,6 +84,8 @@ class TestResultSchema(BaseModel):
     points: float
     max_points: float
     visibility: str
+    cpu_time_sec: Optional[float] = None
+    peak_memory_kb: Optional[int] = None
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -74,7 +96,9 @@ class TestResultSchema(BaseModel):
                 "message": "",
                 "points": 3.0,
                 "max_points": 3.0,
-                "visibility": "public"
+                "visibility": "public",
+                "cpu_time_sec": 0.0008,
+                "peak_memory_kb": 24576
             }
         }
     )
@@ -91,6 +115,11 @@ class ResultResponse(BaseModel):
     failed: Optional[int] = None
     errors: Optional[int] = None
     duration_sec: Optional[float] = None
+    cpu_user_sec: Optional[float] = None
+    cpu_system_sec: Optional[float] = None
+    peak_memory_kb: Optional[int] = None
+    oom_killed: Optional[bool] = None
+    exit_signal: Optional[int] = None
     stdout: Optional[str] = None
     stderr: Optional[str] = None
     error_message: Optional[str] = None
@@ -176,3 +205,23 @@ class SubmissionsListResponse(BaseModel):
     limit: int
     offset: int
     submissions: List[SubmissionSummary]
+
+
+class RegradeProgress(BaseModel):
+    """Schema for the progress of a bulk regrade run"""
+    id: int
+    problem_id: str
+    student_id: Optional[str]
+    mode: str
+    status: str
+    total: int
+    regraded: int
+    failed: int
+    score_changed: int
+    progress_pct: float
+    throughput_per_min: Optional[float]
+    eta_sec: Optional[float]
+    error_message: Optional[str]
+    created_at: Optional[datetime]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
@@ -0,0 +1,115 @@
+"""
+Bulk regrade runs (admin): creation and progress reporting.
+
+The work itself runs on the `regrade` RQ queue (worker/regrade.py), either
+running the code again (mode "rerun") or only recomputing points from the
+stored test results (mode "rescore"); this
+service only creates RegradeRun rows and turns their counters into
+progress, throughput and ETA.
+"""
+import os
+from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models import RegradeRun, Submission
+from ..exceptions import ConflictError, ValidationError
+from ..logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# A running run without progress for this long lost its worker (longer than
+# the 30m timeout of a regrade batch job, so no batch can still be running)
+REGRADE_STALE_SEC = int(os.getenv("REGRADE_STALE_SEC", "2400"))
+
+
+class RegradeService:
+    """Service for bulk regrade runs"""
+
+    def create_run(
+        self,
+        db: Session,
+        problem_id: str,
+        student_id: Optional[str] = None,
+        mode: str = "rerun"
+    ) -> RegradeRun:
+        """Create a regrade run in pending state"""
+        run = RegradeRun(problem_id=problem_id, student_id=student_id, mode=mode, status="pending")
+        db.add(run)
+        db.commit()
+        db.refresh(run)
+
+        logger.info(
+            f"Created regrade run {run.id}",
+            extra={"run_id": run.id, "problem_id": problem_id, "student_id": student_id, "mode": mode}
+        )
+        return run
+
+    def get_run(self, db: Session, run_id: int) -> RegradeRun:
+        """Get a regrade run, raise if not exists"""
+        run = db.query(RegradeRun).filter(RegradeRun.id == run_id).first()
+        if not run:
+            raise ValidationError(f"Regrade run {run_id} not found")
+        return run
+
+    def ensure_resumable(self, db: Session, run: RegradeRun, now: Optional[datetime] = None) -> None:
+        """
+        Raise ConflictError unless resuming can't overlap batches of the run
+        still in flight: it failed, it completed (resuming retries the
+        submissions that failed) or it is running with no submission
+        regraded for REGRADE_STALE_SEC.
+        """
+        if run.status in ("failed", "completed"):
+            return
+        if run.status == "running":
+            last_regraded = db.query(func.max(Submission.regraded_at)).filter(
+                Submission.regrade_run_id == run.id
+            ).scalar()
+            moments = [_aware(t) for t in (run.started_at, last_regraded) if t is not None]
+            now = now or datetime.now(timezone.utc)
+            if not moments or (_aware(now) - max(moments)).total_seconds() >= REGRADE_STALE_SEC:
+                return
+        raise ConflictError(
+            f"Regrade run {run.id} is {run.status}; only failed, completed or stale runs can be resumed"
+        )
+
+    def get_progress(self, run: RegradeRun, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Progress of a run, with throughput (submissions/min) and ETA"""
+        total = run.total or 0
+        done = (run.regraded or 0) + (run.failed or 0)
+        throughput = eta = None
+        if run.started_at is not None:
+            end = run.finished_at or now or datetime.now(timezone.utc)
+            elapsed = (_aware(end) - _aware(run.started_at)).total_seconds()
+            if elapsed > 0 and done:
+                throughput = round(done / elapsed * 60, 2)
+                if run.status == "running":
+                    eta = round(max(total - done, 0) / (done / elapsed), 1)
+
+        return {
+            "id": run.id,
+            "problem_id": run.problem_id,
+            "student_id": run.student_id,
+            "mode": run.mode or "rerun",
+            "status": run.status,
+            "total": total,
+            "regraded": run.regraded or 0,
+            "failed": run.failed or 0,
+            "score_changed": run.score_changed or 0,
+            "progress_pct": round(done / total * 100, 1) if total else (100.0 if run.status == "completed" else 0.0),
+            "throughput_per_min": throughput,
+            "eta_sec": eta,
+            "error_message": run.error_message,
+            "created_at": run.created_at,
+            "started_at": run.started_at,
+            "finished_at": run.finished_at
+        }
+
+
+def _aware(value: datetime) -> datetime:
+    """Naive timestamps (datetime.utcnow(), SQLite) are UTC"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+# Singleton instance
+regrade_service = RegradeService()
@@ -0,0 +1,140 @@
+"""
+Cache of finished submission results, as served by /api/result/{job_id}.
+
+PERFORMANCE: Once a submission is completed/failed/timeout/output_limit its
+result no longer changes, yet every view re-ran a joinedload of
+Submission.test_results and rebuilt the dict in get_result_dict. Now:
+- The result is JSON-encoded once, on the first read after it is final, and
+  kept as bytes in two tiers: an in-process LRU (RESULT_VIEW_LRU_SIZE
+  entries, RESULT_VIEW_LOCAL_TTL) in front of Redis DB 1
+  (`result_view:{job_id}`, RESULT_VIEW_TTL). Hits never touch Postgres
+- Unknown job ids are cached as "" for RESULT_VIEW_NEGATIVE_TTL, so
+  repeated lookups of a bad id do not reach the database either
+- Concurrent misses of the same job are collapsed into one database read
+  (single-flight)
+- Redis is used through redis.asyncio, so neither tier blocks the event loop
+- Regrades rewrite results: they delete the Redis entries
+  (backend.cache.invalidate_result_views); the local tier of other API
+  processes expires within RESULT_VIEW_LOCAL_TTL
+In-progress submissions are never cached.
+"""
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from ..cache import redis_cache_async_client, RESULT_VIEW_PREFIX
+from ..logging_config import get_logger
+from .submission_events import FINAL_STATUSES
+
+logger = get_logger(__name__)
+
+RESULT_VIEW_TTL = int(os.getenv("RESULT_VIEW_TTL", str(7 * 24 * 3600)))  # 7 days
+RESULT_VIEW_NEGATIVE_TTL = int(os.getenv("RESULT_VIEW_NEGATIVE_TTL", "10"))
+RESULT_VIEW_LRU_SIZE = int(os.getenv("RESULT_VIEW_LRU_SIZE", "2048"))
+RESULT_VIEW_LOCAL_TTL = float(os.getenv("RESULT_VIEW_LOCAL_TTL", "60"))
+# Marks an unknown job id in both tiers
+UNKNOWN = b""
+
+# Reads one submission: (submission id, get_result_dict output), or None if unknown
+ResultLoader = Callable[[str], Awaitable[Optional[Tuple[int, Dict[str, Any]]]]]
+
+
+class ResultLookup(NamedTuple):
+    """What /api/result needs to answer for one job"""
+    submission_id: Optional[int]  # None when served from the cache
+    status: str
+    body: Optional[bytes]  # Encoded result; only set once the status is final
+
+
+class ResultViewCache:
+    """Two-tier cache of encoded finished results with single-flight loading"""
+
+    def __init__(
+        self,
+        client=None,
+        ttl: int = RESULT_VIEW_TTL,
+        negative_ttl: int = RESULT_VIEW_NEGATIVE_TTL,
+        lru_size: int = RESULT_VIEW_LRU_SIZE,
+        local_ttl: float = RESULT_VIEW_LOCAL_TTL
+    ):
+        self.client = client if client is not None else redis_cache_async_client
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.lru_size = lru_size
+        self.local_ttl = local_ttl
+        self._local: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def fetch(self, job_id: str, loader: ResultLoader) -> Optional[ResultLookup]:
+        """
+        Result of a job from the cache, or from `loader` on a miss.
+
+        Returns:
+            ResultLookup, or None if the job id is unknown
+        """
+        body = await self.get(job_id)
+        if body is None:
+            task = self._inflight.get(job_id)
+            if task is None:
+                task = asyncio.ensure_future(self._load(job_id, loader))
+                self._inflight[job_id] = task
+                task.add_done_callback(lambda _: self._inflight.pop(job_id, None))
+            # shield: a client that disconnects does not cancel the read for the others
+            return await asyncio.shield(task)
+        if body == UNKNOWN:
+            return None
+        return ResultLookup(None, "", body)
+
+    async def _load(self, job_id: str, loader: ResultLoader) -> Optional[ResultLookup]:
+        found = await loader(job_id)
+        if found is None:
+            await self._set(job_id, UNKNOWN, self.negative_ttl)
+            return None
+        submission_id, result = found
+        status = result["status"]
+        if status not in FINAL_STATUSES:
+            return ResultLookup(submission_id, status, None)
+        body = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        await self._set(job_id, body, self.ttl)
+        return ResultLookup(submission_id, status, body)
+
+    async def get(self, job_id: str) -> Optional[bytes]:
+        """Cached body (UNKNOWN for an unknown job id), or None on a miss"""
+        now = time.monotonic()
+        entry = self._local.get(job_id)
+        if entry is not None:
+            if entry[0] > now:
+                self._local.move_to_end(job_id)
+                return entry[1]
+            del self._local[job_id]
+
+        try:
+            cached = await self.client.get(f"{RESULT_VIEW_PREFIX}:{job_id}")
+        except Exception as e:
+            logger.warning(f"Result view cache read error: {e}")
+            return None
+        if cached is None:
+            return None
+        body = cached.encode("utf-8") if isinstance(cached, str) else cached
+        self._remember(job_id, body, self.negative_ttl if body == UNKNOWN else self.local_ttl)
+        return body
+
+    async def _set(self, job_id: str, body: bytes, ttl: int) -> None:
+        self._remember(job_id, body, min(ttl, self.local_ttl))
+        try:
+            await self.client.setex(f"{RESULT_VIEW_PREFIX}:{job_id}", ttl, body)
+        except Exception as e:
+            logger.warning(f"Result view cache write error: {e}")
+
+    def _remember(self, job_id: str, body: bytes, ttl: float) -> None:
+        self._local[job_id] = (time.monotonic() + ttl, body)
+        self._local.move_to_end(job_id)
+        while len(self._local) > self.lru_size:
+            self._local.popitem(last=False)
+
+
+# Singleton instance
+result_view_cache = ResultViewCache()
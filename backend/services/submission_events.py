@@ -0,0 +1,141 @@
+"""
+Push of submission status changes over Redis pub/sub.
+
+PERFORMANCE: Polling /api/result/{job_id} costs a joined query (and an RQ
+lookup) per request and delays results by up to the backoff interval.
+Workers PUBLISH every status change on `submission_events:{id}` right after
+committing it (worker/services/submission_notifier.py) and the API waits
+for it instead:
+- One PSUBSCRIBE connection per API process, fanned out to the waiting
+  requests through asyncio queues (not one Redis connection per student)
+- GET /api/result/{job_id}/events streams Server-Sent Events (status,
+  per-test progress) and ends with the full result;
+  GET /api/result/{job_id}?wait=N long-polls
+- Waiters register before reading the database, so a change between both
+  is not lost; pub/sub is fire-and-forget, so waits are bounded and end
+  with a database re-check
+"""
+import asyncio
+import json
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Set, Union
+
+from redis.asyncio import Redis as AsyncRedis
+
+from ..cache import SUBMISSION_EVENTS_PREFIX
+from ..config import settings
+from ..logging_config import get_logger
+
+logger = get_logger(__name__)
+
+FINAL_STATUSES = ("completed", "failed", "timeout", "output_limit")
+RECONNECT_DELAY_SEC = 1.0
+# Longest server-side wait of GET /api/result/{job_id}?wait=N
+MAX_RESULT_WAIT_SEC = 30.0
+# SSE: comment line (and database re-check) when nothing happened for this long
+SSE_HEARTBEAT_SEC = 15.0
+# SSE: the stream ends after this long; EventSource reconnects on its own
+SSE_MAX_DURATION_SEC = 120.0
+
+
+def sse_event(event: str, data: Union[Dict[str, Any], bytes]) -> str:
+    """One Server-Sent Events frame (`data` may be already JSON-encoded)"""
+    payload = data.decode("utf-8") if isinstance(data, bytes) else json.dumps(data)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class SubmissionEventHub:
+    """Per-process fan-out of submission status events to waiting requests"""
+
+    def __init__(self, client: Optional[AsyncRedis] = None):
+        self._client = client
+        self._waiters: Dict[int, Set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+
+    @property
+    def client(self) -> AsyncRedis:
+        if self._client is None:
+            self._client = AsyncRedis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB)
+        return self._client
+
+    async def start(self) -> None:
+        """Start the listener (once per event loop) and wait for its subscription"""
+        if self._listener is None or self._listener.done():
+            self._ready = asyncio.Event()
+            self._listener = asyncio.create_task(self._listen())
+        await self._ready.wait()
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    @contextmanager
+    def subscribe(self, submission_id: int) -> Iterator[asyncio.Queue]:
+        """Queue receiving the events of one submission while the block runs"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._waiters.setdefault(submission_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            waiters = self._waiters.get(submission_id)
+            if waiters is not None:
+                waiters.discard(queue)
+                if not waiters:
+                    del self._waiters[submission_id]
+
+    @staticmethod
+    async def next_event(queue: asyncio.Queue, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next event of a subscription, or None after `timeout` seconds"""
+        try:
+            return await asyncio.wait_for(queue.get(), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            return None
+
+    def dispatch(self, channel: Any, data: Any) -> None:
+        """Deliver one pub/sub message to the waiters of its submission"""
+        if isinstance(channel, bytes):
+            channel = channel.decode("utf-8")
+        try:
+            submission_id = int(channel.rsplit(":", 1)[1])
+            event = json.loads(data)
+        except (IndexError, ValueError, TypeError):
+            logger.warning(f"Ignoring malformed submission event on {channel}")
+            return
+        for queue in self._waiters.get(submission_id, ()):
+            queue.put_nowait(event)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{SUBMISSION_EVENTS_PREFIX}:*")
+                async for message in pubsub.listen():
+                    if message["type"] == "psubscribe":
+                        self._ready.set()
+                    elif message["type"] == "pmessage":
+                        self.dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Submission event listener disconnected: {e}")
+                # Despertar a todos: vuelven a consultar la base
+                for waiters in self._waiters.values():
+                    for queue in waiters:
+                        queue.put_nowait({"status": None})
+                self._ready.set()
+                await asyncio.sleep(RECONNECT_DELAY_SEC)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+# Singleton instance
+submission_event_hub = SubmissionEventHub()
@@ -70,6 +70,10 @@ class SubmissionService:
             .first()
         )
 
+    def get_status(self, db: Session, submission_id: int) -> Optional[str]:
+        """Get only the status column of a submission"""
+        return db.query(Submission.status).filter(Submission.id == submission_id).scalar()
+
     def get_by_id(self, db: Session, submission_id: int) -> Optional[Submission]:
         """Get submission by id"""
         return db.query(Submission).filter(Submission.id == submission_id).first()
@@ -85,7 +89,9 @@ class SubmissionService:
                 "message": tr.message or "",
                 "points": tr.points or 0.0,
                 "max_points": tr.max_points or 0.0,
-                "visibility": tr.visibility or "public"
+                "visibility": tr.visibility or "public",
+                "cpu_time_sec": tr.cpu_time_sec,
+                "peak_memory_kb": tr.peak_memory_kb
             })
 
         return {
@@ -98,6 +104,11 @@ class SubmissionService:
             "failed": submission.failed or 0,
             "errors": submission.errors or 0,
             "duration_sec": submission.duration_sec or 0.0,
+            "cpu_user_sec": submission.cpu_user_sec,
+            "cpu_system_sec": submission.cpu_system_sec,
+            "peak_memory_kb": submission.peak_memory_kb,
+            "oom_killed": submission.oom_killed,
+            "exit_signal": submission.exit_signal,
             "stdout": submission.stdout or "",
             "stderr": submission.stderr or "",
             "error_message": submission.error_message or "",
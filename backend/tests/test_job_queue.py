@@ -0,0 +1,85 @@
+"""
+Tests for AsyncQueue (RQ enqueue over redis.asyncio)
+"""
+import asyncio
+
+from redis import Redis
+from rq.job import Job, JobStatus
+
+from backend.job_queue import AsyncQueue
+
+
+class FakeAsyncRedis:
+    """Records the commands replayed on its pipeline"""
+
+    def __init__(self):
+        self.executed = []
+        self.info_calls = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def info(self, section):
+        self.info_calls += 1
+        return {"redis_version": "7.2.4"}
+
+    async def llen(self, key):
+        return sum(1 for args in self.executed if args[0] == "RPUSH" and args[1] == key)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def execute_command(self, *args, **options):
+        self.commands.append(args)
+
+    async def execute(self):
+        self.client.executed.extend(self.commands)
+        return []
+
+
+class TestAsyncQueue:
+    """Test cases for AsyncQueue"""
+
+    def test_enqueue_writes_an_rq_job(self):
+        """The replayed commands store a job RQ workers can load, and push its id"""
+        client = FakeAsyncRedis()
+        queue = AsyncQueue("submissions", connection=client)
+
+        job = asyncio.run(queue.enqueue(
+            "worker.tasks.run_submission_in_sandbox", submission_id=7, code="print(1)", job_timeout="5m"
+        ))
+
+        # As Redis would return the hash: every field and value encoded like redis-py does
+        encode = Redis().get_encoder().encode
+        raw = {}
+        for args in client.executed:
+            if args[0] == "HSET":
+                pairs = [encode(v) for v in args[2:]]
+                raw.update(zip(pairs[::2], pairs[1::2]))
+        stored = Job(job.id, connection=Redis())
+        stored.restore(raw)
+        assert stored.func_name == "worker.tasks.run_submission_in_sandbox"
+        assert stored.kwargs == {"submission_id": 7, "code": "print(1)"}
+        assert stored.timeout == 300
+        assert stored.get_status(refresh=False) == JobStatus.QUEUED
+        assert ("RPUSH", "rq:queue:submissions", job.id) in client.executed
+        assert asyncio.run(queue.count()) == 1
+
+    def test_server_version_read_once(self):
+        """Only the first enqueue asks Redis for its version"""
+        client = FakeAsyncRedis()
+        queue = AsyncQueue("regrade", connection=client)
+
+        for run_id in (1, 2):
+            asyncio.run(queue.enqueue("worker.regrade.start_regrade", run_id=run_id))
+
+        assert client.info_calls == 1
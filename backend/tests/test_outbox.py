@@ -0,0 +1,110 @@
+"""
+Tests for the transactional outbox and its relay to RQ
+"""
+import json
+
+import pytest
+from redis import Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from backend.models import OutboxMessage, Submission
+from backend.sagas import add_job
+from backend.sagas.outbox_relay import OutboxRelay
+
+
+class RecordingRedis(Redis):
+    """Never connects: records the commands of each executed pipeline"""
+
+    def __init__(self, fail=False):
+        super().__init__()
+        self.fail = fail
+        self.pipelines = []
+
+    def info(self, *args, **kwargs):
+        return {"redis_version": "7.2.4"}
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super().pipeline(transaction, shard_hint)
+
+        def execute(raise_on_error=True):
+            if self.fail:
+                raise RedisConnectionError("Redis is down")
+            self.pipelines.append([args for args, _ in pipe.command_stack])
+            return []
+
+        pipe.execute = execute
+        return pipe
+
+
+def _submit(db, count):
+    """Submissions written like /api/submit does, one commit each"""
+    job_ids = []
+    for _ in range(count):
+        submission = Submission(job_id="", problem_id="sumatoria", code="print(1)", status="queued")
+        db.add(submission)
+        db.flush()
+        submission.job_id = add_job(
+            db, "submissions", "worker.tasks.run_submission_in_sandbox",
+            job_timeout="5m", submission_id=submission.id, problem_id="sumatoria"
+        )
+        db.commit()
+        job_ids.append(submission.job_id)
+    return job_ids
+
+
+class TestOutbox:
+    """Test cases for add_job and OutboxRelay"""
+
+    def test_job_is_committed_with_the_submission(self, test_db):
+        """The outbox row carries the job id the submission was given"""
+        job_id = _submit(test_db, 1)[0]
+
+        message = test_db.query(OutboxMessage).one()
+        assert message.job_id == job_id
+        assert message.job_timeout == 300
+        assert json.loads(message.payload) == {"submission_id": 1, "problem_id": "sumatoria"}
+
+    def test_rollback_discards_the_job(self, test_db):
+        """A submission that is not committed leaves no job behind"""
+        test_db.add(Submission(job_id="x", problem_id="sumatoria", code="print(1)"))
+        add_job(test_db, "submissions", "worker.tasks.run_submission_in_sandbox", submission_id=1)
+        test_db.rollback()
+
+        assert test_db.query(OutboxMessage).count() == 0
+
+    def test_relay_enqueues_a_batch_in_one_pipeline(self, test_db):
+        """All pending jobs go to RQ in one round-trip, in order, and leave the outbox"""
+        job_ids = _submit(test_db, 3)
+        redis = RecordingRedis()
+        marked = {}
+        relay = OutboxRelay(redis, session_factory=lambda: test_db, mark_queued=marked.update)
+
+        assert relay.relay_once() == 3
+
+        assert len(redis.pipelines) == 1
+        pushed = [args[2] for args in redis.pipelines[0] if args[0] == "RPUSH"]
+        assert pushed == job_ids
+        assert test_db.query(OutboxMessage).count() == 0
+        assert sorted(marked) == [1, 2, 3]
+        assert relay.relay_once() == 0
+
+    def test_batch_size_limits_each_round(self, test_db):
+        """Bursts are drained in batches of batch_size"""
+        _submit(test_db, 5)
+        redis = RecordingRedis()
+        relay = OutboxRelay(redis, batch_size=2, session_factory=lambda: test_db, mark_queued=lambda _: None)
+
+        assert relay.run(burst=True) == 5
+        assert len(redis.pipelines) == 3
+
+    def test_redis_failure_keeps_the_rows(self, test_db):
+        """Jobs that could not be enqueued stay in the outbox for the next try"""
+        _submit(test_db, 2)
+        relay = OutboxRelay(
+            RecordingRedis(fail=True), session_factory=lambda: test_db, mark_queued=lambda _: None
+        )
+
+        with pytest.raises(RedisConnectionError):
+            relay.relay_once()
+
+        assert test_db.query(OutboxMessage).count() == 2
@@ -0,0 +1,74 @@
+"""
+Tests for RegradeService
+"""
+import pytest
+from datetime import datetime, timedelta
+from backend.exceptions import ConflictError, ValidationError
+from backend.models import Submission
+from backend.services.regrade_service import REGRADE_STALE_SEC, RegradeService
+
+
+class TestRegradeService:
+    """Test cases for RegradeService"""
+
+    def test_create_and_get_run(self, test_db):
+        """A new run is pending with empty counters"""
+        service = RegradeService()
+
+        run = service.create_run(test_db, problem_id="sumatoria", student_id="student-001")
+
+        assert service.get_run(test_db, run.id).status == "pending"
+        progress = service.get_progress(run)
+        assert progress["total"] == 0
+        assert progress["progress_pct"] == 0.0
+        assert progress["throughput_per_min"] is None
+
+    def test_get_run_not_found(self, test_db):
+        """Unknown run ids raise ValidationError"""
+        with pytest.raises(ValidationError):
+            RegradeService().get_run(test_db, 999)
+
+    def test_progress_throughput_and_eta(self, test_db):
+        """Throughput and ETA come from the counters and the elapsed time"""
+        service = RegradeService()
+        run = service.create_run(test_db, problem_id="sumatoria")
+        started = datetime(2025, 1, 1, 12, 0, 0)
+        run.status = "running"
+        run.started_at = started
+        run.total = 400
+        run.regraded = 90
+        run.failed = 10
+        test_db.commit()
+
+        progress = service.get_progress(run, now=started + timedelta(minutes=2))
+
+        assert progress["progress_pct"] == 25.0
+        assert progress["throughput_per_min"] == 50.0
+        assert progress["eta_sec"] == 360.0
+
+    def test_resume_only_when_nothing_is_in_flight(self, test_db):
+        """Pending and progressing runs can't be resumed; failed, completed and stale ones can"""
+        service = RegradeService()
+        run = service.create_run(test_db, problem_id="sumatoria")
+        started = datetime(2025, 1, 1, 12, 0, 0)
+
+        with pytest.raises(ConflictError):
+            service.ensure_resumable(test_db, run)
+
+        run.status = "running"
+        run.started_at = started
+        test_db.add(Submission(
+            job_id="j1", problem_id="sumatoria", code="x", status="completed",
+            regrade_run_id=run.id, regraded_at=started + timedelta(minutes=30)
+        ))
+        test_db.commit()
+        stale = timedelta(seconds=REGRADE_STALE_SEC)
+
+        # Progress 30 minutes in: the stale clock starts there, not at started_at
+        with pytest.raises(ConflictError):
+            service.ensure_resumable(test_db, run, now=started + stale + timedelta(minutes=1))
+        service.ensure_resumable(test_db, run, now=started + timedelta(minutes=30) + stale)
+
+        for status in ("failed", "completed"):
+            run.status = status
+            service.ensure_resumable(test_db, run, now=started)
@@ -0,0 +1,115 @@
+"""
+Tests for the two-tier cache of finished submission results
+"""
+import asyncio
+import json
+
+from backend.services.result_view_cache import ResultViewCache
+
+
+class FakeRedis:
+    """Dict-backed stand-in for async GET/SETEX (decoded responses, like redis_cache_async_client)"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.values[key] = value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class CountingLoader:
+    """Loader returning a fixed submission, counting database reads"""
+
+    def __init__(self, status="completed", found=True):
+        self.status = status
+        self.found = found
+        self.calls = 0
+        self.blocked = False
+        self.release = None
+
+    async def __call__(self, job_id):
+        self.calls += 1
+        if self.blocked:
+            self.release = asyncio.Event()
+            await self.release.wait()
+        if not self.found:
+            return None
+        return 42, {"job_id": job_id, "status": self.status, "score_total": 7.5}
+
+
+class TestResultViewCache:
+    """Test cases for ResultViewCache"""
+
+    def test_finished_result_is_encoded_once(self):
+        """The first read stores the encoded result; later reads skip the loader"""
+        cache = ResultViewCache(client=FakeRedis())
+        loader = CountingLoader()
+
+        first = asyncio.run(cache.fetch("job-1", loader))
+        second = asyncio.run(cache.fetch("job-1", loader))
+
+        assert loader.calls == 1
+        assert (first.submission_id, first.status) == (42, "completed")
+        assert second.body == first.body
+        assert json.loads(second.body)["score_total"] == 7.5
+
+    def test_redis_tier_serves_other_processes(self):
+        """A process with an empty LRU reads the result from Redis"""
+        redis = FakeRedis()
+        asyncio.run(ResultViewCache(client=redis).fetch("job-1", CountingLoader()))
+        loader = CountingLoader()
+
+        lookup = asyncio.run(ResultViewCache(client=redis).fetch("job-1", loader))
+
+        assert loader.calls == 0
+        assert json.loads(lookup.body)["job_id"] == "job-1"
+
+    def test_in_progress_is_not_cached(self):
+        """Unfinished submissions are read again on every request"""
+        cache = ResultViewCache(client=FakeRedis())
+        loader = CountingLoader(status="running")
+
+        lookup = asyncio.run(cache.fetch("job-1", loader))
+        asyncio.run(cache.fetch("job-1", loader))
+
+        assert (lookup.submission_id, lookup.status, lookup.body) == (42, "running", None)
+        assert loader.calls == 2
+        assert cache.client.values == {}
+
+    def test_unknown_job_is_cached_negatively(self):
+        """A bad job id reaches the database once per negative TTL"""
+        cache = ResultViewCache(client=FakeRedis())
+        loader = CountingLoader(found=False)
+
+        assert asyncio.run(cache.fetch("nope", loader)) is None
+        assert asyncio.run(cache.fetch("nope", loader)) is None
+        assert loader.calls == 1
+        assert cache.client.values == {"result_view:nope": ""}
+
+    def test_concurrent_misses_share_one_read(self):
+        """Requests for the same job while it is being read wait for that read"""
+        cache = ResultViewCache(client=FakeRedis())
+        loader = CountingLoader()
+        loader.blocked = True
+
+        async def scenario():
+            requests = [asyncio.create_task(cache.fetch("job-1", loader)) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            loader.release.set()
+            return await asyncio.gather(*requests)
+
+        lookups = asyncio.run(scenario())
+
+        assert loader.calls == 1
+        assert len({lookup.body for lookup in lookups}) == 1
+
+    def test_lru_evicts_least_recently_used(self):
+        """The local tier keeps at most lru_size results"""
+        cache = ResultViewCache(client=FakeRedis(), lru_size=2)
+        for job_id in ("a", "b", "c"):
+            asyncio.run(cache.fetch(job_id, CountingLoader()))
+
+        assert list(cache._local) == ["b", "c"]
@@ -0,0 +1,193 @@
+"""
+Tests for pushed submission results (pub/sub hub, long-poll and SSE)
+"""
+import asyncio
+import json
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from backend import app as app_module
+from backend.database import Base
+from backend.models import Submission
+from backend.services.result_view_cache import ResultViewCache
+from backend.services.submission_events import SubmissionEventHub
+from backend.tests.test_result_view_cache import FakeRedis
+
+
+class FakeRequest:
+    async def is_disconnected(self):
+        return False
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    """Sync sessions for the test setup; the app gets async ones on the same file"""
+    url = f"sqlite:///{tmp_path / 'playground.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+    async_sessions = async_sessionmaker(async_engine, expire_on_commit=False)
+    monkeypatch.setattr(app_module, "AsyncSessionLocal", async_sessions)
+    session_factory = sessionmaker(bind=engine)
+    session_factory.async_sessions = async_sessions
+    yield session_factory
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture(autouse=True)
+def views(monkeypatch):
+    views = ResultViewCache(client=FakeRedis())
+    monkeypatch.setattr(app_module, "result_view_cache", views)
+    return views
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = SubmissionEventHub(client=object())
+
+    async def started():
+        return None
+
+    monkeypatch.setattr(hub, "start", started)
+    monkeypatch.setattr(app_module, "submission_event_hub", hub)
+    return hub
+
+
+def _running(db):
+    submission = Submission(job_id="job-1", problem_id="suma", code="", status="running")
+    db.add(submission)
+    db.commit()
+    return submission.id
+
+
+def _finish(db, submission_id, hub):
+    db.query(Submission).filter(Submission.id == submission_id).update(
+        {"status": "completed", "score_total": 10.0}
+    )
+    db.commit()
+    hub.dispatch(f"submission_events:{submission_id}".encode(), json.dumps({"status": "completed"}))
+
+
+class TestSubmissionEvents:
+    """Test cases for SubmissionEventHub and the result endpoints built on it"""
+
+    def test_dispatch_reaches_only_that_submission(self):
+        """Events are routed by the submission id in the channel name"""
+        async def scenario():
+            hub = SubmissionEventHub(client=object())
+            with hub.subscribe(1) as mine, hub.subscribe(2) as other:
+                hub.dispatch(b"submission_events:1", b'{"status": "running"}')
+                hub.dispatch(b"submission_events:x", b"not json")
+                assert await hub.next_event(mine, 0.1) == {"status": "running"}
+                assert await hub.next_event(other, 0.01) is None
+            assert hub._waiters == {}
+
+        asyncio.run(scenario())
+
+    def test_long_poll_returns_on_event(self, session_factory, hub):
+        """A waiting request returns as soon as the result is published"""
+        db = session_factory()
+        submission_id = _running(db)
+
+        async def scenario():
+            async with session_factory.async_sessions() as session:
+                waiting = asyncio.create_task(app_module._wait_until_finished(session, submission_id, 5))
+                await asyncio.sleep(0.05)
+                _finish(session_factory(), submission_id, hub)
+                return await asyncio.wait_for(waiting, 1)
+
+        assert asyncio.run(scenario()) is True
+
+    def test_long_poll_times_out(self, session_factory, hub):
+        """Without events the wait ends after the requested time"""
+        db = session_factory()
+        submission_id = _running(db)
+
+        async def scenario():
+            async with session_factory.async_sessions() as session:
+                return await app_module._wait_until_finished(session, submission_id, 0.05)
+
+        assert asyncio.run(scenario()) is False
+
+    def test_sse_sends_status_then_result(self, session_factory, hub, monkeypatch):
+        """The stream reports the current status and ends with the full result"""
+        submission_id = _running(session_factory())
+
+        async def scenario():
+            frames = []
+            async for frame in app_module._result_events(FakeRequest(), "job-1", submission_id):
+                frames.append(frame)
+                if len(frames) == 1:
+                    _finish(session_factory(), submission_id, hub)
+            return frames
+
+        frames = asyncio.run(scenario())
+
+        assert frames[0].startswith("event: status\n")
+        assert frames[-1].startswith("event: result\n")
+        result = json.loads(frames[-1].split("data: ", 1)[1])
+        assert (result["status"], result["score_total"]) == ("completed", 10.0)
+
+    def test_finished_result_served_without_db(self, session_factory, hub, monkeypatch, views):
+        """Once cached, GET /api/result answers with the stored bytes"""
+        db = session_factory()
+        submission_id = _running(db)
+        _finish(db, submission_id, hub)
+
+        async def get():
+            async with session_factory.async_sessions() as session:
+                return await app_module.get_result.__wrapped__(FakeRequest(), "job-1", 0, session)
+
+        first = asyncio.run(get())
+        monkeypatch.setattr(app_module, "AsyncSessionLocal", lambda: pytest.fail("database read"))
+        second = asyncio.run(get())
+
+        assert second.body == first.body
+        assert json.loads(second.body)["score_total"] == 10.0
+
+    def test_sse_forwards_progress_without_reading_db(self, session_factory, hub, monkeypatch):
+        """Per-test progress events become `progress` frames before the result"""
+        submission_id = _running(session_factory())
+        channel = f"submission_events:{submission_id}"
+
+        async def scenario():
+            frames = []
+            async for frame in app_module._result_events(FakeRequest(), "job-1", submission_id):
+                frames.append(frame)
+                if len(frames) == 1:
+                    hub.dispatch(channel, json.dumps({"status": "running", "progress": {"tests_done": 1, "score": 2.0}}))
+                elif len(frames) == 2:
+                    _finish(session_factory(), submission_id, hub)
+            return frames
+
+        frames = asyncio.run(scenario())
+
+        assert [frame.split("\n", 1)[0] for frame in frames] == [
+            "event: status", "event: progress", "event: result"
+        ]
+        progress = json.loads(frames[1].split("data: ", 1)[1])
+        assert progress == {"job_id": "job-1", "tests_done": 1, "score": 2.0}
+
+    def test_sse_ends_with_error_when_submission_deleted(self, session_factory, hub):
+        """A submission removed mid-stream closes the stream with an `error` frame"""
+        submission_id = _running(session_factory())
+        channel = f"submission_events:{submission_id}"
+
+        async def scenario():
+            frames = []
+            async for frame in app_module._result_events(FakeRequest(), "job-1", submission_id):
+                frames.append(frame)
+                if len(frames) == 1:
+                    db = session_factory()
+                    db.query(Submission).filter(Submission.id == submission_id).delete()
+                    db.commit()
+                    hub.dispatch(channel, json.dumps({"status": "completed"}))
+            return frames
+
+        frames = asyncio.run(scenario())
+
+        assert [frame.split("\n", 1)[0] for frame in frames] == ["event: status", "event: error"]
+        assert json.loads(frames[-1].split("data: ", 1)[1])["job_id"] == "job-1"
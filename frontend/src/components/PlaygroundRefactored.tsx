@@ -72,6 +72,7 @@ function PlaygroundRefactored({ onSubjectChange }: PlaygroundProps) {
     submit,
     submitting,
     polling,
+    progress,
     result,
     setResult,
     cleanup
@@ -231,6 +232,7 @@ function PlaygroundRefactored({ onSubjectChange }: PlaygroundProps) {
             onReset={resetCode}
             submitting={submitting}
             polling={polling}
+            progress={progress}
             canSubmit={!!code.trim()}
             canReset={!!selectedProblem}
           />
@@ -1,8 +1,11 @@
+import { SubmissionProgress } from '../../types/api'
+
 interface EditorActionsProps {
   onSubmit: () => void
   onReset: () => void
   submitting: boolean
   polling: boolean
+  progress?: SubmissionProgress | null
   canSubmit: boolean
   canReset: boolean
 }
@@ -10,17 +13,21 @@ interface EditorActionsProps {
 /**
  * Editor Action Buttons Component
  *
- * Submit and reset buttons with loading states.
+ * Submit and reset buttons with loading states and live test progress.
  */
 export function EditorActions({
   onSubmit,
   onReset,
   submitting,
   polling,
+  progress,
   canSubmit,
   canReset
 }: EditorActionsProps) {
   const loading = submitting || polling
+  const testsProgress = progress?.tests_total
+    ? ` ${progress.tests_done ?? 0}/${progress.tests_total}`
+    : ''
 
   return (
     <div className="button-group">
@@ -29,7 +36,7 @@ export function EditorActions({
         onClick={onSubmit}
         disabled={loading || !canSubmit}
       >
-        {submitting ? '📤 Enviando...' : polling ? '⏳ Ejecutando tests...' : '▶️ Ejecutar tests'}
+        {submitting ? '📤 Enviando...' : polling ? `⏳ Ejecutando tests...${testsProgress}` : '▶️ Ejecutar tests'}
       </button>
       <button
         className="reset-btn"
@@ -70,6 +70,12 @@ export const ResultsPanel = memo(({ result }: ResultsPanelProps) => {
         </div>
       )}
 
+      {result.status === 'output_limit' && (
+        <div className="status error">
+          📜 Salida demasiado larga: {result.error_message}
+        </div>
+      )}
+
       {result.status === 'failed' && (
         <div className="status error">
           ❌ Error: {result.error_message}
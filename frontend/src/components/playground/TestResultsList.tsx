@@ -24,6 +24,7 @@ export function TestResultsList({ testResults }: TestResultsListProps) {
             {test.outcome === 'passed' && '✅ '}
             {test.outcome === 'failed' && '❌ '}
             {test.outcome === 'error' && '⚠️ '}
+            {test.outcome === 'timeout' && '⏱️ '}
             {test.test_name} ({test.points}/{test.max_points} pts)
           </div>
           {test.message && (
@@ -1,24 +1,33 @@
 import { useState, useRef, useCallback, useEffect } from 'react'
 import axios from 'axios'
-import { SubmissionResult, SubmitRequest, SubmitResponse } from '../types/api'
+import { SubmissionProgress, SubmissionResult, SubmissionStatus, SubmitRequest, SubmitResponse } from '../types/api'
 
 interface UseSubmissionReturn {
   submit: (problemId: string, code: string, studentId?: string) => Promise<void>
   submitting: boolean
   polling: boolean
+  progress: SubmissionProgress | null
   result: SubmissionResult | null
   setResult: (result: SubmissionResult | null) => void
   cleanup: () => void
 }
 
+const FINAL_STATUSES: SubmissionStatus[] = ['completed', 'failed', 'timeout', 'output_limit']
+// Long-poll fallback: each request waits server-side up to LONG_POLL_WAIT_SEC
+const LONG_POLL_WAIT_SEC = 25
+const LONG_POLL_MAX_ATTEMPTS = 4  // ~100 seconds total
+
 /**
- * Custom hook for handling code submissions and result polling.
+ * Custom hook for handling code submissions and pushed results.
  *
  * Manages submission lifecycle:
  * 1. Submit code to backend
- * 2. Poll for results with exponential backoff
- * 3. Handle timeouts and errors
- * 4. Cleanup on unmount or problem change
+ * 2. Wait for the result pushed over Server-Sent Events
+ *    (`/api/result/{job_id}/events`), falling back to long-polling
+ *    (`/api/result/{job_id}?wait=N`) if the stream is unavailable
+ * 3. Show per-test progress while the tests run
+ * 4. Handle timeouts and errors
+ * 5. Cleanup on unmount or problem change
  *
  * @returns Object with submit function, loading states, and result
  */
@@ -26,46 +35,28 @@ export function useSubmission(): UseSubmissionReturn {
   const [submitting, setSubmitting] = useState(false)
   const [polling, setPolling] = useState(false)
   const [result, setResult] = useState<SubmissionResult | null>(null)
+  const [progress, setProgress] = useState<SubmissionProgress | null>(null)
 
   const pollingControllerRef = useRef<AbortController | null>(null)
-  const pollingTimeoutRef = useRef<number | null>(null)
+  const eventSourceRef = useRef<EventSource | null>(null)
 
   /**
-   * Poll for submission result with exponential backoff
+   * Long-poll for the submission result (the server answers as soon as it is ready)
    */
-  const pollResult = useCallback(async (jobId: string) => {
-    // Create abort controller for this polling session
-    const controller = new AbortController()
-    pollingControllerRef.current = controller
-
-    const maxAttempts = 20  // ~40 seconds total
-    let attempts = 0
-
-    const poll = async (): Promise<void> => {
+  const longPollResult = useCallback(async (jobId: string, controller: AbortController) => {
+    for (let attempt = 0; attempt < LONG_POLL_MAX_ATTEMPTS; attempt++) {
       try {
         const res = await axios.get<SubmissionResult>(`/api/result/${jobId}`, {
+          params: { wait: LONG_POLL_WAIT_SEC },
           signal: controller.signal
         })
-        const data = res.data
-
-        if (data.status === 'completed' || data.status === 'failed' || data.status === 'timeout') {
-          setResult(data)
+        if (FINAL_STATUSES.includes(res.data.status)) {
+          setResult(res.data)
           setPolling(false)
-        } else {
-          attempts++
-          if (attempts < maxAttempts) {
-            // Exponential backoff: 2s → 4s → 6s → 8s → 10s (max)
-            const baseDelay = 2000
-            const delay = Math.min(baseDelay * Math.min(attempts, 5), 10000)
-
-            pollingTimeoutRef.current = window.setTimeout(poll, delay)
-          } else {
-            setResult({
-              status: 'error',
-              error_message: 'Timeout esperando resultado (40 segundos). El trabajo puede seguir en ejecución.'
-            })
-            setPolling(false)
-          }
+          return
+        }
+        if (res.data.progress) {
+          setProgress(res.data.progress)
         }
       } catch (err) {
         // Don't show error if polling was cancelled
@@ -79,12 +70,53 @@ export function useSubmission(): UseSubmissionReturn {
           error_message: 'Error consultando resultado'
         })
         setPolling(false)
+        return
       }
     }
 
-    poll()
+    setResult({
+      status: 'error',
+      error_message: 'Timeout esperando resultado. El trabajo puede seguir en ejecución.'
+    })
+    setPolling(false)
   }, [])
 
+  /**
+   * Wait for the submission result pushed by the server
+   */
+  const waitForResult = useCallback((jobId: string) => {
+    const controller = new AbortController()
+    pollingControllerRef.current = controller
+
+    if (typeof EventSource === 'undefined') {
+      longPollResult(jobId, controller)
+      return
+    }
+
+    const source = new EventSource(`/api/result/${jobId}/events`)
+    eventSourceRef.current = source
+
+    source.addEventListener('progress', (event) => {
+      setProgress(JSON.parse((event as MessageEvent).data) as SubmissionProgress)
+    })
+
+    source.addEventListener('result', (event) => {
+      source.close()
+      eventSourceRef.current = null
+      setResult(JSON.parse((event as MessageEvent).data) as SubmissionResult)
+      setPolling(false)
+    })
+
+    // Stream unavailable or closed before the result: continue with long-polling
+    source.onerror = () => {
+      source.close()
+      eventSourceRef.current = null
+      if (!controller.signal.aborted) {
+        longPollResult(jobId, controller)
+      }
+    }
+  }, [longPollResult])
+
   /**
    * Submit code for evaluation
    */
@@ -116,11 +148,12 @@ export function useSubmission(): UseSubmissionReturn {
       const submitRes = await axios.post<SubmitResponse>('/api/submit', submitData)
       const jobId = submitRes.data.job_id
 
-      // Clear previous result and start polling
+      // Clear previous result and wait for the pushed result
       setResult(null)
+      setProgress(null)
       setSubmitting(false)
       setPolling(true)
-      pollResult(jobId)
+      waitForResult(jobId)
 
     } catch (err) {
       console.error('Error submitting:', err)
@@ -142,20 +175,20 @@ export function useSubmission(): UseSubmissionReturn {
       setSubmitting(false)
       setPolling(false)
     }
-  }, [pollResult])
+  }, [waitForResult])
 
   /**
-   * Cleanup polling resources
+   * Cleanup event stream and polling resources
    */
   const cleanup = useCallback(() => {
+    if (eventSourceRef.current) {
+      eventSourceRef.current.close()
+      eventSourceRef.current = null
+    }
     if (pollingControllerRef.current) {
       pollingControllerRef.current.abort()
       pollingControllerRef.current = null
     }
-    if (pollingTimeoutRef.current) {
-      clearTimeout(pollingTimeoutRef.current)
-      pollingTimeoutRef.current = null
-    }
   }, [])
 
   // Cleanup on unmount
@@ -169,6 +202,7 @@ export function useSubmission(): UseSubmissionReturn {
     submit,
     submitting,
     polling,
+    progress,
     result,
     setResult,
     cleanup
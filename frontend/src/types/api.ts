@@ -33,7 +33,7 @@ export interface ProblemsResponse {
 }
 
 // Test result types
-export type TestOutcome = 'passed' | 'failed' | 'error'
+export type TestOutcome = 'passed' | 'failed' | 'error' | 'timeout'
 export type TestVisibility = 'public' | 'hidden'
 
 export interface TestResult {
@@ -44,10 +44,12 @@ export interface TestResult {
   points: number
   max_points: number
   visibility: TestVisibility
+  cpu_time_sec?: number | null
+  peak_memory_kb?: number | null
 }
 
 // Submission result types
-export type SubmissionStatus = 'pending' | 'queued' | 'running' | 'completed' | 'failed' | 'timeout' | 'error'
+export type SubmissionStatus = 'pending' | 'queued' | 'running' | 'completed' | 'failed' | 'timeout' | 'output_limit' | 'error'
 
 export interface SubmissionResult {
   status: SubmissionStatus
@@ -59,10 +61,26 @@ export interface SubmissionResult {
   failed?: number
   errors?: number
   duration_sec?: number
+  cpu_user_sec?: number | null
+  cpu_system_sec?: number | null
+  peak_memory_kb?: number | null
+  oom_killed?: boolean | null
+  exit_signal?: number | null
   test_results?: TestResult[]
   stdout?: string
   stderr?: string
   error_message?: string
+  progress?: SubmissionProgress | null
+}
+
+// Live progress of an in-flight submission (SSE `progress` events, long-poll `progress`)
+export interface SubmissionProgress {
+  tests_done?: number
+  tests_total?: number
+  score?: number
+  score_max?: number
+  queued_at?: string
+  started_at?: string
 }
 
 // Submit request types
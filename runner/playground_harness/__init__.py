@@ -0,0 +1,7 @@
+"""
+Sandbox harness installed in the runner image.
+
+Runs inside py-playground-runner containers. It must only depend on the
+standard library and pytest: the worker and backend packages are not
+available in the image.
+"""
@@ -0,0 +1,173 @@
+"""
+Harness entry point.
+
+    python -m playground_harness serve [--socket PATH] [--keep-uid]
+    python -m playground_harness run [--zygote PATH] [--cpu-seconds N]
+                                     [--test-timeout S] [--session-timeout S]
+                                     [--stdin-tar] -- PYTEST_ARGS...
+    python -m playground_harness isolate [--cgroup DIR] [--bind SRC]
+                                         [--tests DIR] [--hide PATH ...] -- run ...
+    python -m playground_harness precompile [--mount-path PATH] DIR
+
+Runs pytest with the result streaming plugin (plugin.py): one frame per
+test on stdout. --stdin-tar unpacks the workspace from a tar on stdin into
+the working directory first. --test-timeout / --session-timeout set the
+per-test and whole-run time budgets enforced by the plugin. pytest runs in
+a child process; a final "usage" frame reports its CPU time, peak memory,
+OOM kill and exit signal (usage.py). `isolate` runs another harness command
+in new Linux namespaces instead of a container (isolate.py). `precompile`
+writes pytest's assertion-rewritten bytecode for a read-only problem store
+directory (precompile.py).
+
+When the test files named in PYTEST_ARGS were migrated to a cases.json in
+the same directory, `run` grades it with the native harness instead of
+pytest (cases.py).
+"""
+import argparse
+import os
+import sys
+
+from .zygote import DEFAULT_SOCKET_PATH
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog="playground_harness")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Start the zygote fork server")
+    serve.add_argument("--socket", default=DEFAULT_SOCKET_PATH)
+    serve.add_argument(
+        "--keep-uid", action="store_true",
+        help="Do not switch children to the sandbox user (local testing only)"
+    )
+
+    isolate = sub.add_parser("isolate", help="Run a harness command in a namespace sandbox")
+    isolate.add_argument("--cgroup", help="cgroup v2 directory to join (job limits)")
+    isolate.add_argument("--bind", help="Workspace to mount as the working directory")
+    isolate.add_argument("--tests", help="Problem store directory to mount read-only at TESTS_DIR")
+    isolate.add_argument("--hide", action="append", default=[], help="Host directory to hide")
+    isolate.add_argument("--address-space-mb", type=int, default=None, help="RLIMIT_AS without a cgroup")
+    isolate.add_argument(
+        "--keep-uid", action="store_true",
+        help="Do not switch a root launcher to the sandbox user (local testing only)"
+    )
+    isolate.add_argument("harness_args", nargs=argparse.REMAINDER)
+
+    precompile = sub.add_parser("precompile", help="Precompile the test modules of a directory")
+    precompile.add_argument("directory")
+    precompile.add_argument("--mount-path", help="Where the directory is mounted in the sandbox")
+
+    run = sub.add_parser("run", help="Run pytest for the current workspace")
+    run.add_argument("--zygote", help="Fork the run from the zygote at this socket")
+    run.add_argument("--cpu-seconds", type=float, default=None)
+    run.add_argument("--test-timeout", type=float, default=None, help="Per-test budget (seconds)")
+    run.add_argument("--session-timeout", type=float, default=None, help="Budget for all tests (seconds)")
+    run.add_argument("--stdin-tar", action="store_true", help="Read the workspace as a tar from stdin")
+    run.add_argument("pytest_args", nargs=argparse.REMAINDER)
+
+    args = parser.parse_args(argv)
+    if getattr(args, "pytest_args", None) and args.pytest_args[0] == "--":
+        args.pytest_args = args.pytest_args[1:]
+    if getattr(args, "harness_args", None) and args.harness_args[0] == "--":
+        args.harness_args = args.harness_args[1:]
+    return args
+
+
+def main(argv=None) -> int:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.command == "serve":
+        from .zygote import ZygoteServer
+
+        ZygoteServer(args.socket, drop_uid=not args.keep_uid).serve_forever()
+        return 0
+
+    if args.command == "isolate":
+        from .isolate import run_isolated
+
+        return run_isolated(
+            args.harness_args,
+            cgroup_dir=args.cgroup,
+            bind=args.bind,
+            tests=args.tests,
+            hide=args.hide,
+            address_space_mb=args.address_space_mb,
+            keep_uid=args.keep_uid
+        )
+
+    if args.command == "precompile":
+        from .precompile import main as precompile_main
+
+        return precompile_main(args.directory, args.mount_path)
+
+    workspace = os.getcwd()
+    if args.stdin_tar:
+        from .workspace import extract_workspace
+
+        extract_workspace(sys.stdin.buffer, workspace)
+        # The tar consumed stdin; tests must not block on it
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.close(devnull)
+
+    return _run_pytest(args, workspace)
+
+
+def _budget_env(args) -> dict:
+    from .protocol import SESSION_TIMEOUT_ENV, TEST_TIMEOUT_ENV
+
+    env = {}
+    if args.test_timeout is not None:
+        env[TEST_TIMEOUT_ENV] = str(args.test_timeout)
+    if args.session_timeout is not None:
+        env[SESSION_TIMEOUT_ENV] = str(args.session_timeout)
+    return env
+
+
+def _run_pytest(args, workspace: str) -> int:
+    from .cases import find_cases
+
+    cases = find_cases(args.pytest_args, workspace)
+    if cases:
+        return _run_cases(args, cases, workspace)
+
+    if args.zygote:
+        from .client import run_via_zygote
+
+        return run_via_zygote(
+            args.zygote,
+            args.pytest_args,
+            workspace=workspace,
+            env=_budget_env(args),
+            cpu_seconds=args.cpu_seconds
+        )
+
+    from .usage import run_supervised
+
+    def run_child(result_fd: int) -> int:
+        from .limits import apply_rlimits
+        from .plugin import run_pytest
+
+        apply_rlimits(args.cpu_seconds)
+        os.environ.update(_budget_env(args))
+        return run_pytest(args.pytest_args, result_fd)
+
+    return run_supervised(run_child)
+
+
+def _run_cases(args, cases: str, workspace: str) -> int:
+    """Native harness for a cases.json problem (no pytest, not even in zygote mode)"""
+    from .usage import run_supervised
+
+    def run_child(result_fd: int) -> int:
+        from .cases import run_cases
+        from .limits import apply_rlimits
+
+        apply_rlimits(args.cpu_seconds)
+        return run_cases(cases, workspace, result_fd, args.test_timeout, args.session_timeout)
+
+    return run_supervised(run_child)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
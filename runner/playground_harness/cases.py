@@ -0,0 +1,387 @@
+"""
+Native harness for stdin/stdout problems described by a cases.json file.
+
+    {
+      "version": 1,
+      "entry": "main",
+      "max_points": 10,
+      "cases": [
+        {"name": "test_existe_funcion", "defines": "main", "points": 1},
+        {"name": "test_basico", "stdin": "20", "expected": "Es mayor de edad", "points": 2},
+        {"name": "test_area", "stdin": "5", "expected": "78.5398",
+         "compare": "float", "tolerance": 0.01, "points": 1, "visibility": "hidden"}
+      ]
+    }
+
+A case either checks that the student module defines a name ("defines"),
+or calls the entry function with "stdin" as sys.stdin and compares what it
+printed with "expected" (or with each output of a list of accepted ones):
+- strip (default): equal after stripping surrounding whitespace
+- exact: byte for byte
+- lines: equal line by line, ignoring trailing whitespace and blank lines at the end
+- float: both parse as numbers within "tolerance" (default 0)
+"points" and "visibility" (public/hidden, default public) are the rubric.
+
+PERFORMANCE: A pytest suite pays for importing pytest, collecting and
+assertion-rewriting the test modules. Here every case runs in-process with
+a StringIO swap and pytest is never imported. The student module is
+executed again for each case (within the case's time budget), so state a
+case leaves in it can't change the outcome of the next one.
+
+While the cases run, fd 1 points at /dev/null: only the summary printed at
+the end reaches the console, with MAGIC escaped in the echoed messages.
+The records are the same as the pytest plugin's (name "cases.json::<case>"),
+so the worker scores them the same way. Per-case and whole-run time budgets
+work like the plugin's.
+
+Only the standard library is used: the zygote client runs it with `python -S`.
+"""
+import importlib.util
+import io
+import json
+import math
+import os
+import resource
+import signal
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .protocol import ESCAPED_MAGIC, MAGIC, write_frame
+
+CASES_FILE = "cases.json"
+STUDENT_FILE = "student_code.py"
+COMPARE_MODES = ("strip", "exact", "lines", "float")
+MAX_MESSAGE_CHARS = 8000
+MAX_SHOWN_OUTPUT_CHARS = 200
+# Same values as the pytest plugin (plugin.py), which this module must not import
+REARM_INTERVAL_SEC = 0.05
+WATCHDOG_GRACE_SEC = 1.0
+WATCHDOG_EXIT_CODE = 124
+# pytest exit codes, so the worker and the result cache treat both harnesses alike
+EXIT_OK = 0
+EXIT_TESTS_FAILED = 1
+EXIT_INTERRUPTED = 2
+EXIT_NO_TESTS = 5
+
+
+class CaseTimeout(BaseException):
+    """Raised in a case that exceeded its time budget (not caught by `except Exception`)"""
+
+
+class CasesSpecError(ValueError):
+    """cases.json is malformed"""
+
+
+def find_cases(test_paths: List[str], workspace: str) -> Optional[str]:
+    """
+    cases.json that replaces the given pytest arguments, if any.
+
+    The worker always names the test files (tests_public.py, or
+    /problem/tests_public.py with the problem store); a problem migrated
+    to cases.json has that file in the same directory instead.
+    """
+    dirs = []
+    for arg in test_paths:
+        if arg.startswith("-") or not arg.endswith((".py", ".json")):
+            continue
+        directory = os.path.dirname(arg)
+        path = directory if os.path.isabs(directory) else os.path.join(workspace, directory)
+        if path not in dirs:
+            dirs.append(path)
+    for directory in dirs or [workspace]:
+        candidate = os.path.join(directory, CASES_FILE)
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def load_spec(path: str) -> Dict[str, Any]:
+    """Read and validate a cases.json file"""
+    with open(path, "rb") as f:
+        spec = json.loads(f.read().decode("utf-8"))
+    if not isinstance(spec, dict) or not isinstance(spec.get("cases"), list):
+        raise CasesSpecError("cases.json must be an object with a \"cases\" list")
+    seen = set()
+    for case in spec["cases"]:
+        name = case.get("name") if isinstance(case, dict) else None
+        if not name or name in seen:
+            raise CasesSpecError(f"Every case needs a unique name (got {name!r})")
+        seen.add(name)
+        if "defines" not in case and "expected" not in case:
+            raise CasesSpecError(f"Case {name!r} needs \"expected\" or \"defines\"")
+        if case.get("compare", "strip") not in COMPARE_MODES:
+            raise CasesSpecError(f"Case {name!r}: unknown compare mode {case['compare']!r}")
+    return spec
+
+
+def compare_output(output: str, case: Dict[str, Any]) -> Optional[str]:
+    """
+    Check a case's captured output against "expected" (one output, or a list of accepted ones).
+
+    Returns:
+        None when it matches, otherwise the failure message
+    """
+    expected = case["expected"]
+    accepted = [str(e) for e in expected] if isinstance(expected, list) else [str(expected)]
+    if any(_matches(output, e, case) for e in accepted):
+        return None
+    shown = output.strip()
+    if len(shown) > MAX_SHOWN_OUTPUT_CHARS:
+        shown = shown[:MAX_SHOWN_OUTPUT_CHARS] + "..."
+    return f"Se esperaba '{accepted[0].strip()}', se obtuvo '{shown}'"
+
+
+def _matches(output: str, expected: str, case: Dict[str, Any]) -> bool:
+    mode = case.get("compare", "strip")
+    if mode == "exact":
+        return output == expected
+    if mode == "lines":
+        return _lines(output) == _lines(expected)
+    if mode == "float":
+        tolerance = float(case.get("tolerance", 0))
+        try:
+            return math.isclose(float(output.strip()), float(expected), rel_tol=0, abs_tol=tolerance)
+        except ValueError:
+            return False
+    return output.strip() == expected.strip()
+
+
+def _lines(text: str) -> List[str]:
+    lines = [line.rstrip() for line in text.splitlines()]
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+class CaseRunner:
+    """Runs the cases of a spec against the student module, streaming one record per case"""
+
+    def __init__(
+        self,
+        spec: Dict[str, Any],
+        workspace: str,
+        result_fd: Optional[int] = None,
+        test_timeout: Optional[float] = None,
+        session_timeout: Optional[float] = None
+    ):
+        self.spec = spec
+        self.workspace = workspace
+        self.result_fd = result_fd
+        self.test_timeout = test_timeout
+        self.session_timeout = session_timeout
+        self._deadline: Optional[float] = None
+        self._current: Optional[str] = None
+        self._budget = 0.0
+        self._started = 0.0
+        self._done = threading.Event()
+
+    def run(self) -> int:
+        """Run every case; returns a pytest-compatible exit status"""
+        cases = self.spec["cases"]
+        if self.session_timeout is not None:
+            self._deadline = time.monotonic() + self.session_timeout
+        started = time.monotonic()
+
+        outcomes = []
+        console = _silence_stdout()
+        try:
+            for case in cases:
+                name = f"{CASES_FILE}::{case['name']}"
+                outcome, duration, message, usage = self._run_case(case, name)
+                outcomes.append((name, outcome, message))
+                self._write_test(name, outcome, duration, message, usage)
+        finally:
+            os.dup2(console, 1)
+            os.close(console)
+
+        if not cases:
+            exitstatus = EXIT_NO_TESTS
+        elif any(outcome == "error" for _, outcome, _ in outcomes):
+            exitstatus = EXIT_INTERRUPTED
+        elif all(outcome == "passed" for _, outcome, _ in outcomes):
+            exitstatus = EXIT_OK
+        else:
+            exitstatus = EXIT_TESTS_FAILED
+        self._write({"event": "end", "exitstatus": exitstatus})
+        _print_summary(outcomes, time.monotonic() - started)
+        return exitstatus
+
+    def _load_student(self) -> Tuple[Any, Optional[str]]:
+        """Execute a fresh student module, with stdin empty and its prints discarded"""
+        path = os.path.join(self.workspace, STUDENT_FILE)
+        saved = sys.stdin, sys.stdout
+        sys.stdin, sys.stdout = io.StringIO(""), io.StringIO()
+        try:
+            spec = importlib.util.spec_from_file_location("student_code", path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules["student_code"] = module
+            spec.loader.exec_module(module)
+            return module, None
+        except BaseException as e:  # SyntaxError, SystemExit, input() at import time, ...
+            if isinstance(e, (KeyboardInterrupt, CaseTimeout)):
+                raise
+            return None, _format_error(e, path)
+        finally:
+            sys.stdin, sys.stdout = saved
+
+    def _run_case(self, case: Dict[str, Any], name: str) -> Tuple[str, float, str, dict]:
+        before = resource.getrusage(resource.RUSAGE_SELF)
+        self._budget = round(self._next_budget(), 3)
+        self._current = name
+        self._started = time.monotonic()
+        saved = sys.stdin, sys.stdout
+        timed_out = False
+        load_error = message = None
+        self._arm()
+        try:
+            try:
+                student, load_error = self._load_student()
+                if load_error is None:
+                    message = self._check(student, case)
+            finally:
+                self._disarm()
+        except CaseTimeout:
+            timed_out = True
+        except KeyboardInterrupt:
+            raise
+        except BaseException as e:  # Student code raised (including SystemExit)
+            sys.stdin, sys.stdout = saved
+            message = _format_error(e, os.path.join(self.workspace, STUDENT_FILE))
+        duration = time.monotonic() - self._started
+        after = resource.getrusage(resource.RUSAGE_SELF)
+        usage = {
+            "cpu_time": round(
+                (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime), 4
+            ),
+            "max_rss_kb": int(after.ru_maxrss),
+        }
+        if timed_out:
+            return "timeout", duration, f"Test exceeded its time limit ({self._budget:g}s)", usage
+        if load_error is not None:
+            return "error", duration, load_error, usage
+        if message:
+            return "failed", duration, message, usage
+        return "passed", duration, "", usage
+
+    def _check(self, student, case: Dict[str, Any]) -> Optional[str]:
+        """Run one case on the student module; returns the failure message, if any"""
+        if "defines" in case:
+            return None if hasattr(student, case["defines"]) else (
+                f"Debe existir la función {case['defines']}"
+            )
+        saved = sys.stdin, sys.stdout
+        output = io.StringIO()
+        sys.stdin, sys.stdout = io.StringIO(str(case.get("stdin", ""))), output
+        try:
+            getattr(student, case.get("entry", self.spec.get("entry", "main")))()
+        finally:
+            sys.stdin, sys.stdout = saved
+        return compare_output(output.getvalue(), case)
+
+    def _next_budget(self) -> float:
+        limits = [self.test_timeout] if self.test_timeout is not None else []
+        if self._deadline is not None:
+            limits.append(self._deadline - time.monotonic())
+        return max(min(limits), 0.001) if limits else 0.0
+
+    def _arm(self) -> None:
+        if not self._budget:
+            return
+        self._done.clear()
+        signal.signal(signal.SIGALRM, self._on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, self._budget)
+        threading.Thread(target=self._watchdog, daemon=True).start()
+
+    def _disarm(self) -> None:
+        if not self._budget:
+            return
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        self._done.set()
+
+    def _on_alarm(self, signum, frame):
+        # Keep interrupting a case that catches CaseTimeout
+        signal.setitimer(signal.ITIMER_REAL, REARM_INTERVAL_SEC)
+        raise CaseTimeout()
+
+    def _watchdog(self) -> None:
+        if self._done.wait(self._budget + WATCHDOG_GRACE_SEC):
+            return
+        # The case ignored every interruption: report it and stop the run
+        self._write_test(
+            self._current, "timeout", time.monotonic() - self._started,
+            f"Test exceeded its time limit ({self._budget:g}s)"
+        )
+        os._exit(WATCHDOG_EXIT_CODE)
+
+    def _write_test(self, name: str, outcome: str, duration: float, message: str,
+                    usage: Optional[dict] = None) -> None:
+        self._write({
+            "event": "test",
+            "name": name,
+            "outcome": outcome,
+            "duration": duration,
+            "message": message[:MAX_MESSAGE_CHARS],
+            **(usage or {}),
+        })
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if self.result_fd is not None:
+            write_frame(self.result_fd, record)
+
+
+def _silence_stdout() -> int:
+    """Point fd 1 at /dev/null; returns a dup of the previous fd 1"""
+    sys.stdout.flush()
+    console = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    return console
+
+
+def _format_error(error: BaseException, student_path: str) -> str:
+    """Traceback limited to the student's frames, like pytest's --tb=short"""
+    frames = [
+        frame for frame in traceback.extract_tb(error.__traceback__)
+        if frame.filename == student_path
+    ]
+    lines = traceback.format_list(frames) + traceback.format_exception_only(type(error), error)
+    return "".join(lines).rstrip()
+
+
+def _print_summary(outcomes: List[Tuple[str, str, str]], duration: float) -> None:
+    """Console output in the spirit of `pytest -q`"""
+    out = sys.stdout
+    out.write("".join("." if outcome == "passed" else outcome[0].upper() for _, outcome, _ in outcomes))
+    out.write("\n")
+    counts: Dict[str, int] = {}
+    for name, outcome, message in outcomes:
+        counts[outcome] = counts.get(outcome, 0) + 1
+        if outcome != "passed":
+            last_line = message.splitlines()[-1] if message else ""
+            # May echo student output: must not read as a frame
+            last_line = last_line.replace(MAGIC.decode("latin-1"), ESCAPED_MAGIC.decode("latin-1"))
+            out.write(f"{outcome.upper()} {name} - {last_line}\n")
+    summary = ", ".join(f"{count} {outcome}" for outcome, count in counts.items()) or "no tests ran"
+    out.write(f"{summary} in {duration:.2f}s\n")
+    out.flush()
+
+
+def run_cases(
+    path: str,
+    workspace: str,
+    result_fd: int,
+    test_timeout: Optional[float] = None,
+    session_timeout: Optional[float] = None
+) -> int:
+    """Run a cases.json file in this process, streaming results to result_fd"""
+    try:
+        spec = load_spec(path)
+    except (OSError, ValueError) as e:
+        print(f"playground_harness: invalid {Path(path).name}: {e}", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    return CaseRunner(spec, workspace, result_fd, test_timeout, session_timeout).run()
@@ -0,0 +1,72 @@
+"""
+Zygote client, executed via `docker exec` for each run.
+
+Deliberately imports nothing heavy: it forwards its own stdin/stdout/stderr
+to the zygote (SCM_RIGHTS), writes the run's usage frame and exits with
+the child's exit code.
+"""
+import json
+import socket
+import time
+from typing import Any, Dict, List, Optional
+
+from .protocol import write_frame
+
+CONNECT_TIMEOUT_SEC = 10.0
+CONNECT_RETRY_SEC = 0.02
+
+
+def _connect(socket_path: str, timeout_sec: float) -> socket.socket:
+    """Connect, waiting for a zygote that is still warming up"""
+    deadline = time.monotonic() + timeout_sec
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(socket_path)
+            return sock
+        except (FileNotFoundError, ConnectionRefusedError):
+            sock.close()
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(CONNECT_RETRY_SEC)
+
+
+def run_via_zygote(
+    socket_path: str,
+    args: List[str],
+    workspace: str = "/workspace",
+    env: Optional[Dict[str, str]] = None,
+    cpu_seconds: Optional[float] = None,
+    connect_timeout: float = CONNECT_TIMEOUT_SEC
+) -> int:
+    """
+    Ask the zygote to fork a pytest run attached to this process's stdio.
+
+    Returns:
+        Exit code of the forked run (128 + signal when killed)
+    """
+    request: Dict[str, Any] = {
+        "workspace": workspace,
+        "args": args,
+        "env": env or {},
+        "cpu_seconds": cpu_seconds
+    }
+    sock = _connect(socket_path, connect_timeout)
+    try:
+        socket.send_fds(sock, [json.dumps(request).encode()], [0, 1, 2])
+        sock.shutdown(socket.SHUT_WR)
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            reply += chunk
+    finally:
+        sock.close()
+
+    if not reply:
+        raise RuntimeError("Zygote closed the connection without a result")
+    result = json.loads(reply)
+    if result.get("usage"):
+        write_frame(1, result["usage"])
+    return int(result["returncode"])
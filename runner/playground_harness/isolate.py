@@ -0,0 +1,233 @@
+"""
+Namespace sandbox launcher (no container runtime).
+
+    python -m playground_harness isolate [--cgroup DIR] [--bind SRC] [--tests DIR]
+        [--hide PATH ...] [--address-space-mb N] [--keep-uid] -- run ...
+
+PERFORMANCE: Starting a Docker container costs a daemon round-trip and
+hundreds of milliseconds. This launcher builds an equivalent sandbox with
+a few syscalls and then execs the harness `run` command in it:
+- Joins the job's cgroup v2 directory (memory, CPU and pids limits set by
+  the worker) before anything else, so every descendant is accounted
+- New user, mount, PID, network, IPC and UTS namespaces; the sandbox runs
+  as SANDBOX_UID inside, mapped to the (unprivileged) launcher user
+- Private tmpfs on /tmp and on the working directory /tmp/workspace; the
+  job's workspace is bind-mounted there (--bind) or streamed as a tar
+- The problem's precompiled tests (--tests) bind-mounted read-only on
+  TESTS_DIR
+- Empty read-only tmpfs over --hide paths (other jobs, problem tests,
+  the host cgroup tree) and a fresh /proc for the PID namespace
+- No network: the new network namespace only has a loopback device, down
+The exec drops every capability held in the user namespace, and
+PR_SET_NO_NEW_PRIVS is set. Only the standard library is used.
+"""
+import ctypes
+import os
+import signal
+import socket
+import sys
+from typing import List, Optional
+
+from .limits import SANDBOX_GID, SANDBOX_UID, drop_privileges
+from .usage import PR_SET_PDEATHSIG, exit_code_from_status
+
+WORKDIR = "/tmp/workspace"
+TESTS_DIR = "/tmp/problem"
+TMP_TMPFS_OPTIONS = "size=64m,mode=1777"
+WORKDIR_TMPFS_OPTIONS = "size=32m,mode=0700"
+HIDE_TMPFS_OPTIONS = "size=4k,mode=0555"
+# Exit code when the sandbox could not be set up (EX_OSERR)
+ISOLATION_FAILED_EXIT = 71
+
+CLONE_NEWNS = 0x00020000
+CLONE_NEWUTS = 0x04000000
+CLONE_NEWIPC = 0x08000000
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWPID = 0x20000000
+CLONE_NEWNET = 0x40000000
+
+MS_RDONLY = 0x1
+MS_NOSUID = 0x2
+MS_NODEV = 0x4
+MS_NOEXEC = 0x8
+MS_REMOUNT = 0x20
+MS_NOATIME = 0x400
+MS_NODIRATIME = 0x800
+MS_BIND = 0x1000
+MS_REC = 0x4000
+MS_PRIVATE = 0x40000
+MS_RELATIME = 0x200000
+# statvfs f_flag bits -> mount flags; locked in a user namespace, a remount must keep them
+_LOCKED_MOUNT_FLAGS = (
+    (os.ST_NOSUID, MS_NOSUID), (os.ST_NODEV, MS_NODEV), (os.ST_NOEXEC, MS_NOEXEC),
+    (os.ST_NOATIME, MS_NOATIME), (os.ST_NODIRATIME, MS_NODIRATIME), (os.ST_RELATIME, MS_RELATIME),
+)
+
+PR_SET_DUMPABLE = 4
+PR_SET_NO_NEW_PRIVS = 38
+
+_libc = ctypes.CDLL(None, use_errno=True)
+
+
+class IsolationError(OSError):
+    """A namespace, mount or cgroup operation failed"""
+
+
+def _check(result: int, what: str) -> None:
+    if result != 0:
+        errno = ctypes.get_errno()
+        raise IsolationError(errno, f"{what}: {os.strerror(errno)}")
+
+
+def unshare(flags: int) -> None:
+    _check(_libc.unshare(flags), "unshare")
+
+
+def mount(source: str, target: str, fstype: Optional[str], flags: int = 0, data: str = None) -> None:
+    _check(
+        _libc.mount(
+            source.encode(), target.encode(),
+            fstype.encode() if fstype else None,
+            ctypes.c_ulong(flags),
+            data.encode() if data else None
+        ),
+        f"mount {target}"
+    )
+
+
+def _write(path: str, text: str) -> None:
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def join_cgroup(cgroup_dir: str) -> None:
+    """Move the current process (and its future children) into cgroup_dir"""
+    _write(os.path.join(cgroup_dir, "cgroup.procs"), str(os.getpid()))
+
+
+def enter_namespaces(keep_uid: bool = False) -> None:
+    """
+    Create the namespaces and map the sandbox user.
+
+    A root launcher first drops to SANDBOX_UID on the host too: inside a user
+    namespace, permission checks on host files still use the mapped host uid.
+    """
+    if not keep_uid and os.geteuid() == 0:
+        drop_privileges()
+        # setuid() cleared the dumpable flag, which makes /proc/self/*_map root-owned
+        _check(_libc.prctl(PR_SET_DUMPABLE, 1, 0, 0, 0), "prctl")
+    uid, gid = os.geteuid(), os.getegid()
+    unshare(CLONE_NEWUSER | CLONE_NEWNS | CLONE_NEWPID | CLONE_NEWNET | CLONE_NEWIPC | CLONE_NEWUTS)
+    _write("/proc/self/setgroups", "deny")
+    _write("/proc/self/uid_map", f"{SANDBOX_UID} {uid} 1")
+    _write("/proc/self/gid_map", f"{SANDBOX_GID} {gid} 1")
+
+
+def bind_readonly(fd: int, target: str) -> None:
+    """Bind-mount an opened directory on target and make the mount read-only"""
+    mount(f"/proc/self/fd/{fd}", target, None, MS_BIND)
+    flags = MS_BIND | MS_REMOUNT | MS_RDONLY
+    f_flag = os.statvfs(target).f_flag
+    for st_flag, ms_flag in _LOCKED_MOUNT_FLAGS:
+        if f_flag & st_flag:
+            flags |= ms_flag
+    mount("none", target, None, flags)
+
+
+def build_filesystem(bind: Optional[str], hide: List[str], tests: Optional[str] = None) -> None:
+    """Private mounts for the sandbox (runs as PID 1 of the new PID namespace)"""
+    mount("none", "/", None, MS_REC | MS_PRIVATE)
+    # Opened before /tmp is replaced and paths are hidden: they may live under them
+    bind_fd = os.open(bind, os.O_PATH | os.O_DIRECTORY) if bind else None
+    tests_fd = os.open(tests, os.O_PATH | os.O_DIRECTORY) if tests else None
+    mount("tmpfs", "/tmp", "tmpfs", MS_NOSUID | MS_NODEV | MS_NOEXEC, TMP_TMPFS_OPTIONS)
+    os.mkdir(WORKDIR, 0o700)
+    if bind_fd is not None:
+        mount(f"/proc/self/fd/{bind_fd}", WORKDIR, None, MS_BIND | MS_REC)
+        os.close(bind_fd)
+    else:
+        mount("tmpfs", WORKDIR, "tmpfs", MS_NOSUID | MS_NODEV | MS_NOEXEC, WORKDIR_TMPFS_OPTIONS)
+    os.chdir(WORKDIR)
+
+    for path in hide:
+        if os.path.isdir(path):
+            mount("tmpfs", path, "tmpfs", MS_RDONLY | MS_NOSUID | MS_NODEV | MS_NOEXEC, HIDE_TMPFS_OPTIONS)
+
+    if tests_fd is not None:
+        os.mkdir(TESTS_DIR, 0o755)
+        bind_readonly(tests_fd, TESTS_DIR)
+        os.close(tests_fd)
+
+    try:
+        mount("proc", "/proc", "proc", MS_NOSUID | MS_NODEV | MS_NOEXEC)
+    except IsolationError:
+        # Locked /proc overmounts (e.g. inside a container): keep the host /proc
+        pass
+    try:
+        socket.sethostname("sandbox")
+    except OSError:
+        pass
+
+
+def _exec_harness(command: List[str], address_space_mb: Optional[int]) -> None:
+    """Replace PID 1 of the sandbox with the harness command"""
+    _check(_libc.prctl(PR_SET_PDEATHSIG, signal.SIGKILL, 0, 0, 0), "prctl")
+    _check(_libc.prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0), "prctl")
+    if address_space_mb:
+        import resource
+
+        limit = address_space_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    os.execv(sys.executable, [sys.executable, "-m", "playground_harness", *command])
+
+
+def run_isolated(
+    command: List[str],
+    cgroup_dir: Optional[str] = None,
+    bind: Optional[str] = None,
+    tests: Optional[str] = None,
+    hide: List[str] = (),
+    address_space_mb: Optional[int] = None,
+    keep_uid: bool = False
+) -> int:
+    """
+    Run `python -m playground_harness <command>` in a new sandbox.
+
+    Args:
+        command: Harness arguments, e.g. ["run", "--stdin-tar", "--", "-q"]
+        cgroup_dir: Delegated cgroup v2 directory with the job's limits
+        bind: Host workspace to mount as the working directory (default: empty tmpfs)
+        tests: Problem store directory to mount read-only on TESTS_DIR
+        hide: Host directories to cover with an empty read-only tmpfs
+        address_space_mb: RLIMIT_AS fallback when there is no cgroup
+        keep_uid: Do not drop a root launcher to the sandbox user (local testing only)
+
+    Returns:
+        Exit code of the harness (128 + signal when killed), or
+        ISOLATION_FAILED_EXIT if the sandbox could not be set up
+    """
+    try:
+        if cgroup_dir:
+            join_cgroup(cgroup_dir)
+        enter_namespaces(keep_uid)
+    except OSError as e:
+        print(f"playground_harness isolate: {e}", file=sys.stderr)
+        return ISOLATION_FAILED_EXIT
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        code = ISOLATION_FAILED_EXIT
+        try:
+            build_filesystem(bind, list(hide), tests)
+            _exec_harness(command, address_space_mb)
+        except BaseException as e:
+            print(f"playground_harness isolate: {e}", file=sys.stderr)
+        finally:
+            os._exit(code)
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda s, _frame: os.kill(pid, s))
+    _, status = os.waitpid(pid, 0)
+    return exit_code_from_status(status)
@@ -0,0 +1,41 @@
+"""
+Process limits applied to the sandboxed test process.
+
+Docker (or the namespace backend) enforces memory and CPU quotas for the
+whole container; these rlimits add per-process guards on top.
+"""
+import os
+import resource
+from typing import Optional
+
+SANDBOX_UID = 1000
+SANDBOX_GID = 1000
+
+MAX_PROCESSES = 64
+MAX_FILE_SIZE_BYTES = 16 * 1024 * 1024
+MAX_OPEN_FILES = 256
+
+
+def apply_rlimits(cpu_seconds: Optional[float] = None) -> None:
+    """
+    Apply sandbox rlimits to the current process.
+
+    Args:
+        cpu_seconds: Optional CPU time limit (SIGXCPU/SIGKILL when exceeded)
+    """
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (MAX_FILE_SIZE_BYTES, MAX_FILE_SIZE_BYTES))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (MAX_OPEN_FILES, MAX_OPEN_FILES))
+    resource.setrlimit(resource.RLIMIT_NPROC, (MAX_PROCESSES, MAX_PROCESSES))
+    if cpu_seconds:
+        soft = max(1, int(cpu_seconds + 0.999))
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 1))
+
+
+def drop_privileges(uid: int = SANDBOX_UID, gid: int = SANDBOX_GID) -> None:
+    """Switch to the unprivileged sandbox user when running as root"""
+    if os.getuid() != 0:
+        return
+    os.setgroups([])
+    os.setgid(gid)
+    os.setuid(uid)
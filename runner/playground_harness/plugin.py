@@ -0,0 +1,202 @@
+"""
+pytest plugin streaming one result record per test to the worker.
+
+Loaded by the harness with `-p playground_harness.plugin`. Records are
+written as they complete on the result fd run_pytest() was given (a
+private pipe to the supervisor, see usage.run_relayed):
+
+    {"event": "test", "name": nodeid, "outcome": ..., "duration": ..., "message": ...,
+     "cpu_time": seconds, "max_rss_kb": peak RSS of the process so far}
+    {"event": "end", "exitstatus": N}   (only if the session finished)
+
+With time budgets (PLAYGROUND_TEST_TIMEOUT / PLAYGROUND_SESSION_TIMEOUT),
+each test call runs under an interval timer. A test that exceeds
+min(per-test budget, remaining session budget) is interrupted and reported
+with outcome "timeout"; the following tests keep running. If the test
+swallows the interruption, a watchdog reports it and ends the process so
+the results streamed so far are kept.
+"""
+import os
+import resource
+import signal
+import threading
+import time
+from typing import Optional
+
+import pytest
+
+from .protocol import SESSION_TIMEOUT_ENV, TEST_TIMEOUT_ENV, write_frame
+
+PLUGIN_NAME = "playground_harness.plugin"
+MAX_MESSAGE_CHARS = 8000
+# Re-raise interval while a timed-out test keeps running, and how long the
+# watchdog waits for the interruption to take effect before exiting
+REARM_INTERVAL_SEC = 0.05
+WATCHDOG_GRACE_SEC = 1.0
+WATCHDOG_EXIT_CODE = 124  # Same as coreutils timeout(1)
+
+
+class TestTimeout(BaseException):
+    """
+    Raised in a test that exceeded its time budget.
+
+    A BaseException so `except Exception` in student code does not swallow it.
+    """
+
+
+class ResultStreamer:
+    """Writes result frames to the channel file descriptor"""
+
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        """Measure the CPU time of the test call"""
+        before = resource.getrusage(resource.RUSAGE_SELF)
+        try:
+            yield
+        finally:
+            after = resource.getrusage(resource.RUSAGE_SELF)
+            item.playground_usage = {
+                "cpu_time": round(
+                    (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime), 4
+                ),
+                "max_rss_kb": int(after.ru_maxrss),
+            }
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        if call.when == "call":
+            outcome.get_result().playground_usage = getattr(item, "playground_usage", None)
+
+    def pytest_runtest_logreport(self, report):
+        if report.when != "call":
+            return
+        if getattr(report, "playground_timeout", None) is not None:
+            outcome = "timeout"
+            message = f"Test exceeded its time limit ({report.playground_timeout:g}s)"
+        else:
+            outcome = report.outcome
+            message = str(report.longrepr) if report.longrepr else ""
+        self.write_test(
+            report.nodeid, outcome, report.duration, message,
+            usage=getattr(report, "playground_usage", None)
+        )
+
+    def write_test(self, nodeid: str, outcome: str, duration: float, message: str,
+                   usage: Optional[dict] = None) -> None:
+        write_frame(self.fd, {
+            "event": "test",
+            "name": nodeid,
+            "outcome": outcome,
+            "duration": duration,
+            "message": message[:MAX_MESSAGE_CHARS],
+            **(usage or {}),
+        })
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        write_frame(self.fd, {"event": "end", "exitstatus": int(exitstatus)})
+
+
+class TimeBudget:
+    """Per-test and whole-session time limits enforced with ITIMER_REAL"""
+
+    def __init__(
+        self,
+        test_timeout: Optional[float],
+        session_timeout: Optional[float],
+        streamer: Optional[ResultStreamer] = None
+    ):
+        self.test_timeout = test_timeout
+        self.session_timeout = session_timeout
+        self.streamer = streamer
+        self._deadline: Optional[float] = None
+        self._current: Optional[str] = None
+        self._budget = 0.0
+        self._started = 0.0
+        self._expired = False
+        self._done = threading.Event()
+
+    def pytest_sessionstart(self, session):
+        if self.session_timeout is not None:
+            self._deadline = time.monotonic() + self.session_timeout
+
+    def budget(self) -> float:
+        """Seconds the next test may run"""
+        limits = [self.test_timeout] if self.test_timeout is not None else []
+        if self._deadline is not None:
+            limits.append(self._deadline - time.monotonic())
+        return max(min(limits), 0.001) if limits else 0.0
+
+    def _on_alarm(self, signum, frame):
+        self._expired = True
+        # Keep interrupting a test that catches TestTimeout
+        signal.setitimer(signal.ITIMER_REAL, REARM_INTERVAL_SEC)
+        raise TestTimeout()
+
+    def _watchdog(self) -> None:
+        if self._done.wait(self._budget + WATCHDOG_GRACE_SEC):
+            return
+        # The test ignored every interruption: report it and stop the run
+        if self.streamer is not None:
+            self.streamer.write_test(
+                self._current, "timeout", time.monotonic() - self._started,
+                f"Test exceeded its time limit ({self._budget:g}s)"
+            )
+        os._exit(WATCHDOG_EXIT_CODE)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        """Run the test call under the timer (setup/teardown are not limited)"""
+        self._budget = round(self.budget(), 3)
+        self._current = item.nodeid
+        self._started = time.monotonic()
+        self._expired = False
+        self._done.clear()
+        signal.signal(signal.SIGALRM, self._on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, self._budget)
+        threading.Thread(target=self._watchdog, daemon=True).start()
+        try:
+            yield
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            self._done.set()
+        if self._expired:
+            item.playground_timeout = self._budget
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        if call.when == "call" and getattr(item, "playground_timeout", None) is not None:
+            outcome.get_result().playground_timeout = item.playground_timeout
+
+    def pytest_report_teststatus(self, report, config):
+        if report.when == "call" and getattr(report, "playground_timeout", None) is not None:
+            return "failed", "T", "TIMEOUT"
+
+
+def _float_env(name: str) -> Optional[float]:
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+def pytest_configure(config):
+    # Registered by run_pytest(): the fd is not published anywhere else
+    streamer = next(
+        (plugin for plugin in config.pluginmanager.get_plugins() if isinstance(plugin, ResultStreamer)),
+        None
+    )
+
+    test_timeout = _float_env(TEST_TIMEOUT_ENV)
+    session_timeout = _float_env(SESSION_TIMEOUT_ENV)
+    if test_timeout is not None or session_timeout is not None:
+        config.pluginmanager.register(
+            TimeBudget(test_timeout, session_timeout, streamer), "playground-time-budget"
+        )
+
+
+def run_pytest(args, result_fd: int) -> int:
+    """Run pytest in this process, streaming results to result_fd"""
+    return int(pytest.main(["-p", PLUGIN_NAME, *args], plugins=[ResultStreamer(result_fd)]))
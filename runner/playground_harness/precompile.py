@@ -0,0 +1,63 @@
+"""
+Precompile test modules for the read-only problem store.
+
+    python -m playground_harness precompile [--mount-path PATH] DIR
+
+PERFORMANCE: pytest parses every test module, rewrites its asserts and
+compiles it on import. It caches the result in __pycache__ next to the
+module, which a read-only problem directory cannot hold, so each sandbox run
+would redo it. This command writes that cache once per problem version:
+__pycache__/<name>.<cache tag>-pytest-<version>.pyc for every tests_*.py
+in DIR, in the exact format pytest's import hook reads back (it checks the
+source mtime and size, which the read-only mount preserves).
+
+Must run with the interpreter and pytest of the sandbox: the file name
+carries both versions, and a mismatch is silently ignored by pytest.
+--mount-path is where DIR is visible inside the sandbox, so tracebacks and
+assertion messages name the same file as a module rewritten on the spot.
+"""
+import ast
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+TEST_GLOB = "tests_*.py"
+
+
+def precompile_tests(directory: str, mount_path: Optional[str] = None) -> List[str]:
+    """
+    Write assertion-rewritten bytecode of the test modules in directory.
+
+    Returns:
+        Paths of the .pyc files written
+    """
+    from _pytest.assertion.rewrite import PYC_TAIL, _write_pyc_fp, rewrite_asserts
+
+    written = []
+    cache_dir = Path(directory) / "__pycache__"
+    cache_dir.mkdir(exist_ok=True)
+    for source_path in sorted(Path(directory).glob(TEST_GLOB)):
+        module_path = str(Path(mount_path or directory) / source_path.name)
+        stat = os.stat(source_path)
+        source = source_path.read_bytes()
+        tree = ast.parse(source, filename=module_path)
+        rewrite_asserts(tree, source, module_path)
+        code = compile(tree, module_path, "exec", dont_inherit=True)
+
+        pyc = cache_dir / (source_path.name[:-3] + PYC_TAIL)
+        with open(pyc, "wb") as fp:
+            _write_pyc_fp(fp, stat, code)
+        written.append(str(pyc))
+    return written
+
+
+def main(directory: str, mount_path: Optional[str] = None) -> int:
+    try:
+        written = precompile_tests(directory, mount_path)
+    except Exception as e:  # Syntax errors, pytest internals changed, ...
+        print(f"playground_harness precompile: {type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    for path in written:
+        print(path)
+    return 0
@@ -0,0 +1,137 @@
+"""
+Result stream protocol between the runner and the worker.
+
+One frame per record, written to the container's stdout interleaved with
+pytest's console output:
+
+    MAGIC (4 bytes) | payload length (uint32, big endian) | compact JSON
+
+Frames are written with a single unbuffered write each, so every record
+that completed before the container was killed reaches the worker.
+The worker side lives in worker/services/result_stream.py.
+
+Student code shares stdout with pytest, so it must not be able to write
+frames there. The process running tests has its stdout on a pipe and its
+frames on a second, private pipe (not inherited by exec, not named in the
+environment); the supervisor (usage.relay_output) copies the console with
+every MAGIC escaped (ConsoleFilter) and re-encodes the records it reads
+from the private pipe (FrameReader). Only the supervisor writes frames to
+the real stdout.
+"""
+import json
+import os
+import struct
+from typing import Any, Dict, List, Tuple
+
+# Must match worker/services/result_stream.py
+PROTOCOL_VERSION = 1
+MAGIC = b"\x00PGR"
+HEADER = struct.Struct(">4sI")
+# What a MAGIC printed by the tests becomes on the console (readable, never a frame)
+ESCAPED_MAGIC = b"\\x00PGR"
+MAX_FRAME_BYTES = 1024 * 1024
+RECORD_EVENTS = ("test", "end")
+# Time budgets (seconds) read by the plugin
+TEST_TIMEOUT_ENV = "PLAYGROUND_TEST_TIMEOUT"
+SESSION_TIMEOUT_ENV = "PLAYGROUND_SESSION_TIMEOUT"
+
+
+def encode_frame(record: Dict[str, Any]) -> bytes:
+    payload = json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return HEADER.pack(MAGIC, len(payload)) + payload
+
+
+def write_all(fd: int, data: bytes) -> None:
+    """Write data to fd, retrying short writes"""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def write_frame(fd: int, record: Dict[str, Any]) -> None:
+    """Write one frame to fd with a single write when possible"""
+    write_all(fd, encode_frame(record))
+
+
+class ConsoleFilter:
+    """Escapes MAGIC in console bytes, including one split across chunks"""
+
+    def __init__(self):
+        self._pending = b""
+
+    def feed(self, data: bytes) -> bytes:
+        data = (self._pending + data).replace(MAGIC, ESCAPED_MAGIC)
+        keep = _partial_magic_suffix(data)
+        self._pending = data[len(data) - keep:] if keep else b""
+        return data[:len(data) - keep]
+
+    def flush(self) -> bytes:
+        data, self._pending = self._pending, b""
+        return data
+
+
+class FrameReader:
+    """
+    Strict decoder for the private result pipe: only well-formed frames of
+    test/end records. Anything else closes the channel for the rest of the run.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.broken = False
+
+    def feed(self, data: bytes) -> List[Dict[str, Any]]:
+        if self.broken:
+            return []
+        self._buffer += data
+        records = []
+        while len(self._buffer) >= HEADER.size:
+            magic, length = HEADER.unpack_from(self._buffer)
+            if magic != MAGIC or length > MAX_FRAME_BYTES:
+                self.broken = True
+                break
+            end = HEADER.size + length
+            if len(self._buffer) < end:
+                break
+            try:
+                record = json.loads(bytes(self._buffer[HEADER.size:end]))
+            except ValueError:
+                record = None
+            del self._buffer[:end]
+            if not isinstance(record, dict) or record.get("event") not in RECORD_EVENTS:
+                self.broken = True
+                break
+            records.append(record)
+        return records
+
+
+def _partial_magic_suffix(data: bytes) -> int:
+    """Length of the longest suffix of data that is a prefix of MAGIC"""
+    for size in range(min(len(MAGIC) - 1, len(data)), 0, -1):
+        if data.endswith(MAGIC[:size]):
+            return size
+    return 0
+
+
+def decode_frames(data: bytes) -> Tuple[bytes, List[Dict[str, Any]]]:
+    """
+    Split a complete stream into console output and records.
+
+    A truncated trailing frame is dropped.
+    """
+    console = bytearray()
+    records = []
+    offset = 0
+    while True:
+        index = data.find(MAGIC, offset)
+        if index < 0 or index + HEADER.size > len(data):
+            console += data[offset:] if index < 0 else data[offset:index]
+            return bytes(console), records
+        console += data[offset:index]
+        _, length = HEADER.unpack_from(data, index)
+        end = index + HEADER.size + length
+        if end > len(data):
+            return bytes(console), records
+        records.append(json.loads(data[index + HEADER.size:end]))
+        offset = end
@@ -0,0 +1,253 @@
+"""
+Resource accounting of a sandbox run.
+
+pytest runs in a child process; the parent (the supervisor, or the zygote)
+reaps it with wait4(), which reports the CPU time and peak RSS of the child
+and of the processes it reaped itself. The container's cgroup adds the OOM
+kill counter. The parent writes one "usage" record after the child exits,
+including when the kernel OOM-killed it, since only the child is killed:
+
+    {"event": "usage", "cpu_user_sec": ..., "cpu_system_sec": ...,
+     "peak_memory_kb": ..., "oom_killed": bool, "exit_signal": N | null}
+
+The parent is also the only writer of the real stdout: the child's stdout
+and its result frames arrive on two pipes and are relayed by OutputRelay
+(console with MAGIC escaped, frames re-encoded), so output of student code
+can't be taken for a result.
+
+Only the standard library is used: the zygote client imports this module
+with `python -S`.
+"""
+import os
+import selectors
+import signal
+import sys
+import traceback
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .protocol import ConsoleFilter, FrameReader, write_all, write_frame
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+# memory.events (cgroup v2) and memory.oom_control (v1) both have an "oom_kill N" line
+OOM_EVENT_FILES = ("memory.events", "memory/memory.oom_control")
+CHILD_CRASH_EXIT = 70  # EX_SOFTWARE
+PR_SET_PDEATHSIG = 1
+PR_SET_DUMPABLE = 4
+RELAY_CHUNK_BYTES = 65536
+# Only without pidfd_open (Python < 3.9 or old kernels)
+REAP_POLL_SEC = 0.05
+
+
+def exit_code_from_status(status: int) -> int:
+    """Convert a waitpid status to a shell-style exit code (128 + signal)"""
+    code = os.waitstatus_to_exitcode(status)
+    return 128 - code if code < 0 else code
+
+
+def read_oom_kills(root: str = CGROUP_ROOT) -> Optional[int]:
+    """Number of OOM kills in this cgroup so far, or None without cgroup accounting"""
+    for name in OOM_EVENT_FILES:
+        try:
+            text = Path(root, name).read_text()
+        except OSError:
+            continue
+        for line in text.splitlines():
+            key, _, value = line.partition(" ")
+            if key == "oom_kill":
+                return int(value)
+    return None
+
+
+def usage_record(status: int, rusage, oom_kills_before: Optional[int],
+                 oom_kills_after: Optional[int]) -> Dict[str, Any]:
+    """Build the usage record of a reaped child"""
+    code = os.waitstatus_to_exitcode(status)
+    return {
+        "event": "usage",
+        "cpu_user_sec": round(rusage.ru_utime, 4),
+        "cpu_system_sec": round(rusage.ru_stime, 4),
+        "peak_memory_kb": int(rusage.ru_maxrss),  # Linux reports KiB
+        "oom_killed": (
+            oom_kills_before is not None and oom_kills_after is not None
+            and oom_kills_after > oom_kills_before
+        ),
+        "exit_signal": -code if code < 0 else None,
+    }
+
+
+def wait_with_usage(pid: int, oom_kills_before: Optional[int]):
+    """
+    Reap `pid`.
+
+    Returns:
+        (shell-style exit code, usage record)
+    """
+    _, status, rusage = os.wait4(pid, 0)
+    return exit_code_from_status(status), usage_record(
+        status, rusage, oom_kills_before, read_oom_kills()
+    )
+
+
+def _prctl(option: int, value: int) -> bool:
+    try:
+        import ctypes
+
+        return ctypes.CDLL(None, use_errno=True).prctl(option, value) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+def _die_with_parent(parent_pid: int) -> None:
+    """Have the kernel SIGKILL this process when the supervisor dies"""
+    if not _prctl(PR_SET_PDEATHSIG, signal.SIGKILL):
+        return
+    if os.getppid() != parent_pid:
+        os._exit(CHILD_CRASH_EXIT)
+
+
+class OutputRelay:
+    """Copies a child's console and result pipes to out_fd until it exits"""
+
+    def __init__(self, console_fd: int, results_fd: int, out_fd: int):
+        self.console_fd = console_fd
+        self.results_fd = results_fd
+        self.out_fd = out_fd
+        self.console = ConsoleFilter()
+        self.frames = FrameReader()
+
+    def run(self, pid: int):
+        """
+        Relay until `pid` exits, then drain what is left in the pipes.
+
+        Returns:
+            (wait status, rusage) of the child
+        """
+        selector = selectors.DefaultSelector()
+        for fd in (self.console_fd, self.results_fd):
+            os.set_blocking(fd, False)
+            selector.register(fd, selectors.EVENT_READ)
+        exited = _pidfd(pid)
+        if exited is not None:
+            selector.register(exited, selectors.EVENT_READ)
+        try:
+            while True:
+                for key, _ in selector.select(None if exited is not None else REAP_POLL_SEC):
+                    if key.fd != exited and self._copy(key.fd) == b"":
+                        selector.unregister(key.fd)
+                reaped, status, rusage = os.wait4(pid, os.WNOHANG)
+                if reaped:
+                    break
+            self._drain([key.fd for key in selector.get_map().values() if key.fd != exited])
+        finally:
+            selector.close()
+            if exited is not None:
+                os.close(exited)
+        return status, rusage
+
+    def _drain(self, fds) -> None:
+        """
+        Relay whatever the child wrote before exiting (a background process
+        may keep the console open: don't wait for EOF)
+        """
+        for fd in fds:
+            while self._copy(fd):
+                pass
+        write_all(self.out_fd, self.console.flush())
+
+    def _copy(self, fd: int) -> Optional[bytes]:
+        """Relay one read; None when the pipe is empty, b"" at EOF"""
+        try:
+            data = os.read(fd, RELAY_CHUNK_BYTES)
+        except BlockingIOError:
+            return None
+        if fd == self.console_fd:
+            write_all(self.out_fd, self.console.feed(data))
+        else:
+            for record in self.frames.feed(data):
+                write_frame(self.out_fd, record)
+        return data
+
+
+def _pidfd(pid: int) -> Optional[int]:
+    try:
+        return os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        return None
+
+
+def run_relayed(target: Callable[[int], int], out_fd: int = 1):
+    """
+    Run target(result_fd) in a child whose stdout and result frames are
+    relayed to out_fd by this process.
+
+    The child's result fd is a fresh pipe that is not inherited across exec
+    nor named anywhere. This process becomes non-dumpable, so a child running
+    with the same uid can't open its stdout through /proc/<pid>/fd.
+    SIGTERM/SIGINT are forwarded to the child, and the child is killed if
+    this process dies.
+
+    Returns:
+        (wait status, rusage) of the child
+    """
+    parent_pid = os.getpid()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    console_r, console_w = os.pipe()
+    results_r, results_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        code = CHILD_CRASH_EXIT
+        try:
+            _die_with_parent(parent_pid)
+            os.close(console_r)
+            os.close(results_r)
+            os.dup2(console_w, 1)
+            os.close(console_w)
+            code = int(target(results_w))
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    os.close(console_w)
+    os.close(results_w)
+    _prctl(PR_SET_DUMPABLE, 0)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda s, _frame: os.kill(pid, s))
+    try:
+        return OutputRelay(console_r, results_r, out_fd).run(pid)
+    finally:
+        os.close(console_r)
+        os.close(results_r)
+
+
+def exit_like(status: int) -> None:
+    """End this process the way a reaped child ended (same exit code or signal)"""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    if os.WIFSIGNALED(status):
+        signum = os.WTERMSIG(status)
+        if signum != signal.SIGKILL:
+            signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
+    os._exit(exit_code_from_status(status))
+
+
+def run_supervised(target: Callable[[int], int], out_fd: int = 1) -> int:
+    """
+    Run target(result_fd) in a relayed child (run_relayed) and report its
+    resource usage. The usage frame is written to out_fd (stdout) after the
+    child's own frames.
+
+    Returns:
+        Exit code of the child (128 + signal when killed)
+    """
+    oom_kills_before = read_oom_kills()
+    status, rusage = run_relayed(target, out_fd)
+    write_frame(out_fd, usage_record(status, rusage, oom_kills_before, read_oom_kills()))
+    return exit_code_from_status(status)
@@ -0,0 +1,12 @@
+"""
+Workspace streaming: unpack the job's files from a tar on stdin, so no host
+directory is shared with the worker. Results go back as protocol frames.
+"""
+import tarfile
+from typing import BinaryIO
+
+
+def extract_workspace(stream: BinaryIO, dest: str) -> None:
+    """Extract a tar stream into dest, refusing links and paths outside dest"""
+    with tarfile.open(fileobj=stream, mode="r|") as archive:
+        archive.extractall(dest, filter="data")
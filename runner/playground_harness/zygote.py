@@ -0,0 +1,134 @@
+"""
+Zygote (fork server) for sandbox runs.
+
+PERFORMANCE: Python startup plus importing pytest and its builtin plugins
+costs hundreds of milliseconds per run. The zygote pays that once, while
+its container idles in the worker's warm pool, and forks a child per run.
+- Child: new session, client's stdio, rlimits, uid drop, then pytest.main()
+  with the result streaming plugin (plugin.py) in a grandchild whose output
+  the child relays (usage.run_relayed)
+- Parent: reaps the child with wait4() and replies with its exit code and
+  resource usage (usage.py); the client writes the usage frame
+
+Requests are served one at a time; each pooled container serves one job.
+"""
+import json
+import os
+import signal
+import socket
+import sys
+import traceback
+from typing import Any, Dict, List
+
+from .limits import SANDBOX_GID, SANDBOX_UID, apply_rlimits, drop_privileges
+from .usage import (  # noqa: F401
+    CHILD_CRASH_EXIT, exit_code_from_status, exit_like, read_oom_kills, run_relayed, wait_with_usage
+)
+
+DEFAULT_SOCKET_PATH = "/tmp/zygote.sock"
+MAX_REQUEST_BYTES = 64 * 1024
+
+
+def warm_up() -> None:
+    """Import pytest, its builtin and installed plugins so forked children inherit them"""
+    import pytest  # noqa: F401
+    from _pytest.config import get_config
+    from . import plugin  # noqa: F401
+
+    config = get_config()
+    config.pluginmanager.load_setuptools_entrypoints("pytest11")
+
+
+class ZygoteServer:
+    """Unix socket server that forks pre-warmed pytest processes"""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, drop_uid: bool = True):
+        self.socket_path = socket_path
+        self.drop_uid = drop_uid
+        self._listener = None
+
+    def bind(self) -> None:
+        """Create the listening socket, owned by the sandbox user"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        if self.drop_uid and os.getuid() == 0:
+            os.chown(self.socket_path, SANDBOX_UID, SANDBOX_GID)
+        listener.listen(8)
+        self._listener = listener
+
+    def serve_forever(self) -> None:
+        """Warm up, then serve run requests until killed"""
+        warm_up()
+        if self._listener is None:
+            self.bind()
+        while True:
+            conn, _ = self._listener.accept()
+            try:
+                self._handle(conn)
+            except Exception:
+                traceback.print_exc()
+            finally:
+                conn.close()
+
+    def _handle(self, conn: socket.socket) -> None:
+        """Receive one request with the client's stdio fds and run it"""
+        data, fds, _, _ = socket.recv_fds(conn, MAX_REQUEST_BYTES, 3)
+        chunks = [data]
+        while True:
+            chunk = conn.recv(MAX_REQUEST_BYTES)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        request = json.loads(b"".join(chunks))
+
+        oom_kills_before = read_oom_kills()
+        try:
+            pid = os.fork()
+            if pid == 0:
+                self._run_child(conn, request, fds)
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+        returncode, usage = wait_with_usage(pid, oom_kills_before)
+        reply = {"returncode": returncode, "usage": usage}
+        conn.sendall(json.dumps(reply).encode() + b"\n")
+
+    def _run_child(self, conn: socket.socket, request: Dict[str, Any], fds: List[int]) -> None:
+        """
+        Forked child: drop privileges and relay the output of the pytest
+        process (a grandchild, see usage.run_relayed), then end like it did
+        so the server's wait4() sees its status. Never returns.
+        """
+        try:
+            # The tests must not reach the server's reply
+            self._listener.close()
+            conn.close()
+            os.setsid()
+            for target, fd in zip((0, 1, 2), fds):
+                os.dup2(fd, target)
+            for fd in fds:
+                if fd not in (0, 1, 2):
+                    os.close(fd)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+            os.chdir(request.get("workspace", "/workspace"))
+            os.environ.update(request.get("env", {}))
+            apply_rlimits(request.get("cpu_seconds"))
+            if self.drop_uid:
+                drop_privileges()
+
+            from .plugin import run_pytest
+
+            args = list(request.get("args", []))
+            sys.argv = ["pytest", *args]
+            status, _ = run_relayed(lambda result_fd: run_pytest(args, result_fd))
+            exit_like(status)
+        except BaseException:
+            traceback.print_exc()
+            sys.stderr.flush()
+            os._exit(CHILD_CRASH_EXIT)
@@ -0,0 +1,3 @@
+"""
+Runner harness test suite
+"""
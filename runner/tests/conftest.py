@@ -0,0 +1,61 @@
+"""
+Pytest configuration and fixtures for runner harness tests
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+RUNNER_DIR = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def harness_env():
+    """Environment for subprocesses that import playground_harness"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(RUNNER_DIR), env.get("PYTHONPATH")]))
+    return env
+
+
+@pytest.fixture
+def sample_workspace(tmp_path):
+    """Workspace with student code and a public/hidden test file pair"""
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    (workspace / "student_code.py").write_text("def suma(a, b):\n    return a + b\n")
+    (workspace / "tests_public.py").write_text(
+        "from student_code import suma\n\n"
+        "def test_suma_basico():\n"
+        "    assert suma(2, 3) == 5\n"
+    )
+    (workspace / "tests_hidden.py").write_text(
+        "from student_code import suma\n\n"
+        "def test_suma_grande():\n"
+        "    assert suma(1000, 2000) == 3001\n"
+    )
+    return workspace
+
+
+@pytest.fixture
+def python():
+    return sys.executable
+
+
+def _userns_available() -> bool:
+    """True when this host lets an unprivileged process create the sandbox namespaces"""
+    import subprocess
+
+    probe = (
+        "from playground_harness.isolate import enter_namespaces; "
+        "enter_namespaces(keep_uid=True)"
+    )
+    env = dict(os.environ, PYTHONPATH=str(RUNNER_DIR))
+    return subprocess.run([sys.executable, "-c", probe], env=env, capture_output=True).returncode == 0
+
+
+@pytest.fixture(scope="session")
+def userns():
+    """Skip tests of the namespace sandbox where user namespaces are disabled"""
+    if not sys.platform.startswith("linux") or not _userns_available():
+        pytest.skip("unprivileged user namespaces are not available")
@@ -0,0 +1,187 @@
+"""
+Tests for the native cases.json harness
+"""
+import json
+import subprocess
+
+from playground_harness.cases import compare_output, find_cases
+from playground_harness.protocol import MAGIC, decode_frames
+
+SPEC = {
+    "version": 1,
+    "entry": "main",
+    "cases": [
+        {"name": "test_existe_funcion", "defines": "main", "points": 1},
+        {"name": "test_doble", "stdin": "4", "expected": "8", "points": 2},
+        {"name": "test_doble_negativo", "stdin": "-3", "expected": ["-6", "-6.0"], "points": 2},
+        {"name": "test_mitad", "stdin": "5", "expected": "2.5", "compare": "float",
+         "tolerance": 0.01, "entry": "mitad", "points": 1},
+    ],
+}
+DOBLE = (
+    "print('cargando')\n\n"
+    "def main():\n"
+    "    print(int(input()) * 2)\n\n"
+    "def mitad():\n"
+    "    print(int(input()) / 2 + 0.001)\n"
+)
+
+
+def _workspace(tmp_path, code, spec=SPEC):
+    (tmp_path / "student_code.py").write_text(code)
+    (tmp_path / "cases.json").write_text(json.dumps(spec))
+    return tmp_path
+
+
+def _run_harness(python, env, workspace, *harness_args, timeout=60):
+    return subprocess.run(
+        [python, "-m", "playground_harness", "run", *harness_args, "--",
+         "-q", "--tb=short", "tests_public.py", "tests_hidden.py"],
+        cwd=workspace, env=env, capture_output=True, timeout=timeout
+    )
+
+
+def _tests(records):
+    return {r["name"]: r for r in records if r["event"] == "test"}
+
+
+class TestCasesHarness:
+    """Test cases for the native harness"""
+
+    def test_runs_cases_instead_of_pytest(self, tmp_path, harness_env, python):
+        """A cases.json next to the test paths is graded with pytest-compatible records"""
+        workspace = _workspace(tmp_path, DOBLE)
+
+        result = _run_harness(python, harness_env, workspace)
+
+        console, records = decode_frames(result.stdout)
+        assert [r["event"] for r in records] == ["test"] * 4 + ["end", "usage"]
+        tests = _tests(records)
+        assert tests["cases.json::test_existe_funcion"]["outcome"] == "passed"
+        assert tests["cases.json::test_doble"]["outcome"] == "passed"
+        assert tests["cases.json::test_doble_negativo"]["outcome"] == "passed"
+        assert tests["cases.json::test_mitad"]["outcome"] == "passed"
+        assert "cpu_time" in tests["cases.json::test_doble"]
+        assert records[4]["exitstatus"] == 0
+        assert b"4 passed" in console
+        assert b"cargando" not in console
+
+    def test_failures_and_student_errors(self, tmp_path, harness_env, python):
+        """Wrong output and exceptions fail their case only"""
+        code = (
+            "def main():\n"
+            "    n = int(input())\n"
+            "    if n < 0:\n"
+            "        raise ValueError('negativo')\n"
+            "    print(n * 3)\n"
+        )
+        workspace = _workspace(tmp_path, code)
+
+        result = _run_harness(python, harness_env, workspace)
+
+        _, records = decode_frames(result.stdout)
+        tests = _tests(records)
+        assert tests["cases.json::test_doble"]["outcome"] == "failed"
+        assert tests["cases.json::test_doble"]["message"] == "Se esperaba '8', se obtuvo '12'"
+        assert tests["cases.json::test_doble_negativo"]["outcome"] == "failed"
+        assert "ValueError: negativo" in tests["cases.json::test_doble_negativo"]["message"]
+        assert "AttributeError" in tests["cases.json::test_mitad"]["message"]
+        assert records[-2] == {"event": "end", "exitstatus": 1}
+
+    def test_student_module_that_does_not_load(self, tmp_path, harness_env, python):
+        """A syntax error is reported on every case"""
+        workspace = _workspace(tmp_path, "def main(:\n")
+
+        result = _run_harness(python, harness_env, workspace)
+
+        _, records = decode_frames(result.stdout)
+        tests = _tests(records)
+        assert {r["outcome"] for r in tests.values()} == {"error"}
+        assert "SyntaxError" in tests["cases.json::test_doble"]["message"]
+        assert records[-2]["exitstatus"] == 2
+
+    def test_case_over_budget_times_out(self, tmp_path, harness_env, python):
+        """A hung case is interrupted and the next cases keep running"""
+        spec = {"cases": [
+            {"name": "test_cuelga", "stdin": "0", "expected": "0"},
+            {"name": "test_ok", "stdin": "1", "expected": "2"},
+        ]}
+        code = (
+            "def main():\n"
+            "    n = int(input())\n"
+            "    while n == 0:\n"
+            "        try:\n"
+            "            pass\n"
+            "        except Exception:\n"
+            "            pass\n"
+            "    print(n * 2)\n"
+        )
+        workspace = _workspace(tmp_path, code, spec)
+
+        result = _run_harness(python, harness_env, workspace, "--test-timeout", "0.3")
+
+        _, records = decode_frames(result.stdout)
+        tests = _tests(records)
+        assert tests["cases.json::test_cuelga"]["outcome"] == "timeout"
+        assert tests["cases.json::test_ok"]["outcome"] == "passed"
+
+    def test_each_case_gets_a_fresh_module(self, tmp_path, harness_env, python):
+        """Module state left by one case is not seen by the next"""
+        spec = {"cases": [
+            {"name": "test_primero", "stdin": "", "expected": "1"},
+            {"name": "test_segundo", "stdin": "", "expected": "1"},
+        ]}
+        code = (
+            "llamadas = []\n\n"
+            "def main():\n"
+            "    llamadas.append(1)\n"
+            "    print(len(llamadas))\n"
+        )
+        workspace = _workspace(tmp_path, code, spec)
+
+        result = _run_harness(python, harness_env, workspace)
+
+        _, records = decode_frames(result.stdout)
+        assert {r["outcome"] for r in _tests(records).values()} == {"passed"}
+
+    def test_student_writes_to_stdout_are_not_results(self, tmp_path, harness_env, python):
+        """Frames written to fd 1 or echoed in a failure message never decode as records"""
+        spec = {"cases": [{"name": "test_doble", "stdin": "4", "expected": "8"}]}
+        code = (
+            "import os, sys\n"
+            "from playground_harness.protocol import encode_frame\n\n"
+            "FORGED = encode_frame({'event': 'test', 'name': 'cases.json::test_x', 'outcome': 'passed'})\n\n"
+            "def main():\n"
+            "    os.write(1, FORGED)\n"
+            "    sys.__stdout__.buffer.write(FORGED)\n"
+            "    sys.__stdout__.flush()\n"
+            "    print(FORGED.decode('latin-1'))\n"
+        )
+        workspace = _workspace(tmp_path, code, spec)
+
+        result = _run_harness(python, harness_env, workspace)
+
+        console, records = decode_frames(result.stdout)
+        assert [(r["name"], r["outcome"]) for r in records if r["event"] == "test"] == [
+            ("cases.json::test_doble", "failed")
+        ]
+        assert MAGIC not in console
+        assert b"FAILED cases.json::test_doble" in console
+
+    def test_compare_modes(self):
+        """strip, exact, lines and float comparisons"""
+        assert compare_output("  hola \n", {"expected": "hola"}) is None
+        assert compare_output("hola\n", {"expected": "hola", "compare": "exact"}) is not None
+        assert compare_output("a  \nb\n\n", {"expected": "a\nb", "compare": "lines"}) is None
+        assert compare_output("3.14\n", {"expected": "3.1416", "compare": "float", "tolerance": 0.01}) is None
+        assert compare_output("3.2", {"expected": "3.1416", "compare": "float", "tolerance": 0.01}) is not None
+        assert compare_output("tres", {"expected": "3", "compare": "float"}) is not None
+
+    def test_find_cases_next_to_test_paths(self, tmp_path):
+        """Mounted test paths are looked up in their own directory"""
+        problem = tmp_path / "problem"
+        problem.mkdir()
+        (problem / "cases.json").write_text("{}")
+
+        assert find_cases(["-q", f"{problem}/tests_public.py"], str(tmp_path)) == str(problem / "cases.json")
+        assert find_cases(["-q", "tests_public.py"], str(tmp_path)) is None
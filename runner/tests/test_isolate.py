@@ -0,0 +1,113 @@
+"""
+Tests for the namespace sandbox launcher
+"""
+import io
+import subprocess
+import tarfile
+from pathlib import Path
+
+from playground_harness.isolate import ISOLATION_FAILED_EXIT, TESTS_DIR
+from playground_harness.protocol import decode_frames
+
+PROBE_TEST = (
+    "import os, socket\n\n"
+    "def test_sandbox():\n"
+    "    print('PROBE', os.getpid(), os.getuid(), socket.gethostname(), os.getcwd())\n"
+    "    try:\n"
+    "        socket.create_connection(('1.1.1.1', 53), timeout=1)\n"
+    "    except OSError:\n"
+    "        print('PROBE-OFFLINE')\n"
+)
+
+
+def _tar(files):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as archive:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def _isolate(python, env, *options, stdin=None, pytest_args=("-q", "-s", "-p", "no:cacheprovider")):
+    run = ["run", *(["--stdin-tar"] if stdin is not None else []), "--", *pytest_args]
+    return subprocess.run(
+        [python, "-m", "playground_harness", "isolate", "--keep-uid", *options, "--", *run],
+        input=stdin, env=env, capture_output=True, timeout=60
+    )
+
+
+class TestIsolate:
+    """Test cases for `playground_harness isolate`"""
+
+    def test_streamed_workspace(self, userns, harness_env, python):
+        """The tar is unpacked into a private tmpfs; PID, UTS and network are new"""
+        result = _isolate(python, harness_env, stdin=_tar({"test_probe.py": PROBE_TEST.encode()}))
+
+        console, records = decode_frames(result.stdout)
+        assert result.returncode == 0, result.stderr
+        probe = next(line for line in console.decode().splitlines() if line.startswith("PROBE "))
+        # PID 1 is the harness supervisor, pytest its first child
+        assert probe.split()[1:] == ["2", "1000", "sandbox", "/tmp/workspace"]
+        assert b"PROBE-OFFLINE" in console
+        assert [r["event"] for r in records] == ["test", "end", "usage"]
+
+    def test_bind_and_hide(self, userns, sample_workspace, harness_env, python):
+        """--bind mounts the workspace, --hide covers host directories"""
+        # Outside /tmp, which the sandbox replaces anyway
+        secret = str(Path(__file__).parent)
+        (sample_workspace / "test_hidden_path.py").write_text(
+            "import os\n\n"
+            f"def test_hidden():\n    assert os.listdir({secret!r}) == []\n"
+        )
+
+        result = _isolate(
+            python, harness_env, "--bind", str(sample_workspace), "--hide", secret,
+            pytest_args=("-q", "-p", "no:cacheprovider",
+                         "tests_public.py", "tests_hidden.py", "test_hidden_path.py")
+        )
+
+        console, records = decode_frames(result.stdout)
+        outcomes = {r["name"]: r["outcome"] for r in records if r["event"] == "test"}
+        assert outcomes == {
+            "tests_public.py::test_suma_basico": "passed",
+            "tests_hidden.py::test_suma_grande": "failed",
+            "test_hidden_path.py::test_hidden": "passed",
+        }
+        assert result.returncode == 1
+
+    def test_read_only_tests(self, userns, sample_workspace, tmp_path, harness_env, python):
+        """--tests mounts the problem store directory read-only on TESTS_DIR"""
+        problem = tmp_path / "store" / "suma"
+        problem.mkdir(parents=True)
+        for name in ("tests_public.py", "tests_hidden.py"):
+            (sample_workspace / name).rename(problem / name)
+        (problem / "tests_readonly.py").write_text(
+            "import pytest\n\n"
+            "def test_readonly():\n"
+            "    with pytest.raises(OSError):\n"
+            f"        open({TESTS_DIR!r} + '/tests_public.py', 'a')\n"
+        )
+        tests = [f"{TESTS_DIR}/{name}" for name in ("tests_public.py", "tests_hidden.py", "tests_readonly.py")]
+
+        result = _isolate(
+            python, harness_env, "--bind", str(sample_workspace), "--tests", str(problem),
+            "--hide", str(tmp_path / "store"),
+            pytest_args=("-q", "-p", "no:cacheprovider", "--rootdir", TESTS_DIR, *tests)
+        )
+
+        console, records = decode_frames(result.stdout)
+        outcomes = {r["name"]: r["outcome"] for r in records if r["event"] == "test"}
+        assert outcomes == {
+            "tests_public.py::test_suma_basico": "passed",
+            "tests_hidden.py::test_suma_grande": "failed",
+            "tests_readonly.py::test_readonly": "passed",
+        }, result.stderr
+
+    def test_setup_failure(self, harness_env, python):
+        """A cgroup that cannot be joined fails the run instead of running unconfined"""
+        result = _isolate(python, harness_env, "--cgroup", "/nonexistent/cgroup", stdin=b"")
+
+        assert result.returncode == ISOLATION_FAILED_EXIT
+        assert b"isolate:" in result.stderr
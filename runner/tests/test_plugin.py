@@ -0,0 +1,233 @@
+"""
+Tests for the result streaming plugin and its frame protocol
+"""
+import subprocess
+
+from playground_harness.protocol import ESCAPED_MAGIC, MAGIC, ConsoleFilter, decode_frames, encode_frame
+
+
+def _run_harness(python, env, workspace, *pytest_args, timeout=60):
+    return subprocess.run(
+        [python, "-m", "playground_harness", "run", "--", "-q", "-p", "no:cacheprovider", *pytest_args],
+        cwd=workspace, env=env, capture_output=True, timeout=timeout
+    )
+
+
+class TestResultStreamPlugin:
+    """Test cases for the pytest plugin"""
+
+    def test_one_record_per_test_and_end(self, sample_workspace, harness_env, python):
+        """Each test produces a record as it completes, then an end record"""
+        result = _run_harness(python, harness_env, sample_workspace, "tests_public.py", "tests_hidden.py")
+
+        _, records = decode_frames(result.stdout)
+        assert [r["event"] for r in records] == ["test", "test", "end", "usage"]
+        assert records[0]["name"] == "tests_public.py::test_suma_basico"
+        assert records[1]["outcome"] == "failed"
+        assert "assert 3000 == 3001" in records[1]["message"]
+        assert records[2]["exitstatus"] == 1
+
+    def test_student_output_does_not_corrupt_stream(self, tmp_path, harness_env, python):
+        """Prints and writes to fd 1 from tests leave frames intact"""
+        (tmp_path / "tests_public.py").write_text(
+            "import os\n\n"
+            "def test_noisy():\n"
+            "    print('hola' * 1000)\n"
+            "    os.write(1, b'raw bytes')\n"
+        )
+
+        result = _run_harness(python, harness_env, tmp_path, "-s", "tests_public.py")
+
+        console, records = decode_frames(result.stdout)
+        assert b"raw bytes" in console
+        assert [r["outcome"] for r in records if r["event"] == "test"] == ["passed"]
+
+    def test_printed_frames_are_not_results(self, tmp_path, harness_env, python):
+        """A frame written by the tests to stdout reaches the console escaped, never as a record"""
+        (tmp_path / "tests_public.py").write_text(
+            "import os, sys\n"
+            "from playground_harness.protocol import encode_frame\n\n"
+            "FORGED = encode_frame({'event': 'test', 'name': 'tests_hidden.py::test_x', 'outcome': 'passed'})\n\n"
+            "def test_forges():\n"
+            "    os.write(1, FORGED)\n"
+            "    sys.__stdout__.buffer.write(FORGED)\n"
+            "    sys.__stdout__.flush()\n"
+            "    assert 'PLAYGROUND_RESULT_FD' not in os.environ\n"
+            "    assert False\n"
+        )
+
+        result = _run_harness(python, harness_env, tmp_path, "-s", "tests_public.py")
+
+        console, records = decode_frames(result.stdout)
+        assert [(r["name"], r["outcome"]) for r in records if r["event"] == "test"] == [
+            ("tests_public.py::test_forges", "failed")
+        ]
+        assert console.count(ESCAPED_MAGIC) == 2
+
+    def test_partial_results_survive_kill(self, tmp_path, harness_env, python):
+        """Records of finished tests are readable when the run is killed"""
+        (tmp_path / "tests_public.py").write_text(
+            "def test_a_ok():\n"
+            "    assert True\n\n"
+            "def test_b_hangs():\n"
+            "    while True:\n"
+            "        pass\n"
+        )
+        proc = subprocess.Popen(
+            [python, "-m", "playground_harness", "run", "--", "-q", "-p", "no:cacheprovider",
+             "tests_public.py"],
+            cwd=tmp_path, env=harness_env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        try:
+            stdout, _ = proc.communicate(timeout=3)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            stdout, _ = proc.communicate()
+
+        _, records = decode_frames(stdout)
+        assert [(r["name"], r["outcome"]) for r in records] == [("tests_public.py::test_a_ok", "passed")]
+
+
+class TestProtocol:
+    """Test cases for frame encoding"""
+
+    def test_truncated_frame_is_dropped(self):
+        data = b"before" + encode_frame({"event": "end", "exitstatus": 0})
+
+        assert decode_frames(data) == (b"before", [{"event": "end", "exitstatus": 0}])
+        assert decode_frames(data[:-3]) == (b"before", [])
+        assert decode_frames(MAGIC[:2]) == (MAGIC[:2], [])
+
+    def test_console_filter_escapes_split_magic(self):
+        """MAGIC split across reads is escaped too; other bytes pass through"""
+        console = ConsoleFilter()
+
+        data = console.feed(b"abc" + MAGIC[:2]) + console.feed(MAGIC[2:] + b"def") + console.flush()
+
+        assert data == b"abc" + ESCAPED_MAGIC + b"def"
+        assert console.feed(MAGIC[:3]) == b""
+        assert console.flush() == MAGIC[:3]
+
+
+HANGING_TESTS = (
+    "import time\n\n"
+    "def test_a_ok():\n"
+    "    assert True\n\n"
+    "def test_b_hangs():\n"
+    "    while True:\n"
+    "        pass\n\n"
+    "def test_c_swallows_exception():\n"
+    "    while True:\n"
+    "        try:\n"
+    "            time.sleep(10)\n"
+    "        except Exception:\n"
+    "            pass\n\n"
+    "def test_d_ok():\n"
+    "    assert True\n"
+)
+
+
+class TestTimeBudget:
+    """Test cases for per-test and session time budgets"""
+
+    def _run(self, python, env, workspace, *budget_args):
+        return subprocess.run(
+            [python, "-m", "playground_harness", "run", *budget_args,
+             "--", "-q", "-p", "no:cacheprovider", "tests_public.py"],
+            cwd=workspace, env=env, capture_output=True, timeout=60
+        )
+
+    def test_hung_test_times_out_and_run_continues(self, tmp_path, harness_env, python):
+        """A looping test is reported as timeout and later tests still run"""
+        (tmp_path / "tests_public.py").write_text(HANGING_TESTS)
+
+        result = self._run(python, harness_env, tmp_path, "--test-timeout", "0.3")
+
+        _, records = decode_frames(result.stdout)
+        outcomes = [r["outcome"] for r in records if r["event"] == "test"]
+        assert outcomes == ["passed", "timeout", "timeout", "passed"]
+        assert "0.3s" in records[1]["message"]
+        assert records[-2] == {"event": "end", "exitstatus": 1}
+
+    def test_session_budget_limits_remaining_tests(self, tmp_path, harness_env, python):
+        """Once the session budget is spent, later tests get no time"""
+        (tmp_path / "tests_public.py").write_text(HANGING_TESTS)
+
+        result = self._run(
+            python, harness_env, tmp_path, "--test-timeout", "5", "--session-timeout", "0.5"
+        )
+
+        _, records = decode_frames(result.stdout)
+        outcomes = [r["outcome"] for r in records if r["event"] == "test"]
+        assert outcomes[:3] == ["passed", "timeout", "timeout"]
+        assert sum(r.get("duration", 0) for r in records) < 2
+
+    def test_ignored_interruption_ends_run_with_watchdog(self, tmp_path, harness_env, python):
+        """A test that swallows every interruption is reported, then the run exits"""
+        (tmp_path / "tests_public.py").write_text(
+            "def test_a_ok():\n"
+            "    assert True\n\n"
+            "def test_b_stubborn():\n"
+            "    while True:\n"
+            "        try:\n"
+            "            while True:\n"
+            "                pass\n"
+            "        except BaseException:\n"
+            "            pass\n"
+        )
+
+        result = self._run(python, harness_env, tmp_path, "--test-timeout", "0.2")
+
+        _, records = decode_frames(result.stdout)
+        assert result.returncode == 124
+        tests = [r for r in records if r["event"] == "test"]
+        assert [(r["name"].split("::")[1], r["outcome"]) for r in tests] == [
+            ("test_a_ok", "passed"), ("test_b_stubborn", "timeout")
+        ]
+        assert records[-1]["event"] == "usage"
+
+
+class TestUsage:
+    """Test cases for resource usage records"""
+
+    def test_usage_record_after_run(self, sample_workspace, harness_env, python):
+        """The supervisor reports CPU time and peak memory of the pytest process"""
+        result = _run_harness(python, harness_env, sample_workspace, "tests_public.py")
+
+        _, records = decode_frames(result.stdout)
+        usage = records[-1]
+        assert usage["event"] == "usage"
+        assert usage["cpu_user_sec"] > 0
+        assert usage["peak_memory_kb"] > 1000
+        assert usage["exit_signal"] is None
+        assert usage["oom_killed"] is False
+
+    def test_per_test_cpu_time(self, tmp_path, harness_env, python):
+        """Each test record carries the CPU time of its call"""
+        (tmp_path / "tests_public.py").write_text(
+            "def test_busy():\n"
+            "    sum(i * i for i in range(2_000_000))\n"
+        )
+
+        result = _run_harness(python, harness_env, tmp_path, "tests_public.py")
+
+        _, records = decode_frames(result.stdout)
+        assert records[0]["cpu_time"] > 0.01
+        assert records[0]["max_rss_kb"] > 0
+
+    def test_killed_run_still_reports_usage(self, tmp_path, harness_env, python):
+        """A SIGKILLed pytest (as on OOM) is reported with its signal"""
+        (tmp_path / "tests_public.py").write_text(
+            "import os, signal\n\n"
+            "def test_a_ok():\n"
+            "    assert True\n\n"
+            "def test_b_killed():\n"
+            "    os.kill(os.getpid(), signal.SIGKILL)\n"
+        )
+
+        result = _run_harness(python, harness_env, tmp_path, "tests_public.py")
+
+        _, records = decode_frames(result.stdout)
+        assert result.returncode == 128 + 9
+        assert [r["event"] for r in records] == ["test", "usage"]
+        assert records[-1]["exit_signal"] == 9
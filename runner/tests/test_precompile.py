@@ -0,0 +1,67 @@
+"""
+Tests for precompiling test modules of the read-only problem store
+"""
+import os
+import subprocess
+
+from _pytest.assertion.rewrite import PYC_TAIL, _read_pyc
+
+from playground_harness.precompile import precompile_tests
+from playground_harness.protocol import decode_frames
+
+
+class TestPrecompile:
+    """Test cases for `playground_harness precompile`"""
+
+    def test_writes_pyc_pytest_reads_back(self, sample_workspace):
+        """The .pyc is in pytest's rewrite cache format and names the mount path"""
+        written = precompile_tests(str(sample_workspace), mount_path="/problem")
+
+        pyc = sample_workspace / "__pycache__" / ("tests_public" + PYC_TAIL)
+        assert sorted(written) == sorted([
+            str(pyc), str(sample_workspace / "__pycache__" / ("tests_hidden" + PYC_TAIL))
+        ])
+        code = _read_pyc(sample_workspace / "tests_public.py", pyc)
+        assert code is not None
+        assert code.co_filename == "/problem/tests_public.py"
+
+    def test_stale_pyc_ignored_after_edit(self, sample_workspace):
+        """pytest discards the cache once the source size or mtime changes"""
+        precompile_tests(str(sample_workspace))
+        source = sample_workspace / "tests_public.py"
+        source.write_text(source.read_text() + "\n# edited\n")
+
+        assert _read_pyc(source, sample_workspace / "__pycache__" / ("tests_public" + PYC_TAIL)) is None
+
+    def test_run_from_read_only_directory(self, sample_workspace, tmp_path, harness_env, python):
+        """Tests outside the workspace, in a read-only directory, run with the cached bytecode"""
+        problem = tmp_path / "problem"
+        problem.mkdir()
+        for name in ("tests_public.py", "tests_hidden.py"):
+            (sample_workspace / name).rename(problem / name)
+        result = subprocess.run(
+            [python, "-m", "playground_harness", "precompile", str(problem)],
+            env=harness_env, capture_output=True
+        )
+        assert result.returncode == 0, result.stderr
+        pycache = sorted(os.listdir(problem / "__pycache__"))
+        for path in [problem, problem / "__pycache__"]:
+            path.chmod(0o555)
+
+        try:
+            result = subprocess.run(
+                [python, "-m", "playground_harness", "run", "--", "-q", "-p", "no:cacheprovider",
+                 "--rootdir", str(problem), str(problem / "tests_public.py"), str(problem / "tests_hidden.py")],
+                cwd=sample_workspace, env=harness_env, capture_output=True, timeout=60
+            )
+        finally:
+            for path in [problem, problem / "__pycache__"]:
+                path.chmod(0o755)
+
+        _, records = decode_frames(result.stdout)
+        outcomes = {r["name"]: r["outcome"] for r in records if r["event"] == "test"}
+        assert outcomes == {
+            "tests_public.py::test_suma_basico": "passed",
+            "tests_hidden.py::test_suma_grande": "failed",
+        }
+        assert sorted(os.listdir(problem / "__pycache__")) == pycache
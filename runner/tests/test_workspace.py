@@ -0,0 +1,53 @@
+"""
+Tests for workspace streaming (--stdin-tar)
+"""
+import io
+import subprocess
+import tarfile
+
+import pytest
+
+from playground_harness.protocol import decode_frames
+from playground_harness.workspace import extract_workspace
+
+
+def _tar(files):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+class TestWorkspaceStreaming:
+    """Test cases for streamed workspaces"""
+
+    def test_run_from_stdin_tar(self, tmp_path, sample_workspace, harness_env, python):
+        """Files arrive on stdin and results come back as frames on stdout"""
+        files = {p.name: p.read_bytes() for p in sample_workspace.iterdir()}
+        workspace = tmp_path / "empty"
+        workspace.mkdir()
+
+        result = subprocess.run(
+            [python, "-m", "playground_harness", "run", "--stdin-tar",
+             "--", "-q", "-p", "no:cacheprovider", "tests_public.py", "tests_hidden.py"],
+            input=_tar(files), cwd=workspace, env=harness_env, capture_output=True, timeout=60
+        )
+
+        console, records = decode_frames(result.stdout)
+        outcomes = {r["name"]: r["outcome"] for r in records if r["event"] == "test"}
+        assert result.returncode == 1
+        assert b"1 failed, 1 passed" in console
+        assert outcomes == {
+            "tests_public.py::test_suma_basico": "passed",
+            "tests_hidden.py::test_suma_grande": "failed",
+        }
+
+    def test_extract_rejects_path_traversal(self, tmp_path):
+        """Members escaping the workspace are refused"""
+        with pytest.raises(tarfile.TarError):
+            extract_workspace(io.BytesIO(_tar({"../evil.py": b"x"})), str(tmp_path))
+
+        assert not (tmp_path.parent / "evil.py").exists()
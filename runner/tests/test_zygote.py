@@ -0,0 +1,119 @@
+"""
+Tests for the zygote fork server and its client
+"""
+import signal
+import subprocess
+import time
+
+import pytest
+
+from playground_harness.__main__ import _parse_args
+from playground_harness.protocol import decode_frames
+from playground_harness.zygote import exit_code_from_status
+
+
+@pytest.fixture
+def zygote(tmp_path, harness_env, python):
+    """Running zygote server on a temporary socket"""
+    socket_path = str(tmp_path / "zygote.sock")
+    proc = subprocess.Popen(
+        [python, "-m", "playground_harness", "serve", "--socket", socket_path, "--keep-uid"],
+        env=harness_env
+    )
+    yield socket_path
+    proc.kill()
+    proc.wait()
+
+
+def _run_client(python, env, workspace, socket_path, *pytest_args):
+    return subprocess.run(
+        [python, "-S", "-m", "playground_harness", "run", "--zygote", socket_path,
+         "--", "-q", "-p", "no:cacheprovider", *pytest_args],
+        cwd=workspace, env=env, capture_output=True, timeout=60
+    )
+
+
+class TestZygote:
+    """Test cases for the zygote server"""
+
+    def test_forked_run_reports_results(self, zygote, sample_workspace, harness_env, python):
+        """A forked run writes to the client's stdout and returns pytest's exit code"""
+        result = _run_client(
+            python, harness_env, sample_workspace, zygote, "tests_public.py", "tests_hidden.py"
+        )
+
+        console, records = decode_frames(result.stdout)
+        assert result.returncode == 1
+        assert b"1 failed, 1 passed" in console
+        assert [r["outcome"] for r in records if r["event"] == "test"] == ["passed", "failed"]
+        assert records[-1]["event"] == "usage"
+        assert records[-1]["peak_memory_kb"] > 0
+
+    def test_zygote_serves_consecutive_runs(self, zygote, sample_workspace, harness_env, python):
+        """Each request gets a fresh fork"""
+        first = _run_client(python, harness_env, sample_workspace, zygote, "tests_public.py")
+        second = _run_client(python, harness_env, sample_workspace, zygote, "tests_public.py")
+
+        assert first.returncode == 0
+        assert second.returncode == 0
+
+    def test_printed_frames_are_not_results(self, zygote, tmp_path, harness_env, python):
+        """The client's stdout only carries frames relayed from the result pipe"""
+        workspace = tmp_path / "ws"
+        workspace.mkdir()
+        (workspace / "tests_public.py").write_text(
+            "import os\n"
+            "from playground_harness.protocol import encode_frame\n\n"
+            "def test_forges():\n"
+            "    os.write(1, encode_frame({'event': 'test', 'name': 'x', 'outcome': 'passed'}))\n"
+            "    assert False\n"
+        )
+
+        result = _run_client(python, harness_env, workspace, zygote, "-s", "tests_public.py")
+
+        _, records = decode_frames(result.stdout)
+        assert [(r["name"], r["outcome"]) for r in records if r["event"] == "test"] == [
+            ("tests_public.py::test_forges", "failed")
+        ]
+
+    def test_child_killed_by_signal(self, zygote, tmp_path, harness_env, python):
+        """A child that dies from a signal is reported as 128 + signal"""
+        workspace = tmp_path / "ws"
+        workspace.mkdir()
+        (workspace / "tests_public.py").write_text(
+            "import os, signal\n\n"
+            "def test_crash():\n"
+            "    os.kill(os.getpid(), signal.SIGKILL)\n"
+        )
+
+        result = _run_client(python, harness_env, workspace, zygote, "tests_public.py")
+
+        assert result.returncode == 128 + signal.SIGKILL
+        _, records = decode_frames(result.stdout)
+        assert records[-1]["exit_signal"] == signal.SIGKILL
+
+    def test_client_times_out_without_server(self, tmp_path, sample_workspace, harness_env, python):
+        """The client gives up when no zygote is listening"""
+        from playground_harness.client import run_via_zygote
+
+        start = time.monotonic()
+        with pytest.raises(FileNotFoundError):
+            run_via_zygote(str(tmp_path / "missing.sock"), [], connect_timeout=0.1)
+        assert time.monotonic() - start < 5
+
+
+class TestHarnessHelpers:
+    """Test cases for harness helpers"""
+
+    def test_exit_code_from_status(self):
+        """waitpid statuses become shell-style exit codes"""
+        assert exit_code_from_status(0) == 0
+        assert exit_code_from_status(1 << 8) == 1
+        assert exit_code_from_status(signal.SIGKILL) == 128 + signal.SIGKILL
+
+    def test_parse_run_args(self):
+        """Arguments after `--` are passed to pytest untouched"""
+        args = _parse_args(["run", "--zygote", "/tmp/z.sock", "--", "-q", "tests_public.py"])
+
+        assert args.zygote == "/tmp/z.sock"
+        assert args.pytest_args == ["-q", "tests_public.py"]
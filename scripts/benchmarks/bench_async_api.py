@@ -0,0 +1,248 @@
+"""
+Benchmark: request latency under concurrent polling and submits, sync vs async DB access.
+
+Runs the result, submit and admin summary handlers two ways inside
+FastAPI, driven in process by httpx (same event loop, like one uvicorn
+worker): students poll results and submit while a few teachers refresh the
+admin summary, whose aggregate query is slow:
+
+- sync:  `async def` handlers calling the sync Session (the previous API):
+         every query blocks the event loop for its round-trip
+- async: the same service code through AsyncSession.run_sync on the async
+         engine (backend/async_database.py): the loop keeps serving others
+
+The database is SQLite (WAL) with a simulated network round-trip of
+--rtt-ms per statement (--slow-ms for the GROUP BY of the summary), slept
+in the thread that executes the statement (the event loop for the sync
+driver, aiosqlite's thread for the async one), as a round-trip to Postgres
+would. aiosqlite hops threads for every call, so per-request CPU is higher
+than with asyncpg; the gain shown is in the tail, not in the median.
+
+Usage:
+    python scripts/benchmarks/bench_async_api.py [--pollers 200] [--submitters 20] [--admins 2]
+        [--duration 10] [--rtt-ms 2] [--slow-ms 200]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from backend.database import Base
+from backend.models import Submission, TestResult
+from backend.services.submission_service import submission_service
+
+SEED_SUBMISSIONS = 2000
+TESTS_PER_SUBMISSION = 5
+# Cada cliente envía a ritmo fijo (open loop); ~100 polls/s con 200 clientes
+POLL_INTERVAL_SEC = 2.0
+SUBMIT_INTERVAL_SEC = 2.0
+ADMIN_INTERVAL_SEC = 1.0
+
+
+def _seed(url: str) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # Readers and the writer do not block each other (like Postgres MVCC)
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+        conn.execute(Submission.__table__.insert(), [
+            {"id": i, "job_id": f"job-{i}", "problem_id": "bench", "code": "print(1)",
+             "status": "completed", "score_total": 3.0, "score_max": 5.0}
+            for i in range(1, SEED_SUBMISSIONS + 1)
+        ])
+        conn.execute(TestResult.__table__.insert(), [
+            {"submission_id": i, "test_name": f"test_{t}", "outcome": "passed",
+             "points": 1.0, "max_points": 1.0, "visibility": "public"}
+            for i in range(1, SEED_SUBMISSIONS + 1) for t in range(TESTS_PER_SUBMISSION)
+        ])
+    engine.dispose()
+
+
+def _round_trip(rtt: float, slow: float):
+    """SQLite trace callback: runs in the thread executing each statement"""
+    return lambda sql: time.sleep(slow if "GROUP BY" in sql else rtt)
+
+
+def _sync_app(url: str, rtt: float, slow: float) -> Tuple[FastAPI, Any]:
+    engine = create_engine(
+        url, connect_args={"timeout": 30}, poolclass=QueuePool, pool_size=20, max_overflow=30
+    )
+    event.listen(engine, "connect", lambda conn, _: conn.set_trace_callback(_round_trip(rtt, slow)))
+    factory = sessionmaker(bind=engine)
+    app = FastAPI()
+
+    @app.get("/api/result/{job_id}")
+    async def get_result(job_id: str):
+        db = factory()
+        try:
+            return submission_service.get_result_dict(submission_service.get_by_job_id(db, job_id))
+        finally:
+            db.close()
+
+    @app.get("/api/admin/summary")
+    async def admin_summary():
+        db = factory()
+        try:
+            return submission_service.get_statistics(db)
+        finally:
+            db.close()
+
+    @app.post("/api/submit")
+    async def submit():
+        db = factory()
+        try:
+            submission = Submission(job_id="", problem_id="bench", code="print(1)", status="pending")
+            db.add(submission)
+            db.flush()
+            submission.job_id = f"new-{submission.id}"
+            submission.status = "queued"
+            db.commit()
+            return {"job_id": submission.job_id}
+        finally:
+            db.close()
+
+    return app, engine
+
+
+def _async_app(url: str, rtt: float, slow: float) -> Tuple[FastAPI, Any]:
+    engine = create_async_engine(
+        url.replace("sqlite://", "sqlite+aiosqlite://"), connect_args={"timeout": 30},
+        poolclass=AsyncAdaptedQueuePool, pool_size=20, max_overflow=30
+    )
+
+    def on_connect(conn, _):
+        conn.run_async(lambda driver: driver.set_trace_callback(_round_trip(rtt, slow)))
+
+    event.listen(engine.sync_engine, "connect", on_connect)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    app = FastAPI()
+
+    def load(db, job_id):
+        return submission_service.get_result_dict(submission_service.get_by_job_id(db, job_id))
+
+    @app.get("/api/result/{job_id}")
+    async def get_result(job_id: str):
+        async with factory() as db:
+            return await db.run_sync(load, job_id)
+
+    @app.get("/api/admin/summary")
+    async def admin_summary():
+        async with factory() as db:
+            return await db.run_sync(submission_service.get_statistics)
+
+    @app.post("/api/submit")
+    async def submit():
+        async with factory() as db:
+            submission = Submission(job_id="", problem_id="bench", code="print(1)", status="pending")
+            db.add(submission)
+            await db.flush()
+            submission.job_id = f"new-{submission.id}"
+            submission.status = "queued"
+            await db.commit()
+            return {"job_id": submission.job_id}
+
+    return app, engine
+
+
+async def _client_loop(client, method: str, interval: float, deadline: float, latencies: List[float]) -> None:
+    """
+    Send on a fixed schedule and time each request from when it was due, so
+    time the clients themselves spend stuck behind a blocked loop counts
+    (no coordinated omission).
+    """
+    rng = random.Random()
+    due = time.perf_counter() + rng.uniform(0, interval)
+    while due < deadline:
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        if method == "poll":
+            response = await client.get(f"/api/result/job-{rng.randint(1, SEED_SUBMISSIONS)}")
+        elif method == "admin":
+            response = await client.get("/api/admin/summary")
+        else:
+            response = await client.post("/api/submit")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - due) * 1000)
+        due += interval
+
+
+async def _load(
+    app: FastAPI, engine, pollers: int, submitters: int, admins: int, duration: float
+) -> Dict[str, List[float]]:
+    latencies: Dict[str, List[float]] = {"poll": [], "submit": [], "admin": []}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(
+            *[_client_loop(client, "poll", POLL_INTERVAL_SEC, deadline, latencies["poll"]) for _ in range(pollers)],
+            *[_client_loop(client, "submit", SUBMIT_INTERVAL_SEC, deadline, latencies["submit"])
+              for _ in range(submitters)],
+            *[_client_loop(client, "admin", ADMIN_INTERVAL_SEC, deadline, latencies["admin"])
+              for _ in range(admins)],
+        )
+    if isinstance(engine, AsyncEngine):
+        await engine.dispose()
+    else:
+        engine.dispose()
+    return latencies
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[int(pct) - 1] if len(values) > 1 else 0.0
+
+
+def _report(label: str, latencies: Dict[str, List[float]], duration: float) -> float:
+    for kind, values in latencies.items():
+        print(
+            f"{label:<6} {kind:<7} n={len(values):<6} rps={len(values) / duration:7.1f} "
+            f"p50={_percentile(values, 50):7.1f} ms p99={_percentile(values, 99):7.1f} ms"
+        )
+    # Lo que ven los estudiantes (el resumen lento es el que los bloqueaba)
+    return _percentile(latencies["poll"] + latencies["submit"], 99)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pollers", type=int, default=200)
+    parser.add_argument("--submitters", type=int, default=20)
+    parser.add_argument("--admins", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--rtt-ms", type=float, default=2.0)
+    parser.add_argument("--slow-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    print(
+        f"pollers={args.pollers} submitters={args.submitters} admins={args.admins} "
+        f"duration={args.duration}s rtt={args.rtt_ms}ms slow={args.slow_ms}ms"
+    )
+    p99 = {}
+    for label, build in (("sync", _sync_app), ("async", _async_app)):
+        with tempfile.TemporaryDirectory(prefix="bench-async-api-") as tmp:
+            url = f"sqlite:///{tmp}/bench.db"
+            _seed(url)
+            app, engine = build(url, args.rtt_ms / 1000, args.slow_ms / 1000)
+            latencies = asyncio.run(_load(
+                app, engine, args.pollers, args.submitters, args.admins, args.duration
+            ))
+            p99[label] = _report(label, latencies, args.duration)
+
+    print(f"student p99 improvement: {p99['sync'] / max(p99['async'], 1e-9):.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
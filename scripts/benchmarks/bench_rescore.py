@@ -0,0 +1,123 @@
+"""
+Benchmark: rescoring stored results after a rubric change, per row vs in SQL.
+
+Seeds an SQLite database with N finished submissions of one problem (each
+with T stored test results) and applies a new rubric two ways:
+
+- python: load every submission with its results through the ORM, recompute
+  points and totals in Python and flush the changes (a rerun without sandbox)
+- sql:    worker.services.rescorer (two set-based UPDATE statements)
+
+Usage:
+    python scripts/benchmarks/bench_rescore.py [--submissions 100000] [--tests 5]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import selectinload, sessionmaker
+
+from backend.database import Base
+from backend.models import Submission, TestResult
+from worker.services.rescorer import rescorer
+from worker.services.rubric_scorer import rubric_version
+
+PROBLEM_ID = "bench"
+
+
+def _rubric(tests: int, scale: int) -> dict:
+    return {
+        "problem_id": PROBLEM_ID,
+        "max_points": tests * scale,
+        "tests": [
+            {"name": f"test_{i}", "points": scale, "visibility": "hidden" if i % 2 else "public"}
+            for i in range(tests)
+        ],
+    }
+
+
+def _seed(factory, submissions: int, tests: int, version: str) -> None:
+    rng = random.Random(0)
+    engine = factory.kw["bind"]
+    with engine.begin() as conn:
+        conn.execute(Submission.__table__.insert(), [
+            {"id": i, "job_id": f"job-{i}", "problem_id": PROBLEM_ID, "code": "",
+             "status": "completed", "score_total": 0.0, "score_max": float(tests),
+             "rubric_version": version}
+            for i in range(1, submissions + 1)
+        ])
+        conn.execute(TestResult.__table__.insert(), [
+            {"submission_id": i, "test_name": f"test_{t}",
+             "outcome": "passed" if rng.random() < 0.7 else "failed",
+             "points": 0.0, "max_points": 1.0, "visibility": "public"}
+            for i in range(1, submissions + 1) for t in range(tests)
+        ])
+
+
+def _rescore_python(db, rubric: dict, version: str) -> None:
+    tests = {t["name"]: t for t in rubric["tests"]}
+    submissions = (
+        db.query(Submission)
+        .options(selectinload(Submission.test_results))
+        .filter(Submission.problem_id == PROBLEM_ID)
+        .all()
+    )
+    for submission in submissions:
+        total = 0.0
+        for result in submission.test_results:
+            test = tests.get(result.test_name, {})
+            result.max_points = float(test.get("points", 0))
+            result.points = result.max_points if result.outcome == "passed" else 0.0
+            result.visibility = test.get("visibility", "public")
+            total += result.points
+        submission.score_total = total
+        submission.score_max = float(rubric["max_points"])
+        submission.rubric_version = version
+    db.commit()
+
+
+def _time(label: str, factory, submissions: int, tests: int, apply) -> float:
+    engine = factory.kw["bind"]
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    _seed(factory, submissions, tests, "old")
+    rubric = _rubric(tests, scale=2)
+    db = factory()
+    try:
+        start = time.perf_counter()
+        apply(db, rubric, rubric_version(rubric))
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    print(f"{label:<7} {elapsed:8.2f} s")
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--submissions", type=int, default=100_000)
+    parser.add_argument("--tests", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-rescore-") as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        factory = sessionmaker(bind=engine)
+        print(f"submissions={args.submissions} tests={args.tests}")
+        python = _time("python", factory, args.submissions, args.tests, _rescore_python)
+        sql = _time("sql", factory, args.submissions, args.tests,
+                    lambda db, rubric, version: rescorer.rescore(db, PROBLEM_ID, rubric, version))
+        engine.dispose()
+
+    print(f"speedup: {python / sql:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Benchmark: per-run startup of a fresh pytest interpreter vs a zygote fork.
+
+Runs one problem's public and hidden tests against its starter code N times
+with each strategy, outside Docker, so only the interpreter/pytest startup
+differs:
+
+- cold:   python -m pytest ...                 (what `docker run` executes)
+- zygote: python -S -m playground_harness run --zygote SOCK -- ...
+          (what `docker exec` executes against a warm pooled container)
+
+Usage:
+    python scripts/benchmarks/bench_zygote_startup.py [--problem cond_mayor_edad] [--runs 30]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+RUNNER_DIR = ROOT / "runner"
+PROBLEMS_DIR = ROOT / "backend" / "problems"
+PYTEST_ARGS = ["-q", "--tb=short", "-p", "no:cacheprovider", "tests_public.py", "tests_hidden.py"]
+
+
+def _prepare_workspace(problem_id: str) -> Path:
+    problem_dir = PROBLEMS_DIR / problem_id
+    workspace = Path(tempfile.mkdtemp(prefix="bench-zygote-"))
+    shutil.copy(problem_dir / "starter.py", workspace / "student_code.py")
+    for name in ("tests_public.py", "tests_hidden.py"):
+        shutil.copy(problem_dir / name, workspace / name)
+    return workspace
+
+
+def _time_runs(cmd, workspace: Path, env: dict, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=workspace, env=env, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _summary(label: str, timings: list) -> str:
+    ordered = sorted(timings)
+    p90 = ordered[int(len(ordered) * 0.9) - 1]
+    return (
+        f"{label:<8} median={statistics.median(timings):7.1f} ms  "
+        f"mean={statistics.mean(timings):7.1f} ms  p90={p90:7.1f} ms"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--problem", default="cond_mayor_edad")
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(RUNNER_DIR)
+    workspace = _prepare_workspace(args.problem)
+    socket_path = str(workspace.parent / f"{workspace.name}.sock")
+
+    zygote = subprocess.Popen(
+        [sys.executable, "-m", "playground_harness", "serve", "--socket", socket_path, "--keep-uid"],
+        env=env
+    )
+    try:
+        cold_cmd = [sys.executable, "-m", "pytest", *PYTEST_ARGS]
+        zygote_cmd = [
+            sys.executable, "-S", "-m", "playground_harness", "run", "--zygote", socket_path,
+            "--", *PYTEST_ARGS
+        ]
+        # Warm the page cache and wait for the zygote to finish importing
+        _time_runs(cold_cmd, workspace, env, 2)
+        _time_runs(zygote_cmd, workspace, env, 2)
+
+        cold = _time_runs(cold_cmd, workspace, env, args.runs)
+        forked = _time_runs(zygote_cmd, workspace, env, args.runs)
+    finally:
+        zygote.kill()
+        zygote.wait()
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    print(f"problem={args.problem} runs={args.runs}")
+    print(_summary("cold", cold))
+    print(_summary("zygote", forked))
+    saved = statistics.median(cold) - statistics.median(forked)
+    print(f"startup saved per run: {saved:.1f} ms ({saved / statistics.median(cold):.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
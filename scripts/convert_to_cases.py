@@ -0,0 +1,292 @@
+"""
+Migrate stdin/stdout problems from pytest files to cases.json.
+
+Most problems repeat the same test in tests_public.py / tests_hidden.py:
+swap sys.stdin / sys.stdout for StringIO, call student.main(), compare the
+stripped output. This script recognizes that pattern (and the
+`hasattr(student, 'main')` check) and rewrites the problem as a cases.json
+for the runner's native harness (runner/playground_harness/cases.py), with
+the points and visibility of rubric.json.
+
+A problem is converted only if every one of its tests is recognized; then
+cases.json is written and tests_public.py, tests_hidden.py and rubric.json
+are removed. Anything else (function-call tests, helpers, several asserts)
+is left as is and reported.
+
+Usage:
+    python scripts/convert_to_cases.py [--problems-dir DIR] [--dry-run] [PROBLEM_ID ...]
+"""
+import argparse
+import ast
+import json
+import math
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+PROBLEMS_DIR = ROOT / "backend" / "problems"
+TEST_FILES = (("tests_public.py", "public"), ("tests_hidden.py", "hidden"))
+REPLACED_FILES = ("tests_public.py", "tests_hidden.py", "rubric.json")
+
+# Statements of the StringIO swap that carry no information
+BOILERPLATE = {
+    "old_stdin = sys.stdin",
+    "old_stdout = sys.stdout",
+    "sys.stdout = StringIO()",
+    "sys.stdout = io.StringIO()",
+    "sys.stdin = old_stdin",
+    "sys.stdout = old_stdout",
+}
+CAPTURE = "output = sys.stdout.getvalue().strip()"
+# Module-level statements of the student module loader
+LOADER = {
+    "spec = importlib.util.spec_from_file_location('student_code', "
+    "os.path.join(os.getcwd(), 'student_code.py'))",
+    "student = importlib.util.module_from_spec(spec)",
+    "spec.loader.exec_module(student)",
+}
+
+
+class Unsupported(Exception):
+    """A test that does not follow a recognized pattern"""
+
+
+def _number(node: ast.expr) -> float:
+    """Numeric literal, negative literal or math constant"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) \
+            and not isinstance(node.value, bool):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return -_number(node.operand)
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) \
+            and node.value.id == "math" and node.attr in ("pi", "e", "tau"):
+        return getattr(math, node.attr)
+    raise Unsupported(f"not a number: {ast.unparse(node)}")
+
+
+def _string(node: ast.expr) -> str:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    raise Unsupported(f"not a string literal: {ast.unparse(node)}")
+
+
+def _is_output(node: ast.expr, float_alias: Optional[str]) -> bool:
+    """`float(output)`, or the name it was assigned to"""
+    if isinstance(node, ast.Name):
+        return node.id == float_alias
+    return (
+        isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "float"
+        and len(node.args) == 1 and isinstance(node.args[0], ast.Name) and node.args[0].id == "output"
+    )
+
+
+def _output_equals(node: ast.expr) -> str:
+    """`output == "literal"`"""
+    if not (isinstance(node, ast.Compare) and isinstance(node.left, ast.Name) and node.left.id == "output"
+            and len(node.ops) == 1 and isinstance(node.ops[0], ast.Eq)):
+        raise Unsupported(f"unrecognized assertion: {ast.unparse(node)}")
+    expected = _string(node.comparators[0])
+    if expected != expected.strip():
+        # Never equal to the stripped output; keep the pytest version
+        raise Unsupported(f"expected output with surrounding whitespace: {expected!r}")
+    return expected
+
+
+def _comparison(test: ast.expr, float_alias: Optional[str]) -> Dict[str, Any]:
+    """Case fields for the assertion of an I/O test"""
+    if isinstance(test, ast.BoolOp) and isinstance(test.op, ast.Or):
+        return {"expected": [_output_equals(value) for value in test.values]}
+    if isinstance(test, ast.Compare) and len(test.ops) == 1:
+        left, op, right = test.left, test.ops[0], test.comparators[0]
+        if isinstance(left, ast.Name) and left.id == "output":
+            return {"expected": _output_equals(test)}
+        if isinstance(op, ast.Eq) and _is_output(left, float_alias):
+            return {"expected": repr(_number(right)), "compare": "float"}
+        # abs(<float output> - N) < TOL
+        if isinstance(op, (ast.Lt, ast.LtE)) and isinstance(left, ast.Call) \
+                and isinstance(left.func, ast.Name) and left.func.id == "abs" and len(left.args) == 1:
+            diff = left.args[0]
+            if isinstance(diff, ast.BinOp) and isinstance(diff.op, ast.Sub) and _is_output(diff.left, float_alias):
+                return {
+                    "expected": repr(_number(diff.right)),
+                    "compare": "float",
+                    "tolerance": _number(right),
+                }
+    raise Unsupported(f"unrecognized assertion: {ast.unparse(test)}")
+
+
+def convert_test(func: ast.FunctionDef) -> Dict[str, Any]:
+    """cases.json entry (without points) for one pytest test function"""
+    body = list(func.body)
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+            and isinstance(body[0].value.value, str):
+        body = body[1:]  # Docstring
+    if func.args.args or func.decorator_list:
+        raise Unsupported("fixtures or decorators")
+    if not body or not isinstance(body[-1], ast.Assert):
+        raise Unsupported("does not end with an assert")
+    *setup, check = body
+
+    # assert hasattr(student, 'main')
+    test = check.test
+    if not setup and isinstance(test, ast.Call) and isinstance(test.func, ast.Name) \
+            and test.func.id == "hasattr" and len(test.args) == 2 \
+            and isinstance(test.args[0], ast.Name) and test.args[0].id == "student":
+        return {"defines": _string(test.args[1])}
+
+    case, float_alias = _convert_setup(setup)
+    case.update(_comparison(test, float_alias))
+    return case
+
+
+def _convert_setup(setup: List[ast.stmt]) -> Tuple[Dict[str, Any], Optional[str]]:
+    """
+    Case fields (stdin, entry) from the statements before the assert.
+
+    Returns:
+        Tuple of (case, name the captured output was converted into, if any)
+    """
+    case: Dict[str, Any] = {}
+    entry = None
+    captured = False
+    float_alias = None
+    for stmt in setup:
+        source = ast.unparse(stmt)
+        if source in BOILERPLATE:
+            continue
+        if source == CAPTURE:
+            captured = True
+            continue
+        if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1:
+            kind = _setup_assign(stmt, case, captured)
+            if kind == "alias":
+                float_alias = stmt.targets[0].id
+            if kind is not None:
+                continue
+        if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call) and not stmt.value.args \
+                and not stmt.value.keywords and isinstance(stmt.value.func, ast.Attribute) \
+                and ast.unparse(stmt.value.func.value) == "student" and entry is None and not captured:
+            entry = stmt.value.func.attr
+            continue
+        raise Unsupported(f"unrecognized statement: {source}")
+    if entry is None or not captured:
+        raise Unsupported("no student call with captured output")
+    case["entry"] = entry
+    return case, float_alias
+
+
+def _setup_assign(stmt: ast.Assign, case: Dict[str, Any], captured: bool) -> Optional[str]:
+    """
+    Recognize `sys.stdin = StringIO(...)` (stored in case) and
+    `x = float(output)`-style aliases of the captured output.
+
+    Returns:
+        "stdin", "alias" or None if the assignment is not one of those
+    """
+    target, value = ast.unparse(stmt.targets[0]), stmt.value
+    if target == "sys.stdin" and isinstance(value, ast.Call) and len(value.args) == 1 \
+            and ast.unparse(value.func) in ("StringIO", "io.StringIO") and "stdin" not in case:
+        case["stdin"] = _string(value.args[0])
+        return "stdin"
+    if isinstance(stmt.targets[0], ast.Name) and captured and _is_output(value, None):
+        return "alias"
+    return None
+
+
+def convert_module(source: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """(test name, case) for every test of a pytest module"""
+    tree = ast.parse(source)
+    cases = []
+    for stmt in tree.body:
+        if isinstance(stmt, (ast.Import, ast.ImportFrom)):
+            continue
+        if isinstance(stmt, ast.FunctionDef) and stmt.name.startswith("test"):
+            try:
+                cases.append((stmt.name, convert_test(stmt)))
+            except Unsupported as e:
+                raise Unsupported(f"{stmt.name}: {e}") from None
+            continue
+        if ast.unparse(stmt) in LOADER:
+            continue
+        raise Unsupported(f"unrecognized module statement: {ast.unparse(stmt).splitlines()[0]}")
+    return cases
+
+
+def convert_problem(problem_dir: Path) -> Dict[str, Any]:
+    """
+    Build the cases.json spec of a problem.
+
+    Raises:
+        Unsupported: Some test, or the problem layout, is not recognized
+    """
+    if (problem_dir / "cases.json").exists():
+        raise Unsupported("already has cases.json")
+    rubric_path = problem_dir / "rubric.json"
+    if not rubric_path.exists():
+        raise Unsupported("no rubric.json")
+    rubric = json.loads(rubric_path.read_text(encoding="utf-8"))
+    rubric_map = {t["name"]: t for t in rubric.get("tests", [])}
+
+    cases = []
+    for file_name, visibility in TEST_FILES:
+        path = problem_dir / file_name
+        if not path.exists():
+            continue
+        for name, case in convert_module(path.read_text(encoding="utf-8")):
+            entry = rubric_map.get(name, {})
+            cases.append({
+                "name": name,
+                **case,
+                "points": entry.get("points", 0),
+                "visibility": entry.get("visibility", visibility),
+            })
+    if not cases:
+        raise Unsupported("no tests")
+
+    # One entry function for the whole problem when they agree
+    entries = {case["entry"] for case in cases if "entry" in case}
+    spec: Dict[str, Any] = {"version": 1}
+    if len(entries) == 1:
+        spec["entry"] = entries.pop()
+        for case in cases:
+            case.pop("entry", None)
+    spec["max_points"] = rubric.get("max_points", sum(case["points"] for case in cases))
+    spec["cases"] = cases
+    return spec
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("problems", nargs="*", help="Problem IDs (default: all)")
+    parser.add_argument("--problems-dir", type=Path, default=PROBLEMS_DIR)
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing")
+    args = parser.parse_args(argv)
+
+    problem_dirs = (
+        [args.problems_dir / p for p in args.problems] if args.problems
+        else sorted(p for p in args.problems_dir.iterdir() if p.is_dir() and not p.name.startswith(("_", ".")))
+    )
+    converted = 0
+    for problem_dir in problem_dirs:
+        try:
+            spec = convert_problem(problem_dir)
+        except (Unsupported, SyntaxError, OSError, ValueError) as e:
+            print(f"skip     {problem_dir.name}: {e}")
+            continue
+        converted += 1
+        print(f"convert  {problem_dir.name}: {len(spec['cases'])} cases")
+        if args.dry_run:
+            continue
+        (problem_dir / "cases.json").write_text(
+            json.dumps(spec, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+        )
+        for name in REPLACED_FILES:
+            (problem_dir / name).unlink(missing_ok=True)
+
+    print(f"{converted}/{len(problem_dirs)} problems converted")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
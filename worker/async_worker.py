@@ -0,0 +1,207 @@
+"""
+Asyncio worker: runs several sandbox jobs concurrently in one process.
+
+PERFORMANCE: `rq worker` forks one work horse per job and runs a single
+sandbox at a time, so N concurrent sandboxes cost N mostly idle Python
+processes, each with its own imports and DB pool. This worker keeps one
+process and one event loop:
+- Up to WORKER_CONCURRENCY jobs run at the same time (asyncio.Semaphore)
+- Jobs are dequeued from the same `submissions` RQ queue and keep RQ's
+  bookkeeping (started/finished/failed registries, results), so
+  `backend/app.py::submit` and `Job.fetch(...).get_status()` work unchanged
+- Each job runs the regular task on a thread of a bounded executor; the
+  task spends its time waiting on Docker (subprocess or Engine API socket),
+  which releases the GIL
+- The warm container pool, the Docker API connections and the DB pool are
+  shared by all jobs and survive between them
+
+Usage:
+    python -m worker.async_worker [--concurrency N] [--url redis://...] [queue ...]
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Set
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from redis import Redis
+from rq import Queue, SimpleWorker
+from rq.exceptions import DequeueTimeout
+from rq.timeouts import TimerDeathPenalty
+
+from backend.config import settings
+from backend.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_QUEUE = "submissions"
+DEFAULT_CONCURRENCY = 4
+# Seconds a dequeue blocks in Redis before checking for shutdown
+DEQUEUE_TIMEOUT_SEC = 5
+HEARTBEAT_INTERVAL_SEC = 60
+
+
+class SlotWorker(SimpleWorker):
+    """
+    RQ worker identity for one concurrency slot.
+
+    Runs jobs in the calling thread (no fork) and enforces job_timeout with a
+    timer thread instead of SIGALRM, which only works on the main thread.
+    """
+    death_penalty_class = TimerDeathPenalty
+
+
+class AsyncWorker:
+    """Dequeues RQ jobs and runs up to `concurrency` of them at once"""
+
+    def __init__(
+        self,
+        connection: Redis,
+        queue_names: List[str] = None,
+        concurrency: int = None,
+        dequeue_timeout: int = DEQUEUE_TIMEOUT_SEC
+    ):
+        self.connection = connection
+        self.queues = [Queue(name, connection=connection) for name in (queue_names or [DEFAULT_QUEUE])]
+        self.concurrency = concurrency or int(os.getenv("WORKER_CONCURRENCY", str(DEFAULT_CONCURRENCY)))
+        if self.concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self.dequeue_timeout = dequeue_timeout
+
+        # One registered RQ worker per slot: `rq info` and /api/health count
+        # slots, and each job has a worker_name like under `rq worker`
+        base_name = f"async-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._idle_slots: List[SlotWorker] = [
+            SlotWorker(self.queues, connection=connection, name=f"{base_name}.{i}")
+            for i in range(self.concurrency)
+        ]
+        self._all_slots = list(self._idle_slots)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="sandbox-job")
+        self._stop: Optional[asyncio.Event] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.jobs_done = 0
+
+    def request_stop(self) -> None:
+        """Stop dequeuing; jobs already running are allowed to finish"""
+        if self._stop is not None and not self._stop.is_set():
+            logger.info("Async worker: warm shutdown requested")
+            self._stop.set()
+
+    async def run(self, burst: bool = False) -> int:
+        """
+        Main loop.
+
+        Args:
+            burst: Return once the queues are empty (used by tests and one-off drains)
+
+        Returns:
+            Number of jobs processed
+        """
+        self._stop = asyncio.Event()
+        self._install_signal_handlers()
+        for slot in self._all_slots:
+            slot.register_birth()
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        slots = asyncio.Semaphore(self.concurrency)
+        logger.info(
+            "Async worker started",
+            extra={"queues": [q.name for q in self.queues], "concurrency": self.concurrency}
+        )
+
+        try:
+            while not self._stop.is_set():
+                await slots.acquire()
+                if self._stop.is_set():
+                    slots.release()
+                    break
+                result = await asyncio.to_thread(self._dequeue, None if burst else self.dequeue_timeout)
+                if result is None:
+                    slots.release()
+                    if burst:
+                        break
+                    continue
+
+                job, queue = result
+                task = asyncio.create_task(self._execute(job, queue))
+                self._tasks.add(task)
+                task.add_done_callback(lambda t: (self._tasks.discard(t), slots.release()))
+
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            heartbeat.cancel()
+            self._executor.shutdown(wait=True)
+            for slot in self._all_slots:
+                slot.register_death()
+            logger.info("Async worker stopped", extra={"jobs_done": self.jobs_done})
+
+        return self.jobs_done
+
+    def _dequeue(self, timeout: Optional[int]):
+        """Blocking dequeue (runs on a thread); None when the queues stay empty"""
+        try:
+            return Queue.dequeue_any(self.queues, timeout, connection=self.connection)
+        except DequeueTimeout:
+            return None
+
+    async def _execute(self, job, queue: Queue) -> None:
+        """Run one job on an executor thread under an idle slot identity"""
+        slot = self._idle_slots.pop()
+        try:
+            loop = asyncio.get_running_loop()
+            # execute_job updates the RQ registries and stores the result or the
+            # traceback; task exceptions never propagate out of it
+            await loop.run_in_executor(self._executor, slot.execute_job, job, queue)
+        except Exception:
+            logger.error("Async worker: job bookkeeping failed", extra={"job_id": job.id}, exc_info=True)
+        finally:
+            self.jobs_done += 1
+            self._idle_slots.append(slot)
+
+    async def _heartbeat_loop(self) -> None:
+        """Keep idle slot registrations alive (a busy slot gets a job-long TTL when its job starts)"""
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL_SEC)
+            for slot in list(self._idle_slots):
+                try:
+                    await asyncio.to_thread(slot.heartbeat)
+                except Exception:
+                    logger.warning("Async worker: heartbeat failed", exc_info=True)
+
+    def _install_signal_handlers(self) -> None:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.request_stop)
+            except (NotImplementedError, RuntimeError):
+                # Not on the main thread (e.g. tests): rely on request_stop()
+                pass
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run sandbox jobs concurrently in one process")
+    parser.add_argument("queues", nargs="*", default=[DEFAULT_QUEUE])
+    parser.add_argument("--url", default=None, help="Redis URL (default: settings REDIS_HOST/PORT/DB)")
+    parser.add_argument("--concurrency", "-c", type=int, default=None,
+                        help=f"Concurrent jobs (default: WORKER_CONCURRENCY or {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--burst", action="store_true", help="Exit when the queues are empty")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        connection = Redis.from_url(args.url)
+    else:
+        connection = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB)
+
+    worker = AsyncWorker(connection, queue_names=args.queues, concurrency=args.concurrency)
+    asyncio.run(worker.run(burst=args.burst))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Bulk regrade of past submissions after a problem's tests change.
+
+PERFORMANCE: Re-enqueuing submissions one by one through /api/submit
+creates new rows and competes with students for the sandbox. Instead:
+- start_regrade (coordinator) streams the ids of the matching submissions
+  with keyset pagination (id > last id, REGRADE_PAGE_SIZE at a time,
+  without loading their code) and enqueues regrade_batch jobs of
+  REGRADE_BATCH_SIZE ids on the low-priority `regrade` queue
+- Workers list `regrade` after `submissions`, so regrades only use
+  capacity that student submissions leave idle; several workers run
+  batches in parallel
+- regrade_batch grades its submissions REGRADE_CONCURRENCY at a time
+  (identical code against unchanged tests is a result cache hit) and
+  writes all TestResult/Submission updates of the batch in one transaction
+- Progress counters on RegradeRun are bumped with one UPDATE per batch;
+  throughput and ETA are derived from them (backend regrade_service)
+- Resumable: every regraded submission is stamped with the run id, so
+  running start_regrade again after a crash only regrades what is left
+- The API's cached views of the rewritten results (result_view:{job_id})
+  are deleted after each commit
+Submissions still pending, queued or running are not touched.
+
+A run with mode "rescore" (only rubric.json changed) executes no code:
+start_regrade recomputes the stored scores in SQL (services/rescorer.py).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import sys
+import pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from redis import Redis
+from rq import Queue, get_current_job
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from backend.cache import invalidate_result_views
+from backend.config import settings
+from backend.database import SessionLocal
+from backend.logging_config import get_logger
+from backend.models import RegradeRun, Submission, TestResult
+from .services.problem_assets import problem_asset_cache
+from .services.rescorer import rescorer
+from .tasks import build_test_result_rows, grade_submission
+
+logger = get_logger(__name__)
+
+REGRADE_QUEUE = "regrade"
+REGRADE_PAGE_SIZE = 1000
+REGRADE_BATCH_SIZE = int(os.getenv("REGRADE_BATCH_SIZE", "50"))
+# Submissions of a batch graded at once (each still takes a sandbox concurrency slot)
+REGRADE_CONCURRENCY = int(os.getenv("REGRADE_CONCURRENCY", "8"))
+BATCH_JOB_TIMEOUT = "30m"
+# Finished submissions; the others are still owned by their submission job
+REGRADABLE_STATUSES = ("completed", "failed", "timeout", "output_limit")
+
+
+def _regrade_queue() -> Queue:
+    job = get_current_job()
+    connection = job.connection if job is not None else Redis(
+        host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB
+    )
+    return Queue(REGRADE_QUEUE, connection=connection)
+
+
+def _pending(db: Session, run: RegradeRun):
+    """Submissions of the run that it has not regraded yet"""
+    query = db.query(Submission.id).filter(
+        Submission.problem_id == run.problem_id,
+        Submission.status.in_(REGRADABLE_STATUSES),
+        or_(Submission.regrade_run_id.is_(None), Submission.regrade_run_id != run.id)
+    )
+    if run.student_id:
+        query = query.filter(Submission.student_id == run.student_id)
+    return query
+
+
+def start_regrade(run_id: int) -> Dict[str, Any]:
+    """
+    RQ job: enqueue the batches of a regrade run (also resumes a crashed one).
+
+    Returns:
+        Dictionary with the number of submissions and batches enqueued
+    """
+    db: Session = SessionLocal()
+    try:
+        run = db.query(RegradeRun).filter(RegradeRun.id == run_id).first()
+        if run is None:
+            raise Exception(f"Regrade run {run_id} not found")
+
+        if run.mode == "rescore":
+            return _rescore(db, run)
+
+        # Al reanudar, los ya recorregidos cuentan y los fallidos se reintentan
+        pending = _pending(db, run).count()
+        run.total = (run.regraded or 0) + pending
+        run.failed = 0
+        run.status = "running" if pending else "completed"
+        run.started_at = run.started_at or datetime.utcnow()
+        run.finished_at = None if pending else datetime.utcnow()
+        run.error_message = None
+        db.commit()
+
+        queue = _regrade_queue()
+        enqueued = batches = 0
+        last_id = 0
+        while True:
+            # Keyset pagination: index scan from last_id, never an OFFSET
+            page = [
+                row.id for row in _pending(db, run)
+                .filter(Submission.id > last_id)
+                .order_by(Submission.id)
+                .limit(REGRADE_PAGE_SIZE)
+            ]
+            if not page:
+                break
+            for start in range(0, len(page), REGRADE_BATCH_SIZE):
+                queue.enqueue(
+                    "worker.regrade.regrade_batch",
+                    run_id=run_id,
+                    submission_ids=page[start:start + REGRADE_BATCH_SIZE],
+                    job_timeout=BATCH_JOB_TIMEOUT
+                )
+                batches += 1
+            enqueued += len(page)
+            last_id = page[-1]
+
+        logger.info(
+            f"Regrade run {run_id} enqueued",
+            extra={"run_id": run_id, "problem_id": run.problem_id,
+                   "submissions": enqueued, "batches": batches}
+        )
+        return {"run_id": run_id, "submissions": enqueued, "batches": batches}
+
+    except Exception as e:
+        logger.error(f"Regrade run {run_id} failed to start: {e}", extra={"run_id": run_id}, exc_info=True)
+        db.rollback()
+        db.query(RegradeRun).filter(RegradeRun.id == run_id).update(
+            {"status": "failed", "error_message": str(e)[:1000]}, synchronize_session=False
+        )
+        db.commit()
+        raise
+
+    finally:
+        db.close()
+
+
+def _rescore(db: Session, run: RegradeRun) -> Dict[str, Any]:
+    """Recompute stored scores with the current rubric, without the sandbox"""
+    run.status = "running"
+    run.started_at = run.started_at or datetime.utcnow()
+    db.commit()
+
+    assets = problem_asset_cache.get(run.problem_id)
+    stats = rescorer.rescore(
+        db, run.problem_id, assets.rubric, assets.rubric_version, student_id=run.student_id
+    )
+    # Los resultados cacheados por la API quedaron viejos
+    rescored = db.query(Submission.job_id).filter(
+        Submission.problem_id == run.problem_id,
+        Submission.rubric_version == assets.rubric_version
+    )
+    if run.student_id:
+        rescored = rescored.filter(Submission.student_id == run.student_id)
+    invalidate_result_views(job_id for job_id, in rescored)
+
+    run.total = (run.regraded or 0) + stats["rescored"]
+    run.regraded = run.total
+    run.score_changed = (run.score_changed or 0) + stats["score_changed"]
+    run.status = "completed"
+    run.finished_at = datetime.utcnow()
+    db.commit()
+    return {"run_id": run.id, **stats}
+
+
+def _grade(row) -> Tuple[int, Optional[Tuple[Dict[str, Any], list]], Optional[str]]:
+    try:
+        return row.id, grade_submission(row.problem_id, row.code, submission_id=row.id), None
+    except Exception as e:
+        logger.warning(
+            f"Regrade of submission {row.id} failed: {e}",
+            extra={"submission_id": row.id, "problem_id": row.problem_id}
+        )
+        return row.id, None, str(e)
+
+
+def regrade_batch(run_id: int, submission_ids: List[int]) -> Dict[str, Any]:
+    """
+    RQ job: regrade a batch of submissions and store the results in place.
+
+    Returns:
+        Dictionary with the batch statistics
+    """
+    db: Session = SessionLocal()
+    try:
+        run = db.query(RegradeRun).filter(RegradeRun.id == run_id).first()
+        if run is None or run.status != "running":
+            return {"run_id": run_id, "skipped": len(submission_ids)}
+
+        # Skip what a previous attempt of this run already stored
+        rows = (
+            db.query(
+                Submission.id, Submission.job_id, Submission.problem_id, Submission.code,
+                Submission.score_total
+            )
+            .filter(Submission.id.in_(submission_ids))
+            .filter(or_(Submission.regrade_run_id.is_(None), Submission.regrade_run_id != run_id))
+            .all()
+        )
+        old_scores = {row.id: row.score_total for row in rows}
+        job_ids = {row.id: row.job_id for row in rows}
+        # No transaction (and no pooled connection) held while the sandboxes run
+        db.commit()
+
+        with ThreadPoolExecutor(max_workers=max(1, REGRADE_CONCURRENCY)) as pool:
+            results = list(pool.map(_grade, rows))
+
+        graded = [(sid, outcome) for sid, outcome, error in results if outcome is not None]
+        failed = len(results) - len(graded)
+        changed = 0
+        now = datetime.utcnow()
+
+        if graded:
+            graded_ids = [sid for sid, _ in graded]
+            db.query(TestResult).filter(TestResult.submission_id.in_(graded_ids)).delete(
+                synchronize_session=False
+            )
+            db.bulk_insert_mappings(TestResult, [
+                row for sid, (_, test_scores) in graded for row in build_test_result_rows(sid, test_scores)
+            ])
+            db.bulk_update_mappings(Submission, [
+                {"id": sid, **fields, "regrade_run_id": run_id, "regraded_at": now}
+                for sid, (fields, _) in graded
+            ])
+            changed = sum(
+                1 for sid, (fields, _) in graded if fields["score_total"] != old_scores.get(sid)
+            )
+
+        db.query(RegradeRun).filter(RegradeRun.id == run_id).update({
+            RegradeRun.regraded: RegradeRun.regraded + len(graded),
+            RegradeRun.failed: RegradeRun.failed + failed,
+            RegradeRun.score_changed: RegradeRun.score_changed + changed,
+        }, synchronize_session=False)
+        # The batch that completes the count closes the run
+        db.query(RegradeRun).filter(
+            RegradeRun.id == run_id,
+            RegradeRun.status == "running",
+            RegradeRun.regraded + RegradeRun.failed >= RegradeRun.total
+        ).update({"status": "completed", "finished_at": now}, synchronize_session=False)
+        db.commit()
+        invalidate_result_views(job_ids[sid] for sid, _ in graded)
+
+        result = {"run_id": run_id, "regraded": len(graded), "failed": failed, "score_changed": changed}
+        logger.info(f"Regrade batch of run {run_id} stored", extra=result)
+        return result
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
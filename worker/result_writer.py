@@ -0,0 +1,330 @@
+"""
+Batching DB writer for results published to the Redis stream.
+
+PERFORMANCE: One session and two commits per job scale linearly with the
+number of workers against Postgres. Workers with RESULT_PERSISTENCE=stream
+only XADD their results (services/result_publisher.py); this process
+persists them in bulk:
+- XREADGROUP up to RESULT_WRITER_BATCH_SIZE messages at once (waiting at
+  most RESULT_WRITER_BLOCK_MS for the first one)
+- Coalesces them per submission (the last result wins over earlier ones
+  and over "running") and writes the whole batch in one transaction:
+  one UPDATE for "running", one DELETE + bulk INSERT of TestResult rows
+  and one bulk UPDATE of Submission rows
+- XACK + XDEL only after the commit (at-least-once); replaying a message
+  rewrites the same rows, so redelivery is harmless
+- Messages left pending by a writer that died are claimed after
+  RESULT_WRITER_CLAIM_IDLE_MS (XAUTOCLAIM); several writers can share the
+  consumer group
+- A batch the database rejects for its data (IntegrityError, DataError, a
+  malformed message) is retried message by message; a message that still
+  fails is moved to RESULTS_DEAD_STREAM instead of blocking the stream
+- When the database itself fails (OperationalError, lost connection) nothing
+  else is acknowledged: the entries stay pending and are read again after
+  RESULT_WRITER_RETRY_MS
+- After the commit the new statuses are PUBLISHed in one pipeline
+  (services/submission_notifier.py) so waiting students get them at once
+
+Usage:
+    python -m worker.result_writer [--url redis://...] [--batch-size N] [--burst]
+"""
+import argparse
+import os
+import signal
+import socket
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import sys
+import pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from redis import Redis
+from redis.exceptions import ResponseError
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from backend.cache import RESULTS_GROUP, RESULTS_STREAM
+from backend.config import settings
+from backend.database import SessionLocal
+from backend.logging_config import get_logger
+from backend.models import Submission, TestResult
+from .services.result_publisher import decode_message
+from .services.submission_notifier import submission_notifier
+
+logger = get_logger(__name__)
+
+RESULT_WRITER_BATCH_SIZE = int(os.getenv("RESULT_WRITER_BATCH_SIZE", "500"))
+RESULT_WRITER_BLOCK_MS = int(os.getenv("RESULT_WRITER_BLOCK_MS", "1000"))
+RESULT_WRITER_CLAIM_IDLE_MS = int(os.getenv("RESULT_WRITER_CLAIM_IDLE_MS", "60000"))
+RESULT_WRITER_RETRY_MS = int(os.getenv("RESULT_WRITER_RETRY_MS", "1000"))
+RESULTS_DEAD_STREAM = f"{RESULTS_STREAM}:dead"
+# Estados que un mensaje "running" puede pisar (nunca un resultado final)
+RUNNABLE_STATUSES = ("pending", "queued")
+# Failures caused by the message itself: retrying it can't help
+DATA_ERRORS = (IntegrityError, DataError, KeyError, TypeError, ValueError)
+
+
+def coalesce(messages: List[Dict[str, Any]]) -> Tuple[List[int], Dict[int, Dict[str, Any]]]:
+    """
+    Reduce a batch (in stream order) to its effect per submission.
+
+    Returns:
+        Ids only marked running, and the last result message per submission
+    """
+    running: Dict[int, None] = {}
+    results: Dict[int, Dict[str, Any]] = {}
+    for message in messages:
+        submission_id = int(message["submission_id"])
+        if message["kind"] == "running":
+            running[submission_id] = None
+        elif message["kind"] == "result":
+            results[submission_id] = message
+    return [sid for sid in running if sid not in results], results
+
+
+def write_batch(db: Session, messages: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Persist decoded messages in one transaction (commits on success).
+
+    Returns:
+        Dictionary with the number of submissions marked running and finished
+    """
+    running, results = coalesce(messages)
+
+    if running:
+        db.query(Submission).filter(
+            Submission.id.in_(running), Submission.status.in_(RUNNABLE_STATUSES)
+        ).update({"status": "running"}, synchronize_session=False)
+
+    finished = 0
+    if results:
+        existing = {
+            row.id for row in db.query(Submission.id).filter(Submission.id.in_(list(results)))
+        }
+        missing = set(results) - existing
+        if missing:
+            logger.warning(
+                f"Dropping results of {len(missing)} unknown submissions",
+                extra={"submission_ids": sorted(missing)[:20]}
+            )
+        replaced = [
+            sid for sid in existing if results[sid].get("test_results") is not None
+        ]
+        if replaced:
+            # Idempotente: reemplazar (no agregar) los resultados por test
+            db.query(TestResult).filter(TestResult.submission_id.in_(replaced)).delete(
+                synchronize_session=False
+            )
+            db.bulk_insert_mappings(TestResult, [
+                {**row, "submission_id": sid}
+                for sid in replaced for row in results[sid]["test_results"]
+            ])
+        db.bulk_update_mappings(Submission, [
+            {
+                **results[sid]["fields"],
+                "id": sid,
+                "completed_at": datetime.fromisoformat(results[sid]["completed_at"]),
+            }
+            for sid in existing
+        ])
+        finished = len(existing)
+
+    db.commit()
+    return {"running": len(running), "finished": finished}
+
+
+class ResultWriter:
+    """Consumes RESULTS_STREAM in batches and writes them to the database"""
+
+    def __init__(
+        self,
+        client: Redis,
+        consumer: Optional[str] = None,
+        batch_size: int = RESULT_WRITER_BATCH_SIZE,
+        block_ms: int = RESULT_WRITER_BLOCK_MS,
+        claim_idle_ms: int = RESULT_WRITER_CLAIM_IDLE_MS,
+        retry_ms: int = RESULT_WRITER_RETRY_MS,
+        session_factory=None,
+        notifier=None
+    ):
+        self.client = client
+        self.consumer = consumer or socket.gethostname()
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.retry_ms = retry_ms
+        self.session_factory = session_factory or SessionLocal
+        self.notifier = notifier or submission_notifier
+        self._stop = False
+        # Primero lo que este consumidor recibió antes de reiniciarse
+        self._read_id = "0"
+
+    def ensure_group(self) -> None:
+        try:
+            self.client.xgroup_create(RESULTS_STREAM, RESULTS_GROUP, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def request_stop(self) -> None:
+        self._stop = True
+
+    def run(self, burst: bool = False) -> int:
+        """Write batches until stopped (or, with burst, until the stream is drained or the database fails)"""
+        self.ensure_group()
+        written = 0
+        logger.info(
+            "Result writer started",
+            extra={"consumer": self.consumer, "batch_size": self.batch_size}
+        )
+        while not self._stop:
+            try:
+                count = self.process_once(block=not burst)
+            except SQLAlchemyError as e:
+                if burst:
+                    raise
+                logger.warning(f"Database unavailable, result entries left pending: {e}")
+                time.sleep(self.retry_ms / 1000)
+                continue
+            written += count
+            if burst and count == 0:
+                break
+        return written
+
+    def _read(self, block: bool) -> List[Tuple[Any, Dict[Any, Any]]]:
+        claimed = self.client.xautoclaim(
+            RESULTS_STREAM, RESULTS_GROUP, self.consumer,
+            min_idle_time=self.claim_idle_ms, start_id="0-0", count=self.batch_size
+        )
+        entries = list(claimed[1]) if claimed else []
+        while len(entries) < self.batch_size:
+            response = self.client.xreadgroup(
+                RESULTS_GROUP, self.consumer, {RESULTS_STREAM: self._read_id},
+                count=self.batch_size - len(entries),
+                block=self.block_ms if block and not entries and self._read_id == ">" else None
+            )
+            read = response[0][1] if response else []
+            entries.extend(read)
+            if read or self._read_id == ">":
+                break
+            self._read_id = ">"
+        # XAUTOCLAIM devuelve None para entradas ya borradas del stream
+        return [(entry_id, fields) for entry_id, fields in entries if fields]
+
+    def process_once(self, block: bool = True) -> int:
+        """
+        Read, write and acknowledge one batch.
+
+        Only entries that were written or dead-lettered are acknowledged. If
+        the database fails, the rest stay pending (to be read again) and the
+        error is raised.
+
+        Returns:
+            Number of stream entries handled
+        """
+        entries = self._read(block)
+        if not entries:
+            return 0
+
+        done = []
+        decoded = []
+        for entry_id, fields in entries:
+            try:
+                decoded.append((entry_id, decode_message(fields)))
+            except (ValueError, TypeError) as e:
+                self._dead_letter(entry_id, fields, f"undecodable: {e}")
+                done.append(entry_id)
+
+        db: Session = self.session_factory()
+        try:
+            stats, written, written_ids, failure = self._write(db, decoded)
+        finally:
+            db.close()
+        done.extend(written_ids)
+
+        running, results = coalesce(written)
+        self.notifier.notify_many({
+            **{sid: "running" for sid in running},
+            **{sid: message["fields"].get("status") for sid, message in results.items()},
+        })
+
+        if done:
+            self.client.xack(RESULTS_STREAM, RESULTS_GROUP, *done)
+            self.client.xdel(RESULTS_STREAM, *done)
+        if failure is not None:
+            # Volver a leer primero los pendientes de este consumidor
+            self._read_id = "0"
+            raise failure
+        logger.debug("Result batch written", extra={"entries": len(entries), **stats})
+        return len(entries)
+
+    def _write(self, db: Session, decoded: List[Tuple[Any, Dict[str, Any]]]):
+        """
+        Write the batch, or message by message if its data is rejected.
+
+        Returns:
+            (stats, messages written, entry ids written or dead-lettered,
+            the database error that stopped the batch or None)
+        """
+        try:
+            stats = write_batch(db, [message for _, message in decoded])
+            return stats, [message for _, message in decoded], [entry_id for entry_id, _ in decoded], None
+        except DATA_ERRORS as e:
+            db.rollback()
+            logger.warning(f"Result batch rejected, writing one by one: {e}", extra={"entries": len(decoded)})
+            return self._write_each(db, decoded)
+        except SQLAlchemyError as e:
+            db.rollback()
+            return {"running": 0, "finished": 0}, [], [], e
+
+    def _write_each(self, db: Session, decoded: List[Tuple[Any, Dict[str, Any]]]):
+        stats = {"running": 0, "finished": 0}
+        written = []
+        done = []
+        for entry_id, message in decoded:
+            try:
+                for key, value in write_batch(db, [message]).items():
+                    stats[key] += value
+                written.append(message)
+            except DATA_ERRORS as e:
+                db.rollback()
+                self._dead_letter(entry_id, {"data": message}, str(e))
+            except SQLAlchemyError as e:
+                db.rollback()
+                return stats, written, done, e
+            done.append(entry_id)
+        return stats, written, done, None
+
+    def _dead_letter(self, entry_id: Any, fields: Dict[Any, Any], error: str) -> None:
+        logger.error(
+            f"Result message {entry_id} could not be written: {error}",
+            extra={"entry_id": str(entry_id)}
+        )
+        self.client.xadd(RESULTS_DEAD_STREAM, {
+            "entry_id": str(entry_id),
+            "data": str(fields.get(b"data", fields.get("data"))),
+            "error": error[:1000],
+        })
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Write streamed submission results to the database in batches")
+    parser.add_argument("--url", default=None, help="Redis URL (default: settings REDIS_HOST/PORT/DB)")
+    parser.add_argument("--batch-size", type=int, default=RESULT_WRITER_BATCH_SIZE)
+    parser.add_argument("--burst", action="store_true", help="Exit when the stream is drained")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        connection = Redis.from_url(args.url)
+    else:
+        connection = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB)
+
+    writer = ResultWriter(connection, batch_size=args.batch_size)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: writer.request_stop())
+    writer.run(burst=args.burst)
+
+
+if __name__ == "__main__":
+    main()
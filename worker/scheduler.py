@@ -4,6 +4,8 @@ RQ Scheduler for periodic tasks.
 PERFORMANCE: Automated maintenance tasks to prevent resource exhaustion.
 - Workspace cleanup: Every 30 minutes
 - Removes orphaned sandbox directories older than 1 hour
+- Container reaping: Every 5 minutes
+- Destroys run containers older than their time budget and logs their CPU use
 """
 import sys
 from pathlib import Path
@@ -51,6 +53,17 @@ def schedule_periodic_tasks():
 
     logger.info("Scheduled: workspace cleanup (every 30 minutes)")
 
+    # Schedule orphaned container reaping every 5 minutes
+    scheduler.cron(
+        cron_string="*/5 * * * *",  # Every 5 minutes
+        func="worker.services.container_reaper.reap_orphaned_containers",
+        queue_name="maintenance",
+        timeout="5m",
+        id="reap_containers"
+    )
+
+    logger.info("Scheduled: container reaping (every 5 minutes)")
+
     logger.info("All periodic tasks scheduled successfully")
 
 
@@ -0,0 +1,302 @@
+"""
+Adaptive limit on concurrent sandbox runs.
+
+PERFORMANCE: A fixed worker count is either too low (the queue backs up
+during class) or too high (containers contend for cores, run times inflate
+and correct solutions hit `timeout_sec`). The controller gates every
+sandbox run and resizes the gate from host signals:
+- CPU and memory pressure (PSI, /proc/pressure/{cpu,memory}, `some avg10`)
+- Available memory (/proc/meminfo) and load average per core
+- Recent run durations as a fraction of their `timeout_sec`
+Additive increase (+1 while saturated and the host is calm), multiplicative
+decrease (x0.75 under pressure), always within
+[SANDBOX_CONCURRENCY_MIN, SANDBOX_CONCURRENCY_MAX].
+A second, fixed gate caps simultaneous container creations
+(SANDBOX_MAX_CONCURRENT_CREATES) so bursts do not pile onto the Docker daemon.
+Decisions are exported to Redis DB 1 (see backend.cache.get_sandbox_concurrency_stats).
+"""
+import os
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterator, Optional
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.cache import redis_cache_client, SANDBOX_CONCURRENCY_PREFIX
+from backend.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+PRESSURE_ROOT = "/proc/pressure"
+MEMINFO_PATH = "/proc/meminfo"
+
+ADJUST_INTERVAL_SEC = 5.0
+METRICS_TTL_SEC = 120
+RECENT_RUNS = 50
+# Shrink when any of these is exceeded...
+CPU_PRESSURE_HIGH = 40.0     # % of time some task waited for CPU (avg10)
+MEMORY_PRESSURE_HIGH = 10.0  # % of time some task stalled on memory (avg10)
+MEM_AVAILABLE_MIN = 0.10     # fraction of MemTotal
+LOAD_PER_CPU_HIGH = 1.5
+SLOW_RUN_RATIO = 0.8         # p90 of duration / timeout_sec
+# ...grow only when all of these hold and every slot is busy
+CPU_PRESSURE_LOW = 10.0
+LOAD_PER_CPU_LOW = 0.8
+FAST_RUN_RATIO = 0.5
+DECREASE_FACTOR = 0.75
+
+
+@dataclass
+class HostSignals:
+    """Snapshot of host load; None when a source is unavailable"""
+    cpu_pressure: Optional[float] = None
+    memory_pressure: Optional[float] = None
+    mem_available_ratio: Optional[float] = None
+    load_per_cpu: Optional[float] = None
+
+
+def read_pressure(resource: str, root: str = PRESSURE_ROOT) -> Optional[float]:
+    """
+    Read `some avg10` from a PSI file.
+
+    Returns:
+        Percentage of the last 10s in which some task stalled, or None if
+        PSI is unavailable (kernel < 4.20 or CONFIG_PSI disabled)
+    """
+    try:
+        text = Path(root, resource).read_text()
+    except OSError:
+        return None
+    for line in text.splitlines():
+        fields = line.split()
+        if fields and fields[0] == "some":
+            for field in fields[1:]:
+                key, _, value = field.partition("=")
+                if key == "avg10":
+                    return float(value)
+    return None
+
+
+def read_mem_available_ratio(path: str = MEMINFO_PATH) -> Optional[float]:
+    """MemAvailable / MemTotal from /proc/meminfo, or None if unavailable"""
+    values: Dict[str, int] = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("MemTotal", "MemAvailable"):
+                    values[key] = int(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    if not values.get("MemTotal") or "MemAvailable" not in values:
+        return None
+    return values["MemAvailable"] / values["MemTotal"]
+
+
+def read_host_signals() -> HostSignals:
+    """Collect all host signals (cheap: a few small procfs reads)"""
+    try:
+        load_per_cpu = os.getloadavg()[0] / (os.cpu_count() or 1)
+    except OSError:
+        load_per_cpu = None
+    return HostSignals(
+        cpu_pressure=read_pressure("cpu"),
+        memory_pressure=read_pressure("memory"),
+        mem_available_ratio=read_mem_available_ratio(),
+        load_per_cpu=load_per_cpu
+    )
+
+
+class ConcurrencyController:
+    """Resizable gate for sandbox runs plus a fixed gate for container creation"""
+
+    def __init__(
+        self,
+        min_limit: int = None,
+        max_limit: int = None,
+        max_creates: int = None,
+        adaptive: bool = None,
+        adjust_interval: float = ADJUST_INTERVAL_SEC,
+        signal_reader: Callable[[], HostSignals] = read_host_signals,
+        metrics_client=None,
+        name: str = None
+    ):
+        self.min_limit = max(1, min_limit or int(os.getenv("SANDBOX_CONCURRENCY_MIN", "1")))
+        self.max_limit = max(
+            self.min_limit,
+            max_limit or int(os.getenv("SANDBOX_CONCURRENCY_MAX", str(os.cpu_count() or 1)))
+        )
+        self.max_creates = max(1, max_creates or int(os.getenv("SANDBOX_MAX_CONCURRENT_CREATES", "4")))
+        if adaptive is None:
+            adaptive = os.getenv("SANDBOX_CONCURRENCY_ADAPTIVE", "1") == "1"
+        self.adaptive = adaptive
+        self.adjust_interval = adjust_interval
+        self.signal_reader = signal_reader
+        self.metrics_client = metrics_client if metrics_client is not None else redis_cache_client
+        self.metrics_key = f"{SANDBOX_CONCURRENCY_PREFIX}:{name or f'{socket.gethostname()}-{os.getpid()}'}"
+
+        # Adaptive mode starts halfway and moves with the host signals
+        self.limit = (self.min_limit + self.max_limit) // 2 if adaptive else self.max_limit
+        self.in_flight = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+        self._creates = threading.BoundedSemaphore(self.max_creates)
+        self._recent: Deque[float] = deque(maxlen=RECENT_RUNS)
+        self._last_adjust = 0.0
+        self.last_decision = "init"
+        self.last_signals = HostSignals()
+
+    @contextmanager
+    def run_slot(self) -> Iterator[None]:
+        """Hold one sandbox run slot; blocks while the limit is reached"""
+        while True:
+            self.maybe_adjust()
+            with self._cond:
+                if self.in_flight < self.limit:
+                    self.in_flight += 1
+                    break
+                # Wake up periodically: a re-evaluation may raise the limit
+                self.waiting += 1
+                self._cond.wait(timeout=self.adjust_interval)
+                self.waiting -= 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify()
+
+    @contextmanager
+    def create_slot(self) -> Iterator[None]:
+        """Hold one of the SANDBOX_MAX_CONCURRENT_CREATES container creation slots"""
+        self._creates.acquire()
+        try:
+            yield
+        finally:
+            self._creates.release()
+
+    def record_run(self, duration: float, timeout_sec: float, timed_out: bool = False) -> None:
+        """Feed a finished run's duration (relative to its timeout) into the controller"""
+        # A timed-out run is usually an infinite loop in the code, not host contention
+        if not timeout_sec or timed_out:
+            return
+        with self._cond:
+            self._recent.append(duration / timeout_sec)
+
+    def slow_run_ratio(self) -> Optional[float]:
+        """p90 of recent duration/timeout ratios, None without enough samples"""
+        with self._cond:
+            recent = sorted(self._recent)
+        if len(recent) < 5:
+            return None
+        return recent[int(0.9 * (len(recent) - 1))]
+
+    def maybe_adjust(self) -> None:
+        """Re-evaluate the limit if adjust_interval has elapsed"""
+        if not self.adaptive:
+            return
+        with self._cond:
+            now = time.monotonic()
+            if now - self._last_adjust < self.adjust_interval:
+                return
+            self._last_adjust = now
+        self.adjust()
+
+    def adjust(self) -> str:
+        """
+        Read host signals and move the limit one step.
+
+        Returns:
+            Decision: "decrease:<reason>", "increase" or "hold"
+        """
+        signals = self.signal_reader()
+        run_ratio = self.slow_run_ratio()
+        reason = self._pressure_reason(signals, run_ratio)
+
+        with self._cond:
+            old = self.limit
+            saturated = self.in_flight + self.waiting >= self.limit
+            if reason:
+                self.limit = max(self.min_limit, min(old - 1, int(old * DECREASE_FACTOR)))
+                decision = f"decrease:{reason}"
+            elif saturated and self._is_calm(signals, run_ratio):
+                self.limit = min(self.max_limit, old + 1)
+                decision = "increase"
+            else:
+                decision = "hold"
+            if self.limit == old and decision != "hold":
+                decision = f"{decision}:at-bound"
+            self.last_decision = decision
+            self.last_signals = signals
+            self._cond.notify_all()
+
+        if self.limit != old:
+            logger.info(
+                "Sandbox concurrency limit changed",
+                extra={"old_limit": old, "new_limit": self.limit, "decision": decision, **asdict(signals)}
+            )
+        self._export_metrics(run_ratio)
+        return decision
+
+    def stats(self) -> Dict[str, object]:
+        """Current limit, usage and the last decision with its inputs"""
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "max_creates": self.max_creates,
+                "decision": self.last_decision,
+                **{k: v for k, v in asdict(self.last_signals).items() if v is not None}
+            }
+
+    @staticmethod
+    def _pressure_reason(signals: HostSignals, run_ratio: Optional[float]) -> Optional[str]:
+        """Name of the first signal over its high-water mark, if any"""
+        if signals.memory_pressure is not None and signals.memory_pressure >= MEMORY_PRESSURE_HIGH:
+            return "memory-pressure"
+        if signals.mem_available_ratio is not None and signals.mem_available_ratio < MEM_AVAILABLE_MIN:
+            return "low-memory"
+        if signals.cpu_pressure is not None and signals.cpu_pressure >= CPU_PRESSURE_HIGH:
+            return "cpu-pressure"
+        if signals.cpu_pressure is None and signals.load_per_cpu is not None \
+                and signals.load_per_cpu >= LOAD_PER_CPU_HIGH:
+            return "load"
+        if run_ratio is not None and run_ratio >= SLOW_RUN_RATIO:
+            return "slow-runs"
+        return None
+
+    @staticmethod
+    def _is_calm(signals: HostSignals, run_ratio: Optional[float]) -> bool:
+        """True when there is clear headroom for one more run"""
+        if signals.cpu_pressure is not None:
+            if signals.cpu_pressure >= CPU_PRESSURE_LOW:
+                return False
+        elif signals.load_per_cpu is not None and signals.load_per_cpu >= LOAD_PER_CPU_LOW:
+            return False
+        return run_ratio is None or run_ratio < FAST_RUN_RATIO
+
+    def _export_metrics(self, run_ratio: Optional[float]) -> None:
+        """Publish the current decision (best effort, short TTL)"""
+        stats = self.stats()
+        if run_ratio is not None:
+            stats["p90_run_ratio"] = round(run_ratio, 3)
+        stats["updated_at"] = time.time()
+        try:
+            pipe = self.metrics_client.pipeline()
+            pipe.hset(self.metrics_key, mapping={k: str(v) for k, v in stats.items()})
+            pipe.expire(self.metrics_key, METRICS_TTL_SEC)
+            pipe.execute()
+        except Exception as e:
+            logger.debug(f"Failed to export concurrency metrics: {e}")
+
+
+# Singleton instance (one per worker process)
+concurrency_controller = ConcurrencyController()
@@ -0,0 +1,269 @@
+"""
+Warm container pool for DockerRunner.
+
+PERFORMANCE: Takes container creation off the critical path of a submission.
+- Keeps SANDBOX_POOL_SIZE idle runner containers started per resource profile
+- A job leases one container, runs pytest inside it via `docker exec` and the
+  container is destroyed after that single use
+- Destruction and refill happen in background threads
+- Same isolation as `docker run --rm`: network none, identical memory/CPU
+  limits and a private workspace bind mount per container
+
+NOTE: The pool lives in the worker process. Run the worker without forking
+(`rq worker -w rq.worker.SimpleWorker submissions`, or worker/async_worker.py)
+so warm containers survive between jobs. A forking work horse exits with
+os._exit() after its job, which would leak the containers of its pool, so
+DockerRunner does not create one there.
+Refills go through `creation_gate` (the concurrency controller's creation
+slots) so a burst of leases does not start every replacement at once.
+"""
+import contextlib
+import atexit
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, ContextManager, Deque, Dict, List, Optional, Tuple
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+POOL_LABEL = "py-playground.pool"
+DEFAULT_MAX_IDLE_SEC = 1800  # Below WorkspaceCleaner.MAX_AGE_SECONDS (1 hour)
+START_TIMEOUT_SEC = 30
+
+# (memory_mb, cpus)
+PoolProfile = Tuple[int, str]
+
+
+@dataclass
+class PooledContainer:
+    """A started, idle runner container reserved for a single job"""
+    container_id: str
+    workspace: Optional[str]  # Path inside the worker container (None: tmpfs workspace)
+    memory_mb: int
+    cpus: str
+    created_at: float = field(default_factory=time.time)
+
+
+class ContainerPool:
+    """Pool of pre-started, single-use runner containers"""
+
+    def __init__(
+        self,
+        runner_image: str,
+        workspace_dir: str,
+        host_workspace_dir: str,
+        size: int,
+        limit_args: Callable[[int, str], List[str]],
+        max_idle_sec: float = DEFAULT_MAX_IDLE_SEC,
+        bind_workspace: bool = True,
+        container_args: Optional[List[str]] = None,
+        container_command: Optional[List[str]] = None,
+        creation_gate: Callable[[], ContextManager] = contextlib.nullcontext
+    ):
+        self.runner_image = runner_image
+        self.workspace_dir = workspace_dir
+        self.host_workspace_dir = host_workspace_dir
+        self.size = size
+        self.limit_args = limit_args
+        self.max_idle_sec = max_idle_sec
+        self.bind_workspace = bind_workspace
+        self.container_args = container_args or []
+        self.container_command = container_command or ["sleep", "infinity"]
+        self.creation_gate = creation_gate
+
+        self._lock = threading.Lock()
+        self._idle: Dict[PoolProfile, Deque[PooledContainer]] = {}
+        self._starting: Dict[PoolProfile, int] = {}
+        self._closed = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(2, size),
+            thread_name_prefix="sandbox-pool"
+        )
+        atexit.register(self.shutdown)
+
+    def acquire(self, memory_mb: int, cpus: str) -> Optional[PooledContainer]:
+        """
+        Take an idle container for the given limits.
+
+        Args:
+            memory_mb: Memory limit the container must have been started with
+            cpus: CPU limit the container must have been started with
+
+        Returns:
+            PooledContainer, or None when no warm container is available
+            (the caller should fall back to a cold `docker run`)
+        """
+        profile = (memory_mb, cpus)
+        expired: List[PooledContainer] = []
+        lease = None
+
+        with self._lock:
+            idle = self._idle.setdefault(profile, deque())
+            now = time.time()
+            while idle:
+                candidate = idle.popleft()
+                if now - candidate.created_at > self.max_idle_sec:
+                    expired.append(candidate)
+                    continue
+                lease = candidate
+                break
+
+        for container in expired:
+            self._submit(self._destroy, container)
+        self._submit(self._refill, profile)
+
+        if lease is None:
+            logger.info(
+                "Sandbox pool empty, falling back to cold start",
+                extra={"memory_mb": memory_mb, "cpus": cpus}
+            )
+        return lease
+
+    def release(self, container: PooledContainer) -> None:
+        """
+        Give a used container back. It is never reused: it is destroyed and a
+        fresh one is started in its place.
+        """
+        self._submit(self._destroy, container)
+        self._submit(self._refill, (container.memory_mb, container.cpus))
+
+    def stats(self) -> Dict[str, int]:
+        """Return idle/starting counts across all profiles"""
+        with self._lock:
+            return {
+                "idle": sum(len(q) for q in self._idle.values()),
+                "starting": sum(self._starting.values()),
+                "profiles": len(self._idle)
+            }
+
+    def shutdown(self) -> None:
+        """Destroy all idle containers (called at interpreter exit)"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            idle = [c for q in self._idle.values() for c in q]
+            self._idle.clear()
+
+        for container in idle:
+            self._destroy(container)
+        self._executor.shutdown(wait=False)
+
+    def _submit(self, fn, *args) -> None:
+        """Run fn in the background unless the pool is shutting down"""
+        if self._closed:
+            return
+        try:
+            self._executor.submit(fn, *args)
+        except RuntimeError:
+            # Executor already shut down
+            pass
+
+    def _refill(self, profile: PoolProfile) -> None:
+        """Start containers until the profile has `size` idle or starting"""
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                have = len(self._idle.get(profile, ())) + self._starting.get(profile, 0)
+                if have >= self.size:
+                    return
+                self._starting[profile] = self._starting.get(profile, 0) + 1
+
+            try:
+                container = self._start(*profile)
+            except Exception as e:
+                logger.error(
+                    f"Failed to start pooled container: {e}",
+                    extra={"memory_mb": profile[0], "cpus": profile[1]},
+                    exc_info=True
+                )
+                with self._lock:
+                    self._starting[profile] -= 1
+                return
+
+            with self._lock:
+                self._starting[profile] -= 1
+                if not self._closed:
+                    self._idle.setdefault(profile, deque()).append(container)
+                    continue
+
+            # Pool closed while the container was starting
+            self._destroy(container)
+            return
+
+    def _start(self, memory_mb: int, cpus: str) -> PooledContainer:
+        """Start one idle container, with its own workspace directory in bind mode"""
+        workspace = None
+        mount_args: List[str] = []
+        if self.bind_workspace:
+            workspace = tempfile.mkdtemp(prefix="sandbox-pool-", dir=self.workspace_dir)
+            os.chmod(workspace, 0o777)
+            workspace_rel = workspace.replace(self.workspace_dir, "").lstrip("/")
+            host_workspace = f"{self.host_workspace_dir}/{workspace_rel}"
+            mount_args = ["-v", f"{host_workspace}:/workspace:rw"]
+
+        cmd = [
+            "docker", "run", "-d", "--rm",
+            *self.limit_args(memory_mb, cpus),
+            "--label", f"{POOL_LABEL}=1",
+            *mount_args,
+            "-w", "/workspace",
+            *self.container_args,
+            self.runner_image,
+            *self.container_command
+        ]
+        try:
+            with self.creation_gate():
+                result = subprocess.run(
+                    cmd, capture_output=True, text=True, timeout=START_TIMEOUT_SEC
+                )
+        except Exception:
+            self._remove_workspace(workspace)
+            raise
+
+        if result.returncode != 0:
+            self._remove_workspace(workspace)
+            raise RuntimeError(f"docker run failed: {result.stderr.strip()}")
+
+        container = PooledContainer(
+            container_id=result.stdout.strip(),
+            workspace=workspace,
+            memory_mb=memory_mb,
+            cpus=cpus
+        )
+        logger.debug(
+            "Started pooled container",
+            extra={"container_id": container.container_id[:12], "memory_mb": memory_mb}
+        )
+        return container
+
+    def _destroy(self, container: PooledContainer) -> None:
+        """Kill and remove a container and delete its workspace"""
+        try:
+            subprocess.run(
+                ["docker", "rm", "-f", container.container_id],
+                capture_output=True, text=True, timeout=START_TIMEOUT_SEC
+            )
+        except Exception as e:
+            logger.warning(
+                f"Failed to remove pooled container: {e}",
+                extra={"container_id": container.container_id[:12]}
+            )
+        self._remove_workspace(container.workspace)
+
+    @staticmethod
+    def _remove_workspace(workspace: Optional[str]) -> None:
+        if workspace:
+            shutil.rmtree(workspace, ignore_errors=True)
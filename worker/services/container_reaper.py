@@ -0,0 +1,158 @@
+"""
+Reaper for orphaned sandbox containers.
+
+PERFORMANCE: A run container that outlives its job (worker killed mid-run,
+failed `docker rm -f` after a timeout, daemon hiccup) keeps burning a core
+until its code exits on its own, which for an infinite loop is never.
+- Runs every 5 minutes via RQ scheduler
+- Finds containers labeled with a submission (SUBMISSION_LABEL) that are
+  older than their time budget (BUDGET_LABEL) plus a grace period
+- Reads their CPU usage, then force-removes them (kill + remove)
+- Reports the CPU seconds they consumed, per container and in total
+Warm pool containers are not labeled with a submission and are left alone.
+"""
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from .docker_api import DockerEngineClient, DEFAULT_SOCKET_PATH
+from .docker_runner import BUDGET_LABEL, SUBMISSION_LABEL
+from backend.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+GRACE_SEC = 60
+# Budget assumed for labeled containers whose budget label is missing or invalid
+DEFAULT_BUDGET_SEC = 600
+REAP_BATCH_SIZE = 100
+
+
+class ContainerReaper:
+    """Service for destroying run containers that outlived their budget"""
+
+    def __init__(self, client: DockerEngineClient = None, grace_sec: float = GRACE_SEC):
+        self.client = client or DockerEngineClient(
+            socket_path=os.getenv("DOCKER_SOCKET", DEFAULT_SOCKET_PATH)
+        )
+        self.grace_sec = grace_sec
+
+    def find_overdue(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Find labeled run containers older than their budget plus the grace period.
+
+        Args:
+            now: Current time (epoch seconds), for tests
+
+        Returns:
+            Container summaries from the Engine API, oldest first
+        """
+        now = time.time() if now is None else now
+        overdue = []
+        for container in self.client.list_containers(SUBMISSION_LABEL):
+            labels = container.get("Labels") or {}
+            try:
+                budget = float(labels.get(BUDGET_LABEL, DEFAULT_BUDGET_SEC))
+            except ValueError:
+                budget = DEFAULT_BUDGET_SEC
+            age = now - container.get("Created", now)
+            if age > budget + self.grace_sec:
+                overdue.append(container)
+        return sorted(overdue, key=lambda c: c.get("Created", 0))
+
+    def reap_container(self, container: Dict[str, Any]) -> Tuple[bool, Optional[float], str]:
+        """
+        Destroy one container, reading its CPU usage first.
+
+        Args:
+            container: Container summary from find_overdue()
+
+        Returns:
+            Tuple of (success, CPU seconds consumed or None, error message)
+        """
+        container_id = container["Id"]
+        submission = (container.get("Labels") or {}).get(SUBMISSION_LABEL) or None
+        cpu_sec = None
+        try:
+            if container.get("State") == "running":
+                stats = self.client.container_stats(container_id)
+                usage_ns = stats.get("cpu_stats", {}).get("cpu_usage", {}).get("total_usage")
+                if usage_ns is not None:
+                    cpu_sec = round(usage_ns / 1e9, 3)
+            self.client.remove_container(container_id, force=True)
+        except Exception as e:
+            logger.error(
+                f"Failed to reap container {container_id[:12]}: {e}",
+                extra={"container_id": container_id[:12], "submission_id": submission},
+                exc_info=True
+            )
+            return False, cpu_sec, str(e)
+
+        logger.warning(
+            f"Reaped orphaned container {container_id[:12]}",
+            extra={
+                "container_id": container_id[:12],
+                "submission_id": submission,
+                "state": container.get("State"),
+                "age_seconds": int(time.time() - container.get("Created", time.time())),
+                "cpu_sec": cpu_sec,
+            }
+        )
+        return True, cpu_sec, ""
+
+    def reap_all(self) -> dict:
+        """
+        Find and destroy all overdue run containers.
+
+        Returns:
+            Dictionary with reaping statistics
+        """
+        overdue = self.find_overdue()
+        if not overdue:
+            logger.info("No orphaned containers found")
+            return {"found": 0, "reaped": 0, "failed": 0, "cpu_sec": 0.0, "errors": []}
+
+        reaped = 0
+        failed = 0
+        cpu_total = 0.0
+        errors = []
+
+        # Limit batch size to prevent long-running jobs
+        for container in overdue[:REAP_BATCH_SIZE]:
+            success, cpu_sec, error_msg = self.reap_container(container)
+            cpu_total += cpu_sec or 0.0
+            if success:
+                reaped += 1
+            else:
+                failed += 1
+                errors.append(f"{container['Id'][:12]}: {error_msg}")
+
+        result = {
+            "found": len(overdue),
+            "reaped": reaped,
+            "failed": failed,
+            "cpu_sec": round(cpu_total, 3),
+            "errors": errors
+        }
+
+        logger.info(
+            "Container reaping completed",
+            extra=result
+        )
+
+        return result
+
+
+# Singleton instance
+container_reaper = ContainerReaper()
+
+
+def reap_orphaned_containers():
+    """
+    RQ job function for scheduled container reaping.
+
+    This function is called by RQ scheduler every 5 minutes.
+    """
+    return container_reaper.reap_all()
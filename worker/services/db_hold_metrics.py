@@ -0,0 +1,70 @@
+"""
+DB connection hold time of submission jobs.
+
+PERFORMANCE: A job used to keep its session (and pooled connection) open
+for the whole sandbox run, so Postgres connections sat idle in transaction
+for seconds. Jobs now open a short session per phase (claim, persist,
+fail) around the DB-free sandbox run; this module measures each phase
+from session creation to close and keeps running totals in Redis DB 1
+(see backend.cache.get_db_hold_stats). Jobs holding connections longer
+than DB_HOLD_SLOW_MS in total are counted separately.
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy.orm import Session
+
+from backend.cache import redis_cache_client, DB_HOLD_STATS_KEY
+from backend.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DB_HOLD_SLOW_MS = float(os.getenv("DB_HOLD_SLOW_MS", "100"))
+
+
+class DbHoldMetrics:
+    """Times short DB phases of a job and exports the totals"""
+
+    def __init__(self, client=None, slow_ms: float = DB_HOLD_SLOW_MS):
+        self.client = client if client is not None else redis_cache_client
+        self.slow_ms = slow_ms
+
+    @contextmanager
+    def phase(self, name: str, session_factory: Callable[[], Session], hold_ms: Dict[str, float]) -> Iterator[Session]:
+        """
+        Open a session for one phase; its lifetime is added to hold_ms[name].
+
+        Rolls back on error and always closes (returning the connection to the pool).
+        """
+        start = time.perf_counter()
+        db = session_factory()
+        try:
+            yield db
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+            hold_ms[name] = hold_ms.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def record(self, hold_ms: Dict[str, float]) -> None:
+        """Add one job's phase timings to the totals (never fails the job)"""
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hincrby(DB_HOLD_STATS_KEY, "jobs", 1)
+            for name, ms in hold_ms.items():
+                pipe.hincrbyfloat(DB_HOLD_STATS_KEY, f"{name}_ms", round(ms, 3))
+            if sum(hold_ms.values()) > self.slow_ms:
+                pipe.hincrby(DB_HOLD_STATS_KEY, "slow_jobs", 1)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not record DB hold time: {e}")
+
+
+# Singleton instance
+db_hold_metrics = DbHoldMetrics()
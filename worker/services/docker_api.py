@@ -0,0 +1,351 @@
+"""
+Minimal Docker Engine API client over the unix socket.
+
+PERFORMANCE: Replaces a `docker` CLI process per call with HTTP requests on
+persistent keep-alive connections to /var/run/docker.sock.
+- Connections are pooled and reused across jobs and threads
+- Only the endpoints the sandbox needs: create, attach (stdin), start, wait,
+  logs (whole or followed), kill, remove, inspect, and list + stats for the
+  container reaper
+- Standard library only (http.client), no docker SDK dependency
+"""
+import http.client
+import json
+import queue
+import socket
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.exceptions import DockerExecutionError
+from backend.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_SOCKET_PATH = "/var/run/docker.sock"
+DEFAULT_API_VERSION = "v1.41"
+DEFAULT_POOL_SIZE = 8
+DEFAULT_TIMEOUT_SEC = 30.0
+
+# Multiplexed log stream header: stream type (1 byte), padding (3), size (4, big endian)
+_LOG_HEADER = struct.Struct(">BxxxI")
+STDOUT_STREAM, STDERR_STREAM = 1, 2
+LOG_READ_BYTES = 64 * 1024
+
+
+class DockerAPIError(DockerExecutionError):
+    """Docker Engine API returned an error status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Docker API error {status}: {message}")
+        self.status = status
+
+
+def _api_error(status: int, data: bytes) -> DockerAPIError:
+    """Error for a failed response, with the daemon's message when it sent one"""
+    try:
+        message = json.loads(data).get("message", "")
+    except ValueError:
+        message = data.decode(errors="replace")
+    return DockerAPIError(status, message)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection that connects to a unix domain socket"""
+
+    def __init__(self, socket_path: str, timeout: float = DEFAULT_TIMEOUT_SEC):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+def demux_logs(data: bytes) -> Tuple[bytes, bytes]:
+    """
+    Split a multiplexed (non-TTY) log stream into stdout and stderr.
+
+    Args:
+        data: Raw body of GET /containers/{id}/logs
+
+    Returns:
+        Tuple of (stdout bytes, stderr bytes)
+    """
+    stdout, stderr = bytearray(), bytearray()
+    offset = 0
+    while offset + _LOG_HEADER.size <= len(data):
+        stream, size = _LOG_HEADER.unpack_from(data, offset)
+        offset += _LOG_HEADER.size
+        chunk = data[offset:offset + size]
+        offset += size
+        if stream == STDERR_STREAM:
+            stderr += chunk
+        else:
+            stdout += chunk
+    return bytes(stdout), bytes(stderr)
+
+
+class DockerEngineClient:
+    """Thread-safe Docker Engine API client with a keep-alive connection pool"""
+
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        api_version: str = DEFAULT_API_VERSION,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT_SEC
+    ):
+        self.socket_path = socket_path
+        self.api_version = api_version
+        self.timeout = timeout
+        self._pool: "queue.LifoQueue[UnixHTTPConnection]" = queue.LifoQueue(maxsize=pool_size)
+
+    def _acquire(self, timeout: float) -> UnixHTTPConnection:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            return UnixHTTPConnection(self.socket_path, timeout=timeout)
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn
+
+    def _release(self, conn: UnixHTTPConnection) -> None:
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Optional[Any] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[int, bytes]:
+        """
+        Send one API request on a pooled connection.
+
+        Args:
+            method: HTTP method
+            path: API path without version prefix (e.g. "/containers/create")
+            params: Query string parameters
+            body: JSON-serializable request body
+            timeout: Socket timeout for this request (defaults to client timeout)
+
+        Returns:
+            Tuple of (status code, response body)
+
+        Raises:
+            TimeoutError: The daemon did not answer within the timeout
+            DockerAPIError: The daemon answered with status >= 400
+        """
+        url = f"/{self.api_version}{path}"
+        if params:
+            url += "?" + urlencode(params)
+        headers = {"Host": "docker"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+
+        status, data = self._send(method, url, payload, headers, timeout or self.timeout)
+        if status >= 400:
+            raise _api_error(status, data)
+        return status, data
+
+    def _send(
+        self, method: str, url: str, payload: Optional[bytes], headers: Dict[str, str], timeout: float
+    ) -> Tuple[int, bytes]:
+        # A pooled connection may have been closed by the daemon since its last
+        # use; retry once on a fresh connection in that case.
+        for attempt in (1, 2):
+            conn = self._acquire(timeout)
+            reused = conn.sock is not None
+            try:
+                conn.request(method, url, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except socket.timeout as e:
+                conn.close()
+                raise TimeoutError(f"Docker API {method} {url} timed out after {timeout}s") from e
+            except (ConnectionError, http.client.HTTPException):
+                conn.close()
+                if reused and attempt == 1:
+                    continue
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return response.status, data
+
+    def create_container(self, config: Dict[str, Any], name: Optional[str] = None) -> str:
+        """Create a container and return its ID"""
+        params = {"name": name} if name else None
+        _, data = self.request("POST", "/containers/create", params=params, body=config)
+        return json.loads(data)["Id"]
+
+    def start_container(self, container_id: str) -> None:
+        self.request("POST", f"/containers/{quote(container_id)}/start")
+
+    def attach_stdin(self, container_id: str) -> socket.socket:
+        """
+        Attach to a created container's stdin.
+
+        The connection is hijacked (HTTP upgrade to a raw stream), so it gets a
+        dedicated socket that is never returned to the pool. Attach before
+        start_container(); write the input, then shutdown(SHUT_WR) to send EOF.
+
+        Returns:
+            Connected socket writing to the container's stdin
+        """
+        conn = UnixHTTPConnection(self.socket_path, timeout=self.timeout)
+        url = f"/{self.api_version}/containers/{quote(container_id)}/attach?stream=1&stdin=1"
+        conn.request("POST", url, headers={
+            "Host": "docker", "Connection": "Upgrade", "Upgrade": "tcp"
+        })
+        response = conn.getresponse()
+        if response.status != 101:
+            data = response.read()
+            conn.close()
+            raise _api_error(response.status, data)
+        sock = conn.sock
+        conn.sock = None  # Detach the raw socket from http.client
+        return sock
+
+    def wait_container(self, container_id: str, timeout: float) -> int:
+        """
+        Block until the container exits.
+
+        Raises:
+            TimeoutError: Container still running after `timeout` seconds
+        """
+        _, data = self.request("POST", f"/containers/{quote(container_id)}/wait", timeout=timeout)
+        return int(json.loads(data).get("StatusCode", -1))
+
+    def container_logs(self, container_id: str, decode: bool = True) -> Tuple:
+        """Return (stdout, stderr) of a container, as str or raw bytes"""
+        _, data = self.request(
+            "GET", f"/containers/{quote(container_id)}/logs",
+            params={"stdout": 1, "stderr": 1}
+        )
+        stdout, stderr = demux_logs(data)
+        if not decode:
+            return stdout, stderr
+        return stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+    def stream_logs(self, container_id: str, timeout: float) -> Iterator[Tuple[int, bytes]]:
+        """
+        Follow a container's output as it is produced, until it exits.
+
+        Uses a dedicated connection, closed when the generator is closed, so
+        the caller can stop reading at any point. Frames are yielded as their
+        bytes arrive, never buffered whole.
+
+        Args:
+            container_id: Container to follow
+            timeout: Seconds without any output before giving up
+
+        Yields:
+            (stream, chunk) with stream 1 = stdout, 2 = stderr
+
+        Raises:
+            TimeoutError: No output for `timeout` seconds
+            DockerAPIError: The daemon answered with status >= 400
+        """
+        conn = UnixHTTPConnection(self.socket_path, timeout=timeout)
+        url = f"/{self.api_version}/containers/{quote(container_id)}/logs?" + urlencode(
+            {"follow": 1, "stdout": 1, "stderr": 1}
+        )
+        try:
+            try:
+                conn.request("GET", url, headers={"Host": "docker"})
+                response = conn.getresponse()
+                if response.status >= 400:
+                    raise DockerAPIError(response.status, response.read().decode(errors="replace"))
+                header = bytearray()
+                stream, remaining = STDOUT_STREAM, 0
+                while True:
+                    data = response.read1(LOG_READ_BYTES)
+                    if not data:
+                        return
+                    view = memoryview(data)
+                    while view:
+                        if remaining:
+                            chunk, view = view[:remaining], view[remaining:]
+                            remaining -= len(chunk)
+                            yield stream, bytes(chunk)
+                            continue
+                        needed = _LOG_HEADER.size - len(header)
+                        header += view[:needed]
+                        view = view[needed:]
+                        if len(header) == _LOG_HEADER.size:
+                            stream, remaining = _LOG_HEADER.unpack(header)
+                            header.clear()
+            except socket.timeout as e:
+                raise TimeoutError(f"No output from container {container_id[:12]} for {timeout}s") from e
+        finally:
+            conn.close()
+
+    def kill_container(self, container_id: str) -> None:
+        """Send SIGKILL; a container that already exited is not an error"""
+        try:
+            self.request("POST", f"/containers/{quote(container_id)}/kill")
+        except DockerAPIError as e:
+            if e.status not in (404, 409):
+                raise
+
+    def remove_container(self, container_id: str, force: bool = True) -> None:
+        """Remove a container; a container that is already gone is not an error"""
+        try:
+            self.request(
+                "DELETE", f"/containers/{quote(container_id)}",
+                params={"force": int(force), "v": 1}
+            )
+        except DockerAPIError as e:
+            if e.status != 404:
+                raise
+
+    def inspect_container(self, container_id: str) -> Dict[str, Any]:
+        _, data = self.request("GET", f"/containers/{quote(container_id)}/json")
+        return json.loads(data)
+
+    def list_containers(self, label: str, all: bool = True) -> List[Dict[str, Any]]:
+        """
+        List containers that carry a label
+
+        Args:
+            label: Label key (any value) or "key=value"
+            all: Include stopped containers
+
+        Returns:
+            Container summaries (Id, Names, Created, Labels, State, ...)
+        """
+        _, data = self.request("GET", "/containers/json", params={
+            "all": int(all),
+            "filters": json.dumps({"label": [label]})
+        })
+        return json.loads(data)
+
+    def container_stats(self, container_id: str) -> Dict[str, Any]:
+        """One-shot resource usage snapshot of a container"""
+        _, data = self.request(
+            "GET", f"/containers/{quote(container_id)}/stats", params={"stream": 0}
+        )
+        return json.loads(data)
+
+    def close(self) -> None:
+        """Close all pooled connections"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
@@ -0,0 +1,322 @@
+"""
+Docker Engine API runner - DockerRunner over the Docker socket
+
+PERFORMANCE: Same sandbox as DockerRunner (same limits, mounts and command)
+but driven through DockerEngineClient instead of spawning the `docker` CLI:
+no Go binary start-up, config parsing or new socket per job.
+
+Enable with SANDBOX_BACKEND=api. The warm pool (SANDBOX_POOL_SIZE) is only
+available on the CLI backend. In stream mode (SANDBOX_WORKSPACE_MODE=stream)
+the workspace tar is written to the container's attached stdin.
+Output is followed (logs?follow=1) into bounded buffers while the container
+runs, so an output flood is cut off without buffering it (output_capture.py).
+Runs hold a slot of the adaptive concurrency controller; create + start
+hold one of its container creation slots. Containers carry the same
+submission/budget labels as the CLI backend and are killed and removed on
+timeout. The problem store directory (tests_dir) is bind-mounted read-only.
+"""
+import os
+import socket
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .docker_api import DockerEngineClient, DEFAULT_SOCKET_PATH, STDERR_STREAM
+from .docker_runner import (
+    DockerRunner, DockerRunResult, PRECOMPILE_TIMEOUT_SEC, PROBLEM_MOUNT, WORKSPACE_TMPFS, run_labels
+)
+from .output_capture import OutputCapture
+from .workspace_archive import build_workspace_archive
+from backend.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class DockerAPIRunner(DockerRunner):
+    """Service for executing code in Docker containers through the Engine API"""
+
+    def __init__(self, client: DockerEngineClient = None, **kwargs):
+        kwargs["pool_size"] = 0
+        super().__init__(**kwargs)
+        self.client = client or DockerEngineClient(
+            socket_path=os.getenv("DOCKER_SOCKET", DEFAULT_SOCKET_PATH)
+        )
+
+    def run(
+        self,
+        workspace: str,
+        timeout_sec: float = 5.0,
+        memory_mb: int = None,
+        cpus: str = None,
+        test_timeout_sec: float = None,
+        max_output_bytes: int = None,
+        submission_id: int = None,
+        tests_dir: str = None
+    ) -> DockerRunResult:
+        """
+        Execute pytest in a Docker container
+
+        Args:
+            workspace: Path to workspace directory (in worker container)
+            timeout_sec: Execution timeout in seconds (budget for all tests)
+            memory_mb: Memory limit in MB
+            cpus: CPU limit as string (e.g., "1.0")
+            test_timeout_sec: Budget per test (see DockerRunner.run)
+            max_output_bytes: Output budget (see DockerRunner.run)
+            submission_id: Submission the container is labeled with
+            tests_dir: Problem store directory (see DockerRunner.run)
+
+        Returns:
+            DockerRunResult with execution details
+        """
+        memory_mb = memory_mb or self.default_memory_mb
+        cpus = cpus or self.default_cpus
+
+        config = self._build_config(
+            host_workspace=self._host_workspace(workspace),
+            memory_mb=memory_mb,
+            cpus=cpus,
+            budget=self._budget_args(timeout_sec, test_timeout_sec),
+            labels=run_labels(submission_id, timeout_sec),
+            host_tests_dir=self._host_store_path(tests_dir) if tests_dir else None
+        )
+        return self._run_container(config, timeout_sec, max_output_bytes=max_output_bytes)
+
+    def run_archive(
+        self,
+        files: Dict[str, bytes],
+        timeout_sec: float = 5.0,
+        memory_mb: int = None,
+        cpus: str = None,
+        test_timeout_sec: float = None,
+        max_output_bytes: int = None,
+        submission_id: int = None,
+        tests_dir: str = None
+    ) -> DockerRunResult:
+        """
+        Execute pytest on an in-memory workspace streamed over the attach API
+
+        Args:
+            files: Workspace files (name -> content)
+            timeout_sec: Execution timeout in seconds (budget for all tests)
+            memory_mb: Memory limit in MB
+            cpus: CPU limit as string (e.g., "1.0")
+            test_timeout_sec: Budget per test (see DockerRunner.run)
+            max_output_bytes: Output budget (see DockerRunner.run)
+            submission_id: Submission the container is labeled with
+            tests_dir: Problem store directory (see DockerRunner.run)
+
+        Returns:
+            DockerRunResult with execution details
+        """
+        memory_mb = memory_mb or self.default_memory_mb
+        cpus = cpus or self.default_cpus
+
+        config = self._build_config(
+            host_workspace=None,
+            memory_mb=memory_mb,
+            cpus=cpus,
+            budget=self._budget_args(timeout_sec, test_timeout_sec),
+            labels=run_labels(submission_id, timeout_sec),
+            host_tests_dir=self._host_store_path(tests_dir) if tests_dir else None
+        )
+        return self._run_container(
+            config, timeout_sec, stdin=build_workspace_archive(files), max_output_bytes=max_output_bytes
+        )
+
+    def _run_container(
+        self,
+        config: Dict[str, Any],
+        timeout_sec: float,
+        stdin: Optional[bytes] = None,
+        max_output_bytes: Optional[int] = None
+    ) -> DockerRunResult:
+        """
+        Create, run and remove one container, feeding `stdin` if given
+
+        The output is followed while the container runs into bounded buffers;
+        the container is killed on timeout or once it exceeds its output budget.
+        """
+        capture = OutputCapture(max_output_bytes)
+        with self.controller.run_slot():
+            start = time.time()
+            deadline = start + timeout_sec + 2  # +2 seg buffer
+            container_id = None
+            try:
+                with self.controller.create_slot():
+                    container_id = self.client.create_container(config)
+                    attached = self._attach_and_start(container_id, stdin)
+                if attached is not None:
+                    with attached:
+                        attached.sendall(stdin)
+                        attached.shutdown(socket.SHUT_WR)
+
+                timed_out, output_limited = self._follow_logs(container_id, capture, timeout_sec, deadline)
+                returncode, timed_out = self._finish(container_id, deadline, timed_out, output_limited)
+                duration = time.time() - start
+
+                stdout, stderr, test_details, usage = capture.result()
+                if timed_out:
+                    stderr = "Timeout expired"
+                if not usage and not (timed_out or output_limited):
+                    # The harness itself was killed; Docker knows whether it was OOM
+                    state = self.client.inspect_container(container_id).get("State", {})
+                    usage = {"oom_killed": bool(state.get("OOMKilled"))}
+            finally:
+                self._remove(container_id)
+
+        self.controller.record_run(duration, timeout_sec, timed_out)
+        return DockerRunResult(
+            stdout=stdout,
+            stderr=stderr,
+            returncode=returncode,
+            duration=duration,
+            timed_out=timed_out,
+            test_details=test_details,
+            usage=usage,
+            output_limited=output_limited
+        ).with_exit_info()
+
+    def _attach_and_start(self, container_id: str, stdin: Optional[bytes]) -> Optional[socket.socket]:
+        """Start the container, attached to its stdin first when there is input"""
+        attached = self.client.attach_stdin(container_id) if stdin is not None else None
+        self.client.start_container(container_id)
+        return attached
+
+    def _follow_logs(
+        self, container_id: str, capture: OutputCapture, timeout_sec: float, deadline: float
+    ) -> Tuple[bool, bool]:
+        """
+        Feed the container's output into `capture` until it exits or a limit is hit.
+
+        Returns:
+            Tuple of (timed_out, output_limited)
+        """
+        logs = self.client.stream_logs(container_id, timeout=timeout_sec + 2)
+        try:
+            for stream, chunk in logs:
+                (capture.feed_stderr if stream == STDERR_STREAM else capture.feed_stdout)(chunk)
+                if capture.exceeded:
+                    return False, True
+                if time.time() > deadline:
+                    return True, False
+        except TimeoutError:
+            return True, False
+        finally:
+            logs.close()
+        return False, False
+
+    def _finish(
+        self, container_id: str, deadline: float, timed_out: bool, output_limited: bool
+    ) -> Tuple[int, bool]:
+        """
+        Wait for the exit code, or kill the container if a limit was hit.
+
+        Returns:
+            Tuple of (returncode, timed_out); returncode is -1 when killed
+        """
+        if not (timed_out or output_limited):
+            try:
+                return self.client.wait_container(
+                    container_id, timeout=max(1.0, deadline - time.time())
+                ), False
+            except TimeoutError:
+                timed_out = True
+        self.client.kill_container(container_id)
+        return -1, timed_out
+
+    def _remove(self, container_id: Optional[str]) -> None:
+        if container_id is None:
+            return
+        try:
+            self.client.remove_container(container_id)
+        except Exception as e:
+            logger.warning(
+                f"Failed to remove container: {e}",
+                extra={"container_id": container_id[:12]}
+            )
+
+    def _build_config(
+        self,
+        host_workspace: Optional[str],
+        memory_mb: int,
+        cpus: str,
+        budget: List[str] = (),
+        labels: Optional[Dict[str, str]] = None,
+        host_tests_dir: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the container create body, equivalent to DockerRunner._build_command
+
+        Args:
+            host_workspace: Workspace path on host machine, or None to stream
+                the workspace into a tmpfs on stdin
+            memory_mb: Memory limit in MB
+            cpus: CPU limit as string
+            budget: Harness time budget flags
+            labels: Container labels (see run_labels)
+            host_tests_dir: Problem store directory on the host, mounted
+                read-only on PROBLEM_MOUNT
+
+        Returns:
+            JSON body for POST /containers/create
+        """
+        memory_bytes = memory_mb * 1024 * 1024
+        config = {
+            "Image": self.runner_image,
+            "Cmd": self._harness_command(
+                stream=host_workspace is None, zygote=False, budget=budget,
+                tests_mount=PROBLEM_MOUNT if host_tests_dir else None
+            ),
+            "WorkingDir": "/workspace",
+            "Labels": labels or {},
+            "NetworkDisabled": True,
+            "HostConfig": {
+                "NetworkMode": "none",
+                "Binds": [f"{host_workspace}:/workspace:rw"],
+                "Tmpfs": {"/tmp": "rw,noexec,nosuid,size=64m"},
+                "NanoCpus": int(float(cpus) * 1e9),
+                "Memory": memory_bytes,
+                "MemorySwap": memory_bytes,
+            },
+        }
+        if host_workspace is None:
+            _, tmpfs_options = WORKSPACE_TMPFS.split(":", 1)
+            config.update({"OpenStdin": True, "StdinOnce": True, "AttachStdin": True})
+            config["HostConfig"]["Binds"] = []
+            config["HostConfig"]["Tmpfs"]["/workspace"] = tmpfs_options
+        if host_tests_dir:
+            config["HostConfig"]["Binds"].append(f"{host_tests_dir}:{PROBLEM_MOUNT}:ro")
+        return config
+
+    def precompile_tests(self, store_dir: str) -> None:
+        """
+        Precompile a problem store directory with the runner image's pytest
+
+        Raises:
+            RuntimeError: The precompile container failed
+        """
+        config = {
+            "Image": self.runner_image,
+            "Cmd": ["python", "-m", "playground_harness", "precompile", PROBLEM_MOUNT],
+            "NetworkDisabled": True,
+            "HostConfig": {
+                "NetworkMode": "none",
+                "Binds": [f"{self._host_store_path(store_dir)}:{PROBLEM_MOUNT}:rw"],
+            },
+        }
+        container_id = None
+        try:
+            with self.controller.create_slot():
+                container_id = self.client.create_container(config)
+                self.client.start_container(container_id)
+            returncode = self.client.wait_container(container_id, timeout=PRECOMPILE_TIMEOUT_SEC)
+            if returncode != 0:
+                _, stderr = self.client.container_logs(container_id)
+                raise RuntimeError(f"precompile failed: {stderr.strip()[-500:]}")
+        finally:
+            if container_id is not None:
+                self.client.remove_container(container_id)
+
+
+# Singleton instance
+docker_api_runner = DockerAPIRunner()
@@ -1,11 +1,60 @@
 """
 Docker Runner Service - Executes code in isolated Docker containers
+
+PERFORMANCE: Optional warm pool (SANDBOX_POOL_SIZE > 0) keeps runner
+containers started ahead of time so a job only pays for `docker exec`.
+See worker/services/container_pool.py.
+With SANDBOX_ZYGOTE=1 pooled containers run the harness zygote, which has
+pytest already imported and forks one child per run
+(runner/playground_harness/zygote.py).
+With SANDBOX_WORKSPACE_MODE=stream, run_archive() streams the workspace as
+an in-memory tar into a tmpfs /workspace: no shared /workspaces volume is
+needed.
+Every run goes through the runner harness, whose pytest plugin streams one
+frame per test on stdout (see result_stream.py); results are decoded from
+the captured output, including partial output of a timed-out run.
+Output is read incrementally into bounded head/tail buffers and the
+container is killed once it exceeds its output budget (output_capture.py).
+Every run holds a slot of the adaptive concurrency controller
+(concurrency_controller.py), which also caps pool container creations.
+With PROBLEM_STORE_DIR set, cold containers mount the problem's precompiled
+tests read-only on /problem (problem_store.py); pooled containers, started
+before the job's problem is known, keep receiving the tests in the workspace.
+Cold containers are named and labeled with their submission and time
+budget: on timeout the container itself is removed (`docker rm -f`), not
+only the docker CLI process, and containers that escape that are destroyed
+by the periodic reaper (container_reaper.py).
 """
 import subprocess
+import shutil
 import time
 import os
-from typing import Dict, Any, Optional
-from dataclasses import dataclass
+import uuid
+from typing import Dict, Any, List, Optional
+from dataclasses import dataclass, field
+
+from .concurrency_controller import ConcurrencyController, concurrency_controller
+from .container_pool import ContainerPool, PooledContainer
+from .output_capture import OutputCapture, run_bounded
+from .sandbox_runner import SandboxRunner
+from .workspace_archive import build_workspace_archive
+from backend.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+ZYGOTE_SOCKET = "/tmp/zygote.sock"
+SANDBOX_USER = "1000:1000"
+# Harness exit code when a test ignored its time budget (must match
+# WATCHDOG_EXIT_CODE in runner/playground_harness/plugin.py)
+HARNESS_TIMEOUT_EXIT = 124
+WORKSPACE_TMPFS = "/workspace:rw,noexec,nosuid,size=32m,uid=1000,gid=1000,mode=0700"
+# Mount point of the read-only problem store directory in the container
+PROBLEM_MOUNT = "/problem"
+PRECOMPILE_TIMEOUT_SEC = 60
+CONTAINER_NAME_PREFIX = "py-playground-run-"
+# Labels of cold run containers, read by the reaper (container_reaper.py)
+SUBMISSION_LABEL = "py-playground.submission"
+BUDGET_LABEL = "py-playground.budget-sec"
 
 
 @dataclass
@@ -16,9 +65,27 @@ class DockerRunResult:
     returncode: int
     duration: float
     timed_out: bool
+    test_details: List[Dict[str, Any]] = field(default_factory=list)  # Decoded result frames
+    # cpu_user_sec, cpu_system_sec, peak_memory_kb, oom_killed, exit_signal (see with_exit_info)
+    usage: Dict[str, Any] = field(default_factory=dict)
+    output_limited: bool = False  # Killed for exceeding its output budget
 
+    def with_exit_info(self) -> "DockerRunResult":
+        """
+        Fill exit_signal/oom_killed when the harness could not report them
+
+        That happens when the whole container was killed: `docker run` then
+        exits with 128 + signal.
+        """
+        usage = dict(self.usage)
+        if "exit_signal" not in usage:
+            usage["exit_signal"] = self.returncode - 128 if self.returncode > 128 else None
+        usage.setdefault("oom_killed", False)
+        self.usage = usage
+        return self
 
-class DockerRunner:
+
+class DockerRunner(SandboxRunner):
     """Service for executing code in Docker containers"""
 
     def __init__(
@@ -27,29 +94,106 @@ class DockerRunner:
         workspace_dir: str = None,
         host_workspace_dir: str = None,
         default_cpus: str = "1.0",
-        default_memory_mb: int = 256
+        default_memory_mb: int = 256,
+        pool_size: int = None,
+        use_zygote: bool = None,
+        workspace_mode: str = None,
+        controller: ConcurrencyController = None,
+        problem_store_dir: str = None,
+        host_problem_store_dir: str = None
     ):
         self.runner_image = runner_image or os.getenv("RUNNER_IMAGE", "py-playground-runner:latest")
         self.workspace_dir = workspace_dir or os.getenv("WORKSPACE_DIR", "/workspaces")
         self.host_workspace_dir = host_workspace_dir or os.getenv("HOST_WORKSPACE_DIR", "/workspaces")
         self.default_cpus = default_cpus
         self.default_memory_mb = default_memory_mb
+        self.pool_size = pool_size if pool_size is not None else int(os.getenv("SANDBOX_POOL_SIZE", "0"))
+        self.use_zygote = (
+            use_zygote if use_zygote is not None
+            else os.getenv("SANDBOX_ZYGOTE", "0").lower() in ("1", "true", "yes")
+        )
+        self.workspace_mode = workspace_mode or os.getenv("SANDBOX_WORKSPACE_MODE", "bind")
+        self.controller = controller or concurrency_controller
+        self.problem_store_dir = problem_store_dir or os.getenv("PROBLEM_STORE_DIR", "/problem-store")
+        self.host_problem_store_dir = (
+            host_problem_store_dir or os.getenv("HOST_PROBLEM_STORE_DIR", self.problem_store_dir)
+        )
+        self._pool: Optional[ContainerPool] = None
+
+    @property
+    def pool(self) -> Optional[ContainerPool]:
+        """Warm container pool, created lazily when pool_size > 0 (never in a forked RQ work horse)"""
+        if self.pool_size <= 0:
+            return None
+        if self._pool is None:
+            if _in_forked_work_horse():
+                # The horse exits with os._exit() after one job: its pool would never be drained
+                logger.warning(
+                    "SANDBOX_POOL_SIZE ignored in a forking rq worker; run it with "
+                    "-w rq.worker.SimpleWorker or use python -m worker.async_worker"
+                )
+                self.pool_size = 0
+                return None
+            self._pool = ContainerPool(
+                runner_image=self.runner_image,
+                workspace_dir=self.workspace_dir,
+                host_workspace_dir=self.host_workspace_dir,
+                size=self.pool_size,
+                limit_args=self._limit_args,
+                creation_gate=self.controller.create_slot,
+                **self._pool_container_spec()
+            )
+        return self._pool
+
+    @property
+    def streams_workspace(self) -> bool:
+        """True when jobs should use run_archive() instead of run()"""
+        return self.workspace_mode == "stream"
+
+    @property
+    def mounts_problem_store(self) -> bool:
+        """Pooled containers are started before their problem is known"""
+        return self.pool_size <= 0
+
+    def _pool_container_spec(self) -> Dict[str, Any]:
+        """Workspace mount and main process (idle sleep or zygote) of pooled containers"""
+        spec: Dict[str, Any] = {"bind_workspace": not self.streams_workspace, "container_args": []}
+        if self.streams_workspace:
+            spec["container_args"] += ["--tmpfs", WORKSPACE_TMPFS]
+        if self.use_zygote:
+            # The zygote starts as root so each forked run can drop to the sandbox user
+            spec["container_args"] += ["--user", "0:0"]
+            spec["container_command"] = [
+                "python", "-m", "playground_harness", "serve", "--socket", ZYGOTE_SOCKET
+            ]
+        return spec
 
     def run(
         self,
         workspace: str,
         timeout_sec: float = 5.0,
         memory_mb: int = None,
-        cpus: str = None
+        cpus: str = None,
+        test_timeout_sec: float = None,
+        max_output_bytes: int = None,
+        submission_id: int = None,
+        tests_dir: str = None
     ) -> DockerRunResult:
         """
         Execute pytest in a Docker container
 
         Args:
             workspace: Path to workspace directory (in worker container)
-            timeout_sec: Execution timeout in seconds
+            timeout_sec: Execution timeout in seconds (budget for all tests)
             memory_mb: Memory limit in MB
             cpus: CPU limit as string (e.g., "1.0")
+            test_timeout_sec: Budget per test; a test over it is reported as
+                "timeout" and the remaining tests keep running
+            max_output_bytes: Output budget (stdout + stderr); the container
+                is killed when it is exceeded
+            submission_id: Submission the container is labeled with
+            tests_dir: Problem store directory to mount read-only on
+                PROBLEM_MOUNT (cold containers only)
 
         Returns:
             DockerRunResult with execution details
@@ -57,54 +201,248 @@ class DockerRunner:
         # Use defaults if not provided
         memory_mb = memory_mb or self.default_memory_mb
         cpus = cpus or self.default_cpus
+        budget = self._budget_args(timeout_sec, test_timeout_sec)
 
-        # Convert workspace path from worker to host
-        workspace_rel = workspace.replace(self.workspace_dir, "").lstrip("/")
-        host_workspace = f"{self.host_workspace_dir}/{workspace_rel}"
+        pool = self.pool if tests_dir is None else None
+        if pool is not None:
+            lease = pool.acquire(memory_mb, cpus)
+            if lease is not None:
+                return self._run_pooled(lease, workspace, timeout_sec, budget, max_output_bytes)
 
         # Build Docker command
+        name = _container_name()
         docker_cmd = self._build_command(
-            host_workspace=host_workspace,
+            host_workspace=self._host_workspace(workspace),
             memory_mb=memory_mb,
-            cpus=cpus
+            cpus=cpus,
+            budget=budget,
+            name=name,
+            labels=run_labels(submission_id, timeout_sec),
+            host_tests_dir=self._host_store_path(tests_dir) if tests_dir else None
         )
 
-        # Execute with timeout
-        start = time.time()
-        timed_out = False
+        return self._execute(docker_cmd, timeout_sec, container=name, max_output_bytes=max_output_bytes)
 
+    def run_archive(
+        self,
+        files: Dict[str, bytes],
+        timeout_sec: float = 5.0,
+        memory_mb: int = None,
+        cpus: str = None,
+        test_timeout_sec: float = None,
+        max_output_bytes: int = None,
+        submission_id: int = None,
+        tests_dir: str = None
+    ) -> DockerRunResult:
+        """
+        Execute pytest on an in-memory workspace
+
+        The files are streamed as a tar on the container's stdin into a tmpfs
+        /workspace.
+
+        Args:
+            files: Workspace files (name -> content)
+            timeout_sec: Execution timeout in seconds (budget for all tests)
+            memory_mb: Memory limit in MB
+            cpus: CPU limit as string (e.g., "1.0")
+            test_timeout_sec: Budget per test (see run())
+            max_output_bytes: Output budget (see run())
+            submission_id: Submission the container is labeled with
+            tests_dir: Problem store directory (see run())
+
+        Returns:
+            DockerRunResult with execution details
+        """
+        memory_mb = memory_mb or self.default_memory_mb
+        cpus = cpus or self.default_cpus
+        archive = build_workspace_archive(files)
+        budget = self._budget_args(timeout_sec, test_timeout_sec)
+
+        lease = None
+        if self.pool is not None and tests_dir is None:
+            lease = self.pool.acquire(memory_mb, cpus)
+        if lease is not None:
+            try:
+                docker_cmd = self._build_exec_command(lease.container_id, stream=True, budget=budget)
+                result = self._execute(
+                    docker_cmd, timeout_sec, stdin=archive,
+                    container=lease.container_id, max_output_bytes=max_output_bytes
+                )
+            finally:
+                self.pool.release(lease)
+        else:
+            name = _container_name()
+            docker_cmd = [
+                "docker", "run", "-i", "--rm", "--name", name,
+                *_label_args(run_labels(submission_id, timeout_sec)),
+                *self._limit_args(memory_mb, cpus),
+                "--tmpfs", WORKSPACE_TMPFS,
+                *(["-v", f"{self._host_store_path(tests_dir)}:{PROBLEM_MOUNT}:ro"] if tests_dir else []),
+                "-w", "/workspace",
+                self.runner_image,
+                *self._harness_command(
+                    stream=True, zygote=False, budget=budget,
+                    tests_mount=PROBLEM_MOUNT if tests_dir else None
+                )
+            ]
+            result = self._execute(
+                docker_cmd, timeout_sec, stdin=archive, container=name, max_output_bytes=max_output_bytes
+            )
+        return result
+
+    def _host_workspace(self, workspace: str) -> str:
+        """Convert workspace path from worker to host"""
+        workspace_rel = workspace.replace(self.workspace_dir, "").lstrip("/")
+        return f"{self.host_workspace_dir}/{workspace_rel}"
+
+    def _host_store_path(self, path: str) -> str:
+        """Convert a problem store path from worker to host"""
+        path_rel = path.replace(self.problem_store_dir, "").lstrip("/")
+        return f"{self.host_problem_store_dir}/{path_rel}"
+
+    def precompile_tests(self, store_dir: str) -> None:
+        """
+        Precompile a problem store directory with the runner image's pytest
+
+        Raises:
+            RuntimeError: The precompile container failed
+        """
+        cmd = [
+            "docker", "run", "--rm", "--network", "none",
+            "-v", f"{self._host_store_path(store_dir)}:{PROBLEM_MOUNT}:rw",
+            self.runner_image,
+            "python", "-m", "playground_harness", "precompile", PROBLEM_MOUNT
+        ]
+        with self.controller.create_slot():
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=PRECOMPILE_TIMEOUT_SEC)
+        if result.returncode != 0:
+            raise RuntimeError(f"precompile failed: {result.stderr.strip()[-500:]}")
+
+    def _run_pooled(
+        self,
+        lease: PooledContainer,
+        workspace: str,
+        timeout_sec: float,
+        budget: List[str] = (),
+        max_output_bytes: int = None
+    ) -> DockerRunResult:
+        """
+        Run pytest inside a warm container.
+
+        The job's files are moved (renamed, not copied) into the container's
+        workspace and moved back afterwards, so callers find `workspace`
+        exactly as after a cold run. The container is single use.
+        """
         try:
-            result = subprocess.run(
+            _move_contents(workspace, lease.workspace)
+            docker_cmd = self._build_exec_command(lease.container_id, budget=budget)
+            return self._execute(
+                docker_cmd, timeout_sec, container=lease.container_id, max_output_bytes=max_output_bytes
+            )
+        finally:
+            _move_contents(lease.workspace, workspace)
+            self.pool.release(lease)
+
+    def _build_exec_command(
+        self,
+        container_id: str,
+        stream: bool = False,
+        budget: List[str] = ()
+    ) -> list:
+        """
+        Build the `docker exec` command for a warm container
+
+        In zygote mode the exec'd process is only a thin client: the run is
+        forked from the zygote and attached to the client's stdio.
+        """
+        return [
+            "docker", "exec", *(["-i"] if stream else []),
+            "-u", SANDBOX_USER, "-w", "/workspace", container_id,
+            *self._harness_command(stream=stream, zygote=self.use_zygote, budget=budget)
+        ]
+
+    def _harness_command(
+        self,
+        stream: bool,
+        zygote: bool,
+        budget: List[str] = (),
+        tests_mount: Optional[str] = None
+    ) -> list:
+        """Command line of runner/playground_harness for the requested features"""
+        if zygote:
+            # Thin client only: skip site-packages, pytest lives in the zygote
+            cmd = ["python", "-S", "-m", "playground_harness", "run", "--zygote", ZYGOTE_SOCKET]
+        else:
+            cmd = ["python", "-m", "playground_harness", "run"]
+        if stream:
+            cmd.append("--stdin-tar")
+        return [*cmd, *budget, "--", *self._pytest_args(tests_mount)]
+
+    def _execute(
+        self,
+        docker_cmd: list,
+        timeout_sec: float,
+        stdin: Optional[bytes] = None,
+        container: Optional[str] = None,
+        max_output_bytes: Optional[int] = None
+    ) -> DockerRunResult:
+        """
+        Run a docker command with the sandbox timeout and collect its output
+
+        Output is read as it is produced into bounded buffers (output_capture.py).
+        On timeout or when the output budget is exceeded, the docker CLI
+        process is killed and `container` is removed.
+
+        Waits for a slot of the concurrency controller first; the wait is not
+        part of the run's duration.
+        """
+        capture = OutputCapture(max_output_bytes)
+        with self.controller.run_slot():
+            start = time.time()
+            run = run_bounded(
                 docker_cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout_sec + 2  # +2 seg buffer
+                capture,
+                timeout_sec=timeout_sec + 2,  # +2 seg buffer
+                stdin=stdin,
+                kill=lambda proc: _kill_container(proc, container)
             )
             duration = time.time() - start
-            stdout = result.stdout
-            stderr = result.stderr
-            returncode = result.returncode
 
-        except subprocess.TimeoutExpired:
-            duration = time.time() - start
-            stdout = ""
-            stderr = "Timeout expired"
-            returncode = -1
-            timed_out = True
+        self.controller.record_run(duration, timeout_sec, run.timed_out)
 
+        stdout, stderr, test_details, usage = capture.result()
+        if run.timed_out:
+            stderr = "Timeout expired"
         return DockerRunResult(
             stdout=stdout,
             stderr=stderr,
-            returncode=returncode,
+            returncode=run.returncode,
             duration=duration,
-            timed_out=timed_out
-        )
+            timed_out=run.timed_out,
+            test_details=test_details,
+            usage=usage,
+            output_limited=run.output_limited
+        ).with_exit_info()
+
+    def _limit_args(self, memory_mb: int, cpus: str) -> list:
+        """Isolation and resource limit flags shared by cold and pooled containers"""
+        return [
+            "--network", "none",  # No network access
+            "--tmpfs", "/tmp:rw,noexec,nosuid,size=64m",
+            f"--cpus={cpus}",
+            f"--memory={memory_mb}m",
+            "--memory-swap", f"{memory_mb}m",
+        ]
 
     def _build_command(
         self,
         host_workspace: str,
         memory_mb: int,
-        cpus: str
+        cpus: str,
+        budget: List[str] = (),
+        name: Optional[str] = None,
+        labels: Optional[Dict[str, str]] = None,
+        host_tests_dir: Optional[str] = None
     ) -> list:
         """
         Build Docker run command
@@ -113,23 +451,83 @@ class DockerRunner:
             host_workspace: Workspace path on host machine
             memory_mb: Memory limit in MB
             cpus: CPU limit as string
+            budget: Harness time budget flags (see _budget_args)
+            name: Container name, so the container can be killed by name
+            labels: Container labels (see run_labels)
+            host_tests_dir: Problem store directory on the host, mounted
+                read-only on PROBLEM_MOUNT
 
         Returns:
             List of command arguments
         """
         return [
-            "docker", "run", "--rm",
-            "--network", "none",  # No network access
-            "--tmpfs", "/tmp:rw,noexec,nosuid,size=64m",
-            f"--cpus={cpus}",
-            f"--memory={memory_mb}m",
-            "--memory-swap", f"{memory_mb}m",
+            "docker", "run", "--rm", *(["--name", name] if name else []),
+            *_label_args(labels or {}),
+            *self._limit_args(memory_mb, cpus),
             "-v", f"{host_workspace}:/workspace:rw",
+            *(["-v", f"{host_tests_dir}:{PROBLEM_MOUNT}:ro"] if host_tests_dir else []),
             "-w", "/workspace",
             self.runner_image,
-            "pytest", "-q", "--tb=short", "tests_public.py", "tests_hidden.py"
+            *self._harness_command(
+                stream=False, zygote=False, budget=budget,
+                tests_mount=PROBLEM_MOUNT if host_tests_dir else None
+            )
         ]
 
 
+def _in_forked_work_horse() -> bool:
+    """True inside a job of a forking `rq worker`, which sets RQ_JOB_ID before each fork (SimpleWorker does not)"""
+    return "RQ_JOB_ID" in os.environ
+
+
+def run_labels(submission_id: Optional[int], timeout_sec: float) -> Dict[str, str]:
+    """
+    Labels of a cold run container
+
+    The budget is the wall-clock time after which the worker kills the
+    container itself (timeout + 2 s buffer); the reaper destroys labeled
+    containers that outlive it.
+    """
+    return {
+        SUBMISSION_LABEL: str(submission_id) if submission_id is not None else "",
+        BUDGET_LABEL: f"{float(timeout_sec) + 2:g}",
+    }
+
+
+def _label_args(labels: Dict[str, str]) -> List[str]:
+    return [arg for key, value in labels.items() for arg in ("--label", f"{key}={value}")]
+
+
+def _container_name() -> str:
+    return f"{CONTAINER_NAME_PREFIX}{uuid.uuid4().hex[:12]}"
+
+
+def _kill_container(proc: subprocess.Popen, container: Optional[str]) -> None:
+    """Kill the docker CLI process and remove the container it drives"""
+    # Killing `docker run`/`docker exec` alone leaves the container running
+    try:
+        proc.kill()
+    except ProcessLookupError:
+        pass
+    if container:
+        try:
+            subprocess.run(["docker", "rm", "-f", container], capture_output=True, timeout=10)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            # Left to the reaper (container_reaper.py)
+            logger.warning(
+                f"Failed to remove container after kill: {e}",
+                extra={"container": container[:24]}
+            )
+
+
+def _move_contents(src: str, dest: str) -> None:
+    """Move every entry of directory src into directory dest (same filesystem)"""
+    for entry in os.scandir(src):
+        target = os.path.join(dest, entry.name)
+        if os.path.isdir(target) and not os.path.islink(target):
+            shutil.rmtree(target, ignore_errors=True)
+        os.replace(entry.path, target)
+
+
 # Singleton instance
 docker_runner = DockerRunner()
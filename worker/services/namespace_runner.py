@@ -0,0 +1,332 @@
+"""
+Namespace Runner Service - runs the harness without Docker
+
+PERFORMANCE: No daemon round-trip, image layers or container start per job:
+the worker spawns `python -m playground_harness isolate`, which joins a
+fresh cgroup, unshares user/mount/PID/network namespaces, mounts private
+tmpfs on /tmp and the workspace, and execs the harness
+(runner/playground_harness/isolate.py). Sandbox set-up costs a few
+milliseconds on top of the interpreter start.
+
+Meant for dedicated grading hosts and for running the suite and benchmarks
+on a plain Linux box. Requirements:
+- Unprivileged user namespaces (kernel.unprivileged_userns_clone=1; not
+  available under Docker's default seccomp profile)
+- pytest importable by SANDBOX_PYTHON
+- For memory/CPU/pids quotas and OOM detection, a cgroup v2 directory
+  delegated to the worker user (SANDBOX_CGROUP_PARENT) with the memory, cpu
+  and pids controllers in cgroup.subtree_control. Without it, memory is
+  capped with RLIMIT_AS and there is no CPU quota.
+
+The problem store directory (tests_dir) is mounted read-only on
+NAMESPACE_TESTS_DIR and the store root is hidden.
+
+Enable with SANDBOX_BACKEND=namespace. Results, limits, timeouts and the
+output budget behave as with DockerRunner; runs hold a slot of the concurrency controller.
+"""
+import os
+import signal
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .concurrency_controller import ConcurrencyController, concurrency_controller
+from .docker_runner import DockerRunResult, PRECOMPILE_TIMEOUT_SEC
+from .output_capture import OutputCapture, run_bounded
+from .sandbox_runner import SandboxRunner
+from .workspace_archive import build_workspace_archive
+from backend.config import settings
+from backend.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+HARNESS_PATH = str(Path(__file__).parent.parent.parent / "runner")
+CPU_PERIOD_US = 100000
+MAX_PIDS = 64
+# TESTS_DIR of runner/playground_harness/isolate.py
+NAMESPACE_TESTS_DIR = "/tmp/problem"
+# Copied into the sandbox; nothing else from the worker environment leaks in
+SANDBOX_ENV_KEYS = ("PATH", "LANG", "LC_ALL", "TZ")
+
+
+class NamespaceRunner(SandboxRunner):
+    """Service for executing code in Linux namespaces on the worker host"""
+
+    def __init__(
+        self,
+        python: str = None,
+        harness_path: str = None,
+        cgroup_parent: str = None,
+        hide_paths: List[str] = None,
+        default_cpus: str = "1.0",
+        default_memory_mb: int = 256,
+        workspace_mode: str = None,
+        keep_uid: bool = False,
+        controller: ConcurrencyController = None
+    ):
+        self.python = python or os.getenv("SANDBOX_PYTHON", sys.executable)
+        self.harness_path = harness_path or os.getenv("SANDBOX_HARNESS_PATH", HARNESS_PATH)
+        self.cgroup_parent = cgroup_parent if cgroup_parent is not None else os.getenv("SANDBOX_CGROUP_PARENT", "")
+        if hide_paths is None:
+            hide_paths = [
+                os.getenv("WORKSPACE_DIR", "/workspaces"),
+                str(Path(settings.PROBLEMS_DIR).resolve()),
+                "/sys/fs/cgroup",
+            ]
+            if os.getenv("PROBLEM_STORE_DIR"):
+                hide_paths.append(os.getenv("PROBLEM_STORE_DIR"))
+        self.hide_paths = hide_paths
+        self.default_cpus = default_cpus
+        self.default_memory_mb = default_memory_mb
+        self.workspace_mode = workspace_mode or os.getenv("SANDBOX_WORKSPACE_MODE", "bind")
+        self.keep_uid = keep_uid
+        self.controller = controller or concurrency_controller
+
+    @property
+    def streams_workspace(self) -> bool:
+        """True when jobs should use run_archive() instead of run()"""
+        return self.workspace_mode == "stream"
+
+    def run(
+        self,
+        workspace: str,
+        timeout_sec: float = 5.0,
+        memory_mb: int = None,
+        cpus: str = None,
+        test_timeout_sec: float = None,
+        max_output_bytes: int = None,
+        submission_id: int = None,
+        tests_dir: str = None
+    ) -> DockerRunResult:
+        """
+        Execute pytest with the workspace bind-mounted as working directory
+
+        See SandboxRunner.run for the arguments.
+        """
+        return self._execute(
+            workspace=workspace,
+            stdin=None,
+            timeout_sec=timeout_sec,
+            memory_mb=memory_mb or self.default_memory_mb,
+            cpus=cpus or self.default_cpus,
+            budget=self._budget_args(timeout_sec, test_timeout_sec),
+            max_output_bytes=max_output_bytes,
+            tests_dir=tests_dir
+        )
+
+    def run_archive(
+        self,
+        files: Dict[str, bytes],
+        timeout_sec: float = 5.0,
+        memory_mb: int = None,
+        cpus: str = None,
+        test_timeout_sec: float = None,
+        max_output_bytes: int = None,
+        submission_id: int = None,
+        tests_dir: str = None
+    ) -> DockerRunResult:
+        """
+        Execute pytest on an in-memory workspace unpacked into a private tmpfs
+
+        See SandboxRunner.run_archive for the arguments.
+        """
+        return self._execute(
+            workspace=None,
+            stdin=build_workspace_archive(files),
+            timeout_sec=timeout_sec,
+            memory_mb=memory_mb or self.default_memory_mb,
+            cpus=cpus or self.default_cpus,
+            budget=self._budget_args(timeout_sec, test_timeout_sec),
+            max_output_bytes=max_output_bytes,
+            tests_dir=tests_dir
+        )
+
+    def _build_command(
+        self,
+        workspace: Optional[str],
+        cgroup: Optional[str],
+        memory_mb: int,
+        budget: List[str] = (),
+        tests_dir: Optional[str] = None
+    ) -> list:
+        """
+        Build the launcher command line
+
+        Args:
+            workspace: Directory to bind-mount, or None to read a tar on stdin
+            cgroup: Job cgroup directory, or None to fall back to RLIMIT_AS
+            memory_mb: Memory limit in MB
+            budget: Harness time budget flags
+            tests_dir: Problem store directory to mount read-only
+
+        Returns:
+            List of command arguments
+        """
+        cmd = [self.python, "-m", "playground_harness", "isolate"]
+        if cgroup:
+            cmd += ["--cgroup", cgroup]
+        else:
+            cmd += ["--address-space-mb", str(memory_mb)]
+        if workspace:
+            cmd += ["--bind", workspace]
+        if tests_dir:
+            cmd += ["--tests", tests_dir]
+        for path in self.hide_paths:
+            cmd += ["--hide", path]
+        if self.keep_uid:
+            cmd.append("--keep-uid")
+        run = ["run", *([] if workspace else ["--stdin-tar"]), *budget]
+        tests_mount = NAMESPACE_TESTS_DIR if tests_dir else None
+        return [*cmd, "--", *run, "--", *self._pytest_args(tests_mount)]
+
+    def precompile_tests(self, store_dir: str) -> None:
+        """
+        Precompile a problem store directory with SANDBOX_PYTHON's pytest
+
+        The store only holds trusted problem files, so this runs unsandboxed.
+
+        Raises:
+            RuntimeError: Precompilation failed
+        """
+        cmd = [
+            self.python, "-m", "playground_harness", "precompile",
+            "--mount-path", NAMESPACE_TESTS_DIR, store_dir
+        ]
+        result = subprocess.run(
+            cmd, env=self._environment(), capture_output=True, text=True, timeout=PRECOMPILE_TIMEOUT_SEC
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"precompile failed: {result.stderr.strip()[-500:]}")
+
+    def _environment(self) -> Dict[str, str]:
+        env = {key: os.environ[key] for key in SANDBOX_ENV_KEYS if key in os.environ}
+        env.update({
+            "PYTHONPATH": self.harness_path,
+            "PYTHONDONTWRITEBYTECODE": "1",
+            "HOME": "/tmp",
+        })
+        return env
+
+    def _execute(
+        self,
+        workspace: Optional[str],
+        stdin: Optional[bytes],
+        timeout_sec: float,
+        memory_mb: int,
+        cpus: str,
+        budget: List[str],
+        max_output_bytes: Optional[int] = None,
+        tests_dir: Optional[str] = None
+    ) -> DockerRunResult:
+        """Run the launcher under the sandbox timeout and collect its output"""
+        capture = OutputCapture(max_output_bytes)
+        with self.controller.run_slot():
+            cgroup = self._create_cgroup(memory_mb, cpus)
+            cmd = self._build_command(workspace, cgroup, memory_mb, budget, tests_dir)
+            start = time.time()
+            try:
+                run = run_bounded(
+                    cmd,
+                    capture,
+                    timeout_sec=timeout_sec + 2,  # +2 seg buffer
+                    stdin=stdin,
+                    # Killing the launcher kills PID 1 of the sandbox and with it the namespace
+                    kill=lambda proc: self._kill(proc, cgroup),
+                    env=self._environment(),
+                    cwd="/",
+                    start_new_session=True
+                )
+                duration = time.time() - start
+                oom_kills = _read_oom_kills(cgroup) if cgroup else None
+            finally:
+                if cgroup:
+                    _remove_cgroup(cgroup)
+
+        self.controller.record_run(duration, timeout_sec, run.timed_out)
+
+        stdout, stderr, test_details, usage = capture.result()
+        if run.timed_out:
+            stderr = "Timeout expired"
+        if oom_kills is not None:
+            # The job cgroup is authoritative; the harness cannot see it
+            usage["oom_killed"] = oom_kills > 0
+        return DockerRunResult(
+            stdout=stdout,
+            stderr=stderr,
+            returncode=run.returncode,
+            duration=duration,
+            timed_out=run.timed_out,
+            test_details=test_details,
+            usage=usage,
+            output_limited=run.output_limited
+        ).with_exit_info()
+
+    def _create_cgroup(self, memory_mb: int, cpus: str) -> Optional[str]:
+        """Create a cgroup v2 child of cgroup_parent with the job's limits, or None"""
+        if not self.cgroup_parent:
+            return None
+        path = os.path.join(self.cgroup_parent, f"run-{uuid.uuid4().hex[:12]}")
+        limits = {
+            "memory.max": str(memory_mb * 1024 * 1024),
+            "memory.swap.max": "0",
+            "cpu.max": f"{int(float(cpus) * CPU_PERIOD_US)} {CPU_PERIOD_US}",
+            "pids.max": str(MAX_PIDS),
+        }
+        try:
+            os.mkdir(path)
+            for name, value in limits.items():
+                Path(path, name).write_text(value)
+        except OSError as e:
+            logger.warning(
+                f"Failed to create sandbox cgroup, falling back to rlimits: {e}",
+                extra={"cgroup_parent": self.cgroup_parent}
+            )
+            _remove_cgroup(path)
+            return None
+        return path
+
+    @staticmethod
+    def _kill(proc: subprocess.Popen, cgroup: Optional[str]) -> None:
+        """Kill the launcher's process group and everything left in the job cgroup"""
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        if cgroup:
+            try:
+                Path(cgroup, "cgroup.kill").write_text("1")
+            except OSError:
+                pass
+
+
+def _read_oom_kills(cgroup: str) -> Optional[int]:
+    """oom_kill counter of a cgroup v2 directory"""
+    try:
+        text = Path(cgroup, "memory.events").read_text()
+    except OSError:
+        return None
+    for line in text.splitlines():
+        key, _, value = line.partition(" ")
+        if key == "oom_kill":
+            return int(value)
+    return None
+
+
+def _remove_cgroup(path: str) -> None:
+    """Remove a job cgroup (only possible once its processes are gone)"""
+    for _ in range(50):
+        try:
+            os.rmdir(path)
+            return
+        except FileNotFoundError:
+            return
+        except OSError:
+            time.sleep(0.01)
+    logger.warning("Failed to remove sandbox cgroup", extra={"cgroup": path})
+
+
+# Singleton instance
+namespace_runner = NamespaceRunner()
@@ -0,0 +1,255 @@
+"""
+Bounded capture of sandbox stdout/stderr.
+
+PERFORMANCE: `subprocess.run(capture_output=True)` (or reading the whole
+container log) buffers everything a submission prints, so a student's
+`while True: print(...)` grows worker memory until the run times out, only
+for tasks.py to keep the first 10,000 characters. Instead:
+- Output is read incrementally in READ_CHUNK_BYTES chunks as it is produced
+- stdout goes through the result stream decoder, so result frames are never
+  lost; console text and stderr are kept in fixed-size head + tail buffers
+- Every byte counts against the run's output budget (`max_output_kb` in
+  metadata.json); the sandbox is killed as soon as it is exceeded
+Worker memory per run is bounded by the buffers, whatever students print.
+Per-test records are also handed to `test_listener` (if set) as they are
+decoded, for live progress (services/submission_progress.py).
+"""
+import os
+import selectors
+import subprocess
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .result_stream import ResultStreamDecoder
+
+DEFAULT_MAX_OUTPUT_BYTES = 1024 * 1024
+KEEP_HEAD_BYTES = 8 * 1024
+KEEP_TAIL_BYTES = 8 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+OMITTED_MARKER = b"\n... [%d bytes omitted] ...\n"
+
+# Called with each "test" record as soon as it is decoded; set around a run
+# by the caller, so the sandbox backends need no extra argument
+test_listener: ContextVar[Optional[Callable[[Dict[str, Any]], None]]] = ContextVar(
+    "test_listener", default=None
+)
+
+
+class HeadTailBuffer:
+    """Keeps the first `head` and the last `tail` bytes written to it"""
+
+    def __init__(self, head: int = KEEP_HEAD_BYTES, tail: int = KEEP_TAIL_BYTES):
+        self.head_limit = head
+        self.tail_limit = tail
+        self.total = 0
+        self._head = bytearray()
+        self._tail = bytearray()
+
+    def extend(self, data: bytes) -> None:
+        self.total += len(data)
+        room = self.head_limit - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if not data or not self.tail_limit:
+            return
+        if len(data) >= self.tail_limit:
+            self._tail[:] = data[-self.tail_limit:]
+        else:
+            self._tail += data
+            del self._tail[:max(0, len(self._tail) - self.tail_limit)]
+
+    @property
+    def omitted(self) -> int:
+        """Bytes dropped between head and tail"""
+        return self.total - len(self._head) - len(self._tail)
+
+    def __len__(self) -> int:
+        return len(self._head) + len(self._tail)
+
+    def __bytes__(self) -> bytes:
+        if not self.omitted:
+            return bytes(self._head + self._tail)
+        return bytes(self._head) + OMITTED_MARKER % self.omitted + bytes(self._tail)
+
+
+class OutputCapture:
+    """Decodes stdout and keeps bounded console/stderr text of one run"""
+
+    def __init__(self, max_output_bytes: Optional[int] = None):
+        self.max_output_bytes = max_output_bytes or DEFAULT_MAX_OUTPUT_BYTES
+        self.decoder = ResultStreamDecoder(console=HeadTailBuffer())
+        self.stderr = HeadTailBuffer()
+        self.total = 0
+        self.on_test = test_listener.get()
+
+    def feed_stdout(self, data: bytes) -> None:
+        self.total += len(data)
+        records = self.decoder.feed(data)
+        if self.on_test is not None:
+            for record in records:
+                if record.get("event") == "test":
+                    self.on_test(record)
+
+    def feed_stderr(self, data: bytes) -> None:
+        self.total += len(data)
+        self.stderr.extend(data)
+
+    @property
+    def exceeded(self) -> bool:
+        """True once the run printed more than its budget"""
+        return self.total > self.max_output_bytes
+
+    def result(self) -> Tuple[str, str, List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Returns:
+            Tuple of (console text, stderr text, per-test records, usage)
+        """
+        return (
+            self.decoder.console_text(),
+            bytes(self.stderr).decode("utf-8", errors="replace"),
+            self.decoder.test_details(),
+            self.decoder.usage
+        )
+
+
+@dataclass
+class BoundedRun:
+    """Exit status of a process run by run_bounded()"""
+    returncode: int
+    timed_out: bool = False
+    output_limited: bool = False
+
+
+def run_bounded(
+    cmd: List[str],
+    capture: OutputCapture,
+    timeout_sec: float,
+    stdin: Optional[bytes] = None,
+    kill: Callable[[subprocess.Popen], None] = None,
+    **popen_kwargs
+) -> BoundedRun:
+    """
+    Run a command, streaming its output into `capture`
+
+    Args:
+        cmd: Command line
+        capture: Receives stdout/stderr chunks as they are read
+        timeout_sec: Wall-clock limit
+        stdin: Bytes written to the process's stdin (None: /dev/null)
+        kill: Called to stop the sandbox on timeout or output overflow
+            (default: SIGKILL the process)
+        **popen_kwargs: Passed to subprocess.Popen
+
+    Returns:
+        BoundedRun; returncode is -1 when the process had to be killed
+    """
+    start = time.time()
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if stdin is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        **popen_kwargs
+    )
+    selector = selectors.DefaultSelector()
+    selector.register(proc.stdout, selectors.EVENT_READ, capture.feed_stdout)
+    selector.register(proc.stderr, selectors.EVENT_READ, capture.feed_stderr)
+    pending = _register_stdin(selector, proc.stdin, stdin)
+
+    timed_out = output_limited = drained = False
+    try:
+        timed_out, output_limited = _pump(selector, proc.stdin, capture, start + timeout_sec, pending)
+        drained = not (timed_out or output_limited)
+    finally:
+        selector.close()
+        if not drained:
+            (kill or _kill)(proc)
+        for pipe in (proc.stdin, proc.stdout, proc.stderr):
+            _close(pipe)
+        returncode = proc.wait()
+
+    return BoundedRun(
+        returncode=-1 if timed_out or output_limited else returncode,
+        timed_out=timed_out,
+        output_limited=output_limited
+    )
+
+
+def _register_stdin(selector: selectors.BaseSelector, pipe, stdin: Optional[bytes]) -> memoryview:
+    """Watch stdin for writability while there is input left to send"""
+    pending = memoryview(stdin or b"")
+    if stdin is not None:
+        if pending:
+            os.set_blocking(pipe.fileno(), False)
+            selector.register(pipe, selectors.EVENT_WRITE)
+        else:
+            pipe.close()
+    return pending
+
+
+def _pump(
+    selector: selectors.BaseSelector,
+    stdin_pipe,
+    capture: OutputCapture,
+    deadline: float,
+    pending: memoryview
+) -> Tuple[bool, bool]:
+    """
+    Move input and output until every pipe is closed or a limit is hit.
+
+    Returns:
+        Tuple of (timed_out, output_limited)
+    """
+    while selector.get_map():
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return True, False
+        for key, _ in selector.select(remaining):
+            if key.fileobj is stdin_pipe:
+                pending = _write_stdin(selector, stdin_pipe, pending)
+            else:
+                _read_output(selector, key)
+        if capture.exceeded:
+            return False, True
+    return False, False
+
+
+def _write_stdin(selector: selectors.BaseSelector, pipe, pending: memoryview) -> memoryview:
+    try:
+        written = os.write(pipe.fileno(), pending[:READ_CHUNK_BYTES])
+    except BlockingIOError:
+        written = 0
+    except BrokenPipeError:
+        written = len(pending)  # The sandbox stopped reading; drop the rest
+    pending = pending[written:]
+    if not pending:
+        selector.unregister(pipe)
+        _close(pipe)
+    return pending
+
+
+def _read_output(selector: selectors.BaseSelector, key: selectors.SelectorKey) -> None:
+    data = os.read(key.fileobj.fileno(), READ_CHUNK_BYTES)
+    if data:
+        key.data(data)
+    else:
+        selector.unregister(key.fileobj)
+
+
+def _kill(proc: subprocess.Popen) -> None:
+    try:
+        proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+def _close(pipe) -> None:
+    if pipe is None:
+        return
+    try:
+        pipe.close()
+    except OSError:
+        pass
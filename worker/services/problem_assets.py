@@ -0,0 +1,219 @@
+"""
+In-process cache of problem assets (metadata, rubric, test files).
+
+PERFORMANCE: Every job used to resolve the problem directory, re-read and
+re-parse metadata.json and rubric.json, copy the test files with
+shutil.copy2 + chmod and hash them again for the result cache key. With
+thousands of jobs per hour on a few dozen problems that is the same work
+repeated for the same bytes.
+- One entry per problem: parsed metadata and rubric, test file bytes and
+  the sha256 of every file that defines a run (result cache key input)
+- Entries are revalidated at most every REVALIDATE_SEC by stat()-ing the
+  problem files (mtime_ns + size); an unchanged stamp is a hit
+- A changed stamp reloads the files; if their content hash is unchanged the
+  entry keeps its version (e.g. a touch or a git checkout)
+- Hit/miss/reload counters via stats()
+Entries are immutable; a reload swaps the entry, so jobs running on the old
+version are not affected.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.config import settings
+from backend.exceptions import ProblemNotFoundError
+from backend.logging_config import get_logger
+from .rubric_scorer import rubric_version
+
+logger = get_logger(__name__)
+
+# Every file read for a run; their stamps decide whether an entry is stale
+ASSET_FILES = (
+    "metadata.json", "rubric.json", "tests_public.py", "tests_hidden.py", "tests.py", "cases.json"
+)
+REVALIDATE_SEC = float(os.getenv("PROBLEM_CACHE_REVALIDATE_SEC", "2"))
+EMPTY_RUBRIC = {"tests": [], "max_points": 0}
+
+# (file name, st_mtime_ns, st_size) per existing file
+Stamp = Tuple[Tuple[str, int, int], ...]
+
+
+@dataclass(frozen=True)
+class ProblemAssets:
+    """Everything a job needs from a problem directory"""
+    problem_id: str
+    problem_dir: Path
+    version: str  # sha256 of the asset files' content
+    meta: Dict[str, Any]
+    rubric: Dict[str, Any]
+    test_files: Dict[str, bytes]  # Workspace file name -> content
+    file_hashes: Dict[str, bytes] = field(default_factory=dict)  # File name -> sha256 digest
+    rubric_version: str = ""  # rubric_scorer.rubric_version(rubric)
+
+
+@dataclass
+class _Entry:
+    assets: ProblemAssets
+    stamp: Stamp
+    checked_at: float
+
+
+class ProblemAssetCache:
+    """Version-stamped cache of parsed problem assets, per worker process"""
+
+    def __init__(self, search_dirs: List[str] = None, revalidate_sec: float = REVALIDATE_SEC):
+        self.search_dirs = [Path(d) for d in (search_dirs or [settings.PROBLEMS_DIR, "backend/problems"])]
+        self.revalidate_sec = revalidate_sec
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def get(self, problem_id: str) -> ProblemAssets:
+        """
+        Assets of a problem, loading or revalidating them if needed
+
+        Raises:
+            ProblemNotFoundError: No directory for problem_id in search_dirs
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(problem_id)
+            if entry is not None and now - entry.checked_at < self.revalidate_sec:
+                self.hits += 1
+                return entry.assets
+
+        problem_dir = entry.assets.problem_dir if entry else self._resolve(problem_id)
+        # Stamp before reading: a file changed while loading just reloads next time
+        stamp = _stamp(problem_dir)
+        if entry is not None and stamp == entry.stamp:
+            with self._lock:
+                entry.checked_at = now
+                self.hits += 1
+            return entry.assets
+
+        if not problem_dir.is_dir():
+            # Moved or deleted since it was cached
+            problem_dir = self._resolve(problem_id)
+            stamp = _stamp(problem_dir)
+        assets = _load(problem_id, problem_dir)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.reloads += 1
+                if assets.version != entry.assets.version:
+                    logger.info(
+                        "Problem assets changed, reloaded",
+                        extra={"problem_id": problem_id, "version": assets.version[:12]}
+                    )
+            self._entries[problem_id] = _Entry(assets, stamp, now)
+        return assets
+
+    def invalidate(self, problem_id: Optional[str] = None) -> None:
+        """Drop one entry, or all of them"""
+        with self._lock:
+            if problem_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(problem_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.reloads
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "hit_rate": self.hits / max(lookups, 1) * 100
+            }
+
+    def _resolve(self, problem_id: str) -> Path:
+        for base in self.search_dirs:
+            problem_dir = base / problem_id
+            if problem_dir.is_dir():
+                return problem_dir
+        logger.error(
+            "Problem directory not found",
+            extra={"problem_id": problem_id, "search_paths": [str(d) for d in self.search_dirs]}
+        )
+        raise ProblemNotFoundError(f"Problem {problem_id} not found")
+
+
+def _stamp(problem_dir: Path) -> Stamp:
+    stamp = []
+    for name in ASSET_FILES:
+        try:
+            st = os.stat(problem_dir / name)
+        except OSError:
+            continue
+        stamp.append((name, st.st_mtime_ns, st.st_size))
+    return tuple(stamp)
+
+
+def rubric_from_cases(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Rubric of a cases.json spec (runner/playground_harness/cases.py)"""
+    tests = [
+        {
+            "name": case["name"],
+            "points": case.get("points", 0),
+            "visibility": case.get("visibility", "public"),
+        }
+        for case in spec.get("cases", [])
+    ]
+    max_points = spec.get("max_points", sum(test["points"] for test in tests))
+    return {"tests": tests, "max_points": max_points}
+
+
+def _load(problem_id: str, problem_dir: Path) -> ProblemAssets:
+    """Read and parse the asset files of a problem directory"""
+    contents: Dict[str, bytes] = {}
+    for name in ASSET_FILES:
+        try:
+            contents[name] = (problem_dir / name).read_bytes()
+        except FileNotFoundError:
+            continue
+
+    file_hashes = {name: hashlib.sha256(data).digest() for name, data in contents.items()}
+    version = hashlib.sha256()
+    for name in ASSET_FILES:
+        version.update(name.encode() + b"\0" + file_hashes.get(name, b"-"))
+
+    meta = json.loads(contents["metadata.json"]) if "metadata.json" in contents else {}
+    rubric = json.loads(contents["rubric.json"]) if "rubric.json" in contents else dict(EMPTY_RUBRIC)
+
+    if "cases.json" in contents:
+        # I/O cases graded by the runner's native harness; their points are the rubric
+        test_files = {"cases.json": contents["cases.json"]}
+        rubric = rubric_from_cases(json.loads(contents["cases.json"]))
+    # Legacy tests.py runs as tests_public.py when there is neither public nor hidden suite
+    elif "tests_public.py" in contents or "tests_hidden.py" in contents:
+        test_files = {
+            name: contents[name] for name in ("tests_public.py", "tests_hidden.py") if name in contents
+        }
+    else:
+        test_files = {"tests_public.py": contents["tests.py"]} if "tests.py" in contents else {}
+
+    return ProblemAssets(
+        problem_id=problem_id,
+        problem_dir=problem_dir,
+        version=version.hexdigest(),
+        meta=meta,
+        rubric=rubric,
+        test_files=test_files,
+        file_hashes=file_hashes,
+        rubric_version=rubric_version(rubric)
+    )
+
+
+# Singleton instance (one per worker process)
+problem_asset_cache = ProblemAssetCache()
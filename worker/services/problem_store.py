@@ -0,0 +1,132 @@
+"""
+Versioned, read-only store of problem test suites.
+
+PERFORMANCE: Without it every submission writes tests_public.py and
+tests_hidden.py into its workspace, and pytest parses, assertion-rewrites
+and compiles them again in every sandbox. With PROBLEM_STORE_DIR set:
+- Each problem version (ProblemAssets.version, a content hash) is written
+  once to PROBLEM_STORE_DIR/<problem_id>/<version>/
+- Its test modules are precompiled there by the sandbox's own interpreter
+  and pytest (`playground_harness precompile`), so runs load the rewritten
+  bytecode instead of compiling
+- Sandboxes mount that directory read-only; the workspace only holds
+  student_code.py, and hidden tests never land in a writable directory
+A version directory is built in a temporary directory and renamed into place,
+so concurrent workers never see a partial one. Versions are never modified;
+editing a problem creates a new one.
+"""
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Set
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.logging_config import get_logger
+from .problem_assets import ProblemAssets
+
+logger = get_logger(__name__)
+
+PROBLEM_STORE_DIR = os.getenv("PROBLEM_STORE_DIR", "")
+VERSION_CHARS = 16
+
+
+class ProblemStore:
+    """Builds and locates read-only, precompiled problem versions"""
+
+    def __init__(self, root: str = PROBLEM_STORE_DIR):
+        self.root = Path(root) if root else None
+        self._ready: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def version_dir(self, assets: ProblemAssets) -> Path:
+        return self.root / assets.problem_id / assets.version[:VERSION_CHARS]
+
+    def ensure(self, assets: ProblemAssets, precompile: Callable[[str], None]) -> str:
+        """
+        Directory of a problem version, building it on first use
+
+        Args:
+            assets: Problem assets (test file bytes and content version)
+            precompile: Writes the precompiled bytecode into a directory
+                (SandboxRunner.precompile_tests); failures only cost speed
+
+        Returns:
+            Path of the version directory (in the worker)
+        """
+        target = self.version_dir(assets)
+        key = str(target)
+        if key in self._ready:
+            return key
+        with self._lock:
+            if key not in self._ready:
+                if not target.is_dir():
+                    self._build(assets, target, precompile)
+                self._ready.add(key)
+        return key
+
+    def _build(self, assets: ProblemAssets, target: Path, precompile: Callable[[str], None]) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        build = Path(tempfile.mkdtemp(prefix=".build-", dir=target.parent))
+        try:
+            # Writable by the sandbox user while the sandbox precompiles into it
+            os.chmod(build, 0o777)
+            for name, content in assets.test_files.items():
+                (build / name).write_bytes(content)
+                os.chmod(build / name, 0o444)
+            try:
+                precompile(str(build))
+            except Exception as e:
+                logger.warning(
+                    f"Failed to precompile problem tests, pytest will compile them per run: {e}",
+                    extra={"problem_id": assets.problem_id, "version": target.name}
+                )
+            _make_read_only(build)
+            try:
+                os.rename(build, target)
+            except OSError:
+                # Another worker built the same version first
+                if not target.is_dir():
+                    raise
+                _remove(build)
+                return
+        except Exception:
+            _remove(build)
+            raise
+        logger.info(
+            "Built problem store version",
+            extra={"problem_id": assets.problem_id, "version": target.name}
+        )
+
+
+def _make_read_only(path: Path) -> None:
+    """Best effort: files precompiled by the sandbox may belong to its user"""
+    for dirpath, dirnames, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                os.chmod(os.path.join(dirpath, name), 0o444)
+            except OSError:
+                pass
+        try:
+            os.chmod(dirpath, 0o555)
+        except OSError:
+            pass
+
+
+def _remove(path: Path) -> None:
+    for dirpath, _, _ in os.walk(path):
+        try:
+            os.chmod(dirpath, 0o755)
+        except OSError:
+            pass
+    shutil.rmtree(path, ignore_errors=True)
+
+
+# Singleton instance
+problem_store = ProblemStore()
@@ -0,0 +1,137 @@
+"""
+Set-based rescoring of stored test results after a rubric change.
+
+PERFORMANCE: RubricScorer.score only needs each test's outcome, which is
+already stored in test_results, so a rubric.json change (point weights,
+visibility) needs no sandbox run. Instead of loading submissions and
+scoring them one by one in Python, a rescore is a few set-based statements:
+- test_results: rows of tests the rubric no longer lists are deleted (the
+  scorer drops them on a fresh grade), the rest get points, max_points and
+  visibility from a CASE over test_name built from the rubric (passed ->
+  rubric points, else 0)
+- submissions: score_total = SUM(points) of their results (correlated
+  subquery over the submission_id index) capped at max_points like
+  RubricScorer.score, passed/failed/errors counted from the remaining
+  results, score_max and rubric_version
+All of them only touch finished submissions of the problem scored by another
+rubric version, so running it again is a no-op. The database does the
+work in one transaction; 100k submissions take seconds
+(scripts/benchmarks/bench_rescore.py).
+"""
+from typing import Any, Dict, Optional
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import case, func, literal, or_, select
+from sqlalchemy.orm import Session
+
+from backend.logging_config import get_logger
+from backend.models import Submission, TestResult
+
+logger = get_logger(__name__)
+
+# Submissions with stored test results
+RESCORABLE_STATUSES = ("completed", "timeout", "output_limit")
+
+
+class Rescorer:
+    """Recomputes stored scores of a problem with a new rubric, in SQL"""
+
+    def rescore(
+        self,
+        db: Session,
+        problem_id: str,
+        rubric: Dict[str, Any],
+        version: str,
+        student_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Rescore every finished submission of a problem not scored by `version`.
+
+        Commits on success.
+
+        Args:
+            db: Database session
+            problem_id: Problem whose submissions are rescored
+            rubric: Current rubric (tests with points/visibility, max_points)
+            version: rubric_scorer.rubric_version(rubric)
+            student_id: Only this student's submissions
+
+        Returns:
+            Dictionary with the number of submissions rescored and whose score changed
+        """
+        conditions = [
+            Submission.problem_id == problem_id,
+            Submission.status.in_(RESCORABLE_STATUSES),
+            or_(Submission.rubric_version.is_(None), Submission.rubric_version != version),
+        ]
+        if student_id:
+            conditions.append(Submission.student_id == student_id)
+        targets = select(Submission.id).where(*conditions).scalar_subquery()
+
+        tests = rubric.get("tests", [])
+        points_by_test = {t["name"]: float(t.get("points", 0)) for t in tests}
+        visibility_by_test = {t["name"]: t.get("visibility", "public") for t in tests}
+        max_points = (
+            case(points_by_test, value=TestResult.test_name, else_=0.0)
+            if points_by_test else literal(0.0)
+        )
+        visibility = (
+            case(visibility_by_test, value=TestResult.test_name, else_="public")
+            if visibility_by_test else literal("public")
+        )
+
+        score_max = float(rubric.get("max_points", 0))
+
+        try:
+            if points_by_test:
+                db.query(TestResult).filter(
+                    TestResult.submission_id.in_(targets),
+                    TestResult.test_name.notin_(list(points_by_test))
+                ).delete(synchronize_session=False)
+            db.query(TestResult).filter(TestResult.submission_id.in_(targets)).update({
+                TestResult.max_points: max_points,
+                TestResult.points: case((TestResult.outcome == "passed", max_points), else_=0.0),
+                TestResult.visibility: visibility,
+            }, synchronize_session=False)
+
+            points_sum = (
+                select(func.coalesce(func.sum(TestResult.points), 0.0))
+                .where(TestResult.submission_id == Submission.id)
+                .scalar_subquery()
+            )
+            # Never more than the rubric allows (portable LEAST)
+            new_total = case((points_sum > score_max, literal(score_max)), else_=points_sum)
+            score_changed = db.query(func.count(Submission.id)).filter(
+                *conditions, func.coalesce(Submission.score_total, 0.0) != new_total
+            ).scalar()
+            rescored = db.query(Submission).filter(*conditions).update({
+                Submission.score_total: new_total,
+                Submission.score_max: score_max,
+                Submission.passed: _count_results(TestResult.outcome == "passed"),
+                Submission.failed: _count_results(TestResult.outcome.in_(("failed", "timeout"))),
+                Submission.errors: _count_results(TestResult.outcome.notin_(("passed", "failed", "timeout"))),
+                Submission.rubric_version: version,
+            }, synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        result = {"problem_id": problem_id, "rescored": rescored, "score_changed": score_changed}
+        logger.info(f"Rescored problem {problem_id}", extra={**result, "rubric_version": version})
+        return result
+
+
+def _count_results(condition):
+    """Correlated count of the submission's results matching condition (RubricScorer's counters)"""
+    return (
+        select(func.count(TestResult.id))
+        .where(TestResult.submission_id == Submission.id, condition)
+        .scalar_subquery()
+    )
+
+
+# Singleton instance
+rescorer = Rescorer()
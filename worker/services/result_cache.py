@@ -0,0 +1,163 @@
+"""
+Content-addressed cache of sandbox results.
+
+PERFORMANCE: Many submissions are byte-identical (the unmodified starter,
+the canonical short answer). Their sandbox run is reused instead of
+starting a container again.
+- Key: sha256 of the normalized code, the problem's test files, rubric.json
+  and the effective limits, so editing any of them invalidates the entry
+- Value: the raw run (report, output, exit code); scoring and persistence
+  still happen in the task as for a fresh run
+- Only deterministic outcomes are stored: no timeouts (whole run or per
+  test), kills or infra errors
+- Hit/miss counters in Redis DB 1 (see backend.cache.get_result_cache_stats)
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.cache import (
+    redis_cache_client,
+    RESULT_CACHE_PREFIX,
+    RESULT_CACHE_HITS_KEY,
+    RESULT_CACHE_MISSES_KEY,
+)
+from backend.logging_config import get_logger
+from .docker_runner import DockerRunResult
+
+logger = get_logger(__name__)
+
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", str(7 * 24 * 3600)))  # 7 days
+# Files whose content defines what a run computes
+PROBLEM_FILES = ("tests_public.py", "tests_hidden.py", "tests.py", "cases.json", "rubric.json")
+# pytest exit codes that describe the code, not the sandbox (ok, failed, error, no tests)
+CACHEABLE_RETURNCODES = (0, 1, 2, 5)
+# Bump when the harness or report format changes
+KEY_VERSION = "1"
+
+
+def normalize_code(code: str) -> str:
+    """
+    Normalize code without changing its meaning.
+
+    Only line endings, a BOM and trailing whitespace at the end of the file
+    are normalized; the tokenizer treats these variants identically.
+    """
+    return code.lstrip("\ufeff").replace("\r\n", "\n").replace("\r", "\n").rstrip() + "\n"
+
+
+class ResultCache:
+    """Redis-backed cache of sandbox results keyed by content hash"""
+
+    def __init__(self, client=None, ttl: int = RESULT_CACHE_TTL, enabled: bool = None):
+        self.client = client if client is not None else redis_cache_client
+        self.ttl = ttl
+        if enabled is None:
+            enabled = os.getenv("RESULT_CACHE_ENABLED", "1") == "1"
+        self.enabled = enabled
+
+    def compute_key(
+        self,
+        problem_dir: Path,
+        code: str,
+        timeout_sec: float,
+        memory_mb: int,
+        extra: str = "",
+        file_hashes: Optional[Dict[str, bytes]] = None
+    ) -> str:
+        """
+        Build the cache key for a (problem, test suite, code) triple.
+
+        Args:
+            problem_dir: Problem directory with tests and rubric
+            code: Student code
+            timeout_sec: Effective timeout (after metadata.json overrides)
+            memory_mb: Effective memory limit
+            extra: Anything else the run depends on (e.g. harness content)
+            file_hashes: sha256 digests of the problem files, if already known
+                (ProblemAssets.file_hashes); read from problem_dir otherwise
+
+        Returns:
+            Redis key
+        """
+        digest = hashlib.sha256()
+        digest.update(f"v{KEY_VERSION}\0{timeout_sec}\0{memory_mb}\0".encode())
+        digest.update(hashlib.sha256(extra.encode("utf-8")).digest())
+        for name in PROBLEM_FILES:
+            if file_hashes is not None:
+                file_hash = file_hashes.get(name, b"-")
+            else:
+                path = problem_dir / name
+                file_hash = hashlib.sha256(path.read_bytes()).digest() if path.exists() else b"-"
+            digest.update(name.encode() + b"\0" + file_hash)
+        digest.update(hashlib.sha256(normalize_code(code).encode("utf-8")).digest())
+        return f"{RESULT_CACHE_PREFIX}:{problem_dir.name}:{digest.hexdigest()}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached run for key (counting a hit or miss), or None"""
+        if not self.enabled:
+            return None
+        try:
+            cached = self.client.get(key)
+            self.client.incr(RESULT_CACHE_HITS_KEY if cached else RESULT_CACHE_MISSES_KEY)
+        except Exception as e:
+            logger.warning(f"Result cache read error: {e}")
+            return None
+        if not cached:
+            return None
+        logger.info("Result cache hit", extra={"cache_key": key})
+        return json.loads(cached)
+
+    def put(self, key: str, result: DockerRunResult, test_details: List[Dict[str, Any]]) -> bool:
+        """
+        Store a run if its outcome is deterministic.
+
+        Returns:
+            True if the result was stored
+        """
+        if not self.enabled or not self.is_cacheable(result, test_details):
+            return False
+        entry = {
+            "stdout": result.stdout,
+            "stderr": result.stderr,
+            "returncode": result.returncode,
+            "duration": result.duration,
+            "test_details": test_details,
+            "usage": result.usage,
+        }
+        try:
+            self.client.setex(key, self.ttl, json.dumps(entry, ensure_ascii=False))
+        except Exception as e:
+            logger.warning(f"Result cache write error: {e}")
+            return False
+        return True
+
+    @staticmethod
+    def is_cacheable(result: DockerRunResult, test_details: List[Dict[str, Any]]) -> bool:
+        if result.timed_out or result.output_limited or result.returncode not in CACHEABLE_RETURNCODES:
+            return False
+        if result.usage.get("oom_killed"):
+            return False
+        # Per-test timeouts depend on machine load
+        return all(test.get("outcome") != "timeout" for test in test_details)
+
+    @staticmethod
+    def to_run_result(entry: Dict[str, Any]) -> DockerRunResult:
+        """Rebuild the DockerRunResult of a cached entry"""
+        return DockerRunResult(
+            stdout=entry["stdout"],
+            stderr=entry["stderr"],
+            returncode=entry["returncode"],
+            duration=entry["duration"],
+            timed_out=False,
+            test_details=entry["test_details"],
+            usage=entry.get("usage", {})
+        )
+
+
+# Singleton instance
+result_cache = ResultCache()
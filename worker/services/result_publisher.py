@@ -0,0 +1,84 @@
+"""
+Publishes finished submission results to a Redis stream (write-behind).
+
+PERFORMANCE: With RESULT_PERSISTENCE=stream a job never opens a DB
+session: it appends a "running" and a "result" message to RESULTS_STREAM
+(one XADD each, on the RQ Redis) and the batching writer
+(worker/result_writer.py) turns hundreds of them into one transaction.
+Messages are self-contained (Submission fields + TestResult rows), so
+applying one twice leaves the same rows: delivery is at-least-once and
+the writes are idempotent. The stream is not trimmed here; the writer
+deletes what it has committed, so XLEN is the unwritten backlog.
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from redis import Redis
+
+from backend.cache import RESULTS_STREAM
+from backend.config import settings
+
+# Bump when the message layout changes
+MESSAGE_VERSION = 1
+
+
+def encode_message(kind: str, submission_id: int, **payload: Any) -> Dict[str, str]:
+    """Stream entry fields of a message"""
+    return {"data": json.dumps({"v": MESSAGE_VERSION, "kind": kind, "submission_id": submission_id, **payload})}
+
+
+def decode_message(fields: Dict[Any, Any]) -> Dict[str, Any]:
+    """Inverse of encode_message (accepts bytes or str fields)"""
+    data = fields.get(b"data", fields.get("data"))
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+class ResultPublisher:
+    """Appends submission status changes and results to RESULTS_STREAM"""
+
+    def __init__(self, client: Optional[Redis] = None, stream: str = RESULTS_STREAM):
+        self._client = client
+        self.stream = stream
+
+    @property
+    def client(self) -> Redis:
+        if self._client is None:
+            self._client = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB)
+        return self._client
+
+    def publish_running(self, submission_id: int) -> None:
+        """The job started grading the submission"""
+        self.client.xadd(self.stream, encode_message("running", submission_id))
+
+    def publish_result(
+        self,
+        submission_id: int,
+        fields: Dict[str, Any],
+        test_results: Optional[List[Dict[str, Any]]],
+        completed_at: Optional[datetime] = None
+    ) -> None:
+        """
+        The submission finished (or failed).
+
+        Args:
+            submission_id: Submission ID
+            fields: Submission column values (see tasks.grade_submission)
+            test_results: TestResult column values replacing the stored ones
+                (None keeps them, e.g. for an infrastructure failure)
+            completed_at: Completion time (default: now)
+        """
+        completed_at = completed_at or datetime.utcnow()
+        self.client.xadd(self.stream, encode_message(
+            "result", submission_id,
+            fields=fields, test_results=test_results, completed_at=completed_at.isoformat()
+        ))
+
+
+# Singleton instance
+result_publisher = ResultPublisher()
@@ -0,0 +1,143 @@
+"""
+Decoder for the runner's result stream.
+
+PERFORMANCE: The runner plugin (runner/playground_harness/plugin.py) writes
+one compact frame per test to stdout as the test completes, interleaved
+with pytest's console output. No report.json is written in the workspace
+or read back by the worker, and records of tests that finished before a
+timeout kill are still decoded.
+
+Frame: MAGIC (4 bytes) | payload length (uint32, big endian) | JSON
+
+After the session, the harness supervisor adds a "usage" record with the
+run's CPU time, peak memory, OOM kill and exit signal.
+
+Only the supervisor writes frames to stdout: the tests' own output is
+relayed with MAGIC escaped (runner/playground_harness/usage.py), so a
+frame printed by student code stays console text.
+"""
+import json
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+# Must match runner/playground_harness/protocol.py
+PROTOCOL_VERSION = 1
+MAGIC = b"\x00PGR"
+HEADER = struct.Struct(">4sI")
+MAX_FRAME_BYTES = 1024 * 1024
+
+
+class ResultStreamDecoder:
+    """
+    Incremental decoder: feed() stdout chunks as they arrive.
+
+    Console bytes accumulate in `console` (a bytearray, or any buffer with
+    extend() and bytes(), e.g. output_capture.HeadTailBuffer); records in
+    `records`.
+    """
+
+    def __init__(self, console=None):
+        self.console = console if console is not None else bytearray()
+        self.records: List[Dict[str, Any]] = []
+        self.exitstatus: Optional[int] = None
+        self.usage: Dict[str, Any] = {}
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Dict[str, Any]]:
+        """
+        Consume a chunk of stdout.
+
+        Returns:
+            Records completed by this chunk
+        """
+        self._buffer += data
+        completed = []
+        while True:
+            index = self._buffer.find(MAGIC)
+            if index < 0:
+                # Keep a possible MAGIC prefix split across chunks
+                keep = _partial_magic_suffix(self._buffer)
+                self.console.extend(self._buffer[:len(self._buffer) - keep])
+                del self._buffer[:len(self._buffer) - keep]
+                break
+            self.console.extend(self._buffer[:index])
+            del self._buffer[:index]
+            if len(self._buffer) < HEADER.size:
+                break
+            _, length = HEADER.unpack_from(self._buffer)
+            if length > MAX_FRAME_BYTES:
+                # Not a frame (or a corrupt one): treat the magic as output
+                self.console.extend(self._buffer[:len(MAGIC)])
+                del self._buffer[:len(MAGIC)]
+                continue
+            end = HEADER.size + length
+            if len(self._buffer) < end:
+                break
+            record = self._parse(bytes(self._buffer[HEADER.size:end]))
+            del self._buffer[:end]
+            if record is not None:
+                completed.append(record)
+        return completed
+
+    def _parse(self, payload: bytes) -> Optional[Dict[str, Any]]:
+        try:
+            record = json.loads(payload)
+        except ValueError:
+            return None
+        if record.get("event") == "end":
+            self.exitstatus = record.get("exitstatus")
+        elif record.get("event") == "usage":
+            self.usage = {key: value for key, value in record.items() if key != "event"}
+        self.records.append(record)
+        return record
+
+    @property
+    def finished(self) -> bool:
+        """True when the pytest session reported its end"""
+        return self.exitstatus is not None
+
+    def test_details(self) -> List[Dict[str, Any]]:
+        """Per-test records in the format RubricScorer expects"""
+        return [
+            {key: value for key, value in record.items() if key != "event"}
+            for record in self.records
+            if record.get("event") == "test"
+        ]
+
+    def console_text(self) -> str:
+        """Console output decoded; a truncated trailing frame is dropped"""
+        return bytes(self.console).decode("utf-8", errors="replace")
+
+
+def decode_result_stream(stdout) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Decode a complete (or cut-off) stdout capture.
+
+    Returns:
+        Tuple of (console output, per-test records)
+    """
+    console, test_details, _ = decode_run_output(stdout)
+    return console, test_details
+
+
+def decode_run_output(stdout) -> Tuple[str, List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Like decode_result_stream(), plus the run's usage record.
+
+    Returns:
+        Tuple of (console output, per-test records, usage; {} if the run was
+        killed before the harness could report it)
+    """
+    if isinstance(stdout, str):
+        stdout = stdout.encode("utf-8")
+    decoder = ResultStreamDecoder()
+    decoder.feed(stdout or b"")
+    return decoder.console_text(), decoder.test_details(), decoder.usage
+
+
+def _partial_magic_suffix(buffer: bytearray) -> int:
+    """Length of the longest suffix of buffer that is a prefix of MAGIC"""
+    for size in range(min(len(MAGIC) - 1, len(buffer)), 0, -1):
+        if buffer[-size:] == MAGIC[:size]:
+            return size
+    return 0
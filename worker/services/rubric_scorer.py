@@ -1,9 +1,13 @@
 """
 Rubric Scorer Service - Applies scoring rubrics to test results
 """
-from typing import Dict, List, Any
+import hashlib
+import json
+from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 
+RUBRIC_VERSION_CHARS = 16
+
 
 @dataclass
 class TestScore:
@@ -15,6 +19,8 @@ class TestScore:
     points: float
     max_points: float
     visibility: str
+    cpu_time: Optional[float] = None  # CPU seconds of the test call
+    peak_memory_kb: Optional[int] = None  # Peak RSS of the test process when the test ended
 
 
 @dataclass
@@ -26,6 +32,7 @@ class ScoringResult:
     passed: int
     failed: int
     errors: int
+    timeouts: int = 0  # Tests over their time budget (also counted as failed)
 
 
 class RubricScorer:
@@ -51,13 +58,11 @@ class RubricScorer:
 
         # Score each test
         test_scores = []
-        passed = failed = errors = 0
+        passed = failed = errors = timeouts = 0
         score_total = 0.0
         score_max = rubric.get("max_points", 0)
 
-        for test in test_details:
-            # Extract test name (remove path prefix if present)
-            test_name = test["name"].split("::")[-1]
+        for test_name, test in self._one_record_per_test(test_details, rubric_map).items():
             outcome = test["outcome"]
 
             # Count outcomes
@@ -65,6 +70,10 @@ class RubricScorer:
                 passed += 1
             elif outcome == "failed":
                 failed += 1
+            elif outcome == "timeout":
+                # Hung test: no points, the tests that finished keep theirs
+                failed += 1
+                timeouts += 1
             else:
                 errors += 1
 
@@ -85,19 +94,51 @@ class RubricScorer:
                 message=test["message"][:500],  # Limit message size
                 points=points,
                 max_points=max_points,
-                visibility=visibility
+                visibility=visibility,
+                cpu_time=test.get("cpu_time"),
+                peak_memory_kb=test.get("max_rss_kb")
             )
             test_scores.append(test_score)
 
         return ScoringResult(
             test_scores=test_scores,
-            score_total=score_total,
+            # Never more than the rubric allows
+            score_total=min(score_total, score_max),
             score_max=score_max,
             passed=passed,
             failed=failed,
-            errors=errors
+            errors=errors,
+            timeouts=timeouts
         )
 
+    @staticmethod
+    def _one_record_per_test(
+        test_details: List[Dict[str, Any]],
+        rubric_map: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Reduce the records to one per rubric test name (path prefix removed).
+
+        The records come from the sandbox, where student code runs, so they
+        are not trusted: names the rubric does not list are dropped (when it
+        lists any), and if a test has several records, one that did not pass
+        wins over a "passed" one.
+        """
+        records: Dict[str, Dict[str, Any]] = {}
+        for test in test_details:
+            test_name = test["name"].split("::")[-1]
+            if rubric_map and test_name not in rubric_map:
+                continue
+            if test_name not in records or records[test_name]["outcome"] == "passed":
+                records[test_name] = test
+        return records
+
+
+def rubric_version(rubric: Dict[str, Any]) -> str:
+    """Content hash of a rubric, stored on each submission it scored"""
+    canonical = json.dumps(rubric, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:RUBRIC_VERSION_CHARS]
+
 
 # Singleton instance
 rubric_scorer = RubricScorer()
@@ -0,0 +1,142 @@
+"""
+Sandbox runner interface and backend selection.
+
+Every backend runs the runner harness (runner/playground_harness) on a
+job's workspace and returns a DockerRunResult:
+- cli: `docker run` / `docker exec` per job (docker_runner.py)
+- api: Docker Engine API over the socket (docker_api_runner.py)
+- namespace: Linux namespaces + cgroup v2 on the worker host, no Docker
+  (namespace_runner.py)
+Selected with SANDBOX_BACKEND.
+
+With the read-only problem store (problem_store.py), run()/run_archive()
+get `tests_dir`: the problem's precompiled test directory, which the backend
+mounts read-only instead of expecting the tests in the workspace.
+"""
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from .docker_runner import DockerRunResult
+
+SANDBOX_BACKENDS = ("cli", "api", "namespace")
+TEST_FILES = ("tests_public.py", "tests_hidden.py")
+
+
+class SandboxRunner(ABC):
+    """Runs the test harness on a workspace under time and memory limits"""
+
+    @property
+    @abstractmethod
+    def streams_workspace(self) -> bool:
+        """True when jobs should use run_archive() instead of run()"""
+
+    @property
+    def mounts_problem_store(self) -> bool:
+        """True when run()/run_archive() accept a read-only tests_dir"""
+        return True
+
+    @abstractmethod
+    def run(
+        self,
+        workspace: str,
+        timeout_sec: float = 5.0,
+        memory_mb: int = None,
+        cpus: str = None,
+        test_timeout_sec: float = None,
+        max_output_bytes: int = None,
+        submission_id: int = None,
+        tests_dir: str = None
+    ) -> "DockerRunResult":
+        """
+        Run the tests of a workspace directory
+
+        Args:
+            workspace: Path to workspace directory (in worker container)
+            timeout_sec: Execution timeout in seconds (budget for all tests)
+            memory_mb: Memory limit in MB
+            cpus: CPU limit as string (e.g., "1.0")
+            test_timeout_sec: Budget per test; a test over it is reported as
+                "timeout" and the remaining tests keep running
+            max_output_bytes: Output budget (stdout + stderr); the sandbox is
+                killed and the result marked output_limited when exceeded
+            submission_id: Submission being graded, to label the sandbox
+            tests_dir: Problem store version directory (in the worker) to mount
+                read-only; None when the tests are in the workspace
+
+        Returns:
+            DockerRunResult with execution details
+        """
+
+    @abstractmethod
+    def run_archive(
+        self,
+        files: Dict[str, bytes],
+        timeout_sec: float = 5.0,
+        memory_mb: int = None,
+        cpus: str = None,
+        test_timeout_sec: float = None,
+        max_output_bytes: int = None,
+        submission_id: int = None,
+        tests_dir: str = None
+    ) -> "DockerRunResult":
+        """
+        Run the tests of an in-memory workspace (name -> content)
+
+        Same arguments and result as run().
+        """
+
+    @abstractmethod
+    def precompile_tests(self, store_dir: str) -> None:
+        """
+        Precompile the test modules of a problem store directory in place
+
+        Runs `playground_harness precompile` with the sandbox's interpreter
+        and pytest, seeing store_dir where run() will mount it.
+
+        Raises:
+            Exception: Precompilation failed (runs still work, only slower)
+        """
+
+    @staticmethod
+    def _pytest_args(tests_mount: Optional[str] = None) -> List[str]:
+        """pytest arguments for tests in the workspace, or mounted on tests_mount"""
+        if not tests_mount:
+            return ["-q", "--tb=short", *TEST_FILES]
+        # Node IDs stay "tests_public.py::..." and nothing is written next to the tests
+        return [
+            "-q", "--tb=short", "-p", "no:cacheprovider", "--rootdir", tests_mount,
+            *(f"{tests_mount}/{name}" for name in TEST_FILES)
+        ]
+
+    @staticmethod
+    def _budget_args(timeout_sec: Optional[float], test_timeout_sec: Optional[float]) -> List[str]:
+        """Harness flags for the per-test and whole-run time budgets"""
+        args = []
+        if test_timeout_sec:
+            args += ["--test-timeout", f"{float(test_timeout_sec):g}"]
+        if timeout_sec:
+            args += ["--session-timeout", f"{float(timeout_sec):g}"]
+        return args
+
+
+def get_sandbox_runner(backend: str) -> SandboxRunner:
+    """
+    Singleton runner of a backend
+
+    Args:
+        backend: One of SANDBOX_BACKENDS
+
+    Raises:
+        ValueError: Unknown backend
+    """
+    if backend == "cli":
+        from .docker_runner import docker_runner
+        return docker_runner
+    if backend == "api":
+        from .docker_api_runner import docker_api_runner
+        return docker_api_runner
+    if backend == "namespace":
+        from .namespace_runner import namespace_runner
+        return namespace_runner
+    raise ValueError(f"Unknown SANDBOX_BACKEND {backend!r} (expected one of {', '.join(SANDBOX_BACKENDS)})")
@@ -0,0 +1,55 @@
+"""
+Publishes submission status changes for the API to push to students.
+
+PERFORMANCE: Instead of students polling /api/result, the API waits on
+Redis pub/sub (backend/services/submission_events.py). Every status change
+is PUBLISHed on `submission_events:{id}` after its commit, so a listener
+that reads the database on the event always sees the new state. One
+PUBLISH per change (one pipeline per batch from the result writer);
+failures are logged and never fail the job, the API re-checks the database
+when a wait times out.
+"""
+import json
+from typing import Dict
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.cache import redis_cache_client, SUBMISSION_EVENTS_PREFIX
+from backend.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def submission_channel(submission_id: int) -> str:
+    return f"{SUBMISSION_EVENTS_PREFIX}:{submission_id}"
+
+
+class SubmissionNotifier:
+    """PUBLISHes committed status changes of submissions"""
+
+    def __init__(self, client=None):
+        self.client = client if client is not None else redis_cache_client
+
+    def notify(self, submission_id: int, status: str) -> None:
+        """Announce the committed status of one submission"""
+        self.notify_many({submission_id: status})
+
+    def notify_many(self, statuses: Dict[int, str]) -> None:
+        """Announce the committed statuses of several submissions in one round trip"""
+        if not statuses:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for submission_id, status in statuses.items():
+                pipe.publish(submission_channel(submission_id), json.dumps({"status": status}))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(
+                f"Could not publish status of {len(statuses)} submissions: {e}",
+                extra={"submission_ids": sorted(statuses)[:20]}
+            )
+
+
+# Singleton instance
+submission_notifier = SubmissionNotifier()
@@ -0,0 +1,94 @@
+"""
+Live per-test progress of a submission in a small Redis hash.
+
+PERFORMANCE: The API used to call Job.fetch for in-flight submissions,
+deserializing the whole RQ job (student code included) to read a status
+string. Instead `submission_progress:{id}` (Redis DB 1, backend.cache) holds
+only what the student sees while waiting:
+- state and queued_at (outbox relay, on enqueue), started_at and
+  tests_total (worker, on claim), finished_at (worker, after persisting)
+- tests_done and the partial score, updated as each test's frame is
+  decoded from the sandbox output (output_capture.test_listener), with one
+  pipelined HSET + PUBLISH per test so SSE clients get it live
+The API reads it with one HGETALL. Failures are logged and never fail a job.
+"""
+import json
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.cache import redis_cache_client, SUBMISSION_PROGRESS_PREFIX, SUBMISSION_PROGRESS_TTL
+from backend.logging_config import get_logger
+from .output_capture import test_listener
+from .submission_notifier import submission_channel
+
+logger = get_logger(__name__)
+
+
+def progress_key(submission_id: int) -> str:
+    return f"{SUBMISSION_PROGRESS_PREFIX}:{submission_id}"
+
+
+class SubmissionProgress:
+    """Maintains the progress hash of the submissions a worker runs"""
+
+    def __init__(self, client=None):
+        self.client = client if client is not None else redis_cache_client
+
+    def started(self, submission_id: int, rubric: Dict[str, Any]) -> None:
+        """The job claimed the submission: reset the counters"""
+        self._write(submission_id, {
+            "state": "running",
+            "started_at": datetime.utcnow().isoformat(),
+            "tests_done": 0,
+            "tests_total": len(rubric.get("tests", [])),
+            "score": 0.0,
+            "score_max": float(rubric.get("max_points", 0)),
+        })
+
+    def finished(self, submission_id: int, status: str) -> None:
+        """The result is stored: the API reads the database from now on"""
+        self._write(submission_id, {"state": status, "finished_at": datetime.utcnow().isoformat()})
+
+    @contextmanager
+    def track(self, submission_id: int, rubric: Dict[str, Any]) -> Iterator[None]:
+        """Count the tests of the sandbox runs made inside the block"""
+        points = {t["name"]: float(t.get("points", 0)) for t in rubric.get("tests", [])}
+        counters = {"tests_done": 0, "score": 0.0}
+
+        def on_test(record: Dict[str, Any]) -> None:
+            counters["tests_done"] += 1
+            if record.get("outcome") == "passed":
+                counters["score"] += points.get(str(record.get("name", "")).split("::")[-1], 0.0)
+            self._write(submission_id, dict(counters), publish=True)
+
+        token = test_listener.set(on_test)
+        try:
+            yield
+        finally:
+            test_listener.reset(token)
+
+    def _write(self, submission_id: int, fields: Dict[str, Any], publish: bool = False) -> None:
+        key = progress_key(submission_id)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hset(key, mapping=fields)
+            pipe.expire(key, SUBMISSION_PROGRESS_TTL)
+            if publish:
+                pipe.publish(
+                    submission_channel(submission_id),
+                    json.dumps({"status": "running", "progress": fields})
+                )
+            pipe.execute()
+        except Exception as e:
+            logger.warning(
+                f"Could not update progress of submission {submission_id}: {e}",
+                extra={"submission_id": submission_id}
+            )
+
+
+# Singleton instance
+submission_progress = SubmissionProgress()
@@ -0,0 +1,39 @@
+"""
+In-memory workspace archives for streamed sandboxes.
+
+PERFORMANCE: Instead of mkdtemp + chmod + one write per file on the shared
+/workspaces volume, the job's files are packed into a tar in memory and
+streamed to the container's stdin, where the harness unpacks them into a
+tmpfs /workspace. Nothing touches the worker's disk.
+"""
+import io
+import tarfile
+import time
+from typing import Dict
+
+SANDBOX_UID = 1000
+SANDBOX_GID = 1000
+
+
+def build_workspace_archive(files: Dict[str, bytes]) -> bytes:
+    """
+    Pack workspace files into an uncompressed tar.
+
+    Args:
+        files: Mapping of relative file name to content
+
+    Returns:
+        Tar archive bytes, files owned by the sandbox user
+    """
+    buffer = io.BytesIO()
+    mtime = time.time()
+    with tarfile.open(fileobj=buffer, mode="w", format=tarfile.PAX_FORMAT) as archive:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            info.mode = 0o644
+            info.uid = SANDBOX_UID
+            info.gid = SANDBOX_GID
+            info.mtime = mtime
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
@@ -4,11 +4,9 @@ RQ Worker tasks for running submissions in Docker sandbox
 import tempfile
 import shutil
 import pathlib
-import json
 import os
 from datetime import datetime
-from typing import Optional
-from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Tuple
 
 # Importar modelos y database
 import sys
@@ -16,43 +14,242 @@ sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
 
 from backend.database import SessionLocal
 from backend.models import Submission, TestResult
-from backend.config import settings
 from backend.logging_config import get_logger
 
 # Importar services
-from .services.docker_runner import docker_runner
-from .services.rubric_scorer import rubric_scorer
+from .services.db_hold_metrics import db_hold_metrics
+from .services.docker_runner import HARNESS_TIMEOUT_EXIT
+from .services.rubric_scorer import TestScore, rubric_scorer
+from .services.problem_assets import problem_asset_cache
+from .services.problem_store import problem_store
+from .services.result_cache import result_cache, ResultCache
+from .services.result_publisher import result_publisher
+from .services.result_stream import PROTOCOL_VERSION
+from .services.sandbox_runner import get_sandbox_runner
+from .services.submission_notifier import submission_notifier
+from .services.submission_progress import submission_progress
 
 logger = get_logger(__name__)
 
 
 DEFAULT_TIMEOUT = 5.0  # segundos
+# Presupuesto por test si metadata.json no define test_timeout_sec (fracción de timeout_sec)
+DEFAULT_TEST_TIMEOUT_FRACTION = 0.5
 DEFAULT_MEMORY_MB = 256
+# Salida máxima (stdout + stderr) si metadata.json no define max_output_kb
+DEFAULT_MAX_OUTPUT_KB = 1024
 WORKSPACE_DIR = os.getenv("WORKSPACE_DIR", "/workspaces")  # Directorio dentro del worker container
+# cli: docker CLI, api: Docker Engine API, namespace: namespaces + cgroups sin Docker
+SANDBOX_BACKEND = os.getenv("SANDBOX_BACKEND", "cli")
+# direct: el job escribe en la DB, stream: publica en Redis y worker/result_writer.py escribe en lotes
+RESULT_PERSISTENCE = os.getenv("RESULT_PERSISTENCE", "direct")
 
+sandbox_runner = get_sandbox_runner(SANDBOX_BACKEND)
 
-def _copy_test_file(src: pathlib.Path, dest: pathlib.Path, file_type: str) -> None:
-    """
-    Copy test file with proper permissions and error handling.
 
-    Args:
-        src: Source test file path
-        dest: Destination path in workspace
-        file_type: Type of test file (e.g., "public", "hidden", "legacy")
+def _write_workspace_file(path: pathlib.Path, content: bytes) -> None:
+    """Write a workspace file readable and writable by the sandbox user (uid 1000)"""
+    path.write_bytes(content)
+    os.chmod(path, 0o666)
+
+
+def _prepare_workspace(problem_id: str, code: str, test_files: Dict[str, bytes]) -> str:
+    """
+    Create the bind-mounted workspace directory for a run.
 
-    Raises:
-        Exception: If file copy fails
+    Returns:
+        Path of the workspace (inside the worker container)
     """
+    # Crear workspace temporal en directorio compartido con host
+    # Esto es necesario para que Docker pueda montar el volumen
+    workspace = tempfile.mkdtemp(prefix=f"sandbox-{problem_id}-", dir=WORKSPACE_DIR)
+    workspace_path = pathlib.Path(workspace)
+
+    # Dar permisos 777 al workspace para que el usuario sandbox (uid 1000) pueda leer/escribir
+    os.chmod(workspace, 0o777)
+
     try:
-        shutil.copy2(src, dest)
-        os.chmod(dest, 0o666)
-        logger.info(f"Copied {file_type} test file", extra={"src": str(src), "dest": str(dest)})
-    except Exception as e:
-        logger.error(
-            f"Failed to copy {file_type} test file",
-            extra={"src": str(src), "dest": str(dest), "error": str(e)}
-        )
+        # Escribir código del estudiante
+        _write_workspace_file(workspace_path / "student_code.py", code.encode("utf-8"))
+
+        # Tests públicos y ocultos desde la caché de assets (sin releer el problema)
+        for dest_name, content in test_files.items():
+            _write_workspace_file(workspace_path / dest_name, content)
+    except Exception:
+        shutil.rmtree(workspace, ignore_errors=True)
         raise
+    return workspace
+
+
+def grade_submission(
+    problem_id: str,
+    code: str,
+    timeout_sec=None,
+    memory_mb=None,
+    submission_id: int = None
+) -> Tuple[Dict[str, Any], List[TestScore]]:
+    """
+    Run student code against a problem's tests (or reuse an identical run) and score it.
+
+    Does not touch the database: shared by the submission job and bulk regrades.
+
+    Returns:
+        Tuple of (Submission column values, scored tests)
+    """
+    # Configuración
+    timeout_sec = float(timeout_sec) if timeout_sec else DEFAULT_TIMEOUT
+    memory_mb = int(memory_mb) if memory_mb else DEFAULT_MEMORY_MB
+
+    # Metadata, rúbrica y tests del problema, cacheados por proceso y
+    # revalidados por mtime (settings.PROBLEMS_DIR, fallback backend/problems)
+    assets = problem_asset_cache.get(problem_id)
+    problem_dir = assets.problem_dir
+
+    # Override de límites desde metadata.json
+    meta = assets.meta
+    timeout_sec = float(meta.get("timeout_sec", timeout_sec))
+    memory_mb = int(meta.get("memory_mb", memory_mb))
+
+    # Un test colgado se corta a los test_timeout_sec; el resto sigue corriendo
+    test_timeout_sec = float(
+        meta.get("test_timeout_sec", timeout_sec * DEFAULT_TEST_TIMEOUT_FRACTION)
+    )
+    # Un envío que imprime más que esto se corta en cuanto lo supera
+    max_output_kb = int(meta.get("max_output_kb", DEFAULT_MAX_OUTPUT_KB))
+
+    test_files = assets.test_files
+
+    # Código idéntico con los mismos tests y límites: reutilizar el resultado
+    cache_key = result_cache.compute_key(
+        problem_dir, code, timeout_sec, memory_mb,
+        extra=f"result-stream-v{PROTOCOL_VERSION}:test-timeout={test_timeout_sec}"
+              f":max-output={max_output_kb}",
+        file_hashes=assets.file_hashes
+    )
+    cached = result_cache.get(cache_key)
+
+    # Con PROBLEM_STORE_DIR los tests precompilados se montan de solo lectura
+    # y el workspace solo lleva student_code.py
+    tests_dir = None
+    if cached is None and problem_store.enabled and sandbox_runner.mounts_problem_store:
+        tests_dir = problem_store.ensure(assets, sandbox_runner.precompile_tests)
+        test_files = {}
+
+    if cached is not None:
+        docker_result = ResultCache.to_run_result(cached)
+    else:
+        docker_result = _run_sandbox(
+            problem_id, code, test_files,
+            timeout_sec=timeout_sec,
+            memory_mb=memory_mb,
+            test_timeout_sec=test_timeout_sec,
+            max_output_bytes=max_output_kb * 1024,
+            submission_id=submission_id,
+            tests_dir=tests_dir
+        )
+
+    # Resultados por test decodificados del stream del plugin del runner
+    test_details = docker_result.test_details
+
+    if cached is None:
+        result_cache.put(cache_key, docker_result, test_details)
+
+    returncode = docker_result.returncode
+    # El harness sale con HARNESS_TIMEOUT_EXIT si un test ignoró su presupuesto
+    timed_out = docker_result.timed_out or returncode == HARNESS_TIMEOUT_EXIT
+    output_limited = docker_result.output_limited
+
+    # Aplicar scoring usando RubricScorer service
+    scoring_result = rubric_scorer.score(
+        test_details=test_details,
+        rubric=assets.rubric
+    )
+
+    if timed_out:
+        status = "timeout"
+    elif output_limited:
+        status = "output_limit"
+    else:
+        status = "completed"
+
+    # Contabilidad del sandbox: CPU, pico de memoria, OOM y señal de salida
+    usage = docker_result.usage
+    error_message = None
+    if timed_out:
+        error_message = f"Execution timeout ({timeout_sec}s)"
+    elif output_limited:
+        error_message = f"Output limit exceeded ({max_output_kb} KB)"
+    elif usage.get("oom_killed"):
+        error_message = f"Memory limit exceeded ({memory_mb} MB)"
+    elif scoring_result.timeouts:
+        error_message = (
+            f"{scoring_result.timeouts} test(s) exceeded the per-test time limit "
+            f"({test_timeout_sec:g}s)"
+        )
+
+    fields = {
+        "status": status,
+        "ok": returncode == 0 and not timed_out and not output_limited,
+        "score_total": scoring_result.score_total,
+        "score_max": scoring_result.score_max,
+        "rubric_version": assets.rubric_version,
+        "passed": scoring_result.passed,
+        "failed": scoring_result.failed,
+        "errors": scoring_result.errors,
+        "duration_sec": round(docker_result.duration, 4),
+        "cpu_user_sec": usage.get("cpu_user_sec"),
+        "cpu_system_sec": usage.get("cpu_system_sec"),
+        "peak_memory_kb": usage.get("peak_memory_kb"),
+        "oom_killed": usage.get("oom_killed"),
+        "exit_signal": usage.get("exit_signal"),
+        "stdout": docker_result.stdout[:10000],  # limitar tamaño
+        "stderr": docker_result.stderr[:10000],
+        "error_message": error_message,
+    }
+    return fields, scoring_result.test_scores
+
+
+def _run_sandbox(problem_id: str, code: str, test_files: Dict[str, bytes], **limits):
+    """Run the tests with the configured sandbox backend (limits: keyword args of SandboxRunner.run)"""
+    if sandbox_runner.streams_workspace:
+        # Workspace en memoria: se envía como tar por stdin a un tmpfs
+        files = {"student_code.py": code.encode("utf-8"), **test_files}
+        return sandbox_runner.run_archive(files=files, **limits)
+
+    workspace = _prepare_workspace(problem_id, code, test_files)
+    try:
+        # Ejecutar tests en Docker usando el backend configurado
+        return sandbox_runner.run(workspace=workspace, **limits)
+    finally:
+        # Limpiar workspace
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def build_test_result_rows(submission_id: int, test_scores: List[TestScore]) -> List[Dict[str, Any]]:
+    """TestResult column values of scored tests"""
+    return [
+        {
+            "submission_id": submission_id,
+            "test_name": test_score.test_name,
+            "outcome": test_score.outcome,
+            "duration": test_score.duration,
+            "message": test_score.message,
+            "points": test_score.points,
+            "max_points": test_score.max_points,
+            "visibility": test_score.visibility,
+            "cpu_time_sec": test_score.cpu_time,
+            "peak_memory_kb": test_score.peak_memory_kb,
+        }
+        for test_score in test_scores
+    ]
+
+
+def _grade_with_progress(submission_id: int, problem_id: str, code: str, timeout_sec, memory_mb):
+    """grade_submission, updating the submission's progress hash as its tests finish"""
+    rubric = problem_asset_cache.get(problem_id).rubric
+    submission_progress.started(submission_id, rubric)
+    with submission_progress.track(submission_id, rubric):
+        return grade_submission(problem_id, code, timeout_sec, memory_mb, submission_id=submission_id)
 
 
 def run_submission_in_sandbox(submission_id: int, problem_id: str, code: str,
@@ -60,180 +257,58 @@ def run_submission_in_sandbox(submission_id: int, problem_id: str, code: str,
     """
     Execute student code in isolated Docker container.
 
-    PERFORMANCE: Uses connection pooling from backend.database (20 base + 30 overflow).
-    Connection is properly closed via try/finally to return to pool.
+    PERFORMANCE: No DB connection is held while the sandbox runs. The job is
+    three phases: claim (one UPDATE to "running"), execute (DB-free) and
+    persist (bulk insert + one UPDATE), each with its own short session from
+    the pool in backend.database; the hold time per phase is exported by
+    services/db_hold_metrics.py.
 
     Steps:
-    1. Create temp workspace
-    2. Copy problem tests and rubric
+    1. Create temp workspace (or in-memory archive with SANDBOX_WORKSPACE_MODE=stream),
+       unless an identical run is in the result cache
+    2. Load problem metadata, tests and rubric (per-process asset cache)
     3. Write student code
     4. Run Docker container with pytest
     5. Parse results and apply rubric
-    6. Save to database
+    6. Save to database (or, with RESULT_PERSISTENCE=stream, publish for the batching writer)
     """
-    db: Session = SessionLocal()
+    if RESULT_PERSISTENCE == "stream":
+        return _run_write_behind(submission_id, problem_id, code, timeout_sec, memory_mb)
 
+    hold_ms: Dict[str, float] = {}
     try:
-        # Validate connection health (pool_pre_ping=True in database.py)
-        submission = db.query(Submission).filter(Submission.id == submission_id).first()
-        if not submission:
+        # Fase 1: reclamar el job (un UPDATE, sin cargar la fila)
+        with db_hold_metrics.phase("claim", SessionLocal, hold_ms) as db:
+            claimed = db.query(Submission).filter(Submission.id == submission_id).update(
+                {"status": "running"}, synchronize_session=False
+            )
+            db.commit()
+        if not claimed:
             logger.error(
                 f"Submission {submission_id} not found in database",
                 extra={"submission_id": submission_id}
             )
             raise Exception(f"Submission {submission_id} not found")
+        submission_notifier.notify(submission_id, "running")
 
-        # Actualizar estado
-        submission.status = "running"
-        db.commit()
-
-        # Configuración
-        timeout_sec = float(timeout_sec) if timeout_sec else DEFAULT_TIMEOUT
-        memory_mb = int(memory_mb) if memory_mb else DEFAULT_MEMORY_MB
-
-        # Buscar metadata del problema usando settings
-        problem_dir = pathlib.Path(settings.PROBLEMS_DIR) / problem_id
-        if not problem_dir.exists():
-            # Fallback para desarrollo local
-            problem_dir = pathlib.Path("backend/problems") / problem_id
-        if not problem_dir.exists():
-            logger.error(
-                "Problem directory not found",
-                extra={"problem_id": problem_id, "search_paths": [settings.PROBLEMS_DIR, "backend/problems"]}
-            )
-            raise Exception(f"Problem {problem_id} not found")
-
-        meta_path = problem_dir / "metadata.json"
-        rubric_path = problem_dir / "rubric.json"
-
-        # Cargar metadata para override de límites
-        if meta_path.exists():
-            meta = json.loads(meta_path.read_text(encoding="utf-8"))
-            timeout_sec = float(meta.get("timeout_sec", timeout_sec))
-            memory_mb = int(meta.get("memory_mb", memory_mb))
-
-        # Crear workspace temporal en directorio compartido con host
-        # Esto es necesario para que Docker pueda montar el volumen
-        workspace = tempfile.mkdtemp(prefix=f"sandbox-{problem_id}-", dir=WORKSPACE_DIR)
-        workspace_path = pathlib.Path(workspace)
-
-        # Dar permisos 777 al workspace para que el usuario sandbox (uid 1000) pueda leer/escribir
-        os.chmod(workspace, 0o777)
+        # Fase 2: ejecutar en el sandbox, sin conexión a la base
+        fields, test_scores = _grade_with_progress(
+            submission_id, problem_id, code, timeout_sec, memory_mb
+        )
 
-        try:
-            # Escribir código del estudiante
-            (workspace_path / "student_code.py").write_text(code, encoding="utf-8")
-            os.chmod(workspace_path / "student_code.py", 0o666)
-
-            # Copiar tests públicos y ocultos usando helper function
-            tests_public = problem_dir / "tests_public.py"
-            tests_hidden = problem_dir / "tests_hidden.py"
-
-            # Si no existen tests_public/hidden, buscar tests.py legacy
-            if not tests_public.exists() and not tests_hidden.exists():
-                tests_legacy = problem_dir / "tests.py"
-                if tests_legacy.exists():
-                    _copy_test_file(tests_legacy, workspace_path / "tests_public.py", "legacy")
-            else:
-                if tests_public.exists():
-                    _copy_test_file(tests_public, workspace_path / "tests_public.py", "public")
-                if tests_hidden.exists():
-                    _copy_test_file(tests_hidden, workspace_path / "tests_hidden.py", "hidden")
-
-            # Copiar conftest.py para generar report.json
-            conftest_content = '''"""
-Pytest plugin to generate detailed JSON report
-"""
-import pytest
-import json
-
-test_results = []
-
-@pytest.hookimpl(tryfirst=True, hookwrapper=True)
-def pytest_runtest_makereport(item, call):
-    outcome = yield
-    report = outcome.get_result()
-
-    if report.when == "call":
-        test_results.append({
-            "name": item.nodeid,
-            "outcome": report.outcome,
-            "duration": report.duration,
-            "message": str(report.longrepr) if report.longrepr else ""
-        })
-
-def pytest_sessionfinish(session, exitstatus):
-    with open("/workspace/report.json", "w") as f:
-        json.dump(test_results, f, indent=2)
-'''
-            (workspace_path / "conftest.py").write_text(conftest_content, encoding="utf-8")
-            os.chmod(workspace_path / "conftest.py", 0o666)
-
-            # Ejecutar tests en Docker usando DockerRunner service
-            docker_result = docker_runner.run(
-                workspace=workspace,
-                timeout_sec=timeout_sec,
-                memory_mb=memory_mb
+        # Fase 3: guardar resultados individuales y el puntaje en una transacción corta
+        # (reemplazando los de una ejecución anterior del mismo job, p. ej. un reenvío del outbox)
+        with db_hold_metrics.phase("persist", SessionLocal, hold_ms) as db:
+            db.query(TestResult).filter(TestResult.submission_id == submission_id).delete(
+                synchronize_session=False
             )
-
-            stdout = docker_result.stdout
-            stderr = docker_result.stderr
-            returncode = docker_result.returncode
-            duration = docker_result.duration
-            timed_out = docker_result.timed_out
-
-            # Leer report.json generado por conftest
-            report_path = workspace_path / "report.json"
-            test_details = []
-            if report_path.exists():
-                test_details = json.loads(report_path.read_text(encoding="utf-8"))
-
-            # Cargar rúbrica
-            rubric = {"tests": [], "max_points": 0}
-            if rubric_path.exists():
-                rubric = json.loads(rubric_path.read_text(encoding="utf-8"))
-
-            # Aplicar scoring usando RubricScorer service
-            scoring_result = rubric_scorer.score(
-                test_details=test_details,
-                rubric=rubric
+            db.bulk_insert_mappings(TestResult, build_test_result_rows(submission_id, test_scores))
+            db.query(Submission).filter(Submission.id == submission_id).update(
+                {**fields, "completed_at": datetime.utcnow()}, synchronize_session=False
             )
-
-            # Guardar resultados individuales en base de datos
-            for test_score in scoring_result.test_scores:
-                test_result = TestResult(
-                    submission_id=submission_id,
-                    test_name=test_score.test_name,
-                    outcome=test_score.outcome,
-                    duration=test_score.duration,
-                    message=test_score.message,
-                    points=test_score.points,
-                    max_points=test_score.max_points,
-                    visibility=test_score.visibility
-                )
-                db.add(test_result)
-
-            # Actualizar submission usando datos del scoring_result
-            submission.status = "timeout" if timed_out else "completed"
-            submission.ok = (returncode == 0 and not timed_out)
-            submission.score_total = scoring_result.score_total
-            submission.score_max = scoring_result.score_max
-            submission.passed = scoring_result.passed
-            submission.failed = scoring_result.failed
-            submission.errors = scoring_result.errors
-            submission.duration_sec = round(duration, 4)
-            submission.stdout = stdout[:10000]  # limitar tamaño
-            submission.stderr = stderr[:10000]
-            submission.completed_at = datetime.utcnow()
-
-            if timed_out:
-                submission.error_message = f"Execution timeout ({timeout_sec}s)"
-
             db.commit()
-
-        finally:
-            # Limpiar workspace
-            shutil.rmtree(workspace, ignore_errors=True)
+        submission_progress.finished(submission_id, fields["status"])
+        submission_notifier.notify(submission_id, fields["status"])
 
     except Exception as e:
         # Marcar como fallado
@@ -243,24 +318,51 @@ def pytest_sessionfinish(session, exitstatus):
             exc_info=True
         )
         try:
-            submission.status = "failed"
-            submission.error_message = str(e)[:1000]
-            submission.completed_at = datetime.utcnow()
-            db.commit()
+            with db_hold_metrics.phase("fail", SessionLocal, hold_ms) as db:
+                db.query(Submission).filter(Submission.id == submission_id).update({
+                    "status": "failed",
+                    "error_message": str(e)[:1000],
+                    "completed_at": datetime.utcnow(),
+                }, synchronize_session=False)
+                db.commit()
+            submission_progress.finished(submission_id, "failed")
+            submission_notifier.notify(submission_id, "failed")
         except Exception as commit_error:
             logger.error(
                 f"Failed to save error status for submission {submission_id}",
                 extra={"submission_id": submission_id, "error": str(commit_error)},
                 exc_info=True
             )
-            db.rollback()
         raise
 
     finally:
-        # CRITICAL: Always close DB connection to return to pool
-        # Without this, connections leak and pool gets exhausted
-        db.close()
+        # Cada fase ya devolvió su conexión al pool; registrar cuánto la retuvo
+        db_hold_metrics.record(hold_ms)
         logger.debug(
-            f"DB connection closed for submission {submission_id}",
-            extra={"submission_id": submission_id}
+            f"DB connection held {sum(hold_ms.values()):.1f} ms for submission {submission_id}",
+            extra={"submission_id": submission_id, "db_hold_ms": hold_ms}
         )
+
+
+def _run_write_behind(submission_id: int, problem_id: str, code: str, timeout_sec, memory_mb) -> None:
+    """run_submission_in_sandbox without a DB session: results go to the Redis stream"""
+    result_publisher.publish_running(submission_id)
+    try:
+        fields, test_scores = _grade_with_progress(
+            submission_id, problem_id, code, timeout_sec, memory_mb
+        )
+    except Exception as e:
+        logger.error(
+            f"Submission {submission_id} failed with error: {str(e)}",
+            extra={"submission_id": submission_id, "problem_id": problem_id},
+            exc_info=True
+        )
+        # Sin test_results: se conservan los guardados
+        result_publisher.publish_result(
+            submission_id, {"status": "failed", "error_message": str(e)[:1000]}, None
+        )
+        raise
+
+    result_publisher.publish_result(
+        submission_id, fields, build_test_result_rows(submission_id, test_scores)
+    )
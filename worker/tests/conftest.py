@@ -95,3 +95,35 @@ def sample_docker_result():
         "duration": 1.5,
         "timed_out": False
     }
+
+
+@pytest.fixture
+def fake_docker_engine():
+    """Fake Docker Engine API listening on a temporary unix socket"""
+    import shutil
+    import tempfile
+    from worker.tests.fake_docker_engine import FakeDockerEngine
+
+    # Unix socket paths are limited to ~100 characters; keep it short
+    socket_dir = tempfile.mkdtemp(prefix="fde-")
+    engine = FakeDockerEngine(f"{socket_dir}/docker.sock").start()
+    yield engine
+    engine.stop()
+    shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def bounded_output():
+    """
+    Side effect for a patched `run_bounded`: feeds fixed output into the
+    run's OutputCapture instead of starting a process
+    """
+    from worker.services.output_capture import BoundedRun
+
+    def make(stdout=b"", stderr=b"", returncode=0, **flags):
+        def run(cmd, capture, timeout_sec, stdin=None, kill=None, **popen_kwargs):
+            capture.feed_stdout(stdout.encode() if isinstance(stdout, str) else stdout)
+            capture.feed_stderr(stderr.encode() if isinstance(stderr, str) else stderr)
+            return BoundedRun(returncode=returncode, **flags)
+        return run
+    return make
@@ -0,0 +1,264 @@
+"""
+Fake Docker Engine API served on a unix socket.
+
+Lets runner backends that talk to the Engine API be tested without a Docker
+daemon. Containers are records in memory; what a container "does" when it
+runs is decided by a `behavior` callable that receives the create body and
+returns (exit_code, stdout, stderr) or sleeps to simulate a hang.
+Containers created with OpenStdin only run once their attached stdin hit EOF;
+the received bytes are in `stdin_received`. Listing filters on labels only;
+stats report `cpu_usage_ns` of the container record.
+"""
+import json
+import os
+import socketserver
+import struct
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+Behavior = Callable[[Dict[str, Any]], Tuple[int, str, str]]
+
+# A behavior exiting with this code simulates a container killed by the OOM killer
+OOM_EXIT_CODE = 137
+
+
+def _default_behavior(config: Dict[str, Any]) -> Tuple[int, str, str]:
+    return 0, "", ""
+
+
+def _frame(stream: int, data: bytes) -> bytes:
+    return struct.pack(">BxxxI", stream, len(data)) + data
+
+
+def _bytes(data) -> bytes:
+    return data.encode() if isinstance(data, str) else data
+
+
+def _has_label(container: "_Container", label: str) -> bool:
+    key, sep, value = label.partition("=")
+    labels = container.config.get("Labels") or {}
+    return key in labels and (not sep or labels[key] == value)
+
+
+class _Container:
+    def __init__(self, config: Dict[str, Any], name: Optional[str]):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.config = config
+        self.created = int(time.time())
+        self.cpu_usage_ns = 0
+        self.status = "created"
+        self.exit_code: Optional[int] = None
+        self.oom_killed = False
+        self.stdout = ""
+        self.stderr = ""
+        self.stdin: Optional[bytes] = None
+        self.stdin_closed = threading.Event()
+        self.exited = threading.Event()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class FakeDockerEngine:
+    """In-memory Docker Engine API on a unix socket"""
+
+    def __init__(self, socket_path: str, behavior: Behavior = _default_behavior):
+        self.socket_path = socket_path
+        self.behavior = behavior
+        self.containers: Dict[str, _Container] = {}
+        self.requests: List[Tuple[str, str]] = []
+        self.connections = 0
+        self.stdin_received: List[bytes] = []
+        self.create_error: Optional[Tuple[int, str]] = None
+        self._lock = threading.Lock()
+        self._server: Optional[_Server] = None
+
+    def start(self) -> "FakeDockerEngine":
+        engine = self
+
+        class Handler(_Handler):
+            pass
+
+        Handler.engine = engine
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = _Server(self.socket_path, Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            for container in self.containers.values():
+                container.exited.set()
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _run(self, container: _Container) -> None:
+        container.status = "running"
+        if container.config.get("OpenStdin"):
+            container.stdin_closed.wait()
+        try:
+            exit_code, stdout, stderr = self.behavior(container.config)
+        except Exception as e:  # Behavior errors become a failed container
+            exit_code, stdout, stderr = 1, "", str(e)
+        if container.exited.is_set():
+            return  # Killed while running
+        container.exit_code = exit_code
+        container.oom_killed = exit_code == OOM_EXIT_CODE
+        container.stdout = stdout
+        container.stderr = stderr
+        container.status = "exited"
+        container.exited.set()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    engine: FakeDockerEngine = None
+
+    def setup(self):
+        super().setup()
+        with self.engine._lock:
+            self.engine.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def address_string(self):
+        return "unix"
+
+    def _send(self, status: int, body: Any = None, raw: bytes = None) -> None:
+        data = raw if raw is not None else (json.dumps(body).encode() if body is not None else b"")
+        self.send_response(status)
+        if raw is not None:
+            self.send_header("Content-Type", "application/vnd.docker.raw-stream")
+        else:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_chunked(self, raw: bytes, chunk_size: int = 16 * 1024) -> None:
+        """Stream a raw body in chunks, as the daemon does for followed logs"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.docker.raw-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for offset in range(0, len(raw), chunk_size):
+                piece = raw[offset:offset + chunk_size]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client stopped reading (output budget exceeded)
+        self.close_connection = True
+
+    def _body(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def _route(self, method: str) -> None:
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")[1:]  # drop API version
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.engine.requests.append((method, "/" + "/".join(parts)))
+        engine = self.engine
+
+        if method == "POST" and parts == ["containers", "create"]:
+            if engine.create_error:
+                status, message = engine.create_error
+                return self._send(status, {"message": message})
+            container = _Container(self._body(), query.get("name"))
+            engine.containers[container.id] = container
+            return self._send(201, {"Id": container.id, "Warnings": []})
+
+        if method == "GET" and parts == ["containers", "json"]:
+            labels = json.loads(query.get("filters", "{}")).get("label", [])
+            listed = [
+                {
+                    "Id": c.id,
+                    "Names": [f"/{c.name}"] if c.name else [],
+                    "Created": c.created,
+                    "Labels": c.config.get("Labels") or {},
+                    "State": c.status,
+                }
+                for c in list(engine.containers.values())
+                if (query.get("all") == "1" or c.status == "running")
+                and all(_has_label(c, label) for label in labels)
+            ]
+            return self._send(200, listed)
+
+        if len(parts) < 2 or parts[0] != "containers":
+            return self._send(404, {"message": "page not found"})
+        container = engine.containers.get(parts[1])
+        if container is None:
+            return self._send(404, {"message": f"No such container: {parts[1]}"})
+        action = parts[2] if len(parts) > 2 else None
+
+        if method == "POST" and action == "attach":
+            self.send_response(101)
+            self.send_header("Connection", "Upgrade")
+            self.send_header("Upgrade", "tcp")
+            self.end_headers()
+            self.wfile.flush()
+            container.stdin = self.rfile.read()  # Until the client's EOF
+            engine.stdin_received.append(container.stdin)
+            container.stdin_closed.set()
+            self.close_connection = True
+            return
+        if method == "POST" and action == "start":
+            threading.Thread(target=engine._run, args=(container,), daemon=True).start()
+            return self._send(204)
+        if method == "POST" and action == "wait":
+            container.exited.wait()
+            return self._send(200, {"StatusCode": container.exit_code})
+        if method == "POST" and action == "kill":
+            if container.status != "running":
+                return self._send(409, {"message": "Container is not running"})
+            container.exit_code = 137
+            container.status = "exited"
+            container.exited.set()
+            return self._send(204)
+        if method == "GET" and action == "logs":
+            follow = query.get("follow") == "1"
+            if follow:
+                container.exited.wait()
+            raw = _frame(1, _bytes(container.stdout)) + _frame(2, _bytes(container.stderr))
+            return self._send_chunked(raw) if follow else self._send(200, raw=raw)
+        if method == "GET" and action == "stats":
+            return self._send(200, {
+                "id": container.id,
+                "cpu_stats": {"cpu_usage": {"total_usage": container.cpu_usage_ns}},
+            })
+        if method == "GET" and action == "json":
+            return self._send(200, {
+                "Id": container.id,
+                "Name": container.name,
+                "Config": container.config,
+                "State": {
+                    "Status": container.status,
+                    "ExitCode": container.exit_code,
+                    "OOMKilled": container.oom_killed
+                }
+            })
+        if method == "DELETE" and action is None:
+            if container.status == "running" and query.get("force") != "1":
+                return self._send(409, {"message": "container is running"})
+            container.exited.set()
+            del engine.containers[container.id]
+            return self._send(204)
+        return self._send(404, {"message": "page not found"})
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_DELETE(self):
+        self._route("DELETE")
@@ -0,0 +1,113 @@
+"""
+Tests for the asyncio worker (scheduling only; RQ bookkeeping is mocked)
+"""
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from worker.async_worker import AsyncWorker, SlotWorker
+
+
+class FakeJob:
+    def __init__(self, job_id):
+        self.id = job_id
+
+
+@pytest.fixture
+def rq_calls():
+    """Patch the Redis-backed parts of SlotWorker and record executed jobs"""
+    state = {"running": 0, "max_running": 0, "jobs": [], "threads": set()}
+    lock = threading.Lock()
+
+    def fake_execute(slot, job, queue):
+        with lock:
+            state["running"] += 1
+            state["max_running"] = max(state["max_running"], state["running"])
+            state["threads"].add(threading.current_thread().name)
+        time.sleep(0.05)
+        with lock:
+            state["running"] -= 1
+            state["jobs"].append((job.id, slot.name))
+
+    with patch.object(SlotWorker, "register_birth"), \
+            patch.object(SlotWorker, "register_death") as register_death, \
+            patch.object(SlotWorker, "execute_job", autospec=True, side_effect=fake_execute):
+        state["register_death"] = register_death
+        yield state
+
+
+def fake_connection():
+    connection = MagicMock()
+    connection.connection_pool.connection_kwargs = {}
+    return connection
+
+
+def make_worker(jobs, concurrency):
+    """AsyncWorker whose queue yields `jobs` and is then empty"""
+    worker = AsyncWorker(fake_connection(), concurrency=concurrency)
+    pending = [(FakeJob(job_id), worker.queues[0]) for job_id in jobs]
+    worker._dequeue = lambda timeout: pending.pop(0) if pending else None
+    return worker
+
+
+class TestAsyncWorker:
+    """Test concurrent job execution in one process"""
+
+    def test_runs_all_jobs_in_burst_mode(self, rq_calls):
+        """Every dequeued job is executed once, then burst mode returns"""
+        worker = make_worker(["j1", "j2", "j3", "j4", "j5"], concurrency=2)
+
+        done = asyncio.run(worker.run(burst=True))
+
+        assert done == 5
+        assert sorted(job_id for job_id, _ in rq_calls["jobs"]) == ["j1", "j2", "j3", "j4", "j5"]
+        assert rq_calls["register_death"].call_count == 2
+
+    def test_concurrency_limit(self, rq_calls):
+        """Jobs overlap, but never more than the configured concurrency"""
+        worker = make_worker([f"j{i}" for i in range(8)], concurrency=3)
+
+        asyncio.run(worker.run(burst=True))
+
+        assert rq_calls["max_running"] == 3
+        assert all(name.startswith("sandbox-job") for name in rq_calls["threads"])
+
+    def test_each_running_job_has_its_own_slot(self, rq_calls):
+        """Concurrent jobs are reported under distinct RQ worker names"""
+        worker = make_worker(["j1", "j2"], concurrency=2)
+
+        asyncio.run(worker.run(burst=True))
+
+        assert len({slot for _, slot in rq_calls["jobs"]}) == 2
+
+    def test_stop_waits_for_running_jobs(self, rq_calls):
+        """After request_stop() no new job is dequeued, running ones finish"""
+        worker = make_worker([f"j{i}" for i in range(10)], concurrency=2)
+        original = SlotWorker.execute_job.side_effect
+
+        def stop_on_first(slot, job, queue):
+            worker.request_stop()
+            original(slot, job, queue)
+
+        SlotWorker.execute_job.side_effect = stop_on_first
+        done = asyncio.run(worker.run(burst=False))
+
+        assert 1 <= done <= 3
+        assert rq_calls["running"] == 0
+
+    def test_concurrency_from_env(self, monkeypatch):
+        """WORKER_CONCURRENCY sets the default limit"""
+        monkeypatch.setenv("WORKER_CONCURRENCY", "6")
+
+        worker = AsyncWorker(fake_connection())
+
+        assert worker.concurrency == 6
+        assert len(worker._idle_slots) == 6
+
+    def test_invalid_concurrency(self):
+        """A limit below 1 is rejected"""
+        with pytest.raises(ValueError):
+            AsyncWorker(fake_connection(), concurrency=-1)
@@ -0,0 +1,173 @@
+"""
+Tests for the adaptive sandbox concurrency controller
+"""
+import threading
+import time
+from unittest.mock import MagicMock
+
+from worker.services.concurrency_controller import (
+    ConcurrencyController,
+    HostSignals,
+    read_mem_available_ratio,
+    read_pressure,
+)
+
+CALM = HostSignals(cpu_pressure=1.0, memory_pressure=0.0, mem_available_ratio=0.6, load_per_cpu=0.2)
+
+
+def make_controller(signals=CALM, **kwargs):
+    kwargs.setdefault("min_limit", 2)
+    kwargs.setdefault("max_limit", 8)
+    return ConcurrencyController(
+        adaptive=True,
+        signal_reader=lambda: signals,
+        metrics_client=MagicMock(),
+        name="test",
+        **kwargs
+    )
+
+
+class TestHostSignals:
+    """Test procfs parsing"""
+
+    def test_read_pressure(self, tmp_path):
+        """`some avg10` is read from a PSI file"""
+        (tmp_path / "cpu").write_text(
+            "some avg10=12.34 avg60=5.00 avg300=1.00 total=123\n"
+            "full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n"
+        )
+
+        assert read_pressure("cpu", root=str(tmp_path)) == 12.34
+        assert read_pressure("memory", root=str(tmp_path)) is None
+
+    def test_read_mem_available_ratio(self, tmp_path):
+        """MemAvailable is reported as a fraction of MemTotal"""
+        meminfo = tmp_path / "meminfo"
+        meminfo.write_text("MemTotal: 1000 kB\nMemFree: 100 kB\nMemAvailable: 250 kB\n")
+
+        assert read_mem_available_ratio(str(meminfo)) == 0.25
+        assert read_mem_available_ratio(str(tmp_path / "missing")) is None
+
+
+class TestConcurrencyController:
+    """Test limit adjustments and gating"""
+
+    def test_increases_when_saturated_and_calm(self):
+        """+1 while every slot is busy and the host has headroom"""
+        controller = make_controller()
+        controller.in_flight = controller.limit
+
+        before = controller.limit
+        assert controller.adjust() == "increase"
+        assert controller.limit == before + 1
+
+    def test_holds_when_not_saturated(self):
+        """Idle slots mean there is no demand to grow for"""
+        controller = make_controller()
+
+        before = controller.limit
+        assert controller.adjust() == "hold"
+        assert controller.limit == before
+
+    def test_decreases_under_cpu_pressure(self):
+        """CPU pressure shrinks the limit multiplicatively, not below min"""
+        controller = make_controller(HostSignals(cpu_pressure=80.0), max_limit=16)
+        controller.limit = 16
+
+        assert controller.adjust() == "decrease:cpu-pressure"
+        assert controller.limit == 12
+
+        for _ in range(10):
+            controller.adjust()
+        assert controller.limit == controller.min_limit
+        assert controller.adjust() == "decrease:cpu-pressure:at-bound"
+
+    def test_decreases_on_low_memory(self):
+        """Low available memory wins over calm CPU"""
+        controller = make_controller(HostSignals(cpu_pressure=0.0, mem_available_ratio=0.05))
+
+        assert controller.adjust() == "decrease:low-memory"
+
+    def test_decreases_when_runs_get_slow(self):
+        """Runs close to their timeout are a sign of contention"""
+        controller = make_controller()
+        for _ in range(10):
+            controller.record_run(duration=4.5, timeout_sec=5.0)
+
+        assert controller.adjust() == "decrease:slow-runs"
+
+    def test_timed_out_runs_are_ignored(self):
+        """An infinite loop in student code says nothing about the host"""
+        controller = make_controller()
+        for _ in range(10):
+            controller.record_run(duration=7.0, timeout_sec=5.0, timed_out=True)
+
+        assert controller.slow_run_ratio() is None
+
+    def test_fixed_limit_when_not_adaptive(self):
+        """SANDBOX_CONCURRENCY_ADAPTIVE=0 pins the limit at max"""
+        controller = ConcurrencyController(
+            min_limit=1, max_limit=3, adaptive=False, metrics_client=MagicMock(), name="test"
+        )
+        controller.maybe_adjust()
+
+        assert controller.limit == 3
+
+    def test_run_slot_blocks_at_limit(self):
+        """No more than `limit` runs hold a slot at the same time"""
+        controller = make_controller(min_limit=2, max_limit=2, adjust_interval=0.05)
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def run():
+            with controller.run_slot():
+                with lock:
+                    running[0] += 1
+                    peak[0] = max(peak[0], running[0])
+                time.sleep(0.05)
+                with lock:
+                    running[0] -= 1
+
+        threads = [threading.Thread(target=run) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert peak[0] == 2
+        assert controller.in_flight == 0
+
+    def test_create_slot_caps_creations(self):
+        """At most max_creates container creations run concurrently"""
+        controller = make_controller(max_creates=1)
+        events = []
+
+        def create(name):
+            with controller.create_slot():
+                events.append(("start", name))
+                time.sleep(0.02)
+                events.append(("end", name))
+
+        threads = [threading.Thread(target=create, args=(i,)) for i in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # Strictly alternating start/end: creations never overlapped
+        assert [kind for kind, _ in events] == ["start", "end"] * 3
+
+    def test_exports_decision_metrics(self):
+        """Each adjustment publishes limit and decision to Redis"""
+        controller = make_controller()
+        pipe = controller.metrics_client.pipeline.return_value
+
+        controller.adjust()
+
+        key, = pipe.hset.call_args.args
+        mapping = pipe.hset.call_args.kwargs["mapping"]
+        assert key == "sandbox:concurrency:test"
+        assert mapping["limit"] == str(controller.limit)
+        assert mapping["decision"] == "hold"
+        assert mapping["cpu_pressure"] == "1.0"
+        pipe.expire.assert_called_once()
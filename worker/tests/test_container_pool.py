@@ -0,0 +1,215 @@
+"""
+Tests for ContainerPool and DockerRunner pool mode
+
+Note: Docker is mocked; the pool's background executor is replaced by an
+inline one so refills happen synchronously.
+"""
+import os
+import pytest
+from unittest.mock import Mock, patch
+from worker.services.container_pool import ContainerPool, PooledContainer, POOL_LABEL
+from worker.services.docker_runner import DockerRunner
+
+
+def _inline_submit(self, fn, *args):
+    if not self._closed:
+        fn(*args)
+
+
+def _limit_args(memory_mb, cpus):
+    return ["--network", "none", f"--cpus={cpus}", f"--memory={memory_mb}m"]
+
+
+@pytest.fixture
+def workspace_root(tmp_path):
+    root = tmp_path / "workspaces"
+    root.mkdir()
+    return root
+
+
+@pytest.fixture
+def pool(workspace_root):
+    with patch.object(ContainerPool, "_submit", _inline_submit):
+        pool = ContainerPool(
+            runner_image="runner:test",
+            workspace_dir=str(workspace_root),
+            host_workspace_dir="/host/workspaces",
+            size=2,
+            limit_args=_limit_args
+        )
+        yield pool
+        pool._closed = True
+
+
+def _docker_ok(container_ids):
+    ids = iter(container_ids)
+
+    def fake_run(cmd, **kwargs):
+        if cmd[:2] == ["docker", "run"]:
+            return Mock(stdout=f"{next(ids)}\n", stderr="", returncode=0)
+        return Mock(stdout="", stderr="", returncode=0)
+
+    return fake_run
+
+
+class TestContainerPool:
+    """Test cases for ContainerPool"""
+
+    @patch("subprocess.run")
+    def test_first_acquire_is_cold_and_fills_pool(self, mock_run, pool):
+        """First acquire returns None and starts `size` containers"""
+        mock_run.side_effect = _docker_ok(["c1", "c2"])
+
+        assert pool.acquire(128, "1.0") is None
+        assert pool.stats()["idle"] == 2
+
+    @patch("subprocess.run")
+    def test_start_command_uses_limits_and_label(self, mock_run, pool):
+        """Pooled containers get the same limits as cold runs"""
+        mock_run.side_effect = _docker_ok(["c1", "c2"])
+
+        pool.acquire(128, "0.5")
+
+        cmd = mock_run.call_args_list[0][0][0]
+        assert cmd[:5] == ["docker", "run", "-d", "--rm", "--network"]
+        assert "--memory=128m" in cmd
+        assert "--cpus=0.5" in cmd
+        assert f"{POOL_LABEL}=1" in cmd
+        assert cmd[-3:] == ["runner:test", "sleep", "infinity"]
+
+        volume = cmd[cmd.index("-v") + 1]
+        assert volume.startswith("/host/workspaces/sandbox-pool-")
+
+    @patch("subprocess.run")
+    def test_acquire_returns_warm_container(self, mock_run, pool):
+        """Second acquire gets a warm container and the pool is refilled"""
+        mock_run.side_effect = _docker_ok(["c1", "c2", "c3"])
+
+        pool.acquire(128, "1.0")
+        lease = pool.acquire(128, "1.0")
+
+        assert isinstance(lease, PooledContainer)
+        assert lease.container_id == "c1"
+        assert pool.stats()["idle"] == 2
+
+    @patch("subprocess.run")
+    def test_profiles_are_separate(self, mock_run, pool):
+        """Containers are only handed out for matching limits"""
+        mock_run.side_effect = _docker_ok(["c1", "c2", "c3", "c4"])
+
+        pool.acquire(128, "1.0")
+
+        assert pool.acquire(256, "1.0") is None
+
+    @patch("subprocess.run")
+    def test_release_destroys_container(self, mock_run, pool):
+        """A released container is removed, never reused"""
+        mock_run.side_effect = _docker_ok(["c1", "c2", "c3"])
+
+        pool.acquire(128, "1.0")
+        lease = pool.acquire(128, "1.0")
+        pool.release(lease)
+
+        rm_calls = [c[0][0] for c in mock_run.call_args_list if c[0][0][:2] == ["docker", "rm"]]
+        assert rm_calls == [["docker", "rm", "-f", "c1"]]
+        assert not os.path.exists(lease.workspace)
+
+    @patch("subprocess.run")
+    def test_expired_containers_are_discarded(self, mock_run, pool):
+        """Containers idle longer than max_idle_sec are not handed out"""
+        mock_run.side_effect = _docker_ok(["c1", "c2", "c3", "c4"])
+        pool.max_idle_sec = -1
+
+        pool.acquire(128, "1.0")
+
+        assert pool.acquire(128, "1.0") is None
+
+    @patch("subprocess.run")
+    def test_start_failure_leaves_pool_empty(self, mock_run, pool):
+        """Docker errors while refilling do not raise into the job"""
+        mock_run.return_value = Mock(stdout="", stderr="no such image", returncode=125)
+
+        assert pool.acquire(128, "1.0") is None
+        assert pool.stats() == {"idle": 0, "starting": 0, "profiles": 1}
+
+
+class TestDockerRunnerPoolMode:
+    """Test cases for DockerRunner with a warm pool"""
+
+    def test_pool_disabled_by_default(self):
+        """No pool unless SANDBOX_POOL_SIZE is set"""
+        runner = DockerRunner(pool_size=0)
+
+        assert runner.pool is None
+
+    def test_no_pool_in_forked_work_horse(self, monkeypatch):
+        """A forking rq worker's horse would leak its pool on os._exit(): it runs cold"""
+        monkeypatch.setenv("RQ_JOB_ID", "job-1")
+        runner = DockerRunner(pool_size=2)
+
+        assert runner.pool is None
+        assert runner.pool_size == 0
+
+    @patch("worker.services.docker_runner.run_bounded")
+    def test_run_uses_docker_exec_on_warm_container(self, mock_run, workspace_root, tmp_path, bounded_output):
+        """Warm runs exec pytest in the leased container and return the workspace"""
+        runner = DockerRunner(workspace_dir=str(workspace_root), pool_size=1)
+        lease_ws = workspace_root / "sandbox-pool-x"
+        lease_ws.mkdir()
+        lease = PooledContainer(container_id="warm1", workspace=str(lease_ws), memory_mb=256, cpus="1.0")
+
+        job_ws = workspace_root / "sandbox-job"
+        job_ws.mkdir()
+        (job_ws / "student_code.py").write_text("x = 1")
+
+        def fake_exec(cmd, capture, **kwargs):
+            # Files are visible in the container's workspace during the run
+            assert (lease_ws / "student_code.py").exists()
+            (lease_ws / "output.txt").write_text("written by the run")
+            return bounded_output(stdout=b"1 passed")(cmd, capture, **kwargs)
+
+        mock_run.side_effect = fake_exec
+        pool = Mock(acquire=Mock(return_value=lease))
+        runner._pool = pool
+
+        result = runner.run(workspace=str(job_ws), timeout_sec=3.0)
+
+        cmd = mock_run.call_args[0][0]
+        assert cmd[:7] == ["docker", "exec", "-u", "1000:1000", "-w", "/workspace", "warm1"]
+        assert cmd[7:11] == ["python", "-m", "playground_harness", "run"]
+        assert result.returncode == 0
+        assert (job_ws / "student_code.py").exists()
+        assert (job_ws / "output.txt").exists()
+        pool.release.assert_called_once_with(lease)
+
+    @patch("worker.services.docker_runner.run_bounded")
+    def test_run_falls_back_to_cold_start(self, mock_run, workspace_root, bounded_output):
+        """Empty pool means a regular `docker run --rm`"""
+        runner = DockerRunner(workspace_dir=str(workspace_root), pool_size=1)
+        runner._pool = Mock(acquire=Mock(return_value=None))
+        mock_run.side_effect = bounded_output()
+
+        runner.run(workspace=str(workspace_root / "sandbox-1"), timeout_sec=3.0)
+
+        cmd = mock_run.call_args[0][0]
+        assert cmd[:3] == ["docker", "run", "--rm"]
+
+    def test_zygote_mode_pool_spec(self):
+        """Zygote mode starts pooled containers as root running the fork server"""
+        runner = DockerRunner(pool_size=1, use_zygote=True)
+
+        spec = runner._pool_container_spec()
+
+        assert spec["container_args"] == ["--user", "0:0"]
+        assert spec["bind_workspace"] is True
+        assert spec["container_command"][:4] == ["python", "-m", "playground_harness", "serve"]
+
+    def test_zygote_mode_exec_command(self):
+        """Zygote mode execs the thin client as the sandbox user"""
+        runner = DockerRunner(pool_size=1, use_zygote=True)
+
+        cmd = runner._build_exec_command("warm1")
+
+        assert cmd[:7] == ["docker", "exec", "-u", "1000:1000", "-w", "/workspace", "warm1"]
+        assert "--zygote" in cmd
+        assert cmd[-2:] == ["tests_public.py", "tests_hidden.py"]
@@ -0,0 +1,80 @@
+"""
+Tests for the orphaned container reaper
+
+Uses the fake Engine API in worker/tests/fake_docker_engine.py.
+"""
+import threading
+import time
+
+import pytest
+
+from worker.services.container_reaper import ContainerReaper
+from worker.services.docker_api import DockerEngineClient
+from worker.services.docker_runner import run_labels
+
+
+@pytest.fixture
+def client(fake_docker_engine):
+    client = DockerEngineClient(socket_path=fake_docker_engine.socket_path, timeout=5)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def reaper(client):
+    return ContainerReaper(client=client, grace_sec=10)
+
+
+def _start(client, engine, labels, age_sec, cpu_usage_ns=0):
+    """Start a hung container created `age_sec` ago"""
+    hang = threading.Event()
+    engine.behavior = lambda config: (hang.wait(5), (0, "", ""))[1]
+    container_id = client.create_container({"Image": "runner", "Labels": labels})
+    client.start_container(container_id)
+    container = engine.containers[container_id]
+    container.created -= age_sec
+    container.cpu_usage_ns = cpu_usage_ns
+    for _ in range(100):
+        if container.status == "running":
+            break
+        time.sleep(0.01)
+    return container_id
+
+
+class TestContainerReaper:
+    """Test cases for ContainerReaper"""
+
+    def test_only_overdue_run_containers_found(self, reaper, client, fake_docker_engine):
+        """Containers within budget + grace and unlabeled containers are left alone"""
+        overdue = _start(client, fake_docker_engine, run_labels(7, 5.0), age_sec=60)
+        _start(client, fake_docker_engine, run_labels(8, 5.0), age_sec=5)
+        _start(client, fake_docker_engine, {"py-playground.pool": "1"}, age_sec=3600)
+
+        found = reaper.find_overdue()
+
+        assert [c["Id"] for c in found] == [overdue]
+
+    def test_reap_all_destroys_and_reports_cpu(self, reaper, client, fake_docker_engine):
+        """Overdue containers are removed and their CPU time is reported"""
+        first = _start(client, fake_docker_engine, run_labels(1, 5.0), age_sec=120, cpu_usage_ns=2_500_000_000)
+        second = _start(client, fake_docker_engine, run_labels(2, 5.0), age_sec=90, cpu_usage_ns=500_000_000)
+
+        result = reaper.reap_all()
+
+        assert result["found"] == 2
+        assert result["reaped"] == 2
+        assert result["failed"] == 0
+        assert result["cpu_sec"] == 3.0
+        assert first not in fake_docker_engine.containers
+        assert second not in fake_docker_engine.containers
+
+    def test_missing_budget_label_uses_default(self, reaper, client, fake_docker_engine):
+        """A container without a budget label gets DEFAULT_BUDGET_SEC"""
+        _start(client, fake_docker_engine, {"py-playground.submission": "3"}, age_sec=120)
+
+        assert reaper.find_overdue() == []
+        assert reaper.find_overdue(now=time.time() + 3600) != []
+
+    def test_nothing_to_reap(self, reaper):
+        """An empty daemon yields zero counters"""
+        assert reaper.reap_all() == {"found": 0, "reaped": 0, "failed": 0, "cpu_sec": 0.0, "errors": []}
@@ -0,0 +1,179 @@
+"""
+Tests for the short DB phases of submission jobs and their hold-time metrics
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.cache import DB_HOLD_STATS_KEY
+from backend.database import Base
+from backend.models import Submission
+from worker import tasks
+from worker.services import rubric_scorer
+from worker.services.db_hold_metrics import DbHoldMetrics
+from worker.services.problem_assets import ProblemAssets
+from worker.services.submission_progress import SubmissionProgress
+from worker.services.submission_notifier import SubmissionNotifier
+
+
+class FakeRedis:
+    """Hash-backed stand-in for the pipeline commands DbHoldMetrics uses"""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def hincrby(self, key, field, amount):
+        table = self.hashes.setdefault(key, {})
+        table[field] = table.get(field, 0) + amount
+
+    hincrbyfloat = hincrby
+
+    def publish(self, channel, message):
+        self.hashes.setdefault("published", {})[channel] = message
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    def expire(self, key, ttl):
+        pass
+
+    def execute(self):
+        return []
+
+
+class CountingSessions:
+    """Session factory that tracks how many sessions are open"""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.open = 0
+
+    def __call__(self):
+        session = self.factory()
+        self.open += 1
+        close = session.close
+
+        def _close():
+            self.open -= 1
+            close()
+        session.close = _close
+        return session
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    counting = CountingSessions(sessionmaker(bind=engine))
+    monkeypatch.setattr(tasks, "SessionLocal", counting)
+    monkeypatch.setattr(tasks, "RESULT_PERSISTENCE", "direct")
+    monkeypatch.setattr(tasks, "db_hold_metrics", DbHoldMetrics(client=FakeRedis()))
+    monkeypatch.setattr(tasks, "submission_notifier", SubmissionNotifier(client=FakeRedis()))
+    monkeypatch.setattr(tasks, "submission_progress", SubmissionProgress(client=FakeRedis()))
+    assets = ProblemAssets(
+        problem_id="suma", problem_dir=None, version="v", meta={}, rubric={}, test_files={}
+    )
+    monkeypatch.setattr(tasks.problem_asset_cache, "get", lambda problem_id: assets)
+    yield counting
+    Base.metadata.drop_all(engine)
+
+
+def _queued(sessions):
+    db = sessions.factory()
+    submission = Submission(job_id="job-1", problem_id="suma", code="", status="queued")
+    db.add(submission)
+    db.commit()
+    return db, submission.id
+
+
+class TestDbPhases:
+    """Test cases for run_submission_in_sandbox phases and DbHoldMetrics"""
+
+    def test_no_session_open_while_sandbox_runs(self, sessions, monkeypatch):
+        """Claim and persist use short sessions; grading runs without one"""
+        db, sid = _queued(sessions)
+
+        def fake_grade(problem_id, code, timeout_sec=None, memory_mb=None, submission_id=None):
+            assert sessions.open == 0
+            assert db.query(Submission.status).filter(Submission.id == sid).scalar() == "running"
+            score = rubric_scorer.TestScore(
+                test_name="test_a", outcome="passed", duration=0.01, message="",
+                points=5.0, max_points=5.0, visibility="public"
+            )
+            return {"status": "completed", "ok": True, "score_total": 5.0, "score_max": 5.0}, [score]
+
+        monkeypatch.setattr(tasks, "grade_submission", fake_grade)
+
+        tasks.run_submission_in_sandbox(sid, "suma", "print(1)")
+
+        assert sessions.open == 0
+        db.expire_all()
+        submission = db.get(Submission, sid)
+        assert (submission.status, submission.score_total) == ("completed", 5.0)
+        assert submission.completed_at is not None
+        assert [r.test_name for r in submission.test_results] == ["test_a"]
+        stats = tasks.db_hold_metrics.client.hashes[DB_HOLD_STATS_KEY]
+        assert stats["jobs"] == 1
+        assert {"claim_ms", "persist_ms"} <= set(stats)
+        published = tasks.submission_notifier.client.hashes["published"]
+        assert published == {f"submission_events:{sid}": '{"status": "completed"}'}
+
+    def test_rerun_replaces_test_results(self, sessions, monkeypatch):
+        """A job run twice (e.g. re-enqueued by the outbox relay) keeps one set of results"""
+        db, sid = _queued(sessions)
+
+        def fake_grade(problem_id, code, timeout_sec=None, memory_mb=None, submission_id=None):
+            score = rubric_scorer.TestScore(
+                test_name="test_a", outcome="passed", duration=0.01, message="",
+                points=5.0, max_points=5.0, visibility="public"
+            )
+            return {"status": "completed", "ok": True, "score_total": 5.0, "score_max": 5.0}, [score]
+
+        monkeypatch.setattr(tasks, "grade_submission", fake_grade)
+
+        tasks.run_submission_in_sandbox(sid, "suma", "print(1)")
+        tasks.run_submission_in_sandbox(sid, "suma", "print(1)")
+
+        db.expire_all()
+        assert [r.test_name for r in db.get(Submission, sid).test_results] == ["test_a"]
+
+    def test_failure_is_stored_in_its_own_phase(self, sessions, monkeypatch):
+        """A sandbox error marks the submission failed and releases every session"""
+        db, sid = _queued(sessions)
+
+        def broken_grade(*args, **kwargs):
+            raise RuntimeError("docker unavailable")
+
+        monkeypatch.setattr(tasks, "grade_submission", broken_grade)
+
+        with pytest.raises(RuntimeError):
+            tasks.run_submission_in_sandbox(sid, "suma", "print(1)")
+
+        assert sessions.open == 0
+        db.expire_all()
+        submission = db.get(Submission, sid)
+        assert submission.status == "failed"
+        assert "docker unavailable" in submission.error_message
+
+    def test_unknown_submission_is_not_graded(self, sessions, monkeypatch):
+        """The claim UPDATE matching no row stops the job before the sandbox"""
+        monkeypatch.setattr(tasks, "grade_submission", lambda *a, **k: pytest.fail("graded"))
+
+        with pytest.raises(Exception, match="not found"):
+            tasks.run_submission_in_sandbox(404, "suma", "print(1)")
+
+    def test_slow_jobs_are_counted(self):
+        """Jobs whose phases add up past the threshold are counted as slow"""
+        metrics = DbHoldMetrics(client=FakeRedis(), slow_ms=50)
+
+        metrics.record({"claim": 10.0, "persist": 20.0})
+        metrics.record({"claim": 40.0, "persist": 30.0})
+
+        stats = metrics.client.hashes[DB_HOLD_STATS_KEY]
+        assert stats["jobs"] == 2
+        assert stats["slow_jobs"] == 1
+        assert stats["claim_ms"] == 50.0
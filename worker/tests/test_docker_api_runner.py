@@ -0,0 +1,220 @@
+"""
+Tests for the Docker Engine API client and DockerAPIRunner
+
+Uses the fake Engine API in worker/tests/fake_docker_engine.py, so no Docker
+daemon is required.
+"""
+import time
+import pytest
+from worker.services.docker_api import DockerAPIError, DockerEngineClient, demux_logs
+from worker.services.docker_api_runner import DockerAPIRunner
+from worker.services.docker_runner import DockerRunResult
+
+
+@pytest.fixture
+def client(fake_docker_engine):
+    client = DockerEngineClient(socket_path=fake_docker_engine.socket_path, timeout=5)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def runner(client, tmp_path):
+    return DockerAPIRunner(
+        client=client,
+        workspace_dir=str(tmp_path),
+        host_workspace_dir="/host/workspaces"
+    )
+
+
+class TestDockerEngineClient:
+    """Test cases for DockerEngineClient"""
+
+    def test_connection_is_reused(self, client, fake_docker_engine):
+        """Sequential requests share one keep-alive connection"""
+        for _ in range(5):
+            container_id = client.create_container({"Image": "runner"})
+            client.remove_container(container_id)
+
+        assert fake_docker_engine.connections == 1
+
+    def test_api_error_raised(self, client, fake_docker_engine):
+        """Error statuses become DockerAPIError with the daemon's message"""
+        fake_docker_engine.create_error = (404, "No such image: runner")
+
+        with pytest.raises(DockerAPIError) as exc_info:
+            client.create_container({"Image": "runner"})
+
+        assert exc_info.value.status == 404
+        assert "No such image" in str(exc_info.value)
+
+    def test_remove_missing_container_is_ignored(self, client):
+        """Removing a container that is already gone is not an error"""
+        client.remove_container("does-not-exist")
+
+    def test_wait_timeout(self, client, fake_docker_engine):
+        """wait_container raises TimeoutError for a container still running"""
+        fake_docker_engine.behavior = lambda config: (time.sleep(2), (0, "", ""))[1]
+        container_id = client.create_container({"Image": "runner"})
+        client.start_container(container_id)
+
+        with pytest.raises(TimeoutError):
+            client.wait_container(container_id, timeout=0.2)
+
+        # The broken connection was discarded; the client still works
+        client.kill_container(container_id)
+        assert client.inspect_container(container_id)["State"]["Status"] == "exited"
+
+    def test_demux_logs(self):
+        """Multiplexed frames are split into stdout and stderr"""
+        raw = (
+            b"\x01\x00\x00\x00\x00\x00\x00\x03out"
+            b"\x02\x00\x00\x00\x00\x00\x00\x03err"
+            b"\x01\x00\x00\x00\x00\x00\x00\x01!"
+        )
+
+        assert demux_logs(raw) == (b"out!", b"err")
+
+
+class TestDockerAPIRunner:
+    """Test cases for DockerAPIRunner"""
+
+    def test_run_success(self, runner, fake_docker_engine, tmp_path):
+        """A finished container yields the same DockerRunResult as the CLI"""
+        fake_docker_engine.behavior = lambda config: (0, "2 passed in 0.01s\n", "")
+
+        result = runner.run(workspace=str(tmp_path / "sandbox-1"), timeout_sec=3.0)
+
+        assert isinstance(result, DockerRunResult)
+        assert result.returncode == 0
+        assert result.stdout == "2 passed in 0.01s\n"
+        assert result.stderr == ""
+        assert result.timed_out is False
+        assert fake_docker_engine.containers == {}  # removed
+
+    def test_run_config_matches_cli_limits(self, runner, fake_docker_engine, tmp_path):
+        """Create body carries the same isolation and limits as `docker run`"""
+        seen = {}
+        fake_docker_engine.behavior = lambda config: (seen.update(config), (1, "", ""))[1]
+
+        result = runner.run(
+            workspace=str(tmp_path / "sandbox-abc"), timeout_sec=3.0, memory_mb=128, cpus="0.5"
+        )
+
+        host = seen["HostConfig"]
+        assert result.returncode == 1
+        assert host["NetworkMode"] == "none"
+        assert host["Memory"] == host["MemorySwap"] == 128 * 1024 * 1024
+        assert host["NanoCpus"] == 500_000_000
+        assert host["Binds"] == ["/host/workspaces/sandbox-abc:/workspace:rw"]
+        assert seen["Cmd"][:4] == ["python", "-m", "playground_harness", "run"]
+
+    def test_run_mounts_problem_store_read_only(self, client, fake_docker_engine, tmp_path):
+        """tests_dir is bind-mounted read-only and pytest runs the tests from there"""
+        runner = DockerAPIRunner(
+            client=client, workspace_dir=str(tmp_path), host_workspace_dir="/host/workspaces",
+            problem_store_dir="/problem-store", host_problem_store_dir="/host/store"
+        )
+        seen = {}
+        fake_docker_engine.behavior = lambda config: (seen.update(config), (0, "", ""))[1]
+
+        runner.run(
+            workspace=str(tmp_path / "sandbox-1"), timeout_sec=3.0,
+            tests_dir="/problem-store/suma/0123456789abcdef"
+        )
+
+        assert seen["HostConfig"]["Binds"][1] == "/host/store/suma/0123456789abcdef:/problem:ro"
+        assert seen["Cmd"][-2:] == ["/problem/tests_public.py", "/problem/tests_hidden.py"]
+
+    def test_run_labels_container_with_submission(self, runner, fake_docker_engine, tmp_path):
+        """Containers carry the submission and budget labels read by the reaper"""
+        seen = {}
+        fake_docker_engine.behavior = lambda config: (seen.update(config), (0, "", ""))[1]
+
+        runner.run(workspace=str(tmp_path / "sandbox-1"), timeout_sec=3.0, submission_id=42)
+
+        assert seen["Labels"] == {"py-playground.submission": "42", "py-playground.budget-sec": "5"}
+
+    def test_run_decodes_result_frames(self, runner, fake_docker_engine, tmp_path):
+        """Binary result frames in the logs become test_details"""
+        import json
+        from worker.services.result_stream import HEADER, MAGIC
+
+        record = json.dumps({"event": "test", "name": "t.py::test_a", "outcome": "passed"}).encode()
+        frame = HEADER.pack(MAGIC, len(record)) + record
+        fake_docker_engine.behavior = lambda config: (0, b"." + frame + b"\n1 passed\n", "")
+
+        result = runner.run(workspace=str(tmp_path / "sandbox-1"), timeout_sec=3.0)
+
+        assert result.stdout == ".\n1 passed\n"
+        assert result.test_details == [{"name": "t.py::test_a", "outcome": "passed"}]
+
+    def test_run_reports_oom_kill_from_inspect(self, runner, fake_docker_engine, tmp_path):
+        """Without a usage frame, OOMKilled and the exit signal come from Docker"""
+        from worker.tests.fake_docker_engine import OOM_EXIT_CODE
+
+        fake_docker_engine.behavior = lambda config: (OOM_EXIT_CODE, "", "")
+
+        result = runner.run(workspace=str(tmp_path / "sandbox-1"), timeout_sec=3.0)
+
+        assert result.usage == {"oom_killed": True, "exit_signal": 9}
+
+    def test_run_timeout_kills_and_removes(self, runner, fake_docker_engine, tmp_path):
+        """A hung container is killed, removed and reported as timed out"""
+        fake_docker_engine.behavior = lambda config: (time.sleep(10), (0, "", ""))[1]
+
+        result = runner.run(workspace=str(tmp_path / "sandbox-1"), timeout_sec=0.1)
+
+        assert result.timed_out is True
+        assert result.returncode == -1
+        assert "timeout" in result.stderr.lower()
+        assert any(path.endswith("/kill") for _, path in fake_docker_engine.requests)
+        assert fake_docker_engine.containers == {}
+
+    def test_run_output_limit_kills_and_truncates(self, runner, fake_docker_engine, tmp_path):
+        """Output over the budget stops the run and keeps only head and tail"""
+        fake_docker_engine.behavior = lambda config: (0, b"x" * (512 * 1024), "")
+
+        result = runner.run(
+            workspace=str(tmp_path / "sandbox-1"), timeout_sec=3.0, max_output_bytes=64 * 1024
+        )
+
+        assert result.output_limited is True
+        assert result.returncode == -1
+        assert result.timed_out is False
+        assert len(result.stdout) < 20_000
+        assert fake_docker_engine.containers == {}
+
+    def test_run_daemon_error_propagates(self, runner, fake_docker_engine, tmp_path):
+        """Engine errors (e.g. missing image) are raised to the task"""
+        fake_docker_engine.create_error = (404, "No such image")
+
+        with pytest.raises(DockerAPIError):
+            runner.run(workspace=str(tmp_path / "sandbox-1"), timeout_sec=3.0)
+
+    def test_run_archive_streams_workspace(self, runner, fake_docker_engine):
+        """The workspace tar goes to the attached stdin of a tmpfs-only container"""
+        import io
+        import tarfile
+
+        def behavior(config):
+            stdin = fake_docker_engine.stdin_received[-1]
+            with tarfile.open(fileobj=io.BytesIO(stdin)) as archive:
+                assert archive.getnames() == ["student_code.py"]
+            return 0, "1 passed\n", ""
+
+        fake_docker_engine.behavior = behavior
+        seen = {}
+        original = runner._build_config
+        runner._build_config = lambda **kw: seen.setdefault("config", original(**kw))
+
+        result = runner.run_archive(files={"student_code.py": b"x = 1"}, timeout_sec=3.0)
+
+        config = seen["config"]
+        assert config["OpenStdin"] and config["StdinOnce"]
+        assert config["HostConfig"]["Binds"] == []
+        assert "/workspace" in config["HostConfig"]["Tmpfs"]
+        assert "--stdin-tar" in config["Cmd"]
+        assert result.returncode == 0
+        assert result.stdout == "1 passed\n"
+        assert fake_docker_engine.containers == {}
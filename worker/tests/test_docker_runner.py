@@ -7,6 +7,7 @@ Integration tests with real Docker would require Docker daemon.
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from worker.services.docker_runner import DockerRunner, DockerRunResult
+from worker.services.output_capture import BoundedRun
 
 
 class TestDockerRunner:
@@ -94,15 +95,11 @@ class TestDockerRunner:
         assert volume_arg is not None
         assert volume_arg.startswith("/host/workspaces/sandbox-abc-123:")
 
-    @patch('subprocess.run')
-    def test_run_success(self, mock_run):
+    @patch('worker.services.docker_runner.run_bounded')
+    def test_run_success(self, mock_run, bounded_output):
         """Test successful Docker execution"""
         # Mock subprocess.run
-        mock_run.return_value = Mock(
-            stdout="....\\n4 passed in 0.15s",
-            stderr="",
-            returncode=0
-        )
+        mock_run.side_effect = bounded_output(stdout="....\\n4 passed in 0.15s", stderr="", returncode=0)
 
         runner = DockerRunner(
             workspace_dir="/workspaces",
@@ -121,14 +118,10 @@ class TestDockerRunner:
         assert result.timed_out is False
         assert result.duration >= 0
 
-    @patch('subprocess.run')
-    def test_run_with_stderr(self, mock_run):
+    @patch('worker.services.docker_runner.run_bounded')
+    def test_run_with_stderr(self, mock_run, bounded_output):
         """Test Docker execution with stderr output"""
-        mock_run.return_value = Mock(
-            stdout="",
-            stderr="Warning: something happened",
-            returncode=0
-        )
+        mock_run.side_effect = bounded_output(stdout="", stderr="Warning: something happened", returncode=0)
 
         runner = DockerRunner(
             workspace_dir="/workspaces",
@@ -143,16 +136,11 @@ class TestDockerRunner:
         assert result.returncode == 0
         assert result.stderr == "Warning: something happened"
 
-    @patch('subprocess.run')
-    def test_run_timeout(self, mock_run):
+    @patch('worker.services.docker_runner.run_bounded')
+    def test_run_timeout(self, mock_run, bounded_output):
         """Test Docker execution timeout"""
-        import subprocess
-
-        # Mock timeout exception
-        mock_run.side_effect = subprocess.TimeoutExpired(
-            cmd=['docker', 'run'],
-            timeout=5.0
-        )
+        # Mock a run killed at the timeout
+        mock_run.side_effect = bounded_output(returncode=-1, timed_out=True)
 
         runner = DockerRunner(
             workspace_dir="/workspaces",
@@ -168,15 +156,46 @@ class TestDockerRunner:
         assert result.returncode == -1
         assert "timeout" in result.stderr.lower() or "timeout" in result.stdout.lower()
 
-    @patch('subprocess.run')
-    def test_run_with_error_returncode(self, mock_run):
-        """Test Docker execution with non-zero return code"""
-        mock_run.return_value = Mock(
-            stdout="",
-            stderr="Error: test failed",
-            returncode=1
+    @patch('worker.services.docker_runner.run_bounded')
+    def test_run_labels_and_removes_container_on_timeout(self, mock_run, bounded_output):
+        """The cold container is labeled with its submission and removed by name on kill"""
+        mock_run.side_effect = bounded_output(returncode=-1, timed_out=True)
+        runner = DockerRunner(workspace_dir="/workspaces", host_workspace_dir="/host/workspaces")
+
+        runner.run(workspace="/workspaces/sandbox-123", timeout_sec=5.0, submission_id=42)
+
+        cmd = mock_run.call_args[0][0]
+        name = cmd[cmd.index("--name") + 1]
+        assert "py-playground.submission=42" in cmd
+        assert "py-playground.budget-sec=7" in cmd
+
+        proc = Mock()
+        with patch('worker.services.docker_runner.subprocess.run') as docker_cli:
+            mock_run.call_args.kwargs["kill"](proc)
+        proc.kill.assert_called_once()
+        assert docker_cli.call_args[0][0] == ["docker", "rm", "-f", name]
+
+    @patch('worker.services.docker_runner.run_bounded')
+    def test_run_mounts_problem_store_read_only(self, mock_run, bounded_output):
+        """With tests_dir the cold container mounts the store version on /problem"""
+        mock_run.side_effect = bounded_output()
+        runner = DockerRunner(
+            workspace_dir="/workspaces", host_workspace_dir="/host/workspaces",
+            problem_store_dir="/problem-store", host_problem_store_dir="/host/store", pool_size=0
         )
 
+        runner.run(workspace="/workspaces/sandbox-123", timeout_sec=5.0, tests_dir="/problem-store/suma/v1")
+
+        cmd = mock_run.call_args[0][0]
+        assert "/host/store/suma/v1:/problem:ro" in cmd
+        assert cmd[-2:] == ["/problem/tests_public.py", "/problem/tests_hidden.py"]
+        assert runner.mounts_problem_store is True
+
+    @patch('worker.services.docker_runner.run_bounded')
+    def test_run_with_error_returncode(self, mock_run, bounded_output):
+        """Test Docker execution with non-zero return code"""
+        mock_run.side_effect = bounded_output(stdout="", stderr="Error: test failed", returncode=1)
+
         runner = DockerRunner(
             workspace_dir="/workspaces",
             host_workspace_dir="/host/workspaces"
@@ -190,7 +209,7 @@ class TestDockerRunner:
         assert result.returncode == 1
         assert result.timed_out is False
 
-    @patch('subprocess.run')
+    @patch('worker.services.docker_runner.run_bounded')
     def test_run_exception_handling(self, mock_run):
         """Test handling of unexpected exceptions"""
         mock_run.side_effect = Exception("Unexpected error")
@@ -209,14 +228,10 @@ class TestDockerRunner:
         assert "error" in result.stderr.lower() or "error" in result.stdout.lower()
         assert result.timed_out is False
 
-    @patch('subprocess.run')
-    def test_run_with_memory_and_cpu_limits(self, mock_run):
+    @patch('worker.services.docker_runner.run_bounded')
+    def test_run_with_memory_and_cpu_limits(self, mock_run, bounded_output):
         """Test run with both memory and CPU limits"""
-        mock_run.return_value = Mock(
-            stdout="tests passed",
-            stderr="",
-            returncode=0
-        )
+        mock_run.side_effect = bounded_output(stdout="tests passed", stderr="", returncode=0)
 
         runner = DockerRunner(
             workspace_dir="/workspaces",
@@ -230,7 +245,7 @@ class TestDockerRunner:
             cpus="2.0"
         )
 
-        # Verify that subprocess.run was called
+        # Verify that the docker command was run
         assert mock_run.called
         call_args = mock_run.call_args
 
@@ -262,14 +277,14 @@ class TestDockerRunner:
         assert docker_runner is not None
         assert isinstance(docker_runner, DockerRunner)
 
-    @patch('subprocess.run')
+    @patch('worker.services.docker_runner.run_bounded')
     def test_run_measures_duration(self, mock_run):
         """Test that run() measures execution duration"""
         import time
 
         def slow_run(*args, **kwargs):
             time.sleep(0.1)  # Simulate slow execution
-            return Mock(stdout="", stderr="", returncode=0)
+            return BoundedRun(returncode=0)
 
         mock_run.side_effect = slow_run
 
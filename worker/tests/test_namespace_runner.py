@@ -0,0 +1,168 @@
+"""
+Tests for the namespace sandbox backend
+"""
+import os
+import subprocess
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+from worker.services.concurrency_controller import ConcurrencyController
+from worker.services.docker_runner import DockerRunner
+from worker.services.namespace_runner import HARNESS_PATH, NamespaceRunner
+from worker.services.problem_assets import ProblemAssets
+from worker.services.problem_store import ProblemStore
+from worker.services.sandbox_runner import SandboxRunner, get_sandbox_runner
+
+FILES = {
+    "student_code.py": b"def suma(a, b):\n    return a + b\n",
+    "tests_public.py": b"from student_code import suma\n\ndef test_ok():\n    assert suma(2, 3) == 5\n",
+    "tests_hidden.py": b"from student_code import suma\n\ndef test_wrong():\n    assert suma(1, 1) == 3\n",
+}
+
+
+def _userns_available() -> bool:
+    probe = "from playground_harness.isolate import enter_namespaces; enter_namespaces(keep_uid=True)"
+    env = dict(os.environ, PYTHONPATH=HARNESS_PATH)
+    return subprocess.run([sys.executable, "-c", probe], env=env, capture_output=True).returncode == 0
+
+
+requires_userns = pytest.mark.skipif(
+    not sys.platform.startswith("linux") or not _userns_available(),
+    reason="unprivileged user namespaces are not available"
+)
+
+
+def make_runner(**kwargs):
+    controller = ConcurrencyController(
+        min_limit=1, max_limit=2, adaptive=False, metrics_client=MagicMock(), name="test"
+    )
+    kwargs.setdefault("cgroup_parent", "")
+    kwargs.setdefault("hide_paths", [])
+    return NamespaceRunner(keep_uid=True, controller=controller, **kwargs)
+
+
+class TestSandboxBackends:
+    """Test backend selection"""
+
+    def test_backends_share_the_interface(self):
+        """Every SANDBOX_BACKEND resolves to a SandboxRunner"""
+        for backend in ("cli", "namespace"):
+            assert isinstance(get_sandbox_runner(backend), SandboxRunner)
+        assert issubclass(DockerRunner, SandboxRunner)
+
+    def test_unknown_backend(self):
+        """A typo in SANDBOX_BACKEND fails loudly"""
+        with pytest.raises(ValueError):
+            get_sandbox_runner("podman")
+
+
+class TestNamespaceRunner:
+    """Test cases for NamespaceRunner"""
+
+    def test_build_command_stream(self):
+        """Without a cgroup memory falls back to RLIMIT_AS; the tar comes on stdin"""
+        runner = make_runner(hide_paths=["/workspaces"])
+
+        cmd = runner._build_command(None, None, 256, ["--test-timeout", "2"])
+
+        assert cmd[1:4] == ["-m", "playground_harness", "isolate"]
+        assert cmd[cmd.index("--address-space-mb") + 1] == "256"
+        assert cmd[cmd.index("--hide") + 1] == "/workspaces"
+        run = cmd[cmd.index("--") + 1:]
+        assert run[:4] == ["run", "--stdin-tar", "--test-timeout", "2"]
+        assert run[-2:] == ["tests_public.py", "tests_hidden.py"]
+
+    def test_build_command_bind_with_cgroup(self):
+        """A job cgroup replaces the rlimit and the workspace is bind-mounted"""
+        runner = make_runner()
+
+        cmd = runner._build_command("/workspaces/sandbox-1", "/sys/fs/cgroup/pg/run-1", 256)
+
+        assert cmd[cmd.index("--cgroup") + 1] == "/sys/fs/cgroup/pg/run-1"
+        assert cmd[cmd.index("--bind") + 1] == "/workspaces/sandbox-1"
+        assert "--address-space-mb" not in cmd
+        assert "--stdin-tar" not in cmd
+
+    def test_environment_does_not_leak(self, monkeypatch):
+        """Worker secrets stay out of the sandbox"""
+        monkeypatch.setenv("DATABASE_URL", "postgresql://user:secret@db/playground")
+
+        env = make_runner()._environment()
+
+        assert "DATABASE_URL" not in env
+        assert env["PYTHONPATH"] == HARNESS_PATH
+
+    def test_cgroup_limits(self, tmp_path):
+        """Each run gets its own cgroup with the job's limits, removed afterwards"""
+        runner = make_runner(cgroup_parent=str(tmp_path))
+
+        path = runner._create_cgroup(memory_mb=128, cpus="0.5")
+
+        assert (tmp_path / os.path.basename(path) / "memory.max").read_text() == str(128 * 1024 * 1024)
+        assert (tmp_path / os.path.basename(path) / "cpu.max").read_text() == "50000 100000"
+
+    def test_cgroup_fallback(self, tmp_path):
+        """An unusable cgroup parent degrades to rlimits instead of failing the job"""
+        runner = make_runner(cgroup_parent=str(tmp_path / "missing"))
+
+        assert runner._create_cgroup(memory_mb=128, cpus="1.0") is None
+
+    @requires_userns
+    def test_run_archive(self):
+        """Results, usage and exit code come back as with the Docker backends"""
+        result = make_runner().run_archive(FILES, timeout_sec=30)
+
+        assert result.returncode == 1
+        assert not result.timed_out
+        assert [(t["name"], t["outcome"]) for t in result.test_details] == [
+            ("tests_public.py::test_ok", "passed"),
+            ("tests_hidden.py::test_wrong", "failed"),
+        ]
+        assert result.usage["cpu_user_sec"] > 0
+        assert result.usage["oom_killed"] is False
+
+    @requires_userns
+    def test_run_bind(self, mock_workspace):
+        """run() executes the tests of a workspace directory"""
+        result = make_runner().run(str(mock_workspace), timeout_sec=30)
+
+        assert result.returncode == 0
+        assert {t["outcome"] for t in result.test_details} == {"passed"}
+
+    @requires_userns
+    def test_run_with_problem_store(self, tmp_path):
+        """Precompiled tests are mounted read-only; the workspace only has the student code"""
+        runner = make_runner()
+        assets = ProblemAssets(
+            problem_id="suma", problem_dir=tmp_path, version="v" * 64, meta={}, rubric={},
+            test_files={name: FILES[name] for name in ("tests_public.py", "tests_hidden.py")}
+        )
+        tests_dir = ProblemStore(str(tmp_path / "store")).ensure(assets, runner.precompile_tests)
+        assert os.listdir(os.path.join(tests_dir, "__pycache__"))
+
+        result = runner.run_archive(
+            {"student_code.py": FILES["student_code.py"]}, timeout_sec=30, tests_dir=tests_dir
+        )
+
+        assert [(t["name"], t["outcome"]) for t in result.test_details] == [
+            ("tests_public.py::test_ok", "passed"),
+            ("tests_hidden.py::test_wrong", "failed"),
+        ]
+
+    @requires_userns
+    def test_timeout_kills_sandbox(self):
+        """A run over timeout_sec is killed and keeps the results streamed so far"""
+        files = dict(FILES)
+        files["tests_hidden.py"] = b"def test_loop():\n    while True:\n        pass\n"
+
+        runner = make_runner()
+        # No harness budgets: only the runner's own kill can end the run
+        runner._budget_args = lambda *args: []
+
+        result = runner.run_archive(files, timeout_sec=1)
+
+        assert result.timed_out
+        assert result.stderr == "Timeout expired"
+        assert [t["outcome"] for t in result.test_details] == ["passed"]
@@ -0,0 +1,106 @@
+"""
+Tests for bounded output capture (head/tail buffers and run_bounded)
+"""
+import sys
+
+from worker.services.output_capture import (
+    HeadTailBuffer, OutputCapture, run_bounded
+)
+from worker.services.result_stream import HEADER, MAGIC
+
+
+class TestHeadTailBuffer:
+    """Test cases for HeadTailBuffer"""
+
+    def test_short_output_kept_verbatim(self):
+        """Output under head + tail is returned unchanged"""
+        buffer = HeadTailBuffer(head=4, tail=4)
+        buffer.extend(b"abc")
+        buffer.extend(b"def")
+
+        assert bytes(buffer) == b"abcdef"
+        assert buffer.omitted == 0
+
+    def test_long_output_keeps_head_and_tail(self):
+        """The middle is dropped and replaced by a marker with its size"""
+        buffer = HeadTailBuffer(head=4, tail=4)
+        for chunk in (b"0123", b"4567", b"89ab", b"cdef"):
+            buffer.extend(chunk)
+
+        assert bytes(buffer) == b"0123\n... [8 bytes omitted] ...\ncdef"
+        assert buffer.total == 16
+        assert len(buffer) == 8
+
+
+class TestOutputCapture:
+    """Test cases for OutputCapture"""
+
+    def test_result_frames_survive_truncation(self):
+        """Frames are decoded from the stream, not from the bounded console text"""
+        record = b'{"event": "test", "name": "t.py::test_a", "outcome": "passed"}'
+        capture = OutputCapture(max_output_bytes=10 * 1024 * 1024)
+        capture.feed_stdout(b"x" * 100_000)
+        capture.feed_stdout(HEADER.pack(MAGIC, len(record)) + record)
+        capture.feed_stdout(b"y" * 100_000)
+
+        console, _, test_details, _ = capture.result()
+
+        assert test_details == [{"name": "t.py::test_a", "outcome": "passed"}]
+        assert len(console) < 20_000
+        assert "bytes omitted" in console
+
+    def test_budget_counts_stdout_and_stderr(self):
+        """Both streams count against the same budget"""
+        capture = OutputCapture(max_output_bytes=10)
+        capture.feed_stdout(b"12345")
+        capture.feed_stderr(b"12345")
+        assert not capture.exceeded
+
+        capture.feed_stderr(b"!")
+        assert capture.exceeded
+
+
+class TestRunBounded:
+    """Test cases for run_bounded with real processes"""
+
+    def test_run_to_completion(self):
+        """Output and exit code of a process that finishes on its own"""
+        capture = OutputCapture()
+        code = "import sys; sys.stdout.write(sys.stdin.read().upper()); sys.stderr.write('warn'); sys.exit(3)"
+
+        run = run_bounded([sys.executable, "-c", code], capture, timeout_sec=10, stdin=b"hello")
+
+        console, stderr, _, _ = capture.result()
+        assert run.returncode == 3
+        assert not run.timed_out and not run.output_limited
+        assert console == "HELLO"
+        assert stderr == "warn"
+
+    def test_endless_output_is_killed(self):
+        """A process printing forever is killed once over its budget"""
+        capture = OutputCapture(max_output_bytes=256 * 1024)
+        code = "while True: print('spam' * 100)"
+
+        run = run_bounded([sys.executable, "-c", code], capture, timeout_sec=30)
+
+        assert run.output_limited is True
+        assert run.timed_out is False
+        assert run.returncode == -1
+        assert capture.total < 1024 * 1024
+
+    def test_timeout_calls_kill(self):
+        """The kill callback stops a process that outlives the timeout"""
+        capture = OutputCapture()
+        killed = []
+
+        def kill(proc):
+            killed.append(proc.pid)
+            proc.kill()
+
+        run = run_bounded(
+            [sys.executable, "-c", "import time; time.sleep(30)"], capture, timeout_sec=0.2, kill=kill
+        )
+
+        assert run.timed_out is True
+        assert run.returncode == -1
+        assert len(killed) == 1
@@ -0,0 +1,133 @@
+"""
+Tests for the in-process problem asset cache
+"""
+import json
+import os
+
+import pytest
+
+from backend.exceptions import ProblemNotFoundError
+from worker.services.problem_assets import ProblemAssetCache
+from worker.services.result_cache import ResultCache
+
+
+@pytest.fixture
+def problems(tmp_path):
+    problem = tmp_path / "problems" / "suma"
+    problem.mkdir(parents=True)
+    (problem / "metadata.json").write_text(json.dumps({"timeout_sec": 3}))
+    (problem / "rubric.json").write_text(json.dumps({"tests": [], "max_points": 10}))
+    (problem / "tests_public.py").write_text("def test_a(): pass\n")
+    (problem / "tests_hidden.py").write_text("def test_b(): pass\n")
+    return tmp_path / "problems"
+
+
+def _bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestProblemAssetCache:
+    """Test cases for ProblemAssetCache"""
+
+    def test_load_parses_assets_once(self, problems):
+        """First lookup is a miss; later lookups are served from memory"""
+        cache = ProblemAssetCache(search_dirs=[str(problems)], revalidate_sec=60)
+
+        first = cache.get("suma")
+        second = cache.get("suma")
+
+        assert second is first
+        assert first.meta == {"timeout_sec": 3}
+        assert first.rubric["max_points"] == 10
+        assert set(first.test_files) == {"tests_public.py", "tests_hidden.py"}
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_unchanged_stamp_is_a_hit_after_revalidation(self, problems):
+        """Revalidation only stats the files when nothing changed"""
+        cache = ProblemAssetCache(search_dirs=[str(problems)], revalidate_sec=0)
+
+        first = cache.get("suma")
+        assert cache.get("suma") is first
+        assert cache.stats()["reloads"] == 0
+
+    def test_modified_file_reloads_new_version(self, problems):
+        """Editing a test file changes the assets and their version"""
+        cache = ProblemAssetCache(search_dirs=[str(problems)], revalidate_sec=0)
+        first = cache.get("suma")
+
+        hidden = problems / "suma" / "tests_hidden.py"
+        hidden.write_text("def test_b(): assert False\n")
+        _bump_mtime(hidden)
+        second = cache.get("suma")
+
+        assert second.version != first.version
+        assert second.test_files["tests_hidden.py"] == b"def test_b(): assert False\n"
+        assert cache.stats()["reloads"] == 1
+
+    def test_touch_keeps_version(self, problems):
+        """A new mtime with the same content reloads but keeps the version"""
+        cache = ProblemAssetCache(search_dirs=[str(problems)], revalidate_sec=0)
+        first = cache.get("suma")
+
+        _bump_mtime(problems / "suma" / "rubric.json")
+
+        assert cache.get("suma").version == first.version
+
+    def test_legacy_tests_and_defaults(self, tmp_path):
+        """tests.py runs as tests_public.py; missing metadata/rubric get defaults"""
+        problem = tmp_path / "legacy"
+        problem.mkdir()
+        (problem / "tests.py").write_text("def test_x(): pass\n")
+        cache = ProblemAssetCache(search_dirs=[str(tmp_path)])
+
+        assets = cache.get("legacy")
+
+        assert assets.test_files == {"tests_public.py": b"def test_x(): pass\n"}
+        assert assets.meta == {}
+        assert assets.rubric == {"tests": [], "max_points": 0}
+
+    def test_cases_json_replaces_tests_and_rubric(self, tmp_path):
+        """A cases.json problem ships only that file; its points are the rubric"""
+        problem = tmp_path / "io"
+        problem.mkdir()
+        spec = {"cases": [
+            {"name": "test_existe", "defines": "main", "points": 1},
+            {"name": "test_basico", "stdin": "2", "expected": "4", "points": 3, "visibility": "hidden"},
+        ]}
+        (problem / "cases.json").write_text(json.dumps(spec))
+        cache = ProblemAssetCache(search_dirs=[str(tmp_path)])
+
+        assets = cache.get("io")
+
+        assert list(assets.test_files) == ["cases.json"]
+        assert assets.rubric == {
+            "tests": [
+                {"name": "test_existe", "points": 1, "visibility": "public"},
+                {"name": "test_basico", "points": 3, "visibility": "hidden"},
+            ],
+            "max_points": 4,
+        }
+        assert "cases.json" in assets.file_hashes
+
+    def test_search_dirs_fallback_and_missing(self, problems, tmp_path):
+        """The first search dir holding the problem wins; none raises"""
+        cache = ProblemAssetCache(search_dirs=[str(tmp_path / "missing"), str(problems)])
+
+        assert cache.get("suma").problem_dir == problems / "suma"
+        with pytest.raises(ProblemNotFoundError):
+            cache.get("nope")
+
+    def test_file_hashes_match_result_cache_key(self, problems):
+        """Precomputed hashes give the same result cache key as reading the files"""
+        cache = ProblemAssetCache(search_dirs=[str(problems)])
+        assets = cache.get("suma")
+        result_cache = ResultCache(client=object(), enabled=False)
+
+        from_disk = result_cache.compute_key(assets.problem_dir, "x = 1", 3.0, 256)
+        from_cache = result_cache.compute_key(
+            assets.problem_dir, "x = 1", 3.0, 256, file_hashes=assets.file_hashes
+        )
+
+        assert from_cache == from_disk
@@ -0,0 +1,85 @@
+"""
+Tests for the read-only problem store
+"""
+import os
+import stat
+
+import pytest
+
+from worker.services.problem_assets import ProblemAssets
+from worker.services.problem_store import ProblemStore
+
+
+def _assets(version="a" * 64, hidden=b"def test_b(): pass\n"):
+    return ProblemAssets(
+        problem_id="suma",
+        problem_dir=None,
+        version=version,
+        meta={},
+        rubric={},
+        test_files={"tests_public.py": b"def test_a(): pass\n", "tests_hidden.py": hidden}
+    )
+
+
+def _fake_precompile(calls):
+    def precompile(directory):
+        calls.append(directory)
+        os.mkdir(os.path.join(directory, "__pycache__"))
+        with open(os.path.join(directory, "__pycache__", "tests_public.pyc"), "wb") as f:
+            f.write(b"pyc")
+    return precompile
+
+
+class TestProblemStore:
+    """Test cases for ProblemStore"""
+
+    def test_disabled_without_root(self):
+        """No PROBLEM_STORE_DIR keeps the per-workspace test copies"""
+        assert ProblemStore("").enabled is False
+
+    def test_build_version_read_only(self, tmp_path):
+        """A version holds the tests and their bytecode, all read-only"""
+        calls = []
+        store = ProblemStore(str(tmp_path))
+
+        path = store.ensure(_assets(), _fake_precompile(calls))
+
+        assert path == str(tmp_path / "suma" / ("a" * 16))
+        assert sorted(os.listdir(path)) == ["__pycache__", "tests_hidden.py", "tests_public.py"]
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o555
+        assert stat.S_IMODE(os.stat(os.path.join(path, "tests_hidden.py")).st_mode) == 0o444
+        assert len(calls) == 1 and calls[0] != path
+        # Only the finished version is left in the problem directory
+        assert os.listdir(tmp_path / "suma") == ["a" * 16]
+
+    def test_versions_built_once(self, tmp_path):
+        """Later jobs (and other workers) reuse an existing version"""
+        calls = []
+        store = ProblemStore(str(tmp_path))
+        store.ensure(_assets(), _fake_precompile(calls))
+        store.ensure(_assets(), _fake_precompile(calls))
+        ProblemStore(str(tmp_path)).ensure(_assets(), _fake_precompile(calls))
+
+        store.ensure(_assets(version="b" * 64, hidden=b"def test_c(): pass\n"), _fake_precompile(calls))
+
+        assert len(calls) == 2
+        assert sorted(os.listdir(tmp_path / "suma")) == ["a" * 16, "b" * 16]
+
+    def test_precompile_failure_still_builds(self, tmp_path):
+        """Without bytecode pytest compiles per run; the version is still usable"""
+        def broken(directory):
+            raise RuntimeError("no runner image")
+
+        path = ProblemStore(str(tmp_path)).ensure(_assets(), broken)
+
+        assert sorted(os.listdir(path)) == ["tests_hidden.py", "tests_public.py"]
+
+    def test_write_failure_leaves_nothing(self, tmp_path):
+        """A failed build removes its temporary directory"""
+        assets = _assets()
+        assets.test_files["../escape/tests_public.py"] = b""
+
+        with pytest.raises(OSError):
+            ProblemStore(str(tmp_path)).ensure(assets, lambda directory: None)
+
+        assert os.listdir(tmp_path / "suma") == []
@@ -0,0 +1,178 @@
+"""
+Tests for the bulk regrade pipeline
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.database import Base
+from backend import models
+from backend.models import RegradeRun, Submission
+from worker import regrade
+from worker.services import problem_assets, rubric_scorer
+
+
+class FakeQueue:
+    def __init__(self):
+        self.jobs = []
+
+    def enqueue(self, func, job_timeout=None, **kwargs):
+        self.jobs.append((func, kwargs))
+
+
+def _fake_grade(problem_id, code, timeout_sec=None, memory_mb=None, submission_id=None):
+    if "boom" in code:
+        raise RuntimeError("sandbox unavailable")
+    passed = "ok" in code
+    score = rubric_scorer.TestScore(
+        test_name="test_a", outcome="passed" if passed else "failed", duration=0.01,
+        message="", points=10.0 if passed else 0.0, max_points=10.0, visibility="public"
+    )
+    fields = {
+        "status": "completed", "ok": passed, "score_total": score.points, "score_max": 10.0,
+        "passed": int(passed), "failed": int(not passed), "errors": 0, "duration_sec": 0.1,
+        "cpu_user_sec": None, "cpu_system_sec": None, "peak_memory_kb": None,
+        "oom_killed": None, "exit_signal": None, "stdout": "", "stderr": "", "error_message": None,
+    }
+    return fields, [score]
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(regrade, "SessionLocal", factory)
+    monkeypatch.setattr(regrade, "grade_submission", _fake_grade)
+    monkeypatch.setattr(regrade, "REGRADE_BATCH_SIZE", 2)
+    monkeypatch.setattr(regrade, "REGRADE_PAGE_SIZE", 3)
+    yield factory
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    fake = FakeQueue()
+    monkeypatch.setattr(regrade, "_regrade_queue", lambda: fake)
+    return fake
+
+
+def _seed(db, codes, problem_id="suma", status="completed", mode="rerun"):
+    for i, code in enumerate(codes):
+        submission = Submission(
+            job_id=f"{problem_id}-{status}-{i}", problem_id=problem_id, code=code,
+            status=status, score_total=0.0, score_max=10.0
+        )
+        submission.test_results.append(models.TestResult(test_name="test_old", outcome="failed"))
+        db.add(submission)
+    run = RegradeRun(problem_id="suma", status="pending", mode=mode)
+    db.add(run)
+    db.commit()
+    return run.id
+
+
+def _run_batches(queue):
+    while queue.jobs:
+        func, kwargs = queue.jobs.pop(0)
+        assert func == "worker.regrade.regrade_batch"
+        regrade.regrade_batch(**kwargs)
+
+
+class TestRegrade:
+    """Test cases for start_regrade and regrade_batch"""
+
+    def test_regrades_finished_submissions_in_place(self, session_factory, queue):
+        """Results are replaced, counters updated and the run completed"""
+        db = session_factory()
+        run_id = _seed(db, ["ok 1", "mal 2", "ok 3", "ok 4", "mal 5"])
+        _seed(db, ["ok en curso"], status="running")
+        _seed(db, ["ok otro"], problem_id="resta")
+
+        stats = regrade.start_regrade(run_id)
+        assert stats == {"run_id": run_id, "submissions": 5, "batches": 3}
+        _run_batches(queue)
+
+        db.expire_all()
+        run = db.get(RegradeRun, run_id)
+        assert (run.status, run.total, run.regraded, run.failed, run.score_changed) == (
+            "completed", 5, 5, 0, 3
+        )
+        regraded = db.query(Submission).filter(Submission.regrade_run_id == run_id).all()
+        assert len(regraded) == 5
+        assert db.query(Submission).count() == 7  # No new rows
+        assert {r.test_name for s in regraded for r in s.test_results} == {"test_a"}
+        assert sorted(s.score_total for s in regraded) == [0.0, 0.0, 10.0, 10.0, 10.0]
+        in_flight = db.query(Submission).filter(Submission.status == "running").one()
+        assert in_flight.regrade_run_id is None
+
+    def test_failures_keep_old_result_and_resume_retries_them(self, session_factory, queue, monkeypatch):
+        """A failed grade leaves the submission untouched; resuming only reruns what is left"""
+        db = session_factory()
+        run_id = _seed(db, ["ok 1", "boom 2", "ok 3"])
+
+        regrade.start_regrade(run_id)
+        _run_batches(queue)
+        db.expire_all()
+        run = db.get(RegradeRun, run_id)
+        assert (run.status, run.regraded, run.failed) == ("completed", 2, 1)
+        failed = db.query(Submission).filter(Submission.code == "boom 2").one()
+        assert failed.regrade_run_id is None
+        assert [r.test_name for r in failed.test_results] == ["test_old"]
+
+        # The sandbox is back: the resumed run regrades only the failed submission
+        monkeypatch.setattr(regrade, "grade_submission", lambda *a, **k: _fake_grade("suma", "ok"))
+        stats = regrade.start_regrade(run_id)
+        assert stats["submissions"] == 1
+        _run_batches(queue)
+
+        db.expire_all()
+        run = db.get(RegradeRun, run_id)
+        assert (run.status, run.total, run.regraded, run.failed) == ("completed", 3, 3, 0)
+
+    def test_batch_skips_already_regraded(self, session_factory, queue):
+        """A batch run twice (e.g. re-enqueued after a crash) does not count twice"""
+        db = session_factory()
+        run_id = _seed(db, ["ok 1", "ok 2", "ok 3"])
+        regrade.start_regrade(run_id)
+        func, kwargs = queue.jobs[0]
+
+        regrade.regrade_batch(**kwargs)
+        second = regrade.regrade_batch(**kwargs)
+
+        assert second["regraded"] == 0
+        db.expire_all()
+        assert db.get(RegradeRun, run_id).regraded == 2
+
+    def test_nothing_to_regrade_completes_immediately(self, session_factory, queue):
+        """A run without matching submissions enqueues nothing"""
+        db = session_factory()
+        run_id = _seed(db, [])
+
+        stats = regrade.start_regrade(run_id)
+
+        assert stats["batches"] == 0 and queue.jobs == []
+        db.expire_all()
+        assert db.get(RegradeRun, run_id).status == "completed"
+
+
+    def test_rescore_mode_runs_no_code(self, session_factory, queue, monkeypatch):
+        """mode=rescore recomputes stored results with the current rubric, no batches"""
+        db = session_factory()
+        run_id = _seed(db, ["ok 1", "ok 2"], mode="rescore")
+        rubric = {"max_points": 5, "tests": [{"name": "test_old", "points": 5}]}
+        assets = problem_assets.ProblemAssets(
+            problem_id="suma", problem_dir=None, version="v", meta={}, rubric=rubric,
+            test_files={}, rubric_version=rubric_scorer.rubric_version(rubric)
+        )
+        monkeypatch.setattr(regrade.problem_asset_cache, "get", lambda problem_id: assets)
+
+        stats = regrade.start_regrade(run_id)
+
+        assert stats["rescored"] == 2 and queue.jobs == []
+        db.expire_all()
+        run = db.get(RegradeRun, run_id)
+        assert (run.status, run.total, run.regraded, run.score_changed) == ("completed", 2, 2, 0)
+        assert {s.score_max for s in db.query(Submission)} == {5.0}
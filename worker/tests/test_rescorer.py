@@ -0,0 +1,117 @@
+"""
+Tests for the set-based Rescorer
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend import models
+from backend.models import Submission
+from worker.services.rescorer import Rescorer
+from worker.services.rubric_scorer import rubric_version
+
+
+RUBRIC = {
+    "problem_id": "suma",
+    "max_points": 10,
+    "tests": [
+        {"name": "test_a", "points": 4, "visibility": "public"},
+        {"name": "test_b", "points": 6, "visibility": "hidden"},
+    ],
+}
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+
+def _add(db, outcomes, problem_id="suma", status="completed", student_id="alumno", score=5.0):
+    submission = Submission(
+        job_id=f"job-{db.query(Submission).count()}", problem_id=problem_id, student_id=student_id,
+        code="", status=status, score_total=score, score_max=5.0, rubric_version="old"
+    )
+    for name, outcome in outcomes.items():
+        submission.test_results.append(models.TestResult(
+            test_name=name, outcome=outcome, points=0.0, max_points=0.0, visibility="public"
+        ))
+    db.add(submission)
+    db.commit()
+    return submission.id
+
+
+class TestRescorer:
+    """Test cases for Rescorer.rescore"""
+
+    def test_rescores_points_visibility_and_totals(self, db):
+        """Stored outcomes are scored with the new rubric"""
+        both = _add(db, {"test_a": "passed", "test_b": "passed"}, score=10.0)
+        one = _add(db, {"test_a": "passed", "test_b": "failed"})
+
+        stats = Rescorer().rescore(db, "suma", RUBRIC, rubric_version(RUBRIC))
+
+        assert stats == {"problem_id": "suma", "rescored": 2, "score_changed": 1}
+        db.expire_all()
+        first, second = db.get(Submission, both), db.get(Submission, one)
+        assert (first.score_total, first.score_max) == (10.0, 10.0)
+        assert second.score_total == 4.0
+        assert second.rubric_version == rubric_version(RUBRIC)
+        results = {r.test_name: r for r in second.test_results}
+        assert (results["test_a"].points, results["test_a"].max_points) == (4.0, 4.0)
+        assert (results["test_b"].points, results["test_b"].max_points) == (0.0, 6.0)
+        assert results["test_b"].visibility == "hidden"
+
+    def test_second_run_is_noop(self, db):
+        """Submissions already scored by this rubric version are skipped"""
+        _add(db, {"test_a": "passed"})
+        Rescorer().rescore(db, "suma", RUBRIC, rubric_version(RUBRIC))
+
+        stats = Rescorer().rescore(db, "suma", RUBRIC, rubric_version(RUBRIC))
+
+        assert stats["rescored"] == 0
+
+    def test_only_matching_finished_submissions(self, db):
+        """Other problems, other students and unfinished submissions are untouched"""
+        target = _add(db, {"test_a": "passed"})
+        other_student = _add(db, {"test_a": "passed"}, student_id="otro")
+        other_problem = _add(db, {"test_a": "passed"}, problem_id="resta")
+        running = _add(db, {"test_a": "passed"}, status="running")
+
+        stats = Rescorer().rescore(db, "suma", RUBRIC, rubric_version(RUBRIC), student_id="alumno")
+
+        assert stats["rescored"] == 1
+        db.expire_all()
+        assert db.get(Submission, target).score_total == 4.0
+        for untouched in (other_student, other_problem, running):
+            assert db.get(Submission, untouched).score_total == 5.0
+            assert db.get(Submission, untouched).rubric_version == "old"
+
+    def test_total_is_capped_at_max_points(self, db):
+        """Test points adding up past max_points score max_points, like a fresh grade"""
+        rubric = {"max_points": 5, "tests": [{"name": "test_a", "points": 4}, {"name": "test_b", "points": 6}]}
+        both = _add(db, {"test_a": "passed", "test_b": "passed"})
+        one = _add(db, {"test_a": "passed", "test_b": "failed"})
+
+        Rescorer().rescore(db, "suma", rubric, rubric_version(rubric))
+
+        db.expire_all()
+        assert db.get(Submission, both).score_total == 5.0
+        assert db.get(Submission, one).score_total == 4.0
+
+    def test_results_of_tests_dropped_from_the_rubric_are_deleted(self, db):
+        """The rescored test list and counters match what RubricScorer keeps"""
+        sid = _add(db, {"test_a": "passed", "test_b": "failed", "test_viejo": "passed"})
+
+        Rescorer().rescore(db, "suma", RUBRIC, rubric_version(RUBRIC))
+
+        db.expire_all()
+        submission = db.get(Submission, sid)
+        assert sorted(r.test_name for r in submission.test_results) == ["test_a", "test_b"]
+        assert (submission.passed, submission.failed, submission.errors) == (1, 1, 0)
+        assert submission.score_total == 4.0
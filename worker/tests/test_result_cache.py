@@ -0,0 +1,113 @@
+"""
+Tests for the content-addressed sandbox result cache
+"""
+import pytest
+from worker.services.docker_runner import DockerRunResult
+from worker.services.result_cache import ResultCache, normalize_code
+from backend.cache import RESULT_CACHE_HITS_KEY, RESULT_CACHE_MISSES_KEY
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the commands ResultCache uses"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+
+@pytest.fixture
+def problem_dir(tmp_path):
+    problem = tmp_path / "sumatoria"
+    problem.mkdir()
+    (problem / "tests_public.py").write_text("def test_a(): pass\n")
+    (problem / "tests_hidden.py").write_text("def test_b(): pass\n")
+    (problem / "rubric.json").write_text('{"tests": [], "max_points": 0}')
+    return problem
+
+
+@pytest.fixture
+def cache():
+    return ResultCache(client=FakeRedis(), enabled=True)
+
+
+def _result(returncode=0, timed_out=False):
+    return DockerRunResult(
+        stdout="1 passed", stderr="", returncode=returncode, duration=0.5, timed_out=timed_out
+    )
+
+
+class TestResultCache:
+    """Test cases for ResultCache"""
+
+    def test_identical_code_same_key(self, cache, problem_dir):
+        """Line endings and trailing whitespace do not change the key"""
+        key1 = cache.compute_key(problem_dir, "x = 1\n", 5.0, 256)
+        key2 = cache.compute_key(problem_dir, "\ufeffx = 1\r\n\r\n  ", 5.0, 256)
+
+        assert key1 == key2
+
+    def test_key_changes_with_code_tests_and_limits(self, cache, problem_dir):
+        """Any input of the run yields a different key"""
+        base = cache.compute_key(problem_dir, "x = 1", 5.0, 256)
+
+        assert cache.compute_key(problem_dir, "x = 2", 5.0, 256) != base
+        assert cache.compute_key(problem_dir, "x = 1", 10.0, 256) != base
+        assert cache.compute_key(problem_dir, "x = 1", 5.0, 512) != base
+
+        (problem_dir / "tests_hidden.py").write_text("def test_b(): assert False\n")
+        assert cache.compute_key(problem_dir, "x = 1", 5.0, 256) != base
+
+    def test_roundtrip_and_counters(self, cache, problem_dir):
+        """A stored run is returned as a DockerRunResult and hits/misses are counted"""
+        key = cache.compute_key(problem_dir, "x = 1", 5.0, 256)
+        details = [{"name": "tests_public.py::test_a", "outcome": "passed"}]
+
+        assert cache.get(key) is None
+        assert cache.put(key, _result(), details) is True
+        entry = cache.get(key)
+
+        run = ResultCache.to_run_result(entry)
+        assert run.returncode == 0
+        assert run.test_details == details
+        assert cache.client.data[RESULT_CACHE_HITS_KEY] == 1
+        assert cache.client.data[RESULT_CACHE_MISSES_KEY] == 1
+
+    def test_nondeterministic_outcomes_not_stored(self, cache, problem_dir):
+        """Timeouts and killed containers are never cached"""
+        key = cache.compute_key(problem_dir, "while True: pass", 5.0, 256)
+
+        assert cache.put(key, _result(returncode=-1, timed_out=True), []) is False
+        assert cache.put(key, _result(returncode=137), []) is False
+        oom = _result(returncode=1)
+        oom.usage = {"oom_killed": True}
+        assert cache.put(key, oom, []) is False
+        limited = _result(returncode=0)
+        limited.output_limited = True
+        assert cache.put(key, limited, []) is False
+        assert cache.get(key) is None
+
+    def test_per_test_timeouts_not_stored(self, cache, problem_dir):
+        """Runs with a test over its time budget depend on load and are not cached"""
+        key = cache.compute_key(problem_dir, "x = 1", 5.0, 256)
+
+        assert cache.put(key, _result(returncode=1), [{"name": "t", "outcome": "timeout"}]) is False
+
+    def test_disabled_cache_is_a_no_op(self, problem_dir):
+        """RESULT_CACHE_ENABLED=0 turns reads and writes off"""
+        cache = ResultCache(client=FakeRedis(), enabled=False)
+        key = cache.compute_key(problem_dir, "x = 1", 5.0, 256)
+
+        assert cache.put(key, _result(), []) is False
+        assert cache.get(key) is None
+
+    def test_normalize_code(self):
+        assert normalize_code("a\r\nb\r\n\n") == "a\nb\n"
@@ -0,0 +1,85 @@
+"""
+Tests for the runner result stream decoder
+"""
+import json
+import struct
+
+from worker.services.result_stream import (
+    HEADER, MAGIC, ResultStreamDecoder, decode_result_stream, decode_run_output
+)
+
+
+def _frame(record):
+    payload = json.dumps(record).encode()
+    return HEADER.pack(MAGIC, len(payload)) + payload
+
+
+TEST_A = {"event": "test", "name": "tests_public.py::test_a", "outcome": "passed",
+          "duration": 0.01, "message": ""}
+TEST_B = {"event": "test", "name": "tests_hidden.py::test_b", "outcome": "failed",
+          "duration": 0.02, "message": "assert 1 == 2"}
+END = {"event": "end", "exitstatus": 1}
+
+
+class TestResultStreamDecoder:
+    """Test cases for ResultStreamDecoder"""
+
+    def test_frames_interleaved_with_console(self):
+        """Records are extracted and console output is kept in order"""
+        stream = b".F" + _frame(TEST_A) + b"\n" + _frame(TEST_B) + b"1 failed" + _frame(END)
+
+        console, details = decode_result_stream(stream)
+
+        assert console == ".F\n1 failed"
+        assert details == [
+            {k: v for k, v in TEST_A.items() if k != "event"},
+            {k: v for k, v in TEST_B.items() if k != "event"},
+        ]
+
+    def test_byte_by_byte_feed(self):
+        """Frames split at any point across chunks are reassembled"""
+        stream = b"out" + _frame(TEST_A) + b"\x00PG" + _frame(END)
+        decoder = ResultStreamDecoder()
+
+        completed = []
+        for i in range(len(stream)):
+            completed += decoder.feed(stream[i:i + 1])
+
+        assert [r["event"] for r in completed] == ["test", "end"]
+        assert bytes(decoder.console) == b"out\x00PG"
+        assert decoder.finished is True
+
+    def test_truncated_stream_keeps_finished_tests(self):
+        """A run killed mid-frame keeps every complete record"""
+        stream = _frame(TEST_A) + _frame(TEST_B)[:-5]
+        decoder = ResultStreamDecoder()
+
+        decoder.feed(stream)
+
+        assert len(decoder.test_details()) == 1
+        assert decoder.finished is False
+
+    def test_oversized_length_is_console(self):
+        """A magic followed by an absurd length is treated as plain output"""
+        garbage = MAGIC + struct.pack(">I", 0xFFFFFFFF) + b"tail"
+
+        console, details = decode_result_stream(garbage + _frame(TEST_A))
+
+        assert console.endswith("tail")
+        assert len(details) == 1
+
+    def test_text_and_empty_input(self):
+        """Plain text (mocked runs) and missing output decode to no records"""
+        assert decode_result_stream("4 passed") == ("4 passed", [])
+        assert decode_result_stream(None) == ("", [])
+
+    def test_usage_record(self):
+        """The supervisor's usage record is kept apart from test records"""
+        usage = {"event": "usage", "cpu_user_sec": 0.2, "cpu_system_sec": 0.05,
+                 "peak_memory_kb": 30000, "oom_killed": False, "exit_signal": None}
+
+        console, details, decoded = decode_run_output(_frame(TEST_A) + _frame(END) + _frame(usage))
+
+        assert len(details) == 1
+        assert decoded == {k: v for k, v in usage.items() if k != "event"}
+        assert decode_run_output(_frame(TEST_A))[2] == {}
@@ -0,0 +1,235 @@
+"""
+Tests for write-behind result persistence (publisher + batching writer)
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.cache import RESULTS_STREAM
+from backend.database import Base
+from backend.models import Submission
+from worker import result_writer, tasks
+from worker.result_writer import RESULTS_DEAD_STREAM, ResultWriter, write_batch
+from worker.services.result_publisher import ResultPublisher, decode_message, encode_message
+
+
+class FakeNotifier:
+    def __init__(self):
+        self.published = {}
+
+    def notify_many(self, statuses):
+        self.published.update(statuses)
+
+
+class FakeStreamRedis:
+    """In-memory stand-in for the stream commands used by the publisher and writer"""
+
+    def __init__(self):
+        self.streams = {}
+        self.seq = 0
+        self.delivered = 0
+        self.pending = {}  # entry id -> consumer
+
+    def xadd(self, stream, fields):
+        self.seq += 1
+        entry_id = f"{self.seq}-0"
+        self.streams.setdefault(stream, []).append((entry_id, fields))
+        return entry_id
+
+    def xlen(self, stream):
+        return len(self.streams.get(stream, []))
+
+    def xgroup_create(self, stream, group, id="0", mkstream=False):
+        self.streams.setdefault(stream, [])
+
+    def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        (stream, read_id), = streams.items()
+        entries = self.streams.get(stream, [])
+        if read_id == ">":
+            batch = entries[self.delivered:self.delivered + count]
+            self.delivered += len(batch)
+            for entry_id, _ in batch:
+                self.pending[entry_id] = consumer
+        else:
+            batch = [e for e in entries if self.pending.get(e[0]) == consumer][:count]
+        return [[stream, batch]] if batch else []
+
+    def xautoclaim(self, stream, group, consumer, min_idle_time=0, start_id="0-0", count=None):
+        if min_idle_time > 0:
+            return ["0-0", [], []]
+        claimed = [e for e in self.streams.get(stream, []) if self.pending.get(e[0]) not in (None, consumer)]
+        for entry_id, _ in claimed:
+            self.pending[entry_id] = consumer
+        return ["0-0", claimed[:count], []]
+
+    def xack(self, stream, group, *ids):
+        for entry_id in ids:
+            self.pending.pop(entry_id, None)
+
+    def xdel(self, stream, *ids):
+        before = len(self.streams[stream])
+        self.streams[stream] = [e for e in self.streams[stream] if e[0] not in ids]
+        self.delivered -= before - len(self.streams[stream])
+
+
+@pytest.fixture(autouse=True)
+def notifier(monkeypatch):
+    fake = FakeNotifier()
+    monkeypatch.setattr(result_writer, "submission_notifier", fake)
+    return fake
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    Base.metadata.drop_all(engine)
+
+
+def _submission(db, status="queued"):
+    submission = Submission(job_id=f"job-{status}-{db.query(Submission).count()}",
+                            problem_id="suma", code="", status=status)
+    db.add(submission)
+    db.commit()
+    return submission.id
+
+
+def _result(points=10.0, test_name="test_a"):
+    fields = {"status": "completed", "ok": True, "score_total": points, "score_max": 10.0, "passed": 1}
+    rows = [{"test_name": test_name, "outcome": "passed", "points": points, "max_points": 10.0}]
+    return fields, rows
+
+
+class TestResultWriter:
+    """Test cases for ResultPublisher and ResultWriter"""
+
+    def test_batch_is_written_acked_and_deleted(self, session_factory, notifier):
+        """Published results reach the database in one pass and leave the stream"""
+        client = FakeStreamRedis()
+        publisher = ResultPublisher(client=client)
+        db = session_factory()
+        first, second, third = _submission(db), _submission(db), _submission(db)
+        for sid in (first, second):
+            publisher.publish_running(sid)
+            publisher.publish_result(sid, *_result())
+        publisher.publish_running(third)
+
+        written = ResultWriter(client, consumer="w1", session_factory=session_factory).run(burst=True)
+
+        assert written == 5
+        assert client.xlen(RESULTS_STREAM) == 0 and client.pending == {}
+        db.expire_all()
+        done = db.get(Submission, first)
+        assert (done.status, done.score_total) == ("completed", 10.0)
+        assert done.completed_at is not None
+        assert [r.test_name for r in done.test_results] == ["test_a"]
+        assert db.get(Submission, third).status == "running"
+        assert notifier.published == {first: "completed", second: "completed", third: "running"}
+
+    def test_replay_is_idempotent_and_running_never_regresses(self, session_factory):
+        """Redelivered messages rewrite the same rows; a late "running" keeps the result"""
+        db = session_factory()
+        sid = _submission(db)
+        result = decode_message(encode_message(
+            "result", sid, fields=_result()[0], test_results=_result()[1],
+            completed_at="2025-01-01T12:00:00"
+        ))
+        running = decode_message(encode_message("running", sid))
+
+        write_batch(db, [running, result])
+        write_batch(db, [result])
+        write_batch(db, [running])
+
+        db.expire_all()
+        submission = db.get(Submission, sid)
+        assert submission.status == "completed"
+        assert len(submission.test_results) == 1
+
+    def test_last_result_of_a_batch_wins(self, session_factory):
+        """Several results for one submission (a retried job) coalesce to the last"""
+        db = session_factory()
+        sid = _submission(db)
+        messages = [
+            {"kind": "result", "submission_id": sid, "fields": fields, "test_results": rows,
+             "completed_at": "2025-01-01T12:00:00"}
+            for fields, rows in (_result(0.0, "test_old"), _result(10.0, "test_new"))
+        ]
+
+        assert write_batch(db, messages) == {"running": 0, "finished": 1}
+        db.expire_all()
+        submission = db.get(Submission, sid)
+        assert submission.score_total == 10.0
+        assert [r.test_name for r in submission.test_results] == ["test_new"]
+
+    def test_pending_messages_of_dead_writer_are_claimed(self, session_factory):
+        """Entries read but never acked by a crashed writer are written by another"""
+        client = FakeStreamRedis()
+        db = session_factory()
+        sid = _submission(db)
+        ResultPublisher(client=client).publish_result(sid, *_result())
+        client.xreadgroup("g", "crashed", {RESULTS_STREAM: ">"}, count=10)
+
+        ResultWriter(client, consumer="w2", claim_idle_ms=0, session_factory=session_factory).run(burst=True)
+
+        db.expire_all()
+        assert db.get(Submission, sid).status == "completed"
+        assert client.pending == {}
+
+    def test_poison_message_goes_to_dead_letter_stream(self, session_factory):
+        """A message the database rejects does not block the rest of the batch"""
+        client = FakeStreamRedis()
+        publisher = ResultPublisher(client=client)
+        db = session_factory()
+        good, bad = _submission(db), _submission(db)
+        publisher.publish_result(good, *_result())
+        publisher.publish_result(bad, _result()[0], [{"test_name": None, "outcome": "passed"}])
+
+        ResultWriter(client, consumer="w1", session_factory=session_factory).run(burst=True)
+
+        db.expire_all()
+        assert db.get(Submission, good).status == "completed"
+        assert db.get(Submission, bad).status == "queued"
+        assert client.xlen(RESULTS_STREAM) == 0
+        assert client.xlen(RESULTS_DEAD_STREAM) == 1
+
+    def test_database_outage_leaves_entries_pending(self, session_factory, monkeypatch):
+        """A connection error dead-letters nothing; the entries are written once the database is back"""
+        client = FakeStreamRedis()
+        db = session_factory()
+        sid = _submission(db)
+        ResultPublisher(client=client).publish_result(sid, *_result())
+        writer = ResultWriter(client, consumer="w1", session_factory=session_factory)
+
+        def outage(db, messages):
+            raise OperationalError("UPDATE submissions", {}, Exception("server closed the connection"))
+
+        monkeypatch.setattr(result_writer, "write_batch", outage)
+        with pytest.raises(OperationalError):
+            writer.run(burst=True)
+
+        assert client.xlen(RESULTS_STREAM) == 1
+        assert list(client.pending) == ["1-0"]
+        assert client.xlen(RESULTS_DEAD_STREAM) == 0
+
+        monkeypatch.setattr(result_writer, "write_batch", write_batch)
+        assert writer.run(burst=True) == 1
+
+        db.expire_all()
+        assert db.get(Submission, sid).status == "completed"
+        assert client.xlen(RESULTS_STREAM) == 0 and client.pending == {}
+
+    def test_stream_mode_task_does_not_touch_the_database(self, monkeypatch):
+        """With RESULT_PERSISTENCE=stream the job only publishes"""
+        client = FakeStreamRedis()
+        monkeypatch.setattr(tasks, "RESULT_PERSISTENCE", "stream")
+        monkeypatch.setattr(tasks, "result_publisher", ResultPublisher(client=client))
+        monkeypatch.setattr(tasks, "SessionLocal", lambda: pytest.fail("opened a DB session"))
+        monkeypatch.setattr(tasks, "_grade_with_progress", lambda *a, **k: (_result()[0], []))
+
+        tasks.run_submission_in_sandbox(7, "suma", "print(1)")
+
+        kinds = [decode_message(fields)["kind"] for _, fields in client.streams[RESULTS_STREAM]]
+        assert kinds == ["running", "result"]
@@ -2,7 +2,7 @@
 Tests for RubricScorer service
 """
 import pytest
-from worker.services.rubric_scorer import RubricScorer, TestScore, ScoringResult
+from worker.services.rubric_scorer import RubricScorer, TestScore, ScoringResult, rubric_version
 
 
 class TestRubricScorer:
@@ -132,6 +132,59 @@ class TestRubricScorer:
         assert result.failed == 0
         assert result.errors == 1
 
+    def test_score_keeps_points_of_finished_tests_on_timeout(self, sample_rubric):
+        """A hung test scores zero; tests that finished keep their points"""
+        scorer = RubricScorer()
+
+        test_details = [
+            {
+                "name": "tests_public.py::test_suma_basico",
+                "outcome": "passed",
+                "duration": 0.001,
+                "message": ""
+            },
+            {
+                "name": "tests_public.py::test_suma_negativos",
+                "outcome": "timeout",
+                "duration": 2.5,
+                "message": "Test exceeded its time limit (2.5s)"
+            },
+            {
+                "name": "tests_hidden.py::test_suma_grande",
+                "outcome": "passed",
+                "duration": 0.003,
+                "message": ""
+            }
+        ]
+
+        result = scorer.score(test_details, sample_rubric)
+
+        assert result.score_total == 8.0  # 3 + 0 (timeout) + 5
+        assert result.passed == 2
+        assert result.failed == 1
+        assert result.timeouts == 1
+        assert result.test_scores[1].outcome == "timeout"
+
+    def test_score_carries_test_usage(self, sample_rubric):
+        """CPU time and peak memory of a test record reach its TestScore"""
+        scorer = RubricScorer()
+
+        test_details = [
+            {
+                "name": "tests_public.py::test_suma_basico",
+                "outcome": "passed",
+                "duration": 0.001,
+                "message": "",
+                "cpu_time": 0.0009,
+                "max_rss_kb": 24576
+            }
+        ]
+
+        result = scorer.score(test_details, sample_rubric)
+
+        assert result.test_scores[0].cpu_time == 0.0009
+        assert result.test_scores[0].peak_memory_kb == 24576
+
     def test_score_visibility_public(self, sample_rubric):
         """Test that public tests have correct visibility"""
         scorer = RubricScorer()
@@ -169,15 +222,15 @@ class TestRubricScorer:
         assert test_score.visibility == "hidden"
 
     def test_score_test_not_in_rubric(self):
-        """Test scoring when test is not defined in rubric"""
+        """Records of tests the rubric does not list are dropped"""
         scorer = RubricScorer()
 
         test_details = [
             {
-                "nodeid": "tests_public.py::test_unknown",
+                "name": "tests_public.py::test_unknown",
                 "outcome": "passed",
                 "duration": 0.001,
-                "longrepr": ""
+                "message": ""
             }
         ]
 
@@ -190,12 +243,38 @@ class TestRubricScorer:
 
         result = scorer.score(test_details, rubric)
 
-        # Unknown test should have 0 points and unknown visibility
+        assert result.test_scores == []
+        assert result.passed == 0
+        assert result.score_total == 0.0
+
+    def test_score_one_record_per_test(self, sample_rubric):
+        """A repeated record can't add points, and a failure wins over a pass"""
+        scorer = RubricScorer()
+
+        passed = {"name": "tests_public.py::test_suma_basico", "outcome": "passed", "duration": 0.001, "message": ""}
+        failed = dict(passed, outcome="failed", message="assert 4 == 5")
+
+        result = scorer.score([passed, failed, passed, passed], sample_rubric)
+
         assert len(result.test_scores) == 1
-        test_score = result.test_scores[0]
-        assert test_score.points == 0.0
-        assert test_score.max_points == 0.0
-        assert test_score.visibility == "unknown"
+        assert result.test_scores[0].outcome == "failed"
+        assert result.score_total == 0.0
+        assert (result.passed, result.failed) == (0, 1)
+
+    def test_score_total_clamped_to_max(self):
+        """The total never exceeds max_points, even with an inconsistent rubric"""
+        scorer = RubricScorer()
+
+        rubric = {"tests": [{"name": "test_a", "points": 8}, {"name": "test_b", "points": 8}], "max_points": 10}
+        test_details = [
+            {"name": f"tests_public.py::{name}", "outcome": "passed", "duration": 0.001, "message": ""}
+            for name in ("test_a", "test_b")
+        ]
+
+        result = scorer.score(test_details, rubric)
+
+        assert result.score_total == 10
+        assert result.score_max == 10
 
     def test_score_empty_test_details(self, sample_rubric):
         """Test scoring with no test results"""
@@ -303,3 +382,11 @@ class TestRubricScorer:
         assert result.passed == 1
         assert result.failed == 0
         assert result.errors == 0
+
+    def test_rubric_version_ignores_key_order(self, sample_rubric):
+        """The version is a content hash: key order does not matter, points do"""
+        reordered = dict(reversed(list(sample_rubric.items())))
+        changed = {**sample_rubric, "max_points": sample_rubric["max_points"] + 1}
+
+        assert rubric_version(reordered) == rubric_version(sample_rubric)
+        assert rubric_version(changed) != rubric_version(sample_rubric)
@@ -0,0 +1,92 @@
+"""
+Tests for the live per-test progress hash of submissions
+"""
+import json
+
+from worker.services.output_capture import OutputCapture
+from worker.services.result_stream import HEADER, MAGIC
+from worker.services.submission_progress import SubmissionProgress, progress_key
+
+
+class FakeRedis:
+    """Records the pipeline commands SubmissionProgress uses"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.published = []
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    def expire(self, key, ttl):
+        pass
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+    def execute(self):
+        return []
+
+
+RUBRIC = {
+    "max_points": 10,
+    "tests": [{"name": "test_a", "points": 6}, {"name": "test_b", "points": 4}],
+}
+
+
+def _frame(record):
+    payload = json.dumps(record).encode()
+    return HEADER.pack(MAGIC, len(payload)) + payload
+
+
+class TestSubmissionProgress:
+    """Test cases for SubmissionProgress and the OutputCapture test listener"""
+
+    def test_started_resets_counters(self):
+        """Claiming a submission stores its totals from the rubric"""
+        progress = SubmissionProgress(client=FakeRedis())
+
+        progress.started(7, RUBRIC)
+
+        fields = progress.client.hashes[progress_key(7)]
+        assert (fields["state"], fields["tests_done"], fields["tests_total"]) == ("running", 0, 2)
+        assert fields["score_max"] == 10.0
+
+    def test_tests_decoded_inside_track_update_progress(self):
+        """Each decoded test frame counts and publishes the partial score"""
+        progress = SubmissionProgress(client=FakeRedis())
+
+        with progress.track(7, RUBRIC):
+            capture = OutputCapture()
+            capture.feed_stdout(_frame({"event": "test", "name": "t.py::test_a", "outcome": "passed"}))
+            capture.feed_stdout(b"console text")
+            capture.feed_stdout(_frame({"event": "test", "name": "t.py::test_b", "outcome": "failed"}))
+
+        fields = progress.client.hashes[progress_key(7)]
+        assert (fields["tests_done"], fields["score"]) == (2, 6.0)
+        assert progress.client.published[-1] == (
+            "submission_events:7", {"status": "running", "progress": {"tests_done": 2, "score": 6.0}}
+        )
+
+    def test_capture_outside_track_has_no_listener(self):
+        """Runs not wrapped in track (or after it) report nothing"""
+        progress = SubmissionProgress(client=FakeRedis())
+        with progress.track(7, RUBRIC):
+            pass
+
+        capture = OutputCapture()
+        capture.feed_stdout(_frame({"event": "test", "name": "t.py::test_a", "outcome": "passed"}))
+
+        assert capture.on_test is None
+        assert progress.client.hashes == {}
+
+    def test_finished_records_final_state(self):
+        """The worker leaves the final status once the result is stored"""
+        progress = SubmissionProgress(client=FakeRedis())
+
+        progress.finished(7, "completed")
+
+        assert progress.client.hashes[progress_key(7)]["state"] == "completed"
@@ -0,0 +1,92 @@
+"""
+Tests for in-memory workspace archives and DockerRunner stream mode
+"""
+import io
+import tarfile
+from unittest.mock import Mock, patch
+
+from worker.services.docker_runner import DockerRunner
+from worker.services.result_stream import HEADER, MAGIC
+from worker.services.container_pool import PooledContainer
+from worker.services.workspace_archive import build_workspace_archive
+
+
+class TestWorkspaceArchive:
+    """Test cases for build_workspace_archive"""
+
+    def test_archive_contains_files(self):
+        """Every file is packed with its content, owned by the sandbox user"""
+        data = build_workspace_archive({"student_code.py": b"x = 1\n", "tests_public.py": b""})
+
+        with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+            members = {m.name: m for m in archive.getmembers()}
+            assert archive.extractfile("student_code.py").read() == b"x = 1\n"
+
+        assert set(members) == {"student_code.py", "tests_public.py"}
+        assert members["student_code.py"].uid == 1000
+        assert members["student_code.py"].mode == 0o644
+
+
+class TestDockerRunnerStreamMode:
+    """Test cases for DockerRunner.run_archive"""
+
+    @patch("worker.services.docker_runner.run_bounded")
+    def test_cold_run_streams_tar_to_stdin(self, mock_run, bounded_output):
+        """Cold runs use `docker run -i` with a tmpfs workspace and no bind mount"""
+        frame = HEADER.pack(MAGIC, 2) + b"{}"
+        mock_run.side_effect = bounded_output(stdout=b"1 passed\n" + frame)
+        runner = DockerRunner(pool_size=0, workspace_mode="stream")
+
+        result = runner.run_archive(files={"student_code.py": b"x = 1"}, timeout_sec=3.0)
+
+        cmd = mock_run.call_args[0][0]
+        kwargs = mock_run.call_args[1]
+        assert cmd[:4] == ["docker", "run", "-i", "--rm"]
+        assert "-v" not in cmd
+        assert cmd[cmd.index("--tmpfs", cmd.index("--tmpfs") + 1) + 1].startswith("/workspace:")
+        assert "--stdin-tar" in cmd
+        assert cmd[cmd.index("playground_harness") - 2:][:2] == ["python", "-m"]
+        assert tarfile.is_tarfile(io.BytesIO(kwargs["stdin"]))
+        assert result.stdout == "1 passed\n"
+        assert result.test_details == []
+
+    @patch("worker.services.docker_runner.run_bounded")
+    def test_warm_run_uses_exec_with_stdin(self, mock_run, bounded_output):
+        """Warm runs `docker exec -i` the harness in a leased tmpfs container"""
+        mock_run.side_effect = bounded_output(returncode=1)
+        runner = DockerRunner(pool_size=1, workspace_mode="stream")
+        lease = PooledContainer(container_id="warm1", workspace=None, memory_mb=256, cpus="1.0")
+        runner._pool = Mock(acquire=Mock(return_value=lease))
+
+        result = runner.run_archive(files={"student_code.py": b"x = 1"}, timeout_sec=3.0)
+
+        cmd = mock_run.call_args[0][0]
+        assert cmd[:4] == ["docker", "exec", "-i", "-u"]
+        assert "warm1" in cmd and "--stdin-tar" in cmd
+        assert result.test_details == []
+        runner._pool.release.assert_called_once_with(lease)
+
+    @patch("worker.services.docker_runner.run_bounded")
+    def test_time_budgets_passed_to_harness(self, mock_run, bounded_output):
+        """Per-test and session budgets become harness flags"""
+        mock_run.side_effect = bounded_output()
+        runner = DockerRunner(pool_size=0, workspace_mode="stream")
+
+        runner.run_archive(files={}, timeout_sec=4.0, test_timeout_sec=1.5)
+
+        cmd = mock_run.call_args[0][0]
+        harness_args = cmd[cmd.index("run", cmd.index("playground_harness")):cmd.index("--")]
+        assert harness_args == [
+            "run", "--stdin-tar", "--test-timeout", "1.5", "--session-timeout", "4"
+        ]
+        assert mock_run.call_args[1]["timeout_sec"] == 6.0
+
+    def test_stream_mode_pool_spec(self):
+        """Pooled containers get a tmpfs workspace instead of a bind mount"""
+        runner = DockerRunner(pool_size=1, workspace_mode="stream")
+
+        spec = runner._pool_container_spec()
+
+        assert spec["bind_workspace"] is False
+        assert spec["container_args"][0] == "--tmpfs"
+        assert spec["container_args"][1].startswith("/workspace:")